@@ -0,0 +1,135 @@
+# 外貨を含む 10 万件の集計が、基準通貨だけの 10 万件と同じくらいの時間で済むことを確かめる
+# 実行例: poetry run python benchmarks/bench_fx.py --rows 100000
+import argparse
+import random
+import statistics
+import time
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+load_dotenv(".env.test.unit")
+
+from kakeibo_be.core.currency import BASE_CURRENCY  # noqa: E402
+from kakeibo_be.logic.calculate.calculate_fx import convert_to_base_amount  # noqa: E402
+from kakeibo_be.models.db.base import Base  # noqa: E402
+from kakeibo_be.models.db.cash_flow import CashFlow  # noqa: E402
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState  # noqa: E402
+from kakeibo_be.models.db.fx_rate import FxRate  # noqa: E402
+from kakeibo_be.models.db.tenant import tenant_scope  # noqa: E402
+from kakeibo_be.repositories.cash_flow import get_daily_totals_in_range  # noqa: E402
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE  # noqa: E402
+from kakeibo_be.repositories.category import get_category_breakdown  # noqa: E402
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType  # noqa: E402
+
+START_DATE = date(2025, 1, 1)
+END_DATE = date(2026, 1, 1)
+TITLES = ["食費", "日用品", "交通費", "外食", "趣味"]
+FOREIGN_CURRENCIES = {"USD": Decimal("1.5"), "EUR": Decimal("1.6")}
+SINGLE_CURRENCY_USER_ID = 1
+MIXED_CURRENCY_USER_ID = 2
+ITERATIONS = 20
+# 外貨を含む場合に許容する応答時間の倍率
+MAX_RATIO = 1.5
+
+
+def seed(session: Session, rows: int) -> None:
+    rng = random.Random(0)
+    now = datetime.now()
+    days = (END_DATE - START_DATE).days
+    # 為替レートは平日だけ（休日は前の日のレートを使う）
+    session.execute(
+        insert(FxRate),
+        [
+            {"currency": currency, "rate_date": rate_date, "rate": rate, "updated_at": now}
+            for currency, rate in FOREIGN_CURRENCIES.items()
+            for offset in range(days)
+            if (rate_date := START_DATE + timedelta(days=offset)).weekday() < 5
+        ],
+    )
+    currencies = [BASE_CURRENCY, *FOREIGN_CURRENCIES]
+    for user_id in (SINGLE_CURRENCY_USER_ID, MIXED_CURRENCY_USER_ID):
+        session.execute(
+            insert(CashFlow),
+            [
+                {
+                    "user_id": user_id,
+                    "title": rng.choice(TITLES),
+                    "type": CashFlowType.EXPENSE,
+                    "recorded_at": START_DATE + timedelta(days=rng.randrange(days)),
+                    "amount": (amount := rng.randrange(100, 5000)),
+                    "currency": (
+                        currency := rng.choice(currencies)
+                        if user_id == MIXED_CURRENCY_USER_ID
+                        else BASE_CURRENCY
+                    ),
+                    # レートは通貨ごとに一定
+                    "base_amount": (
+                        amount
+                        if currency == BASE_CURRENCY
+                        else convert_to_base_amount(amount, FOREIGN_CURRENCIES[currency])
+                    ),
+                    "sync_version": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for _ in range(rows)
+            ],
+        )
+    session.commit()
+
+
+def measure(session: Session, user_id: int) -> tuple[float, float]:
+    totals_elapsed = []
+    breakdown_elapsed = []
+    with tenant_scope(session, user_id):
+        for _ in range(ITERATIONS):
+            started_at = time.perf_counter()
+            get_daily_totals_in_range(session=session, start_date=START_DATE, end_date=END_DATE)
+            totals_elapsed.append(time.perf_counter() - started_at)
+
+            started_at = time.perf_counter()
+            get_category_breakdown(
+                session=session,
+                start_date=START_DATE,
+                end_date=END_DATE,
+                cash_flow_type=CashFlowType.EXPENSE,
+            )
+            breakdown_elapsed.append(time.perf_counter() - started_at)
+    return statistics.median(totals_elapsed) * 1000, statistics.median(breakdown_elapsed) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="外貨を含む集計の応答時間を計測する")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            ArchiveState(
+                name=CASH_FLOW_ARCHIVE,
+                archived_before=date(1970, 1, 1),
+                archiving_before=date(1970, 1, 1),
+            )
+        )
+        seed(session, args.rows)
+        single = measure(session, SINGLE_CURRENCY_USER_ID)
+        mixed = measure(session, MIXED_CURRENCY_USER_ID)
+
+    print(f"rows per user = {args.rows}, currencies = {[BASE_CURRENCY, *FOREIGN_CURRENCIES]}")
+    print(f"single: totals = {single[0]:.2f} ms, breakdown = {single[1]:.2f} ms")
+    print(f"mixed:  totals = {mixed[0]:.2f} ms, breakdown = {mixed[1]:.2f} ms")
+    ratios = [mixed_ms / single_ms for single_ms, mixed_ms in zip(single, mixed, strict=True)]
+    print(f"ratio: totals = {ratios[0]:.2f}, breakdown = {ratios[1]:.2f} (max = {MAX_RATIO})")
+    if max(ratios) > MAX_RATIO:
+        raise SystemExit("外貨を含むと集計の応答時間が伸びています。")
+
+
+if __name__ == "__main__":
+    main()
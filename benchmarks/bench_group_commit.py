@@ -0,0 +1,137 @@
+# POST /api/v1/cash-flows の作成のスループットを、同時に送るクライアント数ごとに、
+# リクエストごとにコミットする場合と、まとめてコミットする場合（GROUP_COMMIT）とで比べる
+# アプリを同じプロセスで動かし、SQLite のファイルに書き込む
+# コミットのたびにディスクへの書き込みを待つよう、既定では SQLITE_SYNCHRONOUS=FULL にする
+# 実行例: poetry run python benchmarks/bench_group_commit.py --requests 2000
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from datetime import date
+
+DIRECTORY = tempfile.mkdtemp(prefix="bench_group_commit_")
+# アプリのモジュールは import 時に環境変数を読むので、先に設定する
+os.environ.setdefault("DATABASE_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", os.path.join(DIRECTORY, "bench_group_commit.db"))
+os.environ.setdefault("SQLITE_SYNCHRONOUS", "FULL")
+# 同時に送るリクエストを、接続プールとアドミッション制御で待たせない・断らない
+os.environ.setdefault("DB_POOL_SIZE", "128")
+os.environ.setdefault("ADMISSION_MAX_CONCURRENCY", "256")
+os.environ.setdefault("ADMISSION_MAX_QUEUE_SIZE", "256")
+
+import anyio  # noqa: E402
+import httpx  # noqa: E402
+
+from dotenv import load_dotenv  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+load_dotenv(".env.test.unit")
+
+from kakeibo_be.api.v1.cash_flows import (  # noqa: E402
+    cash_flow_group_committer,
+    get_cash_flow_group_committer,
+)
+from kakeibo_be.core.group_commit import GroupCommitter  # noqa: E402
+from kakeibo_be.main import app  # noqa: E402
+from kakeibo_be.models.db.base import Base, engine  # noqa: E402
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState  # noqa: E402
+from kakeibo_be.models.db.sync_sequence import SyncSequence  # noqa: E402
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE  # noqa: E402
+from kakeibo_be.repositories.sync_sequence import (  # noqa: E402
+    CASH_FLOW_SEQUENCE,
+    LEGACY_SYNC_USER_ID,
+)
+
+CLIENTS = (1, 16, 128)
+USERS = 10
+
+
+def setup_database() -> None:
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            SyncSequence(
+                name=CASH_FLOW_SEQUENCE, user_id=LEGACY_SYNC_USER_ID, last_value=0, purged_value=0
+            )
+        )
+        session.add(
+            ArchiveState(
+                name=CASH_FLOW_ARCHIVE,
+                archived_before=date(1970, 1, 1),
+                archiving_before=date(1970, 1, 1),
+            )
+        )
+        session.commit()
+
+
+def get_group_committer() -> GroupCommitter:
+    return cash_flow_group_committer
+
+
+def get_no_group_committer() -> None:
+    return None
+
+
+async def run(clients: int, requests: int) -> tuple[float, int]:
+    # clients 個のクライアントが、合わせて requests 件の作成を送り終えるまでの秒数と失敗の件数
+    # 同期のエンドポイントはスレッドプールで動くので、クライアント数までスレッドを使えるようにする
+    anyio.to_thread.current_default_thread_limiter().total_tokens = max(clients, 40)
+    remaining = iter(range(requests))
+    failures = 0
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal failures
+        for i in remaining:
+            response = await client.post(
+                "/api/v1/cash-flows",
+                json={
+                    "title": "食費",
+                    "type": "expense",
+                    "recordedAt": "2025-12-01",
+                    "amount": i + 1,
+                },
+                headers={"X-User-Id": str(i % USERS + 1)},
+            )
+            if response.status_code != 200:
+                failures += 1
+
+    # 500 も失敗として数える
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        return time.perf_counter() - started_at, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="作成のスループットをまとめたコミットの有無で比べる")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    try:
+        setup_database()
+        print(
+            f"requests = {args.requests}, synchronous = {os.environ['SQLITE_SYNCHRONOUS']}, "
+            f"window = {cash_flow_group_committer.window_seconds * 1000:.1f}ms, "
+            f"max batch = {cash_flow_group_committer.max_batch_size}"
+        )
+        print(f"{'clients':>7} {'group commit':>12} {'req/s':>9} {'failures':>8}")
+        for clients in CLIENTS:
+            for grouped in (False, True):
+                app.dependency_overrides[get_cash_flow_group_committer] = (
+                    get_group_committer if grouped else get_no_group_committer
+                )
+                elapsed, failures = asyncio.run(run(clients, args.requests))
+                label = "on" if grouped else "off"
+                print(f"{clients:>7} {label:>12} {args.requests / elapsed:>9.1f} {failures:>8}")
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        shutil.rmtree(DIRECTORY, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
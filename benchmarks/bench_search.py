@@ -0,0 +1,162 @@
+# 検索（GET /cash-flows/search）の条件の組み合わせすべてについて、100 万件の利用者で
+# 1ページ目と、その続きのページの応答時間と、SQLite の実行計画を確かめる
+# 実行計画で cash_flows をインデックスなしで全件読んでいる組み合わせがあれば失敗にする
+# 実行例: poetry run python benchmarks/bench_search.py --rows 1000000
+import argparse
+import itertools
+import random
+import statistics
+import tempfile
+import time
+
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import Engine, create_engine, event, insert
+from sqlalchemy.orm import Session
+
+load_dotenv(".env.test.unit")
+
+from kakeibo_be.models.db.base import Base  # noqa: E402
+from kakeibo_be.models.db.cash_flow import CashFlow  # noqa: E402
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState  # noqa: E402
+from kakeibo_be.models.db.tenant import tenant_scope  # noqa: E402
+from kakeibo_be.repositories.cash_flow import CashFlowSearch, search_cash_flows  # noqa: E402
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE  # noqa: E402
+from kakeibo_be.store.enum.cash_flow_sort_order import CashFlowSortOrder  # noqa: E402
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType  # noqa: E402
+
+START_DATE = date(2016, 1, 1)
+END_DATE = date(2026, 1, 1)
+TITLES = ["食費", "日用品", "交通費", "外食", "趣味", "コンビニ", "スーパー", "ドラッグストア"]
+TARGET_USER_ID = 1
+# 同じテーブルに入れる他の利用者の行数（利用者で絞り込めていることを確かめるため）
+OTHER_USER_ROWS = 100_000
+INSERT_CHUNK_SIZE = 50_000
+PAGE_SIZE = 100
+# 続きのページとして計測する、何ページ目か
+DEEP_PAGE = 20
+ITERATIONS = 5
+
+FILTERS = {
+    "date": {"start_date": date(2025, 1, 1), "end_date": date(2025, 4, 1)},
+    "type": {"cash_flow_type": CashFlowType.INCOME},
+    "amount": {"min_amount": 1000, "max_amount": 2000},
+    "title": {"title_contains": "コンビニ"},
+}
+
+
+def seed(engine: Engine, rows: int) -> None:
+    rng = random.Random(0)
+    now = datetime.now()
+    days = (END_DATE - START_DATE).days
+    with Session(engine) as session:
+        session.add(
+            ArchiveState(
+                name=CASH_FLOW_ARCHIVE,
+                archived_before=date(1970, 1, 1),
+                archiving_before=date(1970, 1, 1),
+            )
+        )
+        for user_id, count in ((TARGET_USER_ID, rows), (TARGET_USER_ID + 1, OTHER_USER_ROWS)):
+            for start in range(0, count, INSERT_CHUNK_SIZE):
+                session.execute(
+                    insert(CashFlow),
+                    [
+                        {
+                            "user_id": user_id,
+                            "title": rng.choice(TITLES),
+                            # 1割ほどを収入にする
+                            "type": CashFlowType.INCOME if rng.random() < 0.1 else CashFlowType.EXPENSE,
+                            "recorded_at": START_DATE + timedelta(days=rng.randrange(days)),
+                            "amount": (amount := rng.randrange(100, 100_000)),
+                            "currency": "JPY",
+                            "base_amount": amount,
+                            "sync_version": 0,
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                        for _ in range(min(INSERT_CHUNK_SIZE, count - start))
+                    ],
+                )
+        session.commit()
+        # 実行計画を選ぶための統計を作る
+        session.connection().exec_driver_sql("ANALYZE")
+        session.commit()
+
+
+def search_pages(session: Session, search: CashFlowSearch, pages: int) -> list[float]:
+    # 1ページ目から順に pages ページ分を読み、各ページの時間（ミリ秒）を返す
+    elapsed = []
+    for _ in range(pages):
+        started_at = time.perf_counter()
+        rows = search_cash_flows(session, search, limit=PAGE_SIZE + 1)
+        elapsed.append((time.perf_counter() - started_at) * 1000)
+        if len(rows) <= PAGE_SIZE:
+            break
+        last = rows[PAGE_SIZE - 1]
+        value = last.amount if search.sort_by_amount else last.recorded_at
+        search = replace(search, after=(value, last.id))
+    return elapsed
+
+
+def explain(session: Session, search: CashFlowSearch) -> list[str]:
+    # 実際に送った SQL（利用者の条件が付いたもの）の実行計画
+    executed: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001
+        executed.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        search_cash_flows(session, search, limit=PAGE_SIZE + 1)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    statement, parameters = executed[-1]
+    rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="検索の条件の組み合わせごとの応答時間を計測する")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'bench_search.db'}")
+        Base.metadata.create_all(engine)
+        started_at = time.perf_counter()
+        seed(engine, args.rows)
+        print(f"rows = {args.rows} (+ {OTHER_USER_ROWS} other), seed = {time.perf_counter() - started_at:.1f}s")
+        print(f"{'filters':<24} {'sort':<17} {'first ms':>9} {f'page{DEEP_PAGE} ms':>10}  plan")
+
+        full_scans = []
+        with Session(engine) as session, tenant_scope(session, TARGET_USER_ID):
+            for size in range(len(FILTERS) + 1):
+                for names in itertools.combinations(FILTERS, size):
+                    conditions = {key: value for name in names for key, value in FILTERS[name].items()}
+                    for sort in CashFlowSortOrder:
+                        search = CashFlowSearch(**conditions, sort=sort)
+                        first = statistics.median(
+                            search_pages(session, search, 1)[0] for _ in range(ITERATIONS)
+                        )
+                        deep = search_pages(session, search, DEEP_PAGE)[-1]
+                        plan = explain(session, search)
+                        label = "+".join(names) or "(none)"
+                        print(f"{label:<24} {sort.value:<17} {first:>9.2f} {deep:>10.2f}  {' / '.join(plan)}")
+                        # インデックスを使わずに cash_flows を全件読んでいる
+                        if any(
+                            step.startswith("SCAN cash_flows") and "INDEX" not in step
+                            for step in plan
+                        ):
+                            full_scans.append((label, sort.value))
+
+    if full_scans:
+        raise SystemExit(f"インデックスを使わない検索があります: {full_scans}")
+
+
+if __name__ == "__main__":
+    main()
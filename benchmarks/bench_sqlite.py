@@ -0,0 +1,184 @@
+# SQLite（PRAGMA の既定値 / WAL などに調整した値）と MySQL で、API と同じ形の処理の速さを比べる
+# 1件ずつ登録してコミットする書き込み、月の一覧の読み込み、複数スレッドからの読み書きの混在を計測する
+# 実行例: poetry run python benchmarks/bench_sqlite.py --creates 2000
+#         MySQL とも比べる場合は、捨ててよい空のデータベースを --mysql-url で指定する
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+
+from datetime import date, datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+load_dotenv(".env.test.unit")
+
+from kakeibo_be.api.v1.cash_flows import create_cash_flow, get_cash_flows  # noqa: E402
+from kakeibo_be.caches.fx_rate import get_fx_rate_cache  # noqa: E402
+from kakeibo_be.core.database import create_database_engine  # noqa: E402
+from kakeibo_be.indexes.daily_totals import get_daily_total_index  # noqa: E402
+from kakeibo_be.indexes.periods import get_period_index  # noqa: E402
+from kakeibo_be.models.db.base import Base  # noqa: E402
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState  # noqa: E402
+from kakeibo_be.models.db.sync_sequence import SyncSequence  # noqa: E402
+from kakeibo_be.models.db.tenant import tenant_scope  # noqa: E402
+from kakeibo_be.models.request.v1.cash_flow import CreateCashFlowRequest  # noqa: E402
+from kakeibo_be.pubsub.broker import get_change_broker  # noqa: E402
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE  # noqa: E402
+from kakeibo_be.repositories.sync_sequence import (  # noqa: E402
+    CASH_FLOW_SEQUENCE,
+    LEGACY_SYNC_USER_ID,
+)
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType  # noqa: E402
+
+USER_ID = 1
+TARGET_MONTH = datetime(2025, 6, 15)
+TITLES = ["食費", "日用品", "交通費", "外食", "趣味"]
+LIST_ITERATIONS = 200
+THREADS = 8
+MIXED_OPERATIONS_PER_THREAD = 100
+
+
+def prepare(engine: Engine) -> None:
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # マイグレーションで入れている行と同じもの
+        session.merge(
+            SyncSequence(
+                name=CASH_FLOW_SEQUENCE, user_id=LEGACY_SYNC_USER_ID, last_value=0, purged_value=0
+            )
+        )
+        session.merge(
+            ArchiveState(
+                name=CASH_FLOW_ARCHIVE,
+                archived_before=date(1970, 1, 1),
+                archiving_before=date(1970, 1, 1),
+            )
+        )
+        session.commit()
+
+
+def create_one(session: Session, i: int) -> None:
+    with tenant_scope(session, USER_ID):
+        create_cash_flow(
+            body=CreateCashFlowRequest(
+                title=TITLES[i % len(TITLES)],
+                type=CashFlowType.EXPENSE,
+                recorded_at=date(2025, 1 + i % 12, 1 + i % 28),
+                amount=100 + i,
+            ),
+            session=session,
+            broker=get_change_broker(),
+            daily_totals=get_daily_total_index(),
+            fx_rates=get_fx_rate_cache(),
+            # 1件ずつコミットする場合を計測する
+            committer=None,
+        )
+    session.expunge_all()
+
+
+def list_month(session: Session) -> None:
+    with tenant_scope(session, USER_ID):
+        get_cash_flows(target_month=TARGET_MONTH, session=session, periods=get_period_index())
+    session.expunge_all()
+
+
+def measure_creates(session_factory: sessionmaker, count: int) -> float:
+    # POST と同じく、1件ごとにコミットする
+    with session_factory() as session:
+        started_at = time.perf_counter()
+        for i in range(count):
+            create_one(session, i)
+        return count / (time.perf_counter() - started_at)
+
+
+def measure_list(session_factory: sessionmaker) -> float:
+    elapsed = []
+    with session_factory() as session:
+        for _ in range(LIST_ITERATIONS):
+            started_at = time.perf_counter()
+            list_month(session)
+            elapsed.append(time.perf_counter() - started_at)
+    return statistics.median(elapsed) * 1000
+
+
+def measure_mixed(session_factory: sessionmaker) -> tuple[float, int]:
+    # 1割が書き込み、9割が読み込み。スレッドごとに別の接続を使う
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(offset: int) -> None:
+        nonlocal errors
+        with session_factory() as session:
+            for i in range(MIXED_OPERATIONS_PER_THREAD):
+                try:
+                    if i % 10 == 0:
+                        create_one(session, offset + i)
+                    else:
+                        list_month(session)
+                except Exception:
+                    session.rollback()
+                    with lock:
+                        errors += 1
+
+    threads = [
+        threading.Thread(target=worker, args=(n * MIXED_OPERATIONS_PER_THREAD,))
+        for n in range(THREADS)
+    ]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+    return THREADS * MIXED_OPERATIONS_PER_THREAD / elapsed, errors
+
+
+def run(name: str, engine: Engine, creates: int) -> None:
+    prepare(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    creates_per_second = measure_creates(session_factory, creates)
+    list_ms = measure_list(session_factory)
+    mixed_per_second, errors = measure_mixed(session_factory)
+    engine.dispose()
+    print(
+        f"{name:<15} create = {creates_per_second:8.0f} /s, "
+        f"list (median) = {list_ms:6.2f} ms, "
+        f"mixed x{THREADS} = {mixed_per_second:8.0f} ops/s (errors = {errors})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite と MySQL で API と同じ形の処理を計測する")
+    parser.add_argument("--creates", type=int, default=2000)
+    parser.add_argument("--mysql-url", help="比べる MySQL の接続先（捨ててよい空のデータベース）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # PRAGMA を設定しない SQLite（journal_mode=DELETE, synchronous=FULL）
+        default_path = Path(directory) / "default.db"
+        run(
+            "sqlite default",
+            create_engine(
+                f"sqlite:///{default_path}",
+                connect_args={"check_same_thread": False},
+                pool_size=THREADS,
+            ),
+            args.creates,
+        )
+        tuned_path = Path(directory) / "tuned.db"
+        run(
+            "sqlite tuned",
+            create_database_engine(f"sqlite:///{tuned_path}", pool_size=THREADS),
+            args.creates,
+        )
+    if args.mysql_url:
+        run("mysql", create_database_engine(args.mysql_url, pool_size=THREADS), args.creates)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# オフラインで溜まった 5,000 件の操作を、一括反映の API で1回のトランザクションで反映する時間を計測する
+# 実行例: poetry run python benchmarks/bench_sync.py --operations 5000
+import argparse
+import statistics
+import tempfile
+import time
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import Engine, insert
+from sqlalchemy.orm import Session
+
+load_dotenv(".env.test.unit")
+
+from kakeibo_be.api.v1.cash_flows import sync_cash_flows  # noqa: E402
+from kakeibo_be.caches.fx_rate import get_fx_rate_cache  # noqa: E402
+from kakeibo_be.core.database import create_database_engine  # noqa: E402
+from kakeibo_be.indexes.daily_totals import get_daily_total_index  # noqa: E402
+from kakeibo_be.models.db.base import Base  # noqa: E402
+from kakeibo_be.models.db.cash_flow import CashFlow  # noqa: E402
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState  # noqa: E402
+from kakeibo_be.models.db.sync_sequence import SyncSequence  # noqa: E402
+from kakeibo_be.models.db.tenant import tenant_scope  # noqa: E402
+from kakeibo_be.models.request.v1.cash_flow import SyncCashFlowsRequest  # noqa: E402
+from kakeibo_be.pubsub.broker import get_change_broker  # noqa: E402
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE  # noqa: E402
+from kakeibo_be.repositories.sync_sequence import (  # noqa: E402
+    CASH_FLOW_SEQUENCE,
+    LEGACY_SYNC_USER_ID,
+)
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType  # noqa: E402
+
+USER_ID = 1
+EXISTING_ROWS = 20000
+START_DATE = date(2025, 1, 1)
+ITERATIONS = 5
+TARGET_MILLISECONDS = 500
+
+
+def prepare(engine: Engine) -> None:
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        session.add(
+            SyncSequence(
+                name=CASH_FLOW_SEQUENCE, user_id=LEGACY_SYNC_USER_ID, last_value=EXISTING_ROWS
+            )
+        )
+        session.add(
+            ArchiveState(
+                name=CASH_FLOW_ARCHIVE,
+                archived_before=date(1970, 1, 1),
+                archiving_before=date(1970, 1, 1),
+            )
+        )
+        session.execute(
+            insert(CashFlow),
+            [
+                {
+                    "user_id": USER_ID,
+                    "title": "食費",
+                    "type": CashFlowType.EXPENSE,
+                    "recorded_at": START_DATE + timedelta(days=i % 365),
+                    "amount": 100 + i % 1000,
+                    "base_amount": 100 + i % 1000,
+                    "sync_version": i + 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(EXISTING_ROWS)
+            ],
+        )
+        session.commit()
+
+
+def build_request(iteration: int, count: int) -> SyncCashFlowsRequest:
+    # 作成 6割、既存の行の更新 2割、削除 1割、作成した行の更新 1割
+    operations: list[dict] = []
+    base_id = iteration * count
+    for i in range(count):
+        values = {
+            "title": f"メモ{i % 50}",
+            "type": CashFlowType.EXPENSE,
+            "recorded_at": START_DATE + timedelta(days=i % 365),
+            "amount": 100 + i,
+        }
+        kind = i % 10
+        temp_id = f"{iteration}-{i}"
+        if kind < 6:
+            operations.append({"op": "create", "temp_id": temp_id, **values})
+        elif kind < 8:
+            operations.append({"op": "update", "id": base_id + i + 1, **values})
+        elif kind == 8:
+            operations.append({"op": "delete", "id": base_id + i + 1})
+        else:
+            operations.append({"op": "update", "temp_id": f"{iteration}-{i - 9}", **values})
+    return SyncCashFlowsRequest.model_validate({"operations": operations})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="操作の一括反映にかかる時間を計測する")
+    parser.add_argument("--operations", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_database_engine(f"sqlite:///{Path(directory) / 'kakeibo.db'}")
+        prepare(engine)
+
+        elapsed = []
+        with Session(engine) as session:
+            for iteration in range(ITERATIONS):
+                body = build_request(iteration, args.operations)
+                with tenant_scope(session, USER_ID):
+                    started_at = time.perf_counter()
+                    response = sync_cash_flows(
+                        body=body,
+                        session=session,
+                        broker=get_change_broker(),
+                        daily_totals=get_daily_total_index(),
+                        fx_rates=get_fx_rate_cache(),
+                    )
+                    elapsed.append((time.perf_counter() - started_at) * 1000)
+                assert all(result.applied for result in response.results)
+                session.expunge_all()
+        engine.dispose()
+
+    median = statistics.median(elapsed)
+    print(f"operations = {args.operations}, iterations = {ITERATIONS}")
+    print(
+        f"median = {median:.1f} ms, max = {max(elapsed):.1f} ms, target = {TARGET_MILLISECONDS} ms"
+    )
+    if median >= TARGET_MILLISECONDS:
+        raise SystemExit("目標の処理時間を超えました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# 利用者の数が増えても、1人分の一覧・集計の応答時間が変わらないことを確かめる
+# 同じ利用者のデータを入れた、利用者が少ない DB と多い DB を用意し、交互に計測して比べる
+# （順に計測すると、その間のマシンの速さの変化で倍率が 0.7〜2 倍ほどぶれる）
+# 応答時間の大半（95% 以上）は ORM の処理で、DB での実行は 0.02〜0.05ms しかない
+# 全体の時間の倍率と、利用者数の影響を受ける DB での実行時間の倍率の両方で判定する
+# 実行例: poetry run python benchmarks/bench_tenants.py --tenants 10000
+import argparse
+import random
+import statistics
+import time
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import Engine, create_engine, event, insert
+from sqlalchemy.orm import Session
+
+load_dotenv(".env.test.unit")
+
+from kakeibo_be.models.db.base import Base  # noqa: E402
+from kakeibo_be.models.db.budget import Budget  # noqa: E402
+from kakeibo_be.models.db.cash_flow import CashFlow  # noqa: E402
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState  # noqa: E402
+from kakeibo_be.models.db.monthly_total import ALL_TITLES, MonthlyTotal  # noqa: E402
+from kakeibo_be.models.db.tenant import tenant_scope  # noqa: E402
+from kakeibo_be.repositories.budget import get_budgets_with_actual_by_month  # noqa: E402
+from kakeibo_be.repositories.cash_flow import get_cash_flows_by_month  # noqa: E402
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE  # noqa: E402
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType  # noqa: E402
+
+START_DATE = date(2024, 1, 1)
+DAYS = 730
+TARGET_MONTH = date(2025, 6, 1)
+TITLES = ["食費", "日用品", "交通費", "外食", "趣味"]
+# 計測する利用者（最初に作る利用者の中から選ぶ）
+SAMPLE_USERS = 10
+ITERATIONS = 20
+# 利用者が増えたときに許容する全体の応答時間の倍率。交互に計測すると 0.99〜1.01 倍
+MAX_RATIO = 1.1
+# 利用者が増えたときに許容する DB での実行時間の倍率
+# 利用者を先頭にしたインデックスで1人分の範囲だけを読むので、増えるのは B-tree の深さ
+# （1,000 行から 100 万行で 1〜2 段）の分だけ。一覧で 1.02〜1.05 倍、集計で 1.1〜1.2 倍（2µs 前後）
+MAX_DB_RATIO = 1.5
+
+
+class QueryTimer:
+    # エンジンで実行した SQL の時間の累計（結果の行を読み出すまでを含む）
+    def __init__(self, engine: Engine) -> None:
+        self.elapsed = 0.0
+        self._started_at = 0.0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, *_: object) -> None:
+        self._started_at = time.perf_counter()
+
+    def _after(self, *_: object) -> None:
+        self.elapsed += time.perf_counter() - self._started_at
+
+
+def seed_tenants(session: Session, user_ids: range, rows_per_tenant: int) -> None:
+    rng = random.Random(user_ids.start)
+    now = datetime.now()
+    cash_flows = []
+    totals: dict[tuple[int, date, str], list[int]] = defaultdict(lambda: [0, 0])
+    for user_id in user_ids:
+        for _ in range(rows_per_tenant):
+            recorded_at = START_DATE + timedelta(days=rng.randrange(DAYS))
+            title = rng.choice(TITLES)
+            amount = rng.randrange(100, 5000)
+            cash_flows.append(
+                {
+                    "user_id": user_id,
+                    "title": title,
+                    "type": CashFlowType.EXPENSE,
+                    "recorded_at": recorded_at,
+                    "amount": amount,
+                    "base_amount": amount,
+                    "sync_version": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            for key_title in (title, ALL_TITLES):
+                totals[(user_id, recorded_at.replace(day=1), key_title)][0] += amount
+                totals[(user_id, recorded_at.replace(day=1), key_title)][1] += 1
+
+    session.execute(insert(CashFlow), cash_flows)
+    session.execute(
+        insert(MonthlyTotal),
+        [
+            {
+                "user_id": user_id,
+                "month": month,
+                "type": CashFlowType.EXPENSE,
+                "title": title,
+                "amount": amount,
+                "count": count,
+            }
+            for (user_id, month, title), (amount, count) in totals.items()
+        ],
+    )
+    session.execute(
+        insert(Budget),
+        [
+            {
+                "user_id": user_id,
+                "month": TARGET_MONTH,
+                "title": title,
+                "amount": 30000,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user_id in user_ids
+            for title in [ALL_TITLES, *TITLES]
+        ],
+    )
+    session.commit()
+
+
+def measure_once(session: Session, timer: QueryTimer, user_id: int) -> dict[str, float]:
+    # 一覧・集計それぞれの全体と DB での実行の時間（秒）
+    elapsed = {}
+    with tenant_scope(session, user_id):
+        started_at, query_started_at = time.perf_counter(), timer.elapsed
+        get_cash_flows_by_month(
+            session=session,
+            month_start_date=TARGET_MONTH,
+            next_month_start_date=date(2025, 7, 1),
+        )
+        elapsed["list"] = time.perf_counter() - started_at
+        elapsed["list_db"] = timer.elapsed - query_started_at
+
+        started_at, query_started_at = time.perf_counter(), timer.elapsed
+        get_budgets_with_actual_by_month(session=session, month=TARGET_MONTH)
+        elapsed["summary"] = time.perf_counter() - started_at
+        elapsed["summary_db"] = timer.elapsed - query_started_at
+    # 計測ごとに読み込んだ ORM オブジェクトを捨てて、毎回 DB から読み直す
+    session.expunge_all()
+    return elapsed
+
+
+def create_database(tenants: int, rows_per_tenant: int) -> tuple[Engine, QueryTimer]:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            ArchiveState(
+                name=CASH_FLOW_ARCHIVE,
+                archived_before=date(1970, 1, 1),
+                archiving_before=date(1970, 1, 1),
+            )
+        )
+        # 計測する利用者は、どちらの DB にも同じデータを入れる
+        seed_tenants(session, range(1, SAMPLE_USERS + 1), rows_per_tenant)
+        if tenants > SAMPLE_USERS:
+            seed_tenants(session, range(SAMPLE_USERS + 1, tenants + 1), rows_per_tenant)
+    return engine, QueryTimer(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="利用者数に対する一覧・集計の応答時間を計測する")
+    parser.add_argument("--tenants", type=int, default=10000)
+    parser.add_argument("--rows-per-tenant", type=int, default=100)
+    args = parser.parse_args()
+
+    databases = {
+        SAMPLE_USERS: create_database(SAMPLE_USERS, args.rows_per_tenant),
+        args.tenants: create_database(args.tenants, args.rows_per_tenant),
+    }
+    elapsed: dict[int, dict[str, list[float]]] = {
+        tenants: defaultdict(list) for tenants in databases
+    }
+    sessions = {tenants: Session(engine) for tenants, (engine, _) in databases.items()}
+    try:
+        # 最初の1周は文のキャッシュなどを温めるためのもので、計測に含めない
+        for iteration in range(ITERATIONS + 1):
+            for user_id in range(1, SAMPLE_USERS + 1):
+                for tenants, (_, timer) in databases.items():
+                    for key, seconds in measure_once(sessions[tenants], timer, user_id).items():
+                        if iteration > 0:
+                            elapsed[tenants][key].append(seconds)
+    finally:
+        for session in sessions.values():
+            session.close()
+
+    medians = {
+        tenants: {key: statistics.median(values) * 1000 for key, values in by_key.items()}
+        for tenants, by_key in elapsed.items()
+    }
+    print(f"rows per tenant = {args.rows_per_tenant}")
+    for tenants, median in medians.items():
+        print(
+            f"{tenants:>6} tenants: list = {median['list']:.2f} ms (db {median['list_db']:.3f} ms), "
+            f"summary = {median['summary']:.2f} ms (db {median['summary_db']:.3f} ms)"
+        )
+    small, large = medians[SAMPLE_USERS], medians[args.tenants]
+    ratios = {key: large[key] / small[key] for key in small}
+    print(
+        f"ratio (total): list = {ratios['list']:.2f}, summary = {ratios['summary']:.2f} "
+        f"(max = {MAX_RATIO})"
+    )
+    print(
+        f"ratio (db):    list = {ratios['list_db']:.2f}, summary = {ratios['summary_db']:.2f} "
+        f"(max = {MAX_DB_RATIO})"
+    )
+    if max(ratios["list"], ratios["summary"]) > MAX_RATIO:
+        raise SystemExit("利用者の数に応じて応答時間が伸びています。")
+    if max(ratios["list_db"], ratios["summary_db"]) > MAX_DB_RATIO:
+        raise SystemExit("利用者の数に応じて DB での実行時間が伸びています。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# GET /api/v1/reports/trends の集計を、10年分の日次データで計測する
+# 実行例: poetry run python benchmarks/bench_trends.py
+import statistics
+import time
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+load_dotenv(".env.test.unit")
+
+from kakeibo_be.api.v1.reports import get_trends  # noqa: E402
+from kakeibo_be.logic.calculate.calculate_datetime import get_now  # noqa: E402
+from kakeibo_be.models.db.base import Base  # noqa: E402
+from kakeibo_be.models.db.cash_flow import CashFlow  # noqa: E402
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState  # noqa: E402
+from kakeibo_be.models.db.tenant import tenant_scope  # noqa: E402
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE  # noqa: E402
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType  # noqa: E402
+
+USER_ID = 1
+YEARS = 10
+# 1日あたりの支出の件数
+EXPENSES_PER_DAY = 3
+ITERATIONS = 20
+TARGET_MILLISECONDS = 50
+
+
+def seed(session: Session) -> int:
+    session.add(
+        ArchiveState(
+            name=CASH_FLOW_ARCHIVE,
+            archived_before=date(1970, 1, 1),
+            archiving_before=date(1970, 1, 1),
+        )
+    )
+    today = get_now().date()
+    start_date = today.replace(day=1, year=today.year - YEARS)
+    days = (today - start_date).days + 1
+    rng = np.random.default_rng(0)
+    now = datetime.now()
+    rows = []
+    for offset in range(days):
+        recorded_at = start_date + timedelta(days=offset)
+        for amount in rng.integers(100, 5000, EXPENSES_PER_DAY).tolist():
+            rows.append((recorded_at, CashFlowType.EXPENSE, amount))
+        if recorded_at.day == 25:
+            rows.append((recorded_at, CashFlowType.INCOME, 300000))
+
+    session.execute(
+        insert(CashFlow),
+        [
+            {
+                "user_id": USER_ID,
+                "title": "benchmark",
+                "type": cash_flow_type,
+                "recorded_at": recorded_at,
+                "amount": amount,
+                "base_amount": amount,
+                "sync_version": i + 1,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i, (recorded_at, cash_flow_type, amount) in enumerate(rows)
+        ],
+    )
+    session.commit()
+    return len(rows)
+
+
+def main() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        row_count = seed(session)
+
+        elapsed = []
+        with tenant_scope(session, USER_ID):
+            for _ in range(ITERATIONS):
+                started_at = time.perf_counter()
+                get_trends(session=session, months=YEARS * 12)
+                elapsed.append((time.perf_counter() - started_at) * 1000)
+
+    median = statistics.median(elapsed)
+    print(f"rows = {row_count}, months = {YEARS * 12}, iterations = {ITERATIONS}")
+    print(
+        f"median = {median:.1f} ms, max = {max(elapsed):.1f} ms, target = {TARGET_MILLISECONDS} ms"
+    )
+    if median >= TARGET_MILLISECONDS:
+        raise SystemExit("目標の応答時間を超えました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,23 @@
 from fastapi import APIRouter
 
+from kakeibo_be.api.v1.budgets import router as budgets_router
 from kakeibo_be.api.v1.cash_flows import router as cash_flows_router
+from kakeibo_be.api.v1.categories import router as categories_router
 from kakeibo_be.api.v1.health_check import router as health_check_router
+from kakeibo_be.api.v1.metrics import router as metrics_router
+from kakeibo_be.api.v1.periods import router as periods_router
+from kakeibo_be.api.v1.recurring_cash_flows import router as recurring_cash_flows_router
+from kakeibo_be.api.v1.reports import router as reports_router
 
 router = APIRouter()
 
 router.include_router(health_check_router, prefix="/health-check", tags=["Health Check"])
 router.include_router(cash_flows_router, prefix="/cash-flows", tags=["Cash Flows"])
+router.include_router(budgets_router, prefix="/budgets", tags=["Budgets"])
+router.include_router(categories_router, prefix="/categories", tags=["Categories"])
+router.include_router(
+    recurring_cash_flows_router, prefix="/recurring-cash-flows", tags=["Recurring Cash Flows"]
+)
+router.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
+router.include_router(reports_router, prefix="/reports", tags=["Reports"])
+router.include_router(periods_router, prefix="/periods", tags=["Periods"])
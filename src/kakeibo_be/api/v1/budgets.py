@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.tenant import get_tenant_db
+from kakeibo_be.exceptions.business_exception import BusinessException
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_month_start_date
+from kakeibo_be.models.db.budget import Budget
+from kakeibo_be.models.db.monthly_total import ALL_TITLES
+from kakeibo_be.models.request.v1.budget import CreateBudgetRequest
+from kakeibo_be.models.response.v1.budget import CreateBudgetResponse, GetBudgetResponseItem
+from kakeibo_be.repositories.budget import (
+    get_budget_by_id,
+    get_budget_by_month_and_title,
+    get_budgets_with_actual_by_month,
+)
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[GetBudgetResponseItem])
+def get_budgets(
+    target_month: datetime,
+    session: Annotated[Session, Depends(get_tenant_db)],
+) -> list[GetBudgetResponseItem]:
+    month = get_month_start_date(target_month).date()
+
+    result = []
+    for budget, actual_amount in get_budgets_with_actual_by_month(session=session, month=month):
+        remaining_amount = budget.amount - actual_amount
+        result.append(
+            GetBudgetResponseItem(
+                id=budget.id,
+                month=budget.month,
+                title=budget.title or None,
+                amount=budget.amount,
+                actual_amount=actual_amount,
+                remaining_amount=remaining_amount,
+                is_over_budget=remaining_amount < 0,
+            )
+        )
+    return result
+
+
+@router.post("", response_model=CreateBudgetResponse)
+def create_budget(
+    body: CreateBudgetRequest, session: Annotated[Session, Depends(get_tenant_db)]
+) -> CreateBudgetResponse:
+    month = body.month.replace(day=1)
+    title = body.title or ALL_TITLES
+
+    if get_budget_by_month_and_title(session=session, month=month, title=title) is not None:
+        logger.info(f"同じ月・タイトルの予算が既に存在します。month = {month}, title = {title}")
+        raise BusinessException(message="Budget already exists!")
+
+    budget = Budget(month=month, title=title, amount=body.amount)
+    session.add(budget)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("Budgetの作成に失敗しました。")
+        raise e
+
+    return CreateBudgetResponse(
+        id=budget.id,
+        month=budget.month,
+        title=budget.title or None,
+        amount=budget.amount,
+    )
+
+
+@router.delete("/{budget_id}", response_model=None, status_code=204)
+def delete_budget(budget_id: int, session: Annotated[Session, Depends(get_tenant_db)]) -> None:
+    budget = get_budget_by_id(session=session, budget_id=budget_id)
+    if budget is None:
+        logger.info(f"該当する削除対象のBudget IDが見つかりません。id = {budget_id}")
+        raise BusinessException(message="Budget not found!")
+
+    session.delete(budget)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("Budgetの削除に失敗しました。")
+        raise e
@@ -1,46 +1,264 @@
-from datetime import datetime
-from typing import Annotated
+import json
 
-from fastapi import APIRouter, Depends
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+from itertools import groupby
+from typing import Annotated, NamedTuple
+
+from dateutil.relativedelta import relativedelta
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from kakeibo_be.caches.fx_rate import FxRateCache, get_fx_rate_cache
+from kakeibo_be.core.currency import BASE_CURRENCY
+from kakeibo_be.core.group_commit import (
+    GROUP_COMMIT_ENABLED,
+    GROUP_COMMIT_MAX_BATCH_SIZE,
+    GROUP_COMMIT_WINDOW_MS,
+    GroupCommitter,
+)
+from kakeibo_be.core.tenant import get_current_user_id, get_tenant_db
 from kakeibo_be.exceptions.business_exception import BusinessException
+from kakeibo_be.indexes.daily_totals import DailyTotalIndex, get_daily_total_index
+from kakeibo_be.indexes.periods import PeriodIndex, get_period_index
 from kakeibo_be.loggers.custom_logger import logger
 from kakeibo_be.logic.calculate.calculate_datetime import (
     get_month_start_date,
     get_next_month_start_date,
+    get_now,
 )
-from kakeibo_be.models.db.base import get_db
+from kakeibo_be.logic.calculate.calculate_fx import convert_to_base_amount
+from kakeibo_be.logic.deduplicate.calculate_content_hash import calculate_content_hash
+from kakeibo_be.logic.sync.plan_cash_flow_operations import plan_cash_flow_operations
 from kakeibo_be.models.db.cash_flow import CashFlow
-from kakeibo_be.models.request.v1.cash_flow import CreateCashFlowRequest, UpdateCashFlowRequest
+from kakeibo_be.models.db.tenant import get_session_user_id, set_session_user_id
+from kakeibo_be.models.request.v1.cash_flow import (
+    CreateCashFlowRequest,
+    LookupCashFlowsRequest,
+    SyncCashFlowsRequest,
+    UpdateCashFlowRequest,
+)
 from kakeibo_be.models.response.v1.cash_flow import (
+    CashFlowChangeEventResponse,
+    CashFlowOperationResult,
     CreateCashFlowResponse,
+    DuplicateCashFlowCluster,
+    GetCashFlowChangesResponse,
     GetCashFlowResponseItem,
+    GetDuplicateCashFlowsResponse,
+    LookupCashFlowsResponse,
+    SearchCashFlowsResponse,
+    SyncCashFlowsResponse,
     UpdateCashFlowResponse,
 )
-from kakeibo_be.repositories.cash_flow import get_cash_flow_by_id, get_cash_flows_by_month
+from kakeibo_be.pubsub.broker import ChangeBroker, SubscriptionOverflowError, get_change_broker
+from kakeibo_be.pubsub.cash_flow_change import CashFlowChangeEvent
+from kakeibo_be.repositories.cash_flow import (
+    CashFlowSearch,
+    get_cash_flow_by_id,
+    get_cash_flows_by_ids,
+    get_cash_flows_changed_since,
+    get_cash_flows_in_range,
+    get_duplicate_cash_flows,
+    get_existing_content_hashes,
+    insert_cash_flows,
+    search_cash_flows,
+    update_cash_flows,
+)
+from kakeibo_be.repositories.cash_flow_archive import (
+    get_archive_state,
+    get_archived_cash_flow_by_id,
+    is_closed_period,
+)
+from kakeibo_be.repositories.category import get_category_by_id, get_existing_category_ids
+from kakeibo_be.repositories.monthly_total import MonthlyTotalDelta, add_monthly_total_deltas
+from kakeibo_be.repositories.period_setting import get_period_definition
+from kakeibo_be.repositories.recurring_cash_flow import (
+    is_recurring_month_materialized,
+    materialize_recurring_cash_flows,
+)
+from kakeibo_be.repositories.sync_sequence import (
+    allocate_sync_versions,
+    get_current_sync_version,
+    get_purged_sync_version,
+)
+from kakeibo_be.store.enum.cash_flow_change_action import CashFlowChangeAction
+from kakeibo_be.store.enum.cash_flow_operation_type import CashFlowOperationType
+from kakeibo_be.store.enum.cash_flow_sort_order import CashFlowSortOrder
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.duplicate_policy import DuplicatePolicy
 
 router = APIRouter()
 
+# 差分同期で1回に返す最大件数
+DEFAULT_CHANGES_LIMIT = 1000
+MAX_CHANGES_LIMIT = 5000
+
+# 重複のまとまりを1回に返す最大数
+DEFAULT_DUPLICATES_LIMIT = 100
+MAX_DUPLICATES_LIMIT = 1000
+
+# 検索で1回に返す最大数
+DEFAULT_SEARCH_LIMIT = 100
+MAX_SEARCH_LIMIT = 1000
+
+# SSE の接続維持のためのコメントを送る間隔（秒）
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+
+class _PendingCashFlow(NamedTuple):
+    # 束ねてコミットする作成の1件分
+    user_id: int
+    # sync_version と user_id 以外の列の値
+    values: dict
+    delta: MonthlyTotalDelta
+
+
+def _insert_pending_cash_flows(
+    session: Session, items: list[_PendingCashFlow]
+) -> list[tuple[int, int]]:
+    # 複数の利用者の作成をまとめて書き込み、渡した順に (id, sync_version) を返す
+    # バージョンの採番、行と月別集計の書き込みは、利用者ごとに1回ずつ行う
+    # 採番の行ロックは利用者の id の順に取るので、他の書き込みとの間でデッドロックにならない
+    results: dict[int, tuple[int, int]] = {}
+    leader_user_id = get_session_user_id(session)
+    try:
+        for user_id, group in groupby(
+            sorted(enumerate(items), key=lambda pair: pair[1].user_id),
+            key=lambda pair: pair[1].user_id,
+        ):
+            pairs = list(group)
+            set_session_user_id(session, user_id)
+            last_version = allocate_sync_versions(session, len(pairs))
+            versions = range(last_version - len(pairs) + 1, last_version + 1)
+            rows = [
+                {**item.values, "sync_version": version}
+                for (_, item), version in zip(pairs, versions, strict=True)
+            ]
+            ids = insert_cash_flows(session, rows)
+            add_monthly_total_deltas(session, [item.delta for _, item in pairs])
+            for (position, _), version in zip(pairs, versions, strict=True):
+                results[position] = (ids[version], version)
+    finally:
+        # コミットするリクエスト自身の利用者に戻す
+        set_session_user_id(session, leader_user_id)
+    return [results[position] for position in range(len(items))]
+
+
+cash_flow_group_committer = GroupCommitter(
+    _insert_pending_cash_flows,
+    window_seconds=GROUP_COMMIT_WINDOW_MS / 1000,
+    max_batch_size=GROUP_COMMIT_MAX_BATCH_SIZE,
+)
+
+
+def get_cash_flow_group_committer() -> GroupCommitter | None:
+    # 束ねない設定なら None（リクエストごとにコミットする）
+    return cash_flow_group_committer if GROUP_COMMIT_ENABLED else None
+
+
+def _publish_change(broker: ChangeBroker, event: CashFlowChangeEvent) -> None:
+    # コミット済みの変更の通知なので、配信に失敗してもリクエスト自体は成功として返す
+    try:
+        broker.publish(event)
+    except Exception:
+        logger.exception(f"CashFlowの変更通知に失敗しました。id = {event.cash_flow_id}")
+
+
+def _check_category_exists(session: Session, category_id: int | None) -> None:
+    # 他の利用者のカテゴリも見つからない扱いになる
+    if (
+        category_id is not None
+        and get_category_by_id(session=session, category_id=category_id) is None
+    ):
+        logger.info(f"該当するカテゴリが見つかりません。id = {category_id}")
+        raise BusinessException(message="Category not found!")
+
+
+def _get_base_amount(
+    session: Session, fx_rates: FxRateCache, currency: str, recorded_at: date, amount: int
+) -> int:
+    # 月別集計と日別の累積和は基準通貨で持つので、差分を換算してから加算する
+    rate = fx_rates.get_rate(session, currency, recorded_at)
+    if rate is None:
+        logger.info(f"為替レートが見つかりません。currency = {currency}, recorded_at = {recorded_at}")
+        raise BusinessException(message="FX rate not found!")
+    return convert_to_base_amount(amount, rate)
+
+
+def _encode_search_cursor(value: date | int, cash_flow_id: int) -> str:
+    # 並べ替えの列の値と id。金額順なら "1200_15"、日付順なら "2025-01-31_15"
+    return f"{value}_{cash_flow_id}"
+
+
+def _decode_search_cursor(sort: CashFlowSortOrder, cursor: str) -> tuple[date | int, int]:
+    try:
+        value, cash_flow_id = cursor.rsplit("_", 1)
+        if sort in (CashFlowSortOrder.AMOUNT_ASC, CashFlowSortOrder.AMOUNT_DESC):
+            return int(value), int(cash_flow_id)
+        return date.fromisoformat(value), int(cash_flow_id)
+    except ValueError:
+        logger.info(f"検索の cursor が不正です。cursor = {cursor}")
+        raise BusinessException(message="Invalid cursor!") from None
+
+
+def _format_server_sent_event(event: str, data: dict, event_id: int | None = None) -> str:
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _materialize_recurring_month(session: Session, month_start_date: date) -> None:
+    # その月が初めて表示されたときに、繰り返しの収支を cash_flows に展開する
+    if is_recurring_month_materialized(session, month_start_date):
+        return
+    try:
+        materialize_recurring_cash_flows(session, month_start_date)
+        session.commit()
+    except IntegrityError:
+        # 同じ月を同時に別のリクエストが展開済み
+        session.rollback()
+    except Exception as e:
+        session.rollback()
+        logger.exception("繰り返しの収支の展開に失敗しました。")
+        raise e
+
 
 @router.get("", response_model=list[GetCashFlowResponseItem])
 def get_cash_flows(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    periods: Annotated[PeriodIndex, Depends(get_period_index)],
     # http://localhost:8000/api/v1/cash-flows ここから ?target_month=2025-12-12T05%3A43%3A05.419Z
     # target_month: datetime　使いたい関数の引数に設定すると　クエリパラメータ　になる
-    target_month: datetime,
-    session: Annotated[Session, Depends(get_db)],
+    target_month: datetime | None = None,
+    # 指定すると、利用者の区切り方（給料日・週など）でこの日を含む期間の一覧を返す
+    target_date: Annotated[date | None, Query(alias="targetDate")] = None,
 ) -> list[GetCashFlowResponseItem]:
-    # strptime は「文字列を datetime に変換する関数」
-    # 2025-12-01 00:00:00
+    if target_date is not None:
+        # 期間の開始日・終了日は前もって作った一覧から引くだけで、日付の計算はしない
+        calendar = periods.get_calendar(get_period_definition(session))
+        try:
+            period = calendar.resolve(target_date)
+        except ValueError:
+            raise BusinessException(message="targetDate is out of range!") from None
+        start_date, end_date = period.start_date, period.end_date
+    elif target_month is not None:
+        # 2025-12-01 00:00:00
+        start_date = get_month_start_date(target_month).date()
+        end_date = get_next_month_start_date(target_month).date()
+    else:
+        raise BusinessException(message="target_month or targetDate is required!")
 
-    month_start_date = get_month_start_date(target_month)
-    next_month_start_date = get_next_month_start_date(target_month)
+    # 期間が月をまたぐ場合は、かかる月をすべて展開する
+    month_start_date = start_date.replace(day=1)
+    while month_start_date < end_date:
+        _materialize_recurring_month(session, month_start_date)
+        month_start_date += relativedelta(months=1)
 
-    cash_flows = get_cash_flows_by_month(
-        session=session,
-        month_start_date=month_start_date,
-        next_month_start_date=next_month_start_date,
-    )
+    cash_flows = get_cash_flows_in_range(session=session, start_date=start_date, end_date=end_date)
     result = []
     for cash_flow in cash_flows:
         response_item = GetCashFlowResponseItem(
@@ -49,58 +267,388 @@ def get_cash_flows(
             type=cash_flow.type,
             recorded_at=cash_flow.recorded_at,
             amount=cash_flow.amount,
+            currency=cash_flow.currency,
+            category_id=cash_flow.category_id,
         )
         # 配列に格納する　表現
         result.append(response_item)
     return result
 
 
+@router.post("/lookup", response_model=LookupCashFlowsResponse)
+def lookup_cash_flows(
+    body: LookupCashFlowsRequest,
+    session: Annotated[Session, Depends(get_tenant_db)],
+) -> LookupCashFlowsResponse:
+    # 詳細表示や取り消しで使う複数の id を、IN 句のクエリ数回でまとめて取得する
+    cash_flows = get_cash_flows_by_ids(session=session, cash_flow_ids=body.ids)
+
+    items = []
+    missing_ids = []
+    # リクエストの並び順で返す
+    for cash_flow_id in dict.fromkeys(body.ids):
+        cash_flow = cash_flows.get(cash_flow_id)
+        if cash_flow is None:
+            missing_ids.append(cash_flow_id)
+            continue
+        items.append(
+            GetCashFlowResponseItem(
+                id=cash_flow.id,
+                title=cash_flow.title,
+                type=cash_flow.type,
+                recorded_at=cash_flow.recorded_at,
+                amount=cash_flow.amount,
+                currency=cash_flow.currency,
+                category_id=cash_flow.category_id,
+            )
+        )
+    return LookupCashFlowsResponse(items=items, missing_ids=missing_ids)
+
+
+@router.get("/changes", response_model=GetCashFlowChangesResponse)
+def get_cash_flow_changes(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    # 前回のレスポンスの token。省略すると全件を返す
+    since: int | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_CHANGES_LIMIT)] = DEFAULT_CHANGES_LIMIT,
+) -> GetCashFlowChangesResponse:
+    # トークンと変更の取得を同じトランザクション（スナップショット）で行う
+    current_version = get_current_sync_version(session)
+
+    # トゥームストーンが削除済みの範囲のトークンでは、削除を伝えられないので全件同期に切り替える
+    reset_required = since is not None and since < get_purged_sync_version(session)
+    full_sync = since is None or reset_required
+
+    # limit + 1 件取得して、続きがあるかどうかを判定する
+    cash_flows = get_cash_flows_changed_since(
+        session=session,
+        since=0 if full_sync else since,
+        limit=limit + 1,
+        include_deleted=not full_sync,
+    )
+    has_more = len(cash_flows) > limit
+    cash_flows = cash_flows[:limit]
+
+    upserted = []
+    deleted_ids = []
+    for cash_flow in cash_flows:
+        if cash_flow.deleted_at is not None:
+            deleted_ids.append(cash_flow.id)
+            continue
+        upserted.append(
+            GetCashFlowResponseItem(
+                id=cash_flow.id,
+                title=cash_flow.title,
+                type=cash_flow.type,
+                recorded_at=cash_flow.recorded_at,
+                amount=cash_flow.amount,
+                currency=cash_flow.currency,
+                category_id=cash_flow.category_id,
+            )
+        )
+
+    return GetCashFlowChangesResponse(
+        # 続きがある場合は最後に返した行のバージョンから再開させる
+        token=cash_flows[-1].sync_version if has_more else current_version,
+        upserted=upserted,
+        deleted_ids=deleted_ids,
+        has_more=has_more,
+        reset_required=reset_required,
+    )
+
+
+# 期間・種別・金額・タイトルを組み合わせて絞り込み、日付か金額の順に limit 件ずつ返す
+# 続きは nextCursor を cursor に渡して取得する（何ページ目でも同じ速さで読める）
+@router.get("/search", response_model=SearchCashFlowsResponse)
+def search_cash_flow_items(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    start_date: Annotated[date | None, Query(alias="startDate")] = None,
+    end_date: Annotated[date | None, Query(alias="endDate")] = None,
+    cash_flow_type: Annotated[CashFlowType | None, Query(alias="type")] = None,
+    min_amount: Annotated[int | None, Query(alias="minAmount", ge=0)] = None,
+    max_amount: Annotated[int | None, Query(alias="maxAmount", ge=0)] = None,
+    title: Annotated[str | None, Query(min_length=1, max_length=30)] = None,
+    sort: CashFlowSortOrder = CashFlowSortOrder.RECORDED_AT_DESC,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_LIMIT)] = DEFAULT_SEARCH_LIMIT,
+) -> SearchCashFlowsResponse:
+    if start_date is not None and end_date is not None and start_date >= end_date:
+        raise BusinessException(message="startDate must be before endDate!")
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        raise BusinessException(message="minAmount must not be greater than maxAmount!")
+
+    search = CashFlowSearch(
+        start_date=start_date,
+        end_date=end_date,
+        cash_flow_type=cash_flow_type,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        title_contains=title,
+        sort=sort,
+        after=None if cursor is None else _decode_search_cursor(sort, cursor),
+    )
+    # limit + 1 件取得して、続きがあるかどうかを判定する
+    rows = search_cash_flows(session=session, search=search, limit=limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = _encode_search_cursor(
+            last.amount if search.sort_by_amount else last.recorded_at, last.id
+        )
+    return SearchCashFlowsResponse(
+        items=[
+            GetCashFlowResponseItem(
+                id=row.id,
+                title=row.title,
+                type=row.type,
+                recorded_at=row.recorded_at,
+                amount=row.amount,
+                currency=row.currency,
+                category_id=row.category_id,
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/duplicates", response_model=GetDuplicateCashFlowsResponse)
+def get_duplicate_cash_flow_clusters(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    limit: Annotated[int, Query(ge=1, le=MAX_DUPLICATES_LIMIT)] = DEFAULT_DUPLICATES_LIMIT,
+) -> GetDuplicateCashFlowsResponse:
+    # 同じ内容の行のまとまりを、取り込み時の判定と同じ指紋のインデックスで探す
+    # 行どうしを総当たりで比べないので、件数が増えても重複している行の数だけで済む
+    cash_flows = get_duplicate_cash_flows(session=session, limit=limit)
+    clusters = [
+        DuplicateCashFlowCluster(
+            items=[
+                GetCashFlowResponseItem(
+                    id=cash_flow.id,
+                    title=cash_flow.title,
+                    type=cash_flow.type,
+                    recorded_at=cash_flow.recorded_at,
+                    amount=cash_flow.amount,
+                    currency=cash_flow.currency,
+                    category_id=cash_flow.category_id,
+                )
+                for cash_flow in group
+            ]
+        )
+        for _, group in groupby(cash_flows, key=lambda cash_flow: cash_flow.content_hash)
+    ]
+    return GetDuplicateCashFlowsResponse(clusters=clusters)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_cash_flow_changes(
+    request: Request,
+    broker: Annotated[ChangeBroker, Depends(get_change_broker)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    # 指定した場合はその月のデータの変更だけを通知する
+    target_month: datetime | None = None,
+) -> StreamingResponse:
+    month_range = None
+    if target_month is not None:
+        month_range = (
+            get_month_start_date(target_month).date(),
+            get_next_month_start_date(target_month).date(),
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        async with broker.subscribe(user_id) as subscription:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await subscription.receive(timeout=STREAM_HEARTBEAT_SECONDS)
+                except SubscriptionOverflowError:
+                    # 受信が追いつかなかったので、/changes で再同期してもらってから切断する
+                    logger.info("SSEの購読者のバッファがあふれたため切断します。")
+                    yield _format_server_sent_event("resync", {})
+                    return
+
+                if event is None:
+                    # 切断検知とプロキシのタイムアウト回避のためのコメント行
+                    yield ": keep-alive\n\n"
+                    continue
+                if month_range is not None and not event.is_in_range(*month_range):
+                    continue
+
+                response = CashFlowChangeEventResponse(
+                    action=event.action,
+                    id=event.cash_flow_id,
+                    token=event.sync_version,
+                    item=event.item,
+                )
+                yield _format_server_sent_event(
+                    event.action.value,
+                    response.model_dump(mode="json", by_alias=True),
+                    event_id=event.sync_version,
+                )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("", response_model=CreateCashFlowResponse)
 def create_cash_flow(
-    body: CreateCashFlowRequest, session: Annotated[Session, Depends(get_db)]
+    body: CreateCashFlowRequest,
+    session: Annotated[Session, Depends(get_tenant_db)],
+    broker: Annotated[ChangeBroker, Depends(get_change_broker)],
+    daily_totals: Annotated[DailyTotalIndex, Depends(get_daily_total_index)],
+    fx_rates: Annotated[FxRateCache, Depends(get_fx_rate_cache)],
+    committer: Annotated[GroupCommitter | None, Depends(get_cash_flow_group_committer)],
 ) -> CreateCashFlowResponse:
-    # 保存するための容器を作成
-    cash_flow = CashFlow(
-        # 設計図をもとに、INSERT対象の1件分（ORMインスタンス）を組み立てている場所
-        title=body.title,
-        type=body.type,
-        recorded_at=body.recorded_at,
-        amount=body.amount,
+    # 締めてアーカイブした（している）期間には登録できない
+    if is_closed_period(session, body.recorded_at):
+        logger.info(f"締めた期間のCashFlowは作成できません。recorded_at = {body.recorded_at}")
+        raise BusinessException(message="CashFlow in closed period!")
+    _check_category_exists(session, body.category_id)
+    base_amount = _get_base_amount(session, fx_rates, body.currency, body.recorded_at, body.amount)
+
+    values = {
+        "title": body.title,
+        "type": body.type,
+        "recorded_at": body.recorded_at,
+        "amount": body.amount,
+        "currency": body.currency,
+        # 月別集計に加算した値。更新・削除ではこの値を取り消す
+        "base_amount": base_amount,
+        "category_id": body.category_id,
+        # 重複の判定用の指紋
+        "content_hash": calculate_content_hash(
+            body.recorded_at, body.amount, body.type, body.currency, body.title
+        ),
+    }
+    # 予算の実績用の月別集計に加算する（同じトランザクションで反映される）
+    deltas = [MonthlyTotalDelta(body.recorded_at, body.type, body.title, base_amount, 1)]
+    user_id = get_session_user_id(session)
+
+    if committer is not None:
+        # 同時に来た他の作成とまとめて1回でコミットする。失敗した場合は、この1件の失敗だけが返る
+        try:
+            cash_flow_id, sync_version = committer.submit(
+                session, _PendingCashFlow(user_id, values, deltas[0])
+            )
+        except Exception as e:
+            logger.exception("CashFlowの作成に失敗しました。")
+            raise e
+    else:
+        # 保存するための容器を作成
+        # 設計図をもとに、INSERT対象の1件分（ORMインスタンス）を組み立てている
+        # 差分同期用のバージョンを採番
+        cash_flow = CashFlow(**values, sync_version=allocate_sync_versions(session))
+        # セッションに追加（この時点ではまだDBには書き込まれていない）
+        session.add(cash_flow)
+        add_monthly_total_deltas(session, deltas)
+        # DBに保存。必要ならID採番などが反映される
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("CashFlowの作成に失敗しました。")
+            # 意図的にtryの中でキャッチしたエラーを再度発生させてpythonを止める
+            raise e
+        cash_flow_id, sync_version = cash_flow.id, cash_flow.sync_version
+
+    # コミットが成功してから、メモリ上の日別の累積和にも反映する
+    daily_totals.apply_deltas(user_id, deltas, [sync_version])
+
+    # コミットが成功してから、購読者に作成を通知する
+    _publish_change(
+        broker,
+        CashFlowChangeEvent(
+            action=CashFlowChangeAction.CREATED,
+            cash_flow_id=cash_flow_id,
+            user_id=user_id,
+            sync_version=sync_version,
+            recorded_at=body.recorded_at,
+            item=GetCashFlowResponseItem(
+                id=cash_flow_id,
+                title=body.title,
+                type=body.type,
+                recorded_at=body.recorded_at,
+                amount=body.amount,
+                currency=body.currency,
+                category_id=body.category_id,
+            ),
+        ),
     )
-    # セッションに追加（この時点ではまだDBには書き込まれていない）
-    session.add(cash_flow)
-    # DBに保存。必要ならID採番などが反映される
-    try:
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        logger.exception("CashFlowの作成に失敗しました。")
-        # 意図的にtryの中でキャッチしたエラーを再度発生させてpythonを止める
-        raise e
 
     # 保存したデータをレスポンス用に変換して返却
     return CreateCashFlowResponse(
-        id=cash_flow.id,
-        title=cash_flow.title,
-        type=cash_flow.type,
-        recorded_at=cash_flow.recorded_at,
-        amount=cash_flow.amount,
+        id=cash_flow_id,
+        title=body.title,
+        type=body.type,
+        recorded_at=body.recorded_at,
+        amount=body.amount,
+        currency=body.currency,
+        category_id=body.category_id,
     )
 
 
 @router.put("/{cash_flow_id}", response_model=UpdateCashFlowResponse)
 def update_cash_flow(
-    cash_flow_id: int, body: UpdateCashFlowRequest, session: Annotated[Session, Depends(get_db)]
+    cash_flow_id: int,
+    body: UpdateCashFlowRequest,
+    session: Annotated[Session, Depends(get_tenant_db)],
+    broker: Annotated[ChangeBroker, Depends(get_change_broker)],
+    daily_totals: Annotated[DailyTotalIndex, Depends(get_daily_total_index)],
+    fx_rates: Annotated[FxRateCache, Depends(get_fx_rate_cache)],
 ) -> UpdateCashFlowResponse:
-    original_cash_flow = get_cash_flow_by_id(session=session, cash_flow_id=cash_flow_id)
+    # 同時に来た更新・削除が、同じ変更前の値を月別集計から二重に取り消さないよう、行ロックを取って読む
+    original_cash_flow = get_cash_flow_by_id(
+        session=session, cash_flow_id=cash_flow_id, for_update=True
+    )
 
     if original_cash_flow is None:
+        if get_archived_cash_flow_by_id(session=session, cash_flow_id=cash_flow_id) is not None:
+            logger.info(f"アーカイブ済みのCashFlowは更新できません。id = {cash_flow_id}")
+            raise BusinessException(message="CashFlow in closed period!")
         logger.info(f"該当する更新対象のCashFlow IDが見つかりません。id = {cash_flow_id}")
         raise BusinessException(message="CashFlow not found!")
+    if is_closed_period(session, original_cash_flow.recorded_at) or is_closed_period(
+        session, body.recorded_at
+    ):
+        logger.info(f"締めた期間のCashFlowは更新できません。id = {cash_flow_id}")
+        raise BusinessException(message="CashFlow in closed period!")
+    # カテゴリを知らないクライアントからの更新で、分類が外れないようにする
+    if "category_id" in body.model_fields_set:
+        _check_category_exists(session, body.category_id)
+        original_cash_flow.category_id = body.category_id
+    previous_recorded_at = original_cash_flow.recorded_at
+    previous_sync_version = original_cash_flow.sync_version
+    currency = body.currency or original_cash_flow.currency
+    base_amount = _get_base_amount(session, fx_rates, currency, body.recorded_at, body.amount)
+    # 月別集計から変更前の値を取り消し、変更後の値を加算する
+    # 取り消すのは加算した時の換算額（今のレートで換算し直すと、レートが変わった分だけずれる）
+    deltas = [
+        MonthlyTotalDelta(
+            original_cash_flow.recorded_at,
+            original_cash_flow.type,
+            original_cash_flow.title,
+            -original_cash_flow.base_amount,
+            -1,
+        ),
+        MonthlyTotalDelta(body.recorded_at, body.type, body.title, base_amount, 1),
+    ]
+    add_monthly_total_deltas(session, deltas)
     original_cash_flow.title = body.title
     original_cash_flow.type = body.type
     original_cash_flow.recorded_at = body.recorded_at
     original_cash_flow.amount = body.amount
+    original_cash_flow.currency = currency
+    original_cash_flow.base_amount = base_amount
+    original_cash_flow.content_hash = calculate_content_hash(
+        body.recorded_at, body.amount, body.type, currency, body.title
+    )
+    original_cash_flow.sync_version = allocate_sync_versions(session)
 
     session.add(original_cash_flow)
 
@@ -112,27 +660,270 @@ def update_cash_flow(
         # 意図的にtryの中でキャッチしたエラーを再度発生させてpythonを止める
         raise e
 
+    daily_totals.apply_deltas(
+        original_cash_flow.user_id,
+        deltas,
+        [original_cash_flow.sync_version],
+        [previous_sync_version],
+    )
+
+    _publish_change(
+        broker,
+        CashFlowChangeEvent(
+            action=CashFlowChangeAction.UPDATED,
+            cash_flow_id=original_cash_flow.id,
+            user_id=original_cash_flow.user_id,
+            sync_version=original_cash_flow.sync_version,
+            recorded_at=original_cash_flow.recorded_at,
+            previous_recorded_at=previous_recorded_at,
+            item=GetCashFlowResponseItem(
+                id=original_cash_flow.id,
+                title=original_cash_flow.title,
+                type=original_cash_flow.type,
+                recorded_at=original_cash_flow.recorded_at,
+                amount=original_cash_flow.amount,
+                currency=original_cash_flow.currency,
+                category_id=original_cash_flow.category_id,
+            ),
+        ),
+    )
+
     return UpdateCashFlowResponse(
         id=original_cash_flow.id,
         title=original_cash_flow.title,
         type=original_cash_flow.type,
         recorded_at=original_cash_flow.recorded_at,
         amount=original_cash_flow.amount,
+        currency=original_cash_flow.currency,
+        category_id=original_cash_flow.category_id,
+    )
+
+
+@router.post("/sync", response_model=SyncCashFlowsResponse)
+def sync_cash_flows(
+    body: SyncCashFlowsRequest,
+    session: Annotated[Session, Depends(get_tenant_db)],
+    broker: Annotated[ChangeBroker, Depends(get_change_broker)],
+    daily_totals: Annotated[DailyTotalIndex, Depends(get_daily_total_index)],
+    fx_rates: Annotated[FxRateCache, Depends(get_fx_rate_cache)],
+) -> SyncCashFlowsResponse:
+    # オフラインの間にクライアントに溜まった作成・更新・削除を、1回のトランザクションで反映する
+    # 1件ずつ SQL を発行せず、操作をまとめてから種類ごとに1回の INSERT / UPDATE にする
+    # 変更・削除する行は行ロックを取って読み、ロックを取った後の値から月別集計の差分を作る
+    existing = get_cash_flows_by_ids(
+        session=session,
+        cash_flow_ids=[operation.id for operation in body.operations if operation.id is not None],
+        for_update=True,
+    )
+    # 締めの境界は共有ロックで読み、アーカイブとすれ違わないようにする
+    closed_before = get_archive_state(session, for_share=True).archiving_before
+    # 月別集計の差分の換算に使うレートを、操作の (通貨, 日付) ごとに先に引いておく
+    # 既存の行の変更前の値は、行に保存した換算額で取り消すのでレートを引かない
+    # 操作の currency を省略した update は、対象の行の通貨のまま（temp_id の行は作成時の通貨）
+    currencies = {BASE_CURRENCY} | {row.currency for row in existing.values()}
+    currencies.update(op.currency for op in body.operations if op.currency is not None)
+    pairs = {
+        (currency, op.recorded_at)
+        for op in body.operations
+        if op.recorded_at is not None
+        for currency in ([op.currency] if op.currency is not None else currencies)
+    }
+    rates = {
+        (currency, recorded_at): rate
+        for currency, recorded_at in pairs
+        if (rate := fx_rates.get_rate(session, currency, recorded_at)) is not None
+    }
+    # 重複を調べる場合は、作成する行の指紋をまとめて1回の検索（IN 句の件数ごと）で照らし合わせる
+    known_content_hashes: set[str] = set()
+    if body.on_duplicate != DuplicatePolicy.ALLOW:
+        known_content_hashes = get_existing_content_hashes(
+            session,
+            [
+                calculate_content_hash(
+                    op.recorded_at, op.amount, op.type, op.currency or BASE_CURRENCY, op.title
+                )
+                for op in body.operations
+                if op.op == CashFlowOperationType.CREATE
+            ],
+        )
+    # 指定されたカテゴリが利用者のものとしてあるかも、まとめて1回（IN 句の件数ごと）で調べる
+    known_category_ids = get_existing_category_ids(
+        session, [op.category_id for op in body.operations if op.category_id is not None]
+    )
+    plan = plan_cash_flow_operations(
+        body.operations,
+        existing,
+        closed_before,
+        rates,
+        duplicate_policy=body.on_duplicate,
+        known_content_hashes=known_content_hashes,
+        known_category_ids=known_category_ids,
+    )
+
+    inserts, updates, deletes = plan.inserts, plan.updates, plan.deletes
+    changed = [*inserts, *updates, *deletes]
+    if changed:
+        # 変更する行の数だけ差分同期のバージョンをまとめて採番する
+        last_sync_version = allocate_sync_versions(session, len(changed))
+        for offset, cash_flow in enumerate(changed):
+            cash_flow.sync_version = last_sync_version - len(changed) + 1 + offset
+
+        ids_by_sync_version = insert_cash_flows(
+            session,
+            [
+                {
+                    "title": cash_flow.title,
+                    "type": cash_flow.type,
+                    "recorded_at": cash_flow.recorded_at,
+                    "amount": cash_flow.amount,
+                    "currency": cash_flow.currency,
+                    "base_amount": cash_flow.base_amount,
+                    "sync_version": cash_flow.sync_version,
+                    "content_hash": cash_flow.content_hash,
+                    "category_id": cash_flow.category_id,
+                }
+                for cash_flow in inserts
+            ],
+        )
+        for cash_flow in inserts:
+            cash_flow.id = ids_by_sync_version[cash_flow.sync_version]
+        update_cash_flows(
+            session,
+            [
+                {
+                    "id": cash_flow.id,
+                    "title": cash_flow.title,
+                    "type": cash_flow.type,
+                    "recorded_at": cash_flow.recorded_at,
+                    "amount": cash_flow.amount,
+                    "currency": cash_flow.currency,
+                    "base_amount": cash_flow.base_amount,
+                    "sync_version": cash_flow.sync_version,
+                    "content_hash": cash_flow.content_hash,
+                    "category_id": cash_flow.category_id,
+                }
+                for cash_flow in updates
+            ],
+        )
+        now = get_now()
+        update_cash_flows(
+            session,
+            [
+                {
+                    "id": cash_flow.id,
+                    "deleted_at": now,
+                    "sync_version": cash_flow.sync_version,
+                    "content_hash": None,
+                }
+                for cash_flow in deletes
+            ],
+        )
+        deltas = plan.get_monthly_total_deltas()
+        add_monthly_total_deltas(session, deltas)
+
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("CashFlowの一括反映に失敗しました。")
+            raise e
+
+        daily_totals.apply_deltas(
+            get_session_user_id(session),
+            deltas,
+            [cash_flow.sync_version for cash_flow in changed],
+            [
+                cash_flow.previous_sync_version
+                for cash_flow in changed
+                if cash_flow.previous_sync_version is not None
+            ],
+        )
+
+    # コミットが成功してから、変更を購読者に通知する
+    user_id = get_session_user_id(session)
+    for cash_flow in changed:
+        if cash_flow.deleted:
+            event = CashFlowChangeEvent(
+                action=CashFlowChangeAction.DELETED,
+                cash_flow_id=cash_flow.id,
+                user_id=user_id,
+                sync_version=cash_flow.sync_version,
+                recorded_at=cash_flow.original.recorded_at,
+            )
+        else:
+            event = CashFlowChangeEvent(
+                action=CashFlowChangeAction.CREATED
+                if cash_flow.is_new
+                else CashFlowChangeAction.UPDATED,
+                cash_flow_id=cash_flow.id,
+                user_id=user_id,
+                sync_version=cash_flow.sync_version,
+                recorded_at=cash_flow.recorded_at,
+                previous_recorded_at=None if cash_flow.is_new else cash_flow.original.recorded_at,
+                item=GetCashFlowResponseItem(
+                    id=cash_flow.id,
+                    title=cash_flow.title,
+                    type=cash_flow.type,
+                    recorded_at=cash_flow.recorded_at,
+                    amount=cash_flow.amount,
+                    currency=cash_flow.currency,
+                    category_id=cash_flow.category_id,
+                ),
+            )
+        _publish_change(broker, event)
+
+    return SyncCashFlowsResponse(
+        results=[
+            CashFlowOperationResult(
+                index=outcome.index,
+                op=outcome.operation.op,
+                temp_id=outcome.operation.temp_id,
+                id=outcome.target.id if outcome.target is not None else outcome.operation.id,
+                applied=outcome.error is None,
+                error=outcome.error,
+                duplicate=outcome.duplicate,
+            )
+            for outcome in plan.outcomes
+        ],
+        id_map={cash_flow.temp_id: cash_flow.id for cash_flow in inserts},
     )
 
 
 # 対象のidを特定（パスパラメータ）
 # レスポンスは無しなので　None
 @router.delete("/{cash_flow_id}", response_model=None, status_code=204)
-def delete_cash_flow(cash_flow_id: int, session: Annotated[Session, Depends(get_db)]) -> None:
-    # 対象のidのCashFlowを取得
-    cash_flow = get_cash_flow_by_id(session=session, cash_flow_id=cash_flow_id)
+def delete_cash_flow(
+    cash_flow_id: int,
+    session: Annotated[Session, Depends(get_tenant_db)],
+    broker: Annotated[ChangeBroker, Depends(get_change_broker)],
+    daily_totals: Annotated[DailyTotalIndex, Depends(get_daily_total_index)],
+) -> None:
+    # 対象のidのCashFlowを、行ロックを取って取得（同時に来た削除が二重に集計を取り消さないように）
+    cash_flow = get_cash_flow_by_id(session=session, cash_flow_id=cash_flow_id, for_update=True)
     # 存在しなければエラーを返す
     if cash_flow is None:
+        if get_archived_cash_flow_by_id(session=session, cash_flow_id=cash_flow_id) is not None:
+            logger.info(f"アーカイブ済みのCashFlowは削除できません。id = {cash_flow_id}")
+            raise BusinessException(message="CashFlow in closed period!")
         logger.info("該当する削除対象のCashFlow IDが見つかりません。")
         raise BusinessException(message="CashFlow not found!")
-    # 存在すれば削除
-    session.delete(cash_flow)
+    if is_closed_period(session, cash_flow.recorded_at):
+        logger.info(f"締めた期間のCashFlowは削除できません。id = {cash_flow_id}")
+        raise BusinessException(message="CashFlow in closed period!")
+    # 存在すれば論理削除（差分同期のクライアントに削除を伝えるため、行はトゥームストーンとして残す）
+    previous_sync_version = cash_flow.sync_version
+    cash_flow.deleted_at = get_now()
+    cash_flow.sync_version = allocate_sync_versions(session)
+    # トゥームストーンは重複として数えない
+    cash_flow.content_hash = None
+    session.add(cash_flow)
+    # 月別集計から、加算した時の換算額で取り消す
+    deltas = [
+        MonthlyTotalDelta(
+            cash_flow.recorded_at, cash_flow.type, cash_flow.title, -cash_flow.base_amount, -1
+        )
+    ]
+    add_monthly_total_deltas(session, deltas)
 
     # コミット処理
     try:
@@ -143,3 +934,18 @@ def delete_cash_flow(cash_flow_id: int, session: Annotated[Session, Depends(get_
         logger.exception("CashFlowの削除に失敗しました。")
         # ロールバックしたあと、キャッチした例外を再送出して処理を中断する
         raise e
+
+    daily_totals.apply_deltas(
+        cash_flow.user_id, deltas, [cash_flow.sync_version], [previous_sync_version]
+    )
+
+    _publish_change(
+        broker,
+        CashFlowChangeEvent(
+            action=CashFlowChangeAction.DELETED,
+            cash_flow_id=cash_flow.id,
+            user_id=cash_flow.user_id,
+            sync_version=cash_flow.sync_version,
+            recorded_at=cash_flow.recorded_at,
+        ),
+    )
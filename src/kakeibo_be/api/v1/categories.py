@@ -0,0 +1,73 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.tenant import get_tenant_db
+from kakeibo_be.exceptions.business_exception import BusinessException
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.models.db.category import Category, CategoryRule
+from kakeibo_be.models.request.v1.category import CreateCategoryRequest, CreateCategoryRuleRequest
+from kakeibo_be.models.response.v1.category import CategoryResponseItem, CategoryRuleResponseItem
+from kakeibo_be.repositories.category import (
+    get_categories,
+    get_category_by_id,
+    get_category_by_name,
+)
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[CategoryResponseItem])
+def get_category_list(
+    session: Annotated[Session, Depends(get_tenant_db)],
+) -> list[CategoryResponseItem]:
+    return [
+        CategoryResponseItem(id=category.id, name=category.name)
+        for category in get_categories(session=session)
+    ]
+
+
+@router.post("", response_model=CategoryResponseItem)
+def create_category(
+    body: CreateCategoryRequest, session: Annotated[Session, Depends(get_tenant_db)]
+) -> CategoryResponseItem:
+    if get_category_by_name(session=session, name=body.name) is not None:
+        logger.info(f"同じ名前のカテゴリが既に存在します。name = {body.name}")
+        raise BusinessException(message="Category already exists!")
+
+    category = Category(name=body.name)
+    session.add(category)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("Categoryの作成に失敗しました。")
+        raise e
+
+    return CategoryResponseItem(id=category.id, name=category.name)
+
+
+# 追加したルールは、作成済みの未分類の収支にはバッチ（backfill_cash_flow_categories）で反映する
+@router.post("/{category_id}/rules", response_model=CategoryRuleResponseItem)
+def create_category_rule(
+    category_id: int,
+    body: CreateCategoryRuleRequest,
+    session: Annotated[Session, Depends(get_tenant_db)],
+) -> CategoryRuleResponseItem:
+    if get_category_by_id(session=session, category_id=category_id) is None:
+        logger.info(f"該当するカテゴリが見つかりません。id = {category_id}")
+        raise BusinessException(message="Category not found!")
+
+    rule = CategoryRule(category_id=category_id, keyword=body.keyword, priority=body.priority)
+    session.add(rule)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("CategoryRuleの作成に失敗しました。")
+        raise e
+
+    return CategoryRuleResponseItem(
+        id=rule.id, category_id=rule.category_id, keyword=rule.keyword, priority=rule.priority
+    )
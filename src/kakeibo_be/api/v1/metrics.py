@@ -0,0 +1,29 @@
+from dataclasses import asdict
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from kakeibo_be.indexes.daily_totals import DailyTotalIndex, get_daily_total_index
+from kakeibo_be.middlewares.admission_control import AdmissionLimiter, get_admission_limiter
+from kakeibo_be.models.response.v1.metrics import (
+    GetAdmissionMetricsResponse,
+    GetDailyTotalIndexMetricsResponse,
+)
+
+router = APIRouter()
+
+
+# 混雑状況はイベントループ上で更新されるので、async で同じスレッドから読む
+@router.get("/admission", response_model=GetAdmissionMetricsResponse)
+async def get_admission_metrics(
+    limiter: Annotated[AdmissionLimiter, Depends(get_admission_limiter)],
+) -> GetAdmissionMetricsResponse:
+    return GetAdmissionMetricsResponse(**asdict(limiter.get_metrics()))
+
+
+# 日別の累積和のインデックスが使っているメモリ（ロックで守っているので、どのスレッドから読んでもよい）
+@router.get("/daily-totals", response_model=GetDailyTotalIndexMetricsResponse)
+def get_daily_total_index_metrics(
+    daily_totals: Annotated[DailyTotalIndex, Depends(get_daily_total_index)],
+) -> GetDailyTotalIndexMetricsResponse:
+    return GetDailyTotalIndexMetricsResponse(**asdict(daily_totals.get_metrics()))
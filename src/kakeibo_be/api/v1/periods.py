@@ -0,0 +1,67 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.tenant import get_tenant_db
+from kakeibo_be.exceptions.business_exception import BusinessException
+from kakeibo_be.indexes.periods import PeriodIndex, get_period_index
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.logic.calculate.calculate_period import PeriodDefinition
+from kakeibo_be.models.request.v1.period import UpdatePeriodSettingRequest
+from kakeibo_be.models.response.v1.period import GetPeriodResponseItem, GetPeriodSettingResponse
+from kakeibo_be.repositories.period_setting import get_period_definition, save_period_definition
+
+router = APIRouter()
+
+# 一覧で返せる最大の期間の数
+MAX_PERIODS = 120
+
+
+@router.get("/setting", response_model=GetPeriodSettingResponse)
+def get_period_setting(session: Annotated[Session, Depends(get_tenant_db)]) -> GetPeriodSettingResponse:
+    definition = get_period_definition(session)
+    return GetPeriodSettingResponse(kind=definition.kind, start_day=definition.start_day)
+
+
+@router.put("/setting", response_model=GetPeriodSettingResponse)
+def update_period_setting(
+    body: UpdatePeriodSettingRequest, session: Annotated[Session, Depends(get_tenant_db)]
+) -> GetPeriodSettingResponse:
+    try:
+        definition = PeriodDefinition(kind=body.kind, start_day=body.start_day)
+    except ValueError:
+        logger.info(f"期間の区切り方が不正です。kind = {body.kind}, start_day = {body.start_day}")
+        raise BusinessException(message="Invalid period setting!") from None
+
+    save_period_definition(session, definition)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("期間の区切り方の更新に失敗しました。")
+        raise e
+
+    return GetPeriodSettingResponse(kind=definition.kind, start_day=definition.start_day)
+
+
+# target_date を含む期間までの直近 count 期間（古い順）
+@router.get("", response_model=list[GetPeriodResponseItem])
+def get_periods(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    periods: Annotated[PeriodIndex, Depends(get_period_index)],
+    target_date: Annotated[date | None, Query(alias="targetDate")] = None,
+    count: Annotated[int, Query(ge=1, le=MAX_PERIODS)] = 1,
+) -> list[GetPeriodResponseItem]:
+    calendar = periods.get_calendar(get_period_definition(session))
+    try:
+        recent_periods = calendar.get_recent_periods(target_date or get_now().date(), count)
+    except ValueError:
+        raise BusinessException(message="targetDate is out of range!") from None
+
+    return [
+        GetPeriodResponseItem(key=period.key, start_date=period.start_date, end_date=period.end_date)
+        for period in recent_periods
+    ]
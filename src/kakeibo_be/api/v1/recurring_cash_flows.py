@@ -0,0 +1,92 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.tenant import get_tenant_db
+from kakeibo_be.exceptions.business_exception import BusinessException
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.models.db.recurring_cash_flow import RecurringCashFlow
+from kakeibo_be.models.request.v1.recurring_cash_flow import CreateRecurringCashFlowRequest
+from kakeibo_be.models.response.v1.recurring_cash_flow import RecurringCashFlowResponseItem
+from kakeibo_be.repositories.recurring_cash_flow import (
+    get_recurring_cash_flow_by_id,
+    get_recurring_cash_flows,
+    reset_recurring_materialized_months,
+)
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[RecurringCashFlowResponseItem])
+def get_recurring_cash_flow_list(
+    session: Annotated[Session, Depends(get_tenant_db)],
+) -> list[RecurringCashFlowResponseItem]:
+    return [
+        RecurringCashFlowResponseItem(
+            id=recurring_cash_flow.id,
+            title=recurring_cash_flow.title,
+            type=recurring_cash_flow.type,
+            amount=recurring_cash_flow.amount,
+            frequency=recurring_cash_flow.frequency,
+            start_date=recurring_cash_flow.start_date,
+            end_date=recurring_cash_flow.end_date,
+        )
+        for recurring_cash_flow in get_recurring_cash_flows(session=session)
+    ]
+
+
+@router.post("", response_model=RecurringCashFlowResponseItem)
+def create_recurring_cash_flow(
+    body: CreateRecurringCashFlowRequest, session: Annotated[Session, Depends(get_tenant_db)]
+) -> RecurringCashFlowResponseItem:
+    recurring_cash_flow = RecurringCashFlow(
+        title=body.title,
+        type=body.type,
+        amount=body.amount,
+        frequency=body.frequency,
+        start_date=body.start_date,
+        end_date=body.end_date,
+    )
+    session.add(recurring_cash_flow)
+    # 開始月以降で展開済みの月にも、次に表示されたときに新しいルールの分を展開する
+    reset_recurring_materialized_months(session, body.start_date.replace(day=1))
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("RecurringCashFlowの作成に失敗しました。")
+        raise e
+
+    return RecurringCashFlowResponseItem(
+        id=recurring_cash_flow.id,
+        title=recurring_cash_flow.title,
+        type=recurring_cash_flow.type,
+        amount=recurring_cash_flow.amount,
+        frequency=recurring_cash_flow.frequency,
+        start_date=recurring_cash_flow.start_date,
+        end_date=recurring_cash_flow.end_date,
+    )
+
+
+# 作成済みの収支は残し、以降の月には展開しないようにする
+@router.delete("/{recurring_cash_flow_id}", response_model=None, status_code=204)
+def delete_recurring_cash_flow(
+    recurring_cash_flow_id: int, session: Annotated[Session, Depends(get_tenant_db)]
+) -> None:
+    recurring_cash_flow = get_recurring_cash_flow_by_id(
+        session=session, recurring_cash_flow_id=recurring_cash_flow_id
+    )
+    if recurring_cash_flow is None:
+        logger.info(
+            f"該当する削除対象のRecurringCashFlow IDが見つかりません。id = {recurring_cash_flow_id}"
+        )
+        raise BusinessException(message="RecurringCashFlow not found!")
+
+    session.delete(recurring_cash_flow)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("RecurringCashFlowの削除に失敗しました。")
+        raise e
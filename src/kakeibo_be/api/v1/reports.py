@@ -0,0 +1,301 @@
+import math
+
+from datetime import date, timedelta
+from typing import Annotated
+
+import numpy as np
+
+from dateutil.relativedelta import relativedelta
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.tenant import get_current_user_id, get_tenant_db
+from kakeibo_be.exceptions.business_exception import BusinessException
+from kakeibo_be.indexes.daily_totals import DailyTotalIndex, get_daily_total_index
+from kakeibo_be.indexes.periods import PeriodIndex, get_period_index
+from kakeibo_be.jobs.reports import RESULT_FORMATS
+from kakeibo_be.jobs.runner import ReportJob, ReportJobRunner, get_report_job_runner
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.logic.calculate.calculate_trend import (
+    build_daily_series,
+    calculate_monthly_trend,
+    calculate_weekday_profile,
+    moving_average,
+    project_month_end,
+)
+from kakeibo_be.models.request.v1.report import CreateReportJobRequest
+from kakeibo_be.models.response.v1.report import (
+    BreakdownCategoryItem,
+    BreakdownTitleItem,
+    GetBreakdownResponse,
+    GetPeriodTotalsResponse,
+    GetRangeTotalsResponse,
+    GetReportJobResponse,
+    GetTrendsResponse,
+    PeriodTotalItem,
+    TrendDayItem,
+    TrendMonthItem,
+    TrendProjection,
+    TrendWeekdayItem,
+)
+from kakeibo_be.repositories.cash_flow import get_daily_totals_in_range
+from kakeibo_be.repositories.category import get_category_breakdown, get_top_titles
+from kakeibo_be.repositories.period_setting import get_period_definition
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.report_job_status import ReportJobStatus
+
+router = APIRouter()
+
+# 1つのジョブで扱える最大の年数
+MAX_REPORT_YEARS = 20
+# 傾向の集計で指定できる最大の月数
+MAX_TREND_MONTHS = 120
+# 月ごとの支出の移動平均の月数
+MONTHLY_MOVING_AVERAGE_WINDOW = 3
+# 日ごとの推移を返す日数
+TREND_DAYS = 90
+# 内訳で返す上位のタイトルの数
+DEFAULT_TOP_TITLES = 10
+MAX_TOP_TITLES = 100
+
+
+def _to_response(job: ReportJob) -> GetReportJobResponse:
+    return GetReportJobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        start_date=job.start_date,
+        end_date=job.end_date,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        error=job.error,
+    )
+
+
+def _get_job_or_raise(runner: ReportJobRunner, job_id: str, user_id: int) -> ReportJob:
+    job = runner.get(job_id, user_id)
+    if job is None:
+        logger.info(f"該当するジョブが見つかりません。id = {job_id}")
+        raise BusinessException(message="Job not found!")
+    return job
+
+
+# 時間のかかるレポート・エクスポートはジョブとして受け付け、ジョブIDを返す
+# 同じ内容のジョブが実行中・結果の保持期間内なら、そのジョブを返す
+@router.post("/jobs", response_model=GetReportJobResponse, status_code=202)
+def create_report_job(
+    body: CreateReportJobRequest,
+    runner: Annotated[ReportJobRunner, Depends(get_report_job_runner)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
+) -> GetReportJobResponse:
+    if body.start_date >= body.end_date:
+        raise BusinessException(message="startDate must be before endDate!")
+    if (body.end_date - body.start_date).days > 366 * MAX_REPORT_YEARS:
+        raise BusinessException(message="Report period is too long!")
+
+    job = runner.submit(kind=body.kind, user_id=user_id, start_date=body.start_date, end_date=body.end_date)
+    return _to_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=GetReportJobResponse)
+def get_report_job(
+    job_id: str,
+    runner: Annotated[ReportJobRunner, Depends(get_report_job_runner)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
+) -> GetReportJobResponse:
+    return _to_response(_get_job_or_raise(runner, job_id, user_id))
+
+
+@router.get("/jobs/{job_id}/result")
+def get_report_job_result(
+    job_id: str,
+    runner: Annotated[ReportJobRunner, Depends(get_report_job_runner)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
+) -> FileResponse:
+    job = _get_job_or_raise(runner, job_id, user_id)
+    if job.status != ReportJobStatus.SUCCEEDED or not job.result_path.exists():
+        raise BusinessException(message="Job result is not ready!")
+
+    _, media_type = RESULT_FORMATS[job.kind]
+    return FileResponse(
+        job.result_path,
+        media_type=media_type,
+        filename=f"{job.kind.value}_{job.start_date}_{job.end_date}{job.result_path.suffix}",
+    )
+
+
+# [start_date, end_date) の収入・支出の合計
+# 日ごとの累積和をメモリに持っておき、期間の長さによらず引き算1回で返す
+@router.get("/totals", response_model=GetRangeTotalsResponse)
+def get_range_totals(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    daily_totals: Annotated[DailyTotalIndex, Depends(get_daily_total_index)],
+    start_date: Annotated[date, Query(alias="startDate")],
+    end_date: Annotated[date, Query(alias="endDate")],
+) -> GetRangeTotalsResponse:
+    if start_date >= end_date:
+        raise BusinessException(message="startDate must be before endDate!")
+
+    income, expense = daily_totals.get_range_total(session, user_id, start_date, end_date)
+    return GetRangeTotalsResponse(
+        start_date=start_date,
+        end_date=end_date,
+        income=income,
+        expense=expense,
+        balance=income - expense,
+    )
+
+
+# 利用者の区切り方（給料日・週など）での、target_date を含む期間までの直近 count 期間の合計
+# 期間の境界は前もって作った一覧から引き、合計は日ごとの累積和の境界の差で求める
+@router.get("/periods", response_model=GetPeriodTotalsResponse)
+def get_period_totals(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    daily_totals: Annotated[DailyTotalIndex, Depends(get_daily_total_index)],
+    periods: Annotated[PeriodIndex, Depends(get_period_index)],
+    target_date: Annotated[date | None, Query(alias="targetDate")] = None,
+    count: Annotated[int, Query(ge=1, le=MAX_TREND_MONTHS)] = 12,
+) -> GetPeriodTotalsResponse:
+    definition = get_period_definition(session)
+    try:
+        recent_periods = periods.get_calendar(definition).get_recent_periods(
+            target_date or get_now().date(), count
+        )
+    except ValueError:
+        raise BusinessException(message="targetDate is out of range!") from None
+
+    boundaries = [period.start_date for period in recent_periods] + [recent_periods[-1].end_date]
+    totals = daily_totals.get_range_totals(session, user_id, boundaries)
+    return GetPeriodTotalsResponse(
+        kind=definition.kind,
+        start_day=definition.start_day,
+        periods=[
+            PeriodTotalItem(
+                key=period.key,
+                start_date=period.start_date,
+                end_date=period.end_date,
+                income=income,
+                expense=expense,
+                balance=income - expense,
+            )
+            for period, (income, expense) in zip(recent_periods, totals, strict=True)
+        ],
+    )
+
+
+# カテゴリごとの合計と、金額の大きいタイトル（支払先）の上位
+# 集計・並べ替え・件数の絞り込みはすべて DB で行い、結果の行だけを受け取る
+@router.get("/breakdown", response_model=GetBreakdownResponse)
+def get_breakdown(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    start_date: Annotated[date, Query(alias="startDate")],
+    end_date: Annotated[date, Query(alias="endDate")],
+    cash_flow_type: Annotated[CashFlowType, Query(alias="type")] = CashFlowType.EXPENSE,
+    limit: Annotated[int, Query(ge=1, le=MAX_TOP_TITLES)] = DEFAULT_TOP_TITLES,
+) -> GetBreakdownResponse:
+    if start_date >= end_date:
+        raise BusinessException(message="startDate must be before endDate!")
+
+    categories = get_category_breakdown(
+        session=session, start_date=start_date, end_date=end_date, cash_flow_type=cash_flow_type
+    )
+    top_titles = get_top_titles(
+        session=session,
+        start_date=start_date,
+        end_date=end_date,
+        cash_flow_type=cash_flow_type,
+        limit=limit,
+    )
+    return GetBreakdownResponse(
+        start_date=start_date,
+        end_date=end_date,
+        type=cash_flow_type,
+        categories=[
+            BreakdownCategoryItem(
+                category_id=row.category_id, name=row.name, amount=row.amount, count=row.count
+            )
+            for row in categories
+        ],
+        top_titles=[
+            BreakdownTitleItem(title=row.title, amount=row.amount, count=row.count)
+            for row in top_titles
+        ],
+    )
+
+
+@router.get("/trends", response_model=GetTrendsResponse)
+def get_trends(
+    session: Annotated[Session, Depends(get_tenant_db)],
+    months: Annotated[int, Query(ge=1, le=MAX_TREND_MONTHS)] = 12,
+) -> GetTrendsResponse:
+    # 今月を含む直近 months か月分を、日付・種別ごとの集計クエリ1回で読み込み、
+    # 以降の統計はすべて NumPy の配列演算で計算する
+    today = get_now().date()
+    start_date = today.replace(day=1) - relativedelta(months=months - 1)
+    end_date = today + timedelta(days=1)
+    rows = get_daily_totals_in_range(session=session, start_date=start_date, end_date=end_date)
+    series = build_daily_series(
+        start_date=start_date,
+        end_date=end_date,
+        recorded_ats=[row.recorded_at for row in rows],
+        types=[row.type for row in rows],
+        amounts=[row.amount for row in rows],
+    )
+
+    monthly_trend = calculate_monthly_trend(series, MONTHLY_MOVING_AVERAGE_WINDOW)
+    moving_average_7 = moving_average(series.expense, 7)
+    moving_average_30 = moving_average(series.expense, 30)
+    weekday_profile = calculate_weekday_profile(series)
+    projection = project_month_end(series, today, weekday_profile)
+
+    recent = slice(-TREND_DAYS, None)
+    return GetTrendsResponse(
+        months=[
+            TrendMonthItem(
+                month=month,
+                income=income,
+                expense=expense,
+                balance=income - expense,
+                expense_change_rate=None if math.isnan(change_rate) else change_rate,
+                expense_moving_average=average,
+            )
+            for month, income, expense, change_rate, average in zip(
+                monthly_trend.months.astype("datetime64[D]").tolist(),
+                monthly_trend.income.tolist(),
+                monthly_trend.expense.tolist(),
+                monthly_trend.expense_change_rate.tolist(),
+                monthly_trend.expense_moving_average.tolist(),
+                strict=True,
+            )
+        ],
+        days=[
+            TrendDayItem(
+                date=day,
+                expense=expense,
+                expense_moving_average_7=average_7,
+                expense_moving_average_30=average_30,
+            )
+            for day, expense, average_7, average_30 in zip(
+                series.days[recent].tolist(),
+                series.expense[recent].tolist(),
+                moving_average_7[recent].tolist(),
+                moving_average_30[recent].tolist(),
+                strict=True,
+            )
+        ],
+        weekdays=[
+            TrendWeekdayItem(weekday=weekday, average_expense=average)
+            for weekday, average in enumerate(np.round(weekday_profile, 2).tolist())
+        ],
+        projection=TrendProjection(
+            month=projection.month,
+            elapsed_days=projection.elapsed_days,
+            days_in_month=projection.days_in_month,
+            expense_to_date=projection.expense_to_date,
+            projected_expense=projection.projected_expense,
+        ),
+    )
@@ -0,0 +1,71 @@
+import argparse
+
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.base import session as session_factory
+from kakeibo_be.repositories.cash_flow_archive import (
+    finish_archiving,
+    move_cash_flows_to_archive,
+    start_archiving,
+)
+
+# cash_flows に残しておく年数（今年を含む）
+DEFAULT_KEEP_YEARS = 2
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _commit(session: Session, message: str) -> None:
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception(message)
+        raise e
+
+
+def archive_cash_flows(session: Session, archive_before: date, batch_size: int) -> int:
+    # 先に境界を進めて対象期間への書き込みを止めてから移動する
+    start_archiving(session=session, archive_before=archive_before)
+    _commit(session, "締めの境界の更新に失敗しました。")
+
+    archived_count = 0
+    while True:
+        # バッチごとにコピーと削除をコミットするので、途中で止まっても次回は残りから再開できる
+        count = move_cash_flows_to_archive(
+            session=session, archive_before=archive_before, limit=batch_size
+        )
+        if count == 0:
+            break
+        _commit(session, "CashFlowのアーカイブに失敗しました。")
+
+        archived_count += count
+        logger.info(f"CashFlowをアーカイブしました。累計 = {archived_count}")
+
+    # すべて移動し終えてから、読み取り側の境界を進める
+    finish_archiving(session=session, archive_before=archive_before)
+    _commit(session, "アーカイブの完了の記録に失敗しました。")
+
+    return archived_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="締めた年の CashFlow をアーカイブテーブルへ移動する"
+    )
+    parser.add_argument("--keep-years", type=int, default=DEFAULT_KEEP_YEARS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    archive_before = date(get_now().year - (args.keep_years - 1), 1, 1)
+    with session_factory() as session:
+        archive_cash_flows(
+            session=session, archive_before=archive_before, batch_size=args.batch_size
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.categorize.match_category_rule import match_category_rule, sort_category_rules
+from kakeibo_be.models.db.base import session as session_factory
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import CashFlowArchive
+from kakeibo_be.models.db.tenant import get_session_user_id, tenant_scope
+from kakeibo_be.repositories.category import (
+    get_category_rule_items,
+    get_category_rule_user_ids,
+    get_uncategorized_cash_flows,
+    set_uncategorized_cash_flow_categories,
+)
+from kakeibo_be.repositories.sync_sequence import allocate_sync_versions
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def backfill_categories(session: Session, batch_size: int) -> int:
+    # 分類のルールを持つ利用者ごとに、未分類の収支へルールを当てはめる
+    assigned_count = 0
+    for user_id in get_category_rule_user_ids(session):
+        with tenant_scope(session, user_id):
+            assigned_count += _backfill_user_categories(session, batch_size)
+    return assigned_count
+
+
+def _backfill_user_categories(session: Session, batch_size: int) -> int:
+    rules = sort_category_rules(get_category_rule_items(session))
+    assigned_count = 0
+    # 締めた年の行も、内訳の集計で分類できるようアーカイブ側まで当てはめる
+    for model in (CashFlow, CashFlowArchive):
+        after_id = 0
+        while True:
+            cash_flows = get_uncategorized_cash_flows(
+                session=session, model=model, after_id=after_id, limit=batch_size
+            )
+            if not cash_flows:
+                break
+            after_id = cash_flows[-1].id
+
+            rows = []
+            for cash_flow in cash_flows:
+                category_id = match_category_rule(cash_flow.title, rules)
+                if category_id is not None:
+                    rows.append({"id": cash_flow.id, "category_id": category_id})
+            if not rows:
+                continue
+            if model is CashFlow:
+                # 差分同期のクライアントに分類の変更が届くよう、バージョンもまとめて採番する
+                last_sync_version = allocate_sync_versions(session, len(rows))
+                for offset, row in enumerate(rows):
+                    row["sync_version"] = last_sync_version - len(rows) + 1 + offset
+
+            # バッチごとにコミットし、ロックを長く持たない
+            # 途中で止まっても、分類済みの行は次回の対象にならないので続きから再開できる
+            set_uncategorized_cash_flow_categories(session=session, model=model, rows=rows)
+            try:
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.exception(
+                    f"カテゴリの分類に失敗しました。user_id = {get_session_user_id(session)}"
+                )
+                raise e
+
+            assigned_count += len(rows)
+            logger.info(
+                f"カテゴリを分類しました。table = {model.__tablename__}, "
+                f"user_id = {get_session_user_id(session)}, 累計 = {assigned_count}"
+            )
+
+    return assigned_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="分類のルールをもとに、未分類の収支にカテゴリを設定する"
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with session_factory() as session:
+        backfill_categories(session=session, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
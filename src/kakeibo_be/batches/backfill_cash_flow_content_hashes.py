@@ -0,0 +1,69 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.deduplicate.calculate_content_hash import calculate_content_hash
+from kakeibo_be.models.db.base import session as session_factory
+from kakeibo_be.repositories.cash_flow import (
+    get_cash_flows_without_content_hash,
+    set_cash_flow_content_hashes,
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def backfill_content_hashes(session: Session, batch_size: int) -> int:
+    # 指紋の列を追加する前の行に、指紋を計算して設定する
+    # 指紋は利用者を問わず行の内容だけで決まるので、利用者ごとに分けずに id の順に進める
+    # 指紋は API のレスポンスに含まれないので、差分同期のバージョンは採番しない
+    filled_count = 0
+    after_id = 0
+    while True:
+        cash_flows = get_cash_flows_without_content_hash(
+            session=session, after_id=after_id, limit=batch_size
+        )
+        if not cash_flows:
+            break
+        after_id = cash_flows[-1].id
+
+        rows = [
+            {
+                "id": cash_flow.id,
+                "content_hash": calculate_content_hash(
+                    cash_flow.recorded_at,
+                    cash_flow.amount,
+                    cash_flow.type,
+                    cash_flow.currency,
+                    cash_flow.title,
+                ),
+            }
+            for cash_flow in cash_flows
+        ]
+        # バッチごとにコミットし、ロックを長く持たない
+        # 途中で止まっても、設定済みの行は次回の対象にならないので続きから再開できる
+        set_cash_flow_content_hashes(session=session, rows=rows)
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception(f"重複判定用の指紋の設定に失敗しました。after_id = {after_id}")
+            raise e
+
+        filled_count += len(rows)
+        logger.info(f"重複判定用の指紋を設定しました。累計 = {filled_count}")
+
+    return filled_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="指紋を計算していない収支に、重複判定用の指紋を設定する")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with session_factory() as session:
+        backfill_content_hashes(session=session, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
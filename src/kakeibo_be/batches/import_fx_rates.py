@@ -0,0 +1,78 @@
+import argparse
+import csv
+
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.caches.fx_rate import FxRateCache, get_fx_rate_cache
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.models.db.base import session as session_factory
+from kakeibo_be.repositories.fx_rate import upsert_fx_rates
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def import_fx_rates(
+    session: Session, rows: Iterable[dict[str, str]], batch_size: int, fx_rates: FxRateCache
+) -> int:
+    # currency, date, rate の列を持つ行を、batch_size 件ずつ1回の INSERT ... ON CONFLICT で登録する
+    # 既に使われている日付のレートを訂正しても、登録済みの月別集計（予算の実績）は作り直さない
+    # （期間の合計・内訳は集計のたびに新しいレートで換算される）
+    imported_count = 0
+    currencies: set[str] = set()
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(
+            {
+                "currency": row["currency"].strip().upper(),
+                "rate_date": date.fromisoformat(row["date"]),
+                "rate": Decimal(row["rate"]),
+            }
+        )
+        if len(batch) >= batch_size:
+            imported_count += _import_batch(session, batch)
+            currencies.update(item["currency"] for item in batch)
+            batch = []
+    if batch:
+        imported_count += _import_batch(session, batch)
+        currencies.update(item["currency"] for item in batch)
+
+    # このプロセスのキャッシュは捨てる（他のプロセスは TTL が過ぎたら入れ替わる）
+    for currency in currencies:
+        fx_rates.invalidate(currency)
+    return imported_count
+
+
+def _import_batch(session: Session, batch: list[dict]) -> int:
+    upsert_fx_rates(session, batch)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.exception("為替レートの登録に失敗しました。")
+        raise e
+    logger.info(f"為替レートを登録しました。件数 = {len(batch)}")
+    return len(batch)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CSV（currency,date,rate）の為替レートを登録する")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with args.path.open(encoding="utf-8", newline="") as file, session_factory() as session:
+        import_fx_rates(
+            session=session,
+            rows=csv.DictReader(file),
+            batch_size=args.batch_size,
+            fx_rates=get_fx_rate_cache(),
+        )
+
+
+if __name__ == "__main__":
+    main()
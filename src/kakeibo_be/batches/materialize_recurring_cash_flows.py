@@ -0,0 +1,72 @@
+import argparse
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_month_start_date, get_now
+from kakeibo_be.models.db.base import session as session_factory
+from kakeibo_be.models.db.tenant import get_session_user_id, tenant_scope
+from kakeibo_be.repositories.recurring_cash_flow import (
+    get_recurring_cash_flow_user_ids,
+    is_recurring_month_materialized,
+    materialize_recurring_cash_flows,
+)
+
+# 今月に加えて何か月先まで展開しておくか
+DEFAULT_MONTHS_AHEAD = 1
+
+
+def materialize_months(session: Session, months_ahead: int) -> int:
+    # 繰り返しのルールを持つ利用者ごとに展開する
+    created_count = 0
+    for user_id in get_recurring_cash_flow_user_ids(session):
+        with tenant_scope(session, user_id):
+            created_count += _materialize_user_months(session, months_ahead)
+    return created_count
+
+
+def _materialize_user_months(session: Session, months_ahead: int) -> int:
+    this_month_start_date = get_month_start_date(get_now()).date()
+    created_count = 0
+    for i in range(months_ahead + 1):
+        month_start_date = this_month_start_date + relativedelta(months=i)
+        # 一覧の表示で展開済みの月は飛ばす（表示時の展開と同じ処理なので結果は変わらない）
+        if is_recurring_month_materialized(session, month_start_date):
+            continue
+        try:
+            count = materialize_recurring_cash_flows(session, month_start_date)
+            session.commit()
+        except IntegrityError:
+            # 同じ月を同時にリクエスト側で展開済み
+            session.rollback()
+            continue
+        except Exception as e:
+            session.rollback()
+            logger.exception(
+                f"繰り返しの収支の展開に失敗しました。month = {month_start_date}, "
+                f"user_id = {get_session_user_id(session)}"
+            )
+            raise e
+
+        created_count += count
+        logger.info(
+            f"繰り返しの収支を展開しました。month = {month_start_date}, "
+            f"user_id = {get_session_user_id(session)}, count = {count}"
+        )
+
+    return created_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="繰り返しの収支を cash_flows に展開する")
+    parser.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+    args = parser.parse_args()
+
+    with session_factory() as session:
+        materialize_months(session=session, months_ahead=args.months_ahead)
+
+
+if __name__ == "__main__":
+    main()
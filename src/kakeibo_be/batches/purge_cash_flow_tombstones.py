@@ -0,0 +1,64 @@
+import argparse
+
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.base import session as session_factory
+from kakeibo_be.repositories.cash_flow import delete_cash_flows_by_ids, get_cash_flow_tombstones
+from kakeibo_be.repositories.sync_sequence import advance_purged_sync_version
+
+# トゥームストーンを残しておく日数。これより長くオフラインだったクライアントは全件同期になる
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_BATCH_SIZE = 1000
+
+
+def purge_tombstones(session: Session, deleted_before: datetime, batch_size: int) -> int:
+    purged_count = 0
+    while True:
+        tombstones = get_cash_flow_tombstones(
+            session=session, deleted_before=deleted_before, limit=batch_size
+        )
+        if not tombstones:
+            break
+
+        # バッチごとに削除と「どこまで削除したか」の記録を1トランザクションで行う
+        # 途中で止まっても、次回はコミット済みのバッチの続きから再開できる
+        delete_cash_flows_by_ids(
+            session=session, cash_flow_ids=[cash_flow_id for cash_flow_id, _, _ in tombstones]
+        )
+        # バージョンは利用者ごとに採番しているので、削除済みの範囲も利用者ごとに進める
+        # （別の利用者のトークンは、自分のトゥームストーンを削除しない限り全件同期にならない）
+        purged_values: dict[int, int] = {}
+        for _, user_id, version in tombstones:
+            purged_values[user_id] = max(purged_values.get(user_id, 0), version)
+        for user_id, purged_value in sorted(purged_values.items()):
+            advance_purged_sync_version(session=session, purged_value=purged_value, user_id=user_id)
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("トゥームストーンの削除に失敗しました。")
+            raise e
+
+        purged_count += len(tombstones)
+        logger.info(f"トゥームストーンを削除しました。累計 = {purged_count}")
+
+    return purged_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="古いトゥームストーンをバッチ単位で物理削除する")
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    deleted_before = get_now() - timedelta(days=args.retention_days)
+    with session_factory() as session:
+        purge_tombstones(session=session, deleted_before=deleted_before, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import argparse
+import os
+import time
+
+from pathlib import Path
+from typing import BinaryIO
+
+import sqlalchemy as sa
+
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Connection, Index, Table, func, select, type_coerce, union_all
+
+from kakeibo_be.core.database import create_database_engine, get_database_url
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.logic.snapshot.encode_columnar_snapshot import (
+    DATE,
+    DATETIME,
+    INT,
+    STR,
+    SnapshotColumn,
+    SnapshotHeader,
+    read_chunks,
+    read_header,
+    write_chunk,
+    write_end,
+    write_header,
+)
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState, CashFlowArchive
+from kakeibo_be.repositories.monthly_total import rebuild_monthly_totals
+from kakeibo_be.repositories.sync_sequence import advance_last_sync_versions
+
+# 1チャンクの行数。大きいほど圧縮が効き、DB との往復も減るが、その分メモリを使う
+DEFAULT_CHUNK_SIZE = 100_000
+# zlib の圧縮レベル。1 でも同じ値が続く列はよく縮むので、速さを優先する
+DEFAULT_COMPRESSION_LEVEL = 1
+
+_cash_flows: Table = CashFlow.__table__
+_cash_flows_archive: Table = CashFlowArchive.__table__
+_archive_states: Table = ArchiveState.__table__
+# スナップショットに入れるテーブル（この順に書き出し、読み込む）
+# 締めた期間の行は cash_flows_archive にあるので、その境界の archive_states と一緒に戻す
+# archive_states は1行だけなので先に入れ、読み込みの途中で境界のない状態にならないようにする
+SNAPSHOT_TABLES: tuple[Table, ...] = (_archive_states, _cash_flows_archive, _cash_flows)
+# 読み込み先が空であること（replace なら全行の削除）を求めるテーブル
+# archive_states にはマイグレーションで入れた行があるので、常にスナップショットの行で置き換える
+_LEDGER_TABLES: tuple[Table, ...] = (_cash_flows_archive, _cash_flows)
+
+
+def get_snapshot_columns(table: Table) -> tuple[SnapshotColumn, ...]:
+    # 列の型から、スナップショットでの値の種類を決める（Enum は DB に入っている名前の文字列で持つ）
+    columns = []
+    for column in table.columns:
+        if isinstance(column.type, sa.String):
+            kind = STR
+        elif isinstance(column.type, sa.DateTime):
+            kind = DATETIME
+        elif isinstance(column.type, sa.Date):
+            kind = DATE
+        elif isinstance(column.type, sa.Integer):
+            kind = INT
+        else:
+            raise ValueError(f"スナップショットに対応していない列です。{column.name}: {column.type}")
+        columns.append(SnapshotColumn(name=column.name, kind=kind))
+    return tuple(columns)
+
+
+def export_snapshot(
+    connection: Connection,
+    path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> dict[str, int]:
+    # SNAPSHOT_TABLES の全行（全利用者・論理削除した行も含む）を主キーの順に読み、テーブルごとに
+    # ヘッダー・チャンク・終わりの印を続けて書き出す。テーブルごとの行数を返す
+    # サーバー側のカーソルで chunk_size 行ずつ受け取るので、行数によらずメモリは1チャンク分で済む
+    # すべてのテーブルを同じトランザクション（リビジョンを読んだ時に始まる）で読むので、
+    # アーカイブへ移動中の行が二重に入ったり抜けたりしない
+    # 書き終わるまでは別の名前で書き、最後に置き換える（途中で止まっても壊れたファイルが残らない）
+    schema_revision = MigrationContext.configure(connection).get_current_revision()
+    created_at = get_now()
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    row_counts: dict[str, int] = {}
+    started_at = time.monotonic()
+    try:
+        with temporary_path.open("wb") as file:
+            for table in SNAPSHOT_TABLES:
+                header = SnapshotHeader(
+                    table=table.name,
+                    schema_revision=schema_revision,
+                    columns=get_snapshot_columns(table),
+                    created_at=created_at,
+                )
+                row_counts[table.name] = _write_table(
+                    connection, file, table, header, chunk_size, level
+                )
+        os.replace(temporary_path, path)
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        logger.exception(f"スナップショットの書き出しに失敗しました。path = {path}")
+        raise
+
+    logger.info(
+        f"スナップショットを書き出しました。path = {path}, 行数 = {row_counts}, "
+        f"revision = {schema_revision}, 経過 = {time.monotonic() - started_at:.1f}s"
+    )
+    return row_counts
+
+
+def _write_table(
+    connection: Connection,
+    file: BinaryIO,
+    table: Table,
+    header: SnapshotHeader,
+    chunk_size: int,
+    level: int,
+) -> int:
+    stmt = select(
+        *(
+            # Enum は Python の列挙型に変換せず、DB の値のまま受け取る
+            type_coerce(column, sa.String).label(column.name)
+            if isinstance(column.type, sa.Enum)
+            else column
+            for column in table.columns
+        )
+    ).order_by(*table.primary_key.columns)
+
+    write_header(file, header)
+    row_count = 0
+    result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+    for rows in result.partitions():
+        # 行の並びを列の並びに入れ替える
+        write_chunk(file, header.columns, list(zip(*rows, strict=True)), level)
+        row_count += len(rows)
+        logger.info(f"スナップショットを書き出しています。table = {table.name}, 累計 = {row_count}")
+    write_end(file, row_count)
+    return row_count
+
+
+def restore_snapshot(
+    connection: Connection, path: Path, replace: bool = False
+) -> dict[str, int]:
+    # スナップショットを SNAPSHOT_TABLES に読み込み、テーブルごとの行数を返す
+    # 同じリビジョンまでマイグレーションした DB にだけ読み込める
+    # ・二次インデックスは先に削除し、全行を入れた後にまとめて作り直す（1行ごとに更新するより速い）
+    # ・チャンクごとに、プリペアドステートメントの executemany で入れる
+    #   （mysqlclient は複数行の INSERT ... VALUES (...), (...) にまとめて送る）
+    # ・外部キーの確認はしない。参照先（categories・recurring_cash_flows）は別に戻す
+    # ・月別集計（monthly_totals）は、読み込んだ行から作り直す
+    # ・起動中のサーバーのメモリ上の日別の累積和には反映されないので、読み込んだ後に再起動する
+    with path.open("rb") as file:
+        header = read_header(file)
+        _check_header(connection, header, SNAPSHOT_TABLES[0])
+        for table in _LEDGER_TABLES:
+            if replace:
+                connection.execute(table.delete())
+            elif connection.execute(select(*table.primary_key.columns).limit(1)).first() is not None:
+                raise ValueError(f"{table.name} が空ではありません。置き換える場合は replace を指定します。")
+        connection.execute(_archive_states.delete())
+
+        dialect = connection.dialect
+        if dialect.name == "mysql":
+            connection.exec_driver_sql("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+        deferred_indexes = [
+            index for table in _LEDGER_TABLES for index in _get_deferrable_indexes(table)
+        ]
+        for index in deferred_indexes:
+            index.drop(connection)
+        connection.commit()
+
+        row_counts: dict[str, int] = {}
+        started_at = time.monotonic()
+        try:
+            for position, table in enumerate(SNAPSHOT_TABLES):
+                # 最初のテーブルのヘッダーは、行を削除する前に確かめてある
+                if position > 0:
+                    header = read_header(file)
+                    _check_header(connection, header, table)
+                row_counts[table.name] = _insert_table(connection, file, table, header)
+        except BaseException:
+            connection.rollback()
+            logger.exception(f"スナップショットの読み込みに失敗しました。path = {path}, 読み込み済み = {row_counts}")
+            raise
+        finally:
+            # 失敗しても、テーブルの定義は元に戻す
+            indexes_started_at = time.monotonic()
+            for index in deferred_indexes:
+                index.create(connection)
+            if dialect.name == "mysql":
+                connection.exec_driver_sql("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+            connection.commit()
+            logger.info(f"インデックスを作り直しました。経過 = {time.monotonic() - indexes_started_at:.1f}s")
+
+    # 読み込んだ行のバージョンより前から採番し直さないよう、利用者ごとに差分同期の採番を進める
+    versions = union_all(
+        *(select(table.c.user_id, table.c.sync_version) for table in _LEDGER_TABLES)
+    ).subquery()
+    advance_last_sync_versions(
+        connection,
+        dict(
+            connection.execute(
+                select(versions.c.user_id, func.max(versions.c.sync_version)).group_by(
+                    versions.c.user_id
+                )
+            ).all()
+        ),
+    )
+    totals_started_at = time.monotonic()
+    monthly_total_count = rebuild_monthly_totals(connection)
+    connection.commit()
+    logger.info(
+        f"月別集計を作り直しました。行数 = {monthly_total_count}, "
+        f"経過 = {time.monotonic() - totals_started_at:.1f}s"
+    )
+    logger.info(
+        f"スナップショットを読み込みました。path = {path}, 行数 = {row_counts}, "
+        f"経過 = {time.monotonic() - started_at:.1f}s"
+    )
+    return row_counts
+
+
+def _insert_table(
+    connection: Connection, file: BinaryIO, table: Table, header: SnapshotHeader
+) -> int:
+    insert_sql = _build_insert_sql(connection, table, header.columns)
+    row_count = 0
+    # 日付・日時は文字列で渡す。SQLite では SQLAlchemy が保存するのと同じ形で、MySQL もそのまま受け付ける
+    # Enum は DB に入っている名前の文字列のままなので、どちらも Python での変換はしない
+    for chunk in read_chunks(file, header.columns, dates_as_text=True):
+        connection.exec_driver_sql(insert_sql, list(zip(*chunk, strict=True)))
+        connection.commit()
+        row_count += len(chunk[0])
+        logger.info(f"スナップショットを読み込んでいます。table = {table.name}, 累計 = {row_count}")
+    return row_count
+
+
+def _check_header(connection: Connection, header: SnapshotHeader, table: Table) -> None:
+    revision = MigrationContext.configure(connection).get_current_revision()
+    if header.table != table.name or header.schema_revision != revision:
+        raise ValueError(
+            f"スナップショットと DB のスキーマが一致しません。table = {header.table} ({table.name} の位置), "
+            f"snapshot = {header.schema_revision}, database = {revision}"
+        )
+    if header.columns != get_snapshot_columns(table):
+        raise ValueError(f"スナップショットと DB の列が一致しません。table = {table.name}")
+
+
+def _get_deferrable_indexes(table: Table) -> list[Index]:
+    # 外部キーの列が先頭のインデックスは残す（MySQL は外部キーが使うインデックスを削除できない）
+    # 主キーと一意制約は、重複のない行だけが入るよう残す
+    return sorted(
+        (index for index in table.indexes if not next(iter(index.columns)).foreign_keys),
+        key=lambda index: index.name,
+    )
+
+
+def _build_insert_sql(
+    connection: Connection, table: Table, columns: tuple[SnapshotColumn, ...]
+) -> str:
+    preparer = connection.dialect.identifier_preparer
+    placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    return (
+        f"INSERT INTO {preparer.format_table(table)} "
+        f"({', '.join(preparer.quote(column.name) for column in columns)}) "
+        f"VALUES ({', '.join([placeholder] * len(columns))})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="cash_flows・cash_flows_archive の全行のスナップショットを書き出す・読み込む"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="スナップショットを書き出す")
+    export_parser.add_argument("path", type=Path)
+    export_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    export_parser.add_argument("--level", type=int, default=DEFAULT_COMPRESSION_LEVEL)
+    restore_parser = subparsers.add_parser("restore", help="スナップショットを読み込む")
+    restore_parser.add_argument("path", type=Path)
+    restore_parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="cash_flows・cash_flows_archive の既存の行を削除してから読み込む",
+    )
+    args = parser.parse_args()
+
+    # テーブルを作り直すマイグレーションと同じく、SQLite でも外部キーを確認しない接続を使う
+    engine = create_database_engine(get_database_url(), sqlite_foreign_keys=False)
+    try:
+        with engine.connect() as connection:
+            if args.command == "export":
+                export_snapshot(connection, args.path, chunk_size=args.chunk_size, level=args.level)
+            else:
+                restore_snapshot(connection, args.path, replace=args.replace)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
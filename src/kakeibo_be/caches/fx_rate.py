@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.currency import BASE_CURRENCY
+from kakeibo_be.repositories.fx_rate import get_effective_fx_rate
+
+# 覚えておく (通貨, 日付) の数の上限。超えたら最近使っていないものから捨てる
+FX_RATE_CACHE_MAX_ENTRIES = int(os.environ.get("FX_RATE_CACHE_MAX_ENTRIES", "10000"))
+# 別のプロセスで登録されたレートに入れ替わるまでの時間（秒）
+FX_RATE_CACHE_TTL_SECONDS = float(os.environ.get("FX_RATE_CACHE_TTL_SECONDS", "3600"))
+
+
+@dataclass
+class FxRateCacheMetrics:
+    entries: int
+    max_entries: int
+    hit_count: int
+    miss_count: int
+
+
+class FxRateCache:
+    # 書き込みのたびに月別集計の差分を換算するので、同じ通貨・日付のレートを毎回 DB に問い合わせない
+    # レートのない日は前の日のレートを使うので、その日に実際に使うレート（なければ None）を覚える
+    # ハンドラーはスレッドプールで動くのでロックで守る
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._rates: OrderedDict[tuple[str, date], tuple[Decimal | None, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hit_count = 0
+        self._miss_count = 0
+
+    def get_rate(self, session: Session, currency: str, on_date: date) -> Decimal | None:
+        if currency == BASE_CURRENCY:
+            return Decimal(1)
+
+        key = (currency, on_date)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._rates.get(key)
+            if cached is not None and cached[1] > now:
+                self._rates.move_to_end(key)
+                self._hit_count += 1
+                return cached[0]
+
+        rate = get_effective_fx_rate(session=session, currency=currency, on_date=on_date)
+        with self._lock:
+            self._miss_count += 1
+            self._rates[key] = (rate, now + self.ttl_seconds)
+            self._rates.move_to_end(key)
+            while len(self._rates) > self.max_entries:
+                self._rates.popitem(last=False)
+        return rate
+
+    def invalidate(self, currency: str) -> None:
+        # 新しいレートは、その日以降の「前の日のレート」も変えるので、通貨ごとまとめて捨てる
+        with self._lock:
+            for key in [key for key in self._rates if key[0] == currency]:
+                del self._rates[key]
+
+    def get_metrics(self) -> FxRateCacheMetrics:
+        with self._lock:
+            return FxRateCacheMetrics(
+                entries=len(self._rates),
+                max_entries=self.max_entries,
+                hit_count=self._hit_count,
+                miss_count=self._miss_count,
+            )
+
+
+fx_rate_cache = FxRateCache(
+    max_entries=FX_RATE_CACHE_MAX_ENTRIES, ttl_seconds=FX_RATE_CACHE_TTL_SECONDS
+)
+
+
+def get_fx_rate_cache() -> FxRateCache:
+    return fx_rate_cache
@@ -0,0 +1,4 @@
+import os
+
+# 集計・予算・レポートの金額をそろえる通貨（ISO 4217 の3文字のコード）
+BASE_CURRENCY = os.environ.get("BASE_CURRENCY", "JPY")
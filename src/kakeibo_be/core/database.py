@@ -1,7 +1,30 @@
 import os
 
+from sqlalchemy import Engine, create_engine, event, make_url
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.pool import ConnectionPoolEntry
+
+# コネクションプールの大きさ。アドミッション制御の同時実行数の初期値もここから決める
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+
+# 利用するデータベース。mysql（既定）か sqlite
+# sqlite は1人で使う場合や手元・エッジでの運用、テストとベンチマーク向け
+DATABASE_BACKENDS = ("mysql", "sqlite")
+
+
+def get_database_backend() -> str:
+    # テストでは .env を読み込んだ後に呼ばれるので、import 時ではなく呼ばれるたびに読む
+    backend = os.environ.get("DATABASE_BACKEND", "mysql")
+    if backend not in DATABASE_BACKENDS:
+        raise ValueError(f"DATABASE_BACKEND must be one of {DATABASE_BACKENDS}: {backend}")
+    return backend
+
 
 def get_database_url() -> str:
+    if get_database_backend() == "sqlite":
+        # ファイルに保存する（WAL は :memory: では使えない）
+        return f"sqlite:///{os.environ.get('SQLITE_PATH', 'kakeibo.db')}"
     return (
         f"{os.environ['MYSQL_CONNECTION']}://"
         f"{os.environ['MYSQL_USER']}:"
@@ -9,4 +32,48 @@ def get_database_url() -> str:
         f"{os.environ['MYSQL_HOST']}:"
         f"{os.environ['MYSQL_PORT']}/"
         f"{os.environ['MYSQL_DATABASE']}"
-    )
\ No newline at end of file
+    )
+
+
+def get_sqlite_pragmas() -> dict[str, str]:
+    # 接続するたびに設定する PRAGMA
+    return {
+        # 書き込み中でも読み込みを止めない
+        "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+        # WAL なら NORMAL でも壊れない（電源断で直近のコミットが失われることはある）
+        "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        # 負の値は KiB 単位。1接続あたり 64MiB のページキャッシュ
+        "cache_size": os.environ.get("SQLITE_CACHE_SIZE", "-65536"),
+        # 256MiB までファイルをメモリに写して読む
+        "mmap_size": os.environ.get("SQLITE_MMAP_SIZE", "268435456"),
+        "temp_store": "MEMORY",
+        # 他の接続が書き込み中なら、すぐにエラーにせず待つ
+        "busy_timeout": os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    }
+
+
+def create_database_engine(
+    database_url: str, *, sqlite_foreign_keys: bool = True, **kwargs: object
+) -> Engine:
+    if make_url(database_url).get_backend_name() != "sqlite":
+        return create_engine(database_url, **kwargs)
+
+    # API はスレッドプールで動くので、接続を作ったスレッド以外からも使えるようにする
+    engine = create_engine(database_url, connect_args={"check_same_thread": False}, **kwargs)
+    pragmas = get_sqlite_pragmas()
+    # SQLite は既定では外部キー制約を確認しないので有効にする
+    # （テーブルを作り直すマイグレーションでは、ON DELETE が動かないように無効のままにする）
+    pragmas["foreign_keys"] = "ON" if sqlite_foreign_keys else "OFF"
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(
+        dbapi_connection: DBAPIConnection, _connection_record: ConnectionPoolEntry
+    ) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
@@ -0,0 +1,124 @@
+import os
+import threading
+
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.loggers.custom_logger import logger
+
+# 同時に来た作成のリクエストを束ねて、1つのトランザクションでコミットするか
+# 既定ではリクエストごとにコミットする
+GROUP_COMMIT_ENABLED = os.environ.get("GROUP_COMMIT_ENABLED", "false") == "true"
+# 最初のリクエストが来てから、同じコミットに入れるリクエストを待つ時間（ミリ秒）
+GROUP_COMMIT_WINDOW_MS = float(os.environ.get("GROUP_COMMIT_WINDOW_MS", "2"))
+# 1回のコミットに入れる最大件数。集まった時点で待たずにコミットする
+GROUP_COMMIT_MAX_BATCH_SIZE = int(os.environ.get("GROUP_COMMIT_MAX_BATCH_SIZE", "128"))
+
+
+class _Entry:
+    # 1リクエスト分の書き込みと、その結果
+    def __init__(self, item: object) -> None:
+        self.item = item
+        self.result: object = None
+        self.error: BaseException | None = None
+        self.done = threading.Event()
+
+    def set_result(self, result: object) -> None:
+        self.result = result
+        self.done.set()
+
+    def set_error(self, error: BaseException) -> None:
+        self.error = error
+        self.done.set()
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.entries: list[_Entry] = []
+        self.full = threading.Event()
+
+
+class GroupCommitter:
+    # 短い間に来た書き込みを束ねて、まとめて書き込み・コミットする
+    # ・受け付けを開始したリクエスト（リーダー）が window_seconds だけ待ち、その間に来た分も
+    #   リーダーのセッションで書き込んで1回でコミットする。他のリクエストは結果を待つだけ
+    # ・前のまとまりのコミット中に来た分は、次のまとまりとしてコミットの終わりまで集め続ける
+    # ・まとめたコミットが失敗したら1件ずつやり直し、失敗した分だけをそのリクエストに返す
+    # write は (セッション, 書き込みのリスト) を受け取り、渡した順に結果のリストを返す（コミットはしない）
+    def __init__(
+        self,
+        write: Callable[[Session, list], list],
+        window_seconds: float,
+        max_batch_size: int,
+    ) -> None:
+        self._write = write
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        # 受け付け中のまとまり
+        self._open_batch: _Batch | None = None
+        self._lock = threading.Lock()
+        # コミットは1まとまりずつ
+        self._commit_lock = threading.Lock()
+
+    def submit(self, session: Session, item: object) -> object:
+        # item の書き込みがコミットされたら、その結果を返す。失敗したらその例外を送出する
+        entry = _Entry(item)
+        with self._lock:
+            batch = self._open_batch
+            is_leader = batch is None
+            if batch is None:
+                batch = self._open_batch = _Batch()
+            batch.entries.append(entry)
+            if len(batch.entries) >= self.max_batch_size:
+                # いっぱいになったら締め切り、次のリクエストからは新しいまとまりにする
+                self._open_batch = None
+                batch.full.set()
+
+        if is_leader:
+            self._lead(session, batch)
+        entry.done.wait()
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
+
+    def _lead(self, session: Session, batch: _Batch) -> None:
+        batch.full.wait(self.window_seconds)
+        with self._commit_lock:
+            with self._lock:
+                if self._open_batch is batch:
+                    self._open_batch = None
+            self._commit(session, batch.entries)
+
+    def _commit(self, session: Session, entries: list[_Entry]) -> None:
+        try:
+            try:
+                results = self._write(session, [entry.item for entry in entries])
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                if len(entries) == 1:
+                    entries[0].set_error(e)
+                    return
+                logger.exception(f"まとめたコミットに失敗しました。1件ずつやり直します。件数 = {len(entries)}")
+                for entry in entries:
+                    self._commit_one(session, entry)
+                return
+
+            for entry, result in zip(entries, results, strict=True):
+                entry.set_result(result)
+        finally:
+            # 途中で止まっても、待っているリクエストを置き去りにしない
+            for entry in entries:
+                if not entry.done.is_set():
+                    entry.set_error(RuntimeError("まとめたコミットが中断されました。"))
+
+    def _commit_one(self, session: Session, entry: _Entry) -> None:
+        try:
+            (result,) = self._write(session, [entry.item])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            entry.set_error(e)
+            return
+        entry.set_result(result)
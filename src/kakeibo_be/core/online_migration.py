@@ -0,0 +1,266 @@
+import os
+import time
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+
+from alembic import op
+from sqlalchemy import Connection, Table, func, insert, select, update
+from sqlalchemy.schema import CreateColumn
+
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.backfill_progress import BackfillProgress
+
+# 1回のバッチで処理する主キーの数
+DEFAULT_BACKFILL_BATCH_SIZE = int(os.environ.get("BACKFILL_BATCH_SIZE", "1000"))
+# オンラインの DDL がメタデータロックを待つ上限（秒）
+# 長いトランザクションの後ろで待ち続けると、後から来た読み書きまで止まるので、早めに諦めて再実行する
+DEFAULT_LOCK_WAIT_TIMEOUT_SECONDS = int(os.environ.get("DDL_LOCK_WAIT_TIMEOUT_SECONDS", "5"))
+
+_backfill_progress: Table = BackfillProgress.__table__
+
+
+@dataclass
+class BackfillReport:
+    name: str
+    # ここまでの主キーは処理済み
+    last_id: int
+    max_id: int
+    processed_count: int
+    # 今回の実行で処理したバッチの数
+    batch_count: int
+    elapsed_seconds: float
+    finished: bool
+
+    @property
+    def progress(self) -> float:
+        # 主キーの範囲に対する進み具合（0.0〜1.0）
+        return 1.0 if self.max_id == 0 else min(self.last_id / self.max_id, 1.0)
+
+
+def _log_progress(report: BackfillReport) -> None:
+    logger.info(
+        f"バックフィルを進めました。name = {report.name}, "
+        f"id = {report.last_id}/{report.max_id} ({report.progress:.1%}), "
+        f"累計 = {report.processed_count}, 経過 = {report.elapsed_seconds:.1f}s"
+    )
+
+
+def run_backfill(
+    connection: Connection,
+    name: str,
+    table: Table,
+    process_range: Callable[[Connection, int, int], int],
+    *,
+    batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE,
+    pause_seconds: float = 0.0,
+    duty_cycle: float = 1.0,
+    max_batches: int | None = None,
+    on_progress: Callable[[BackfillReport], None] = _log_progress,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BackfillReport:
+    # 大きなテーブルを、主キーの範囲ごとの短いトランザクションに分けて書き換える
+    # process_range(connection, after_id, to_id) は after_id < 主キー <= to_id の行を処理し、処理した件数を返す
+    # （範囲の条件で主キーのインデックスを使うので、何バッチ目でも同じ速さで読める）
+    # バッチの書き込みと backfill_progress の更新を同じトランザクションでコミットするので、
+    # 途中で止まっても（例外・プロセスの停止）、次に同じ name で呼べば続きのバッチから再開する
+    #
+    # 負荷の調整:
+    # ・pause_seconds: バッチの間に必ず空ける時間
+    # ・duty_cycle: 書き込みに使う時間の割合（0.5 ならバッチにかかった時間と同じだけ休む）
+    # ・max_batches: 今回の実行で処理するバッチの数の上限（夜間だけ少しずつ進める場合など）
+    #
+    # マイグレーションの中で使う場合は、op.get_context().autocommit_block() の中で
+    # op.get_bind() を渡す（Alembic のトランザクションの外でバッチごとにコミットするため）
+    # autocommit の接続ではバッチと進み具合が別々にコミットされるので、
+    # process_range は同じ範囲をもう一度処理しても結果が変わらないように書く
+    if not 0 < duty_cycle <= 1:
+        raise ValueError(f"duty_cycle must be in (0, 1]: {duty_cycle}")
+    primary_key = _get_integer_primary_key(table)
+    started_at = time.monotonic()
+
+    progress = _start_backfill(connection, name, table, primary_key)
+    last_id, max_id, processed_count = progress.last_id, progress.max_id, progress.processed_count
+    batch_count = 0
+    finished = progress.finished_at is not None
+
+    while not finished and (max_batches is None or batch_count < max_batches):
+        batch_started_at = time.monotonic()
+        # 次のバッチの上限の主キー。主キーに歯抜けがあっても、1バッチで batch_size 行ずつ進む
+        to_id = connection.execute(
+            select(primary_key)
+            .where(primary_key > last_id)
+            .order_by(primary_key)
+            .limit(1)
+            .offset(batch_size - 1)
+        ).scalar_one_or_none()
+        to_id = max_id if to_id is None else min(to_id, max_id)
+        finished = to_id >= max_id
+
+        try:
+            count = process_range(connection, last_id, to_id)
+            now = get_now()
+            connection.execute(
+                update(_backfill_progress)
+                .where(_backfill_progress.c.name == name)
+                .values(
+                    last_id=to_id,
+                    processed_count=_backfill_progress.c.processed_count + count,
+                    updated_at=now,
+                    finished_at=now if finished else None,
+                )
+            )
+            connection.commit()
+        except BaseException:
+            # KeyboardInterrupt などでも、途中まで書いたバッチは残さない
+            connection.rollback()
+            logger.exception(f"バックフィルに失敗しました。name = {name}, after_id = {last_id}")
+            raise
+
+        last_id = to_id
+        processed_count += count
+        batch_count += 1
+        batch_elapsed = time.monotonic() - batch_started_at
+        on_progress(
+            BackfillReport(
+                name=name,
+                last_id=last_id,
+                max_id=max_id,
+                processed_count=processed_count,
+                batch_count=batch_count,
+                elapsed_seconds=time.monotonic() - started_at,
+                finished=finished,
+            )
+        )
+
+        wait_seconds = pause_seconds + batch_elapsed * (1 - duty_cycle) / duty_cycle
+        if not finished and wait_seconds > 0:
+            sleep(wait_seconds)
+
+    return BackfillReport(
+        name=name,
+        last_id=last_id,
+        max_id=max_id,
+        processed_count=processed_count,
+        batch_count=batch_count,
+        elapsed_seconds=time.monotonic() - started_at,
+        finished=finished,
+    )
+
+
+def reset_backfill(connection: Connection, name: str) -> None:
+    # 進み具合を捨てて、次の run_backfill を最初から（その時点の主キーの最大値まで）やり直す
+    connection.execute(_backfill_progress.delete().where(_backfill_progress.c.name == name))
+    connection.commit()
+
+
+def _get_integer_primary_key(table: Table) -> sa.Column:
+    columns = list(table.primary_key.columns)
+    if len(columns) != 1 or not isinstance(columns[0].type, sa.Integer):
+        raise ValueError(f"{table.name} must have a single integer primary key")
+    return columns[0]
+
+
+def _start_backfill(
+    connection: Connection, name: str, table: Table, primary_key: sa.Column
+) -> sa.Row:
+    progress = connection.execute(
+        select(_backfill_progress).where(_backfill_progress.c.name == name)
+    ).one_or_none()
+    if progress is not None:
+        return progress
+
+    # 初回だけ、対象にする主キーの上限を記録する
+    max_id = connection.execute(select(func.max(primary_key))).scalar_one() or 0
+    now = get_now()
+    connection.execute(
+        insert(_backfill_progress).values(
+            name=name,
+            last_id=0,
+            max_id=max_id,
+            processed_count=0,
+            started_at=now,
+            updated_at=now,
+            finished_at=now if max_id == 0 else None,
+        )
+    )
+    connection.commit()
+    logger.info(f"バックフィルを開始します。name = {name}, table = {table.name}, max_id = {max_id}")
+    return connection.execute(
+        select(_backfill_progress).where(_backfill_progress.c.name == name)
+    ).one()
+
+
+# 以下はマイグレーションの upgrade / downgrade の中で使う
+# MySQL では行のコピーやテーブルのロックを伴わない ALGORITHM / LOCK を指定し、
+# 指定できない変更は DDL がエラーになる（黙ってテーブルをロックする方法に切り替わらない）
+# SQLite などは、通常の Alembic の操作と同じになる
+
+
+def create_index_online(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    *,
+    unique: bool = False,
+    lock_wait_timeout_seconds: int = DEFAULT_LOCK_WAIT_TIMEOUT_SECONDS,
+) -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        op.create_index(index_name, table_name, list(columns), unique=unique)
+        return
+    # 作成中も読み書きを止めない（InnoDB のオンライン DDL）
+    preparer = bind.dialect.identifier_preparer
+    quoted_columns = ", ".join(preparer.quote(column) for column in columns)
+    _set_lock_wait_timeout(lock_wait_timeout_seconds)
+    op.execute(
+        f"ALTER TABLE {preparer.quote(table_name)} "
+        f"ADD {'UNIQUE ' if unique else ''}INDEX {preparer.quote(index_name)} ({quoted_columns}), "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def drop_index_online(
+    index_name: str,
+    table_name: str,
+    *,
+    lock_wait_timeout_seconds: int = DEFAULT_LOCK_WAIT_TIMEOUT_SECONDS,
+) -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        op.drop_index(index_name, table_name=table_name)
+        return
+    preparer = bind.dialect.identifier_preparer
+    _set_lock_wait_timeout(lock_wait_timeout_seconds)
+    op.execute(
+        f"ALTER TABLE {preparer.quote(table_name)} DROP INDEX {preparer.quote(index_name)}, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def add_column_online(
+    table_name: str,
+    column: sa.Column,
+    *,
+    lock_wait_timeout_seconds: int = DEFAULT_LOCK_WAIT_TIMEOUT_SECONDS,
+) -> None:
+    # 列を追加するだけで、既存の行は書き換えない（値を入れるのは run_backfill で行う）
+    # MySQL 8.0 の INSTANT はテーブルのメタデータだけを変えるので、行数によらずすぐに終わる
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(column)
+        return
+    preparer = bind.dialect.identifier_preparer
+    column_ddl = CreateColumn(column).compile(dialect=bind.dialect)
+    _set_lock_wait_timeout(lock_wait_timeout_seconds)
+    op.execute(
+        f"ALTER TABLE {preparer.quote(table_name)} ADD COLUMN {column_ddl}, ALGORITHM=INSTANT"
+    )
+
+
+def _set_lock_wait_timeout(seconds: int) -> None:
+    op.execute(f"SET SESSION lock_wait_timeout = {int(seconds)}")
@@ -0,0 +1,41 @@
+import os
+
+from collections.abc import Generator
+from typing import Annotated
+
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.base import get_db
+from kakeibo_be.models.db.tenant import clear_session_user_id, set_session_user_id
+
+# X-User-Id は、認証を行う前段のプロキシが付け直す（クライアントが送った値は取り除く）ことを前提に
+# そのまま信用する。プロキシを通らずに API へ届く構成では、誰でも任意の利用者として読み書きできる
+# 利用者の指定がないリクエストを扱う利用者。既定は空で、ヘッダーのないリクエストは 401 にする
+# 1世帯だけで使う場合（プロキシを置かずに手元で動かす場合など）に限り、その利用者の id を設定する
+DEFAULT_USER_ID = os.environ.get("DEFAULT_USER_ID", "")
+
+
+def get_current_user_id(
+    x_user_id: Annotated[
+        int | None,
+        Header(gt=0, description="利用者の id。認証を行う前段のプロキシだけが付ける"),
+    ] = None,
+) -> int:
+    if x_user_id is not None:
+        return x_user_id
+    if DEFAULT_USER_ID:
+        return int(DEFAULT_USER_ID)
+    raise HTTPException(status_code=401, detail="X-User-Id header is required!")
+
+
+def get_tenant_db(
+    session: Annotated[Session, Depends(get_db)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
+) -> Generator[Session]:
+    # リクエストの間、このセッションで読み書きするデータをその利用者の分だけに絞る
+    set_session_user_id(session, user_id)
+    try:
+        yield session
+    finally:
+        clear_session_user_id(session)
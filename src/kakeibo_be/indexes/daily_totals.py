@@ -0,0 +1,275 @@
+import os
+import threading
+
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Self
+
+import numpy as np
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.repositories.cash_flow import (
+    get_daily_totals_in_range,
+    get_latest_sync_version,
+    get_sync_versions_since,
+)
+from kakeibo_be.repositories.monthly_total import MonthlyTotalDelta
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+# 日ごとの収入・支出の累積和をメモリに持ち、任意の期間の合計を DB を読まずに返す
+# 無効にすると、毎回 DB で集計する
+DAILY_TOTAL_INDEX_ENABLED = os.environ.get("DAILY_TOTAL_INDEX_ENABLED", "true") == "true"
+# 全利用者分の上限（バイト）。超えたら最近使っていない利用者から捨てる
+# 1人分は 40 年分でも 2列 × 8 バイト × 約 14,600 日 ≒ 234KB
+DAILY_TOTAL_INDEX_MAX_BYTES = int(os.environ.get("DAILY_TOTAL_INDEX_MAX_BYTES", 64 * 1024 * 1024))
+# 読み込んだ後に反映した変更がこの件数を超えたら、次に読むときに DB から作り直す
+# （鮮度の確認で読むバージョンの数を抑えるため）
+DAILY_TOTAL_INDEX_MAX_PENDING = int(os.environ.get("DAILY_TOTAL_INDEX_MAX_PENDING", "1000"))
+# 範囲の外の日付が来たときに、配列を伸ばす最小の日数（伸ばすたびの確保を減らす）
+_GROW_DAYS = 366
+# 全期間を読み込むときの範囲
+_MIN_DATE = date(1900, 1, 1)
+_MAX_DATE = date(9999, 12, 31)
+
+
+@dataclass
+class DailyTotalIndexMetrics:
+    enabled: bool
+    users: int
+    days: int
+    memory_bytes: int
+    max_bytes: int
+    build_count: int
+    hit_count: int
+
+
+class UserDailyTotals:
+    # 1人分の累積和。income[i] は start_date から i 日分（start_date + i の前日まで）の合計
+    # 0 日目に 0 を置くので、[start, end) の合計は income[end] - income[start] の引き算1回で求まる
+    def __init__(
+        self,
+        start_date: date,
+        income: np.ndarray,
+        expense: np.ndarray,
+        snapshot_version: int,
+    ) -> None:
+        self.start_date = start_date
+        self.income = income
+        self.expense = expense
+        # 読み込んだ時点のバージョン。これ以下の変更はすでに含まれている
+        self.snapshot_version = snapshot_version
+        # 読み込んだ後に反映した変更で、いまの行が持っているバージョン
+        # DB で snapshot_version より新しい行のバージョンがこれと一致すれば、取りこぼしはない
+        self.applied_versions: set[int] = set()
+
+    @classmethod
+    def from_daily_totals(
+        cls,
+        recorded_ats: Sequence[date],
+        types: Sequence[CashFlowType],
+        amounts: Sequence[int],
+        snapshot_version: int,
+    ) -> Self:
+        if not recorded_ats:
+            today = get_now().date()
+            return cls(today, np.zeros(1, np.int64), np.zeros(1, np.int64), snapshot_version)
+        start_date = min(recorded_ats)
+        days = (max(recorded_ats) - start_date).days + 1
+        offsets = np.array([(d - start_date).days for d in recorded_ats], dtype=np.int64) + 1
+        values = np.asarray(amounts, dtype=np.int64)
+        is_income = np.array([t == CashFlowType.INCOME for t in types], dtype=bool)
+
+        # 日ごとの合計を配列に入れてから累積和にする（同じ日の行は np.add.at で足し込む）
+        income = np.zeros(days + 1, np.int64)
+        expense = np.zeros(days + 1, np.int64)
+        np.add.at(income, offsets[is_income], values[is_income])
+        np.add.at(expense, offsets[~is_income], values[~is_income])
+        return cls(start_date, np.cumsum(income), np.cumsum(expense), snapshot_version)
+
+    @property
+    def days(self) -> int:
+        return len(self.income) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.income.nbytes + self.expense.nbytes
+
+    def get_range_total(self, start_date: date, end_date: date) -> tuple[int, int]:
+        # [start_date, end_date) の (収入, 支出)。範囲の外の日は 0 として扱う
+        start = min(max((start_date - self.start_date).days, 0), self.days)
+        end = min(max((end_date - self.start_date).days, 0), self.days)
+        if end <= start:
+            return 0, 0
+        return (
+            int(self.income[end] - self.income[start]),
+            int(self.expense[end] - self.expense[start]),
+        )
+
+    def get_range_totals(self, boundaries: Sequence[date]) -> list[tuple[int, int]]:
+        # 昇順の境界で区切った [boundaries[i], boundaries[i + 1]) ごとの (収入, 支出)
+        # 境界の位置を NumPy でまとめて引き、隣どうしの差を取る
+        offsets = (
+            np.array(boundaries, dtype="datetime64[D]") - np.datetime64(self.start_date, "D")
+        ).astype(np.int64)
+        # 範囲の外の日は 0、前の境界より前にある境界は空の期間として扱う
+        offsets = np.maximum.accumulate(np.clip(offsets, 0, self.days))
+        return list(
+            zip(
+                np.diff(self.income[offsets]).tolist(),
+                np.diff(self.expense[offsets]).tolist(),
+                strict=True,
+            )
+        )
+
+    def add(self, recorded_at: date, cash_flow_type: CashFlowType, amount: int) -> None:
+        self._ensure_range(recorded_at)
+        offset = (recorded_at - self.start_date).days + 1
+        prefix = self.income if cash_flow_type == CashFlowType.INCOME else self.expense
+        # その日以降の累積和をまとめてずらす（NumPy の1回の加算で済む）
+        prefix[offset:] += amount
+
+    def _ensure_range(self, recorded_at: date) -> None:
+        if recorded_at < self.start_date:
+            grow = max((self.start_date - recorded_at).days, _GROW_DAYS)
+            # 前に足す日は合計が 0 なので、累積和は 0 を並べるだけでよい
+            self.income = np.concatenate([np.zeros(grow, np.int64), self.income])
+            self.expense = np.concatenate([np.zeros(grow, np.int64), self.expense])
+            self.start_date -= timedelta(days=grow)
+        elif (recorded_at - self.start_date).days >= self.days:
+            grow = max((recorded_at - self.start_date).days - self.days + 1, _GROW_DAYS)
+            # 後ろに足す日も合計が 0 なので、最後の累積和を並べる
+            self.income = np.concatenate([self.income, np.full(grow, self.income[-1])])
+            self.expense = np.concatenate([self.expense, np.full(grow, self.expense[-1])])
+
+
+class DailyTotalIndex:
+    # 利用者ごとの UserDailyTotals を持つ。ハンドラーはスレッドプールで動くのでロックで守る
+    def __init__(self, enabled: bool, max_bytes: int, max_pending: int) -> None:
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self._users: OrderedDict[int, UserDailyTotals] = OrderedDict()
+        self._lock = threading.Lock()
+        # 全利用者分の配列の大きさ（毎回数え直さないよう、増減のたびに更新する）
+        self._memory_bytes = 0
+        self._build_count = 0
+        self._hit_count = 0
+
+    def get_range_total(
+        self, session: Session, user_id: int, start_date: date, end_date: date
+    ) -> tuple[int, int]:
+        return self.get_range_totals(session, user_id, [start_date, end_date])[0]
+
+    def get_range_totals(
+        self, session: Session, user_id: int, boundaries: Sequence[date]
+    ) -> list[tuple[int, int]]:
+        # 連続する期間ごとの合計。期間がいくつあっても、鮮度の確認は1回で済む
+        if self.enabled:
+            with self._lock:
+                totals = self._users.get(user_id)
+            if totals is not None:
+                # 別のプロセスでの書き込みや一括の処理を取りこぼしていないか、読み込んだ後に
+                # 変更された行のバージョンで確かめる（利用者・バージョンのインデックスの範囲を読むだけ）
+                changed_versions = get_sync_versions_since(session, totals.snapshot_version)
+                with self._lock:
+                    if self._users.get(user_id) is totals and (
+                        set(changed_versions) == totals.applied_versions
+                    ):
+                        self._users.move_to_end(user_id)
+                        self._hit_count += 1
+                        return totals.get_range_totals(boundaries)
+
+        # 集計クエリ1回で全期間を読み込む
+        # 同じトランザクションで読むので、集計とバージョンは同じ時点のもの
+        latest_version = get_latest_sync_version(session)
+        rows = get_daily_totals_in_range(session=session, start_date=_MIN_DATE, end_date=_MAX_DATE)
+        totals = UserDailyTotals.from_daily_totals(
+            recorded_ats=[row.recorded_at for row in rows],
+            types=[row.type for row in rows],
+            amounts=[row.amount for row in rows],
+            snapshot_version=latest_version,
+        )
+        if self.enabled:
+            with self._lock:
+                self._discard(user_id)
+                self._users[user_id] = totals
+                self._memory_bytes += totals.nbytes
+                self._build_count += 1
+                self._evict()
+        return totals.get_range_totals(boundaries)
+
+    def apply_deltas(
+        self,
+        user_id: int,
+        deltas: Iterable[MonthlyTotalDelta],
+        sync_versions: Iterable[int],
+        previous_versions: Iterable[int] = (),
+    ) -> None:
+        # 作成・更新・削除のコミット後に、ハンドラーから差分を反映する
+        # sync_versions は変更した行に採番したバージョン、previous_versions は更新・削除した行の変更前のもの
+        # 読み込んでいない利用者は、次に読むときに DB から作るので何もしない
+        sync_versions = list(sync_versions)
+        previous_versions = list(previous_versions)
+        with self._lock:
+            totals = self._users.get(user_id)
+            # 読み込んだ時点で含まれている変更は二重に足さない
+            # （1回のコミットのバージョンは、すべて含まれているか、すべて含まれていないかのどちらか）
+            if totals is None or not sync_versions or max(sync_versions) <= totals.snapshot_version:
+                return
+            # 変更前の行が、反映していない（別のプロセスでの）変更のものなら差分が合わないので捨てる
+            if (
+                any(
+                    version > totals.snapshot_version and version not in totals.applied_versions
+                    for version in previous_versions
+                )
+                or len(totals.applied_versions) >= self.max_pending
+            ):
+                self._discard(user_id)
+                return
+
+            nbytes = totals.nbytes
+            for delta in deltas:
+                totals.add(delta.recorded_at, delta.type, delta.amount)
+            # 範囲の外の日付で配列が伸びた分
+            self._memory_bytes += totals.nbytes - nbytes
+            totals.applied_versions.difference_update(previous_versions)
+            totals.applied_versions.update(sync_versions)
+            self._evict()
+
+    def get_metrics(self) -> DailyTotalIndexMetrics:
+        with self._lock:
+            return DailyTotalIndexMetrics(
+                enabled=self.enabled,
+                users=len(self._users),
+                days=sum(totals.days for totals in self._users.values()),
+                memory_bytes=self._memory_bytes,
+                max_bytes=self.max_bytes,
+                build_count=self._build_count,
+                hit_count=self._hit_count,
+            )
+
+    def _discard(self, user_id: int) -> None:
+        totals = self._users.pop(user_id, None)
+        if totals is not None:
+            self._memory_bytes -= totals.nbytes
+
+    def _evict(self) -> None:
+        # 最後に使った1人は残す
+        while len(self._users) > 1 and self._memory_bytes > self.max_bytes:
+            _, evicted = self._users.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+
+daily_total_index = DailyTotalIndex(
+    enabled=DAILY_TOTAL_INDEX_ENABLED,
+    max_bytes=DAILY_TOTAL_INDEX_MAX_BYTES,
+    max_pending=DAILY_TOTAL_INDEX_MAX_PENDING,
+)
+
+
+def get_daily_total_index() -> DailyTotalIndex:
+    return daily_total_index
@@ -0,0 +1,91 @@
+import threading
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from kakeibo_be.logic.calculate.calculate_period import PeriodDefinition, get_period_start_dates
+
+# 期間の一覧を前もって作っておく範囲。この範囲の外の日付は扱わない
+PERIOD_CALENDAR_START_DATE = date(1970, 1, 1)
+PERIOD_CALENDAR_END_DATE = date(2100, 1, 1)
+
+
+@dataclass(frozen=True)
+class Period:
+    # 区切り方ごとの通し番号（PERIOD_CALENDAR_START_DATE を含む期間が 0）
+    key: int
+    start_date: date
+    # この日を含まない
+    end_date: date
+
+
+class PeriodCalendar:
+    # 1つの区切り方の期間の開始日を、範囲全体について並べておいたもの
+    # 日付から期間を求めるのは二分探索1回で、リクエストごとに日付の計算をしない
+    # 期間の数は、毎月でも 130 年で約 1,560、毎週でも約 6,800（8 バイトずつ）
+    def __init__(self, definition: PeriodDefinition, start_date: date, end_date: date) -> None:
+        self.definition = definition
+        self.start_date = start_date
+        self.end_date = end_date
+        self._starts = get_period_start_dates(definition, start_date, end_date)
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def get_period(self, key: int) -> Period:
+        if not 0 <= key < len(self):
+            raise ValueError(f"period key is out of range: {key}")
+        return Period(
+            key=key,
+            start_date=self._starts[key].item(),
+            end_date=self._starts[key + 1].item(),
+        )
+
+    def get_key(self, target_date: date) -> int:
+        if not self.start_date <= target_date < self.end_date:
+            raise ValueError(f"date is out of range: {target_date}")
+        return int(np.searchsorted(self._starts, np.datetime64(target_date, "D"), side="right")) - 1
+
+    def resolve(self, target_date: date) -> Period:
+        # target_date を含む期間
+        return self.get_period(self.get_key(target_date))
+
+    def get_periods(self, start_date: date, end_date: date) -> list[Period]:
+        # [start_date, end_date) と重なる期間（古い順）
+        if start_date >= end_date:
+            return []
+        first = self.get_key(start_date)
+        last = self.get_key(end_date - timedelta(days=1))
+        return [self.get_period(key) for key in range(first, last + 1)]
+
+    def get_recent_periods(self, target_date: date, count: int) -> list[Period]:
+        # target_date を含む期間までの直近 count 期間（古い順）
+        last = self.get_key(target_date)
+        return [self.get_period(key) for key in range(max(last - count + 1, 0), last + 1)]
+
+
+class PeriodIndex:
+    # 区切り方ごとの PeriodCalendar を持つ
+    # 区切り方は高々 28 + 7 通りなので、一度作ったものは捨てない
+    def __init__(self, start_date: date, end_date: date) -> None:
+        self.start_date = start_date
+        self.end_date = end_date
+        self._calendars: dict[PeriodDefinition, PeriodCalendar] = {}
+        self._lock = threading.Lock()
+
+    def get_calendar(self, definition: PeriodDefinition) -> PeriodCalendar:
+        with self._lock:
+            calendar = self._calendars.get(definition)
+            if calendar is None:
+                calendar = PeriodCalendar(definition, self.start_date, self.end_date)
+                self._calendars[definition] = calendar
+            return calendar
+
+
+period_index = PeriodIndex(start_date=PERIOD_CALENDAR_START_DATE, end_date=PERIOD_CALENDAR_END_DATE)
+
+
+def get_period_index() -> PeriodIndex:
+    return period_index
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import os
+import uuid
+
+from collections.abc import Callable
+from datetime import date
+from pathlib import Path
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.base import session as default_session_factory
+from kakeibo_be.models.db.tenant import tenant_scope
+from kakeibo_be.repositories.cash_flow import get_cash_flows_in_range
+from kakeibo_be.repositories.monthly_total import get_monthly_totals_in_range
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.report_job_kind import ReportJobKind
+
+# ジョブの種類ごとの結果ファイルの拡張子と Content-Type
+RESULT_FORMATS: dict[ReportJobKind, tuple[str, str]] = {
+    ReportJobKind.CASH_FLOWS_CSV: (".csv", "text/csv"),
+    ReportJobKind.MONTHLY_SUMMARY: (".json", "application/json"),
+}
+
+
+def _iter_months(start_date: date, end_date: date) -> list[tuple[date, date]]:
+    # [start_date, end_date) を月の境界で区切る
+    months = []
+    month_start_date = start_date
+    while month_start_date < end_date:
+        next_month_start_date = min(
+            month_start_date.replace(day=1) + relativedelta(months=1), end_date
+        )
+        months.append((month_start_date, next_month_start_date))
+        month_start_date = next_month_start_date
+    return months
+
+
+def write_cash_flows_csv(
+    session: Session, start_date: date, end_date: date, output: io.TextIOBase
+) -> None:
+    writer = csv.writer(output)
+    writer.writerow(["id", "recorded_at", "type", "title", "amount", "currency"])
+    # 何年分でもメモリに載せきらないよう、1か月ずつ読み込んで書き出す
+    # 参照先（cash_flows / アーカイブ）の振り分けはリポジトリに任せる
+    for month_start_date, next_month_start_date in _iter_months(start_date, end_date):
+        cash_flows = get_cash_flows_in_range(
+            session=session, start_date=month_start_date, end_date=next_month_start_date
+        )
+        writer.writerows(
+            [
+                cash_flow.id,
+                cash_flow.recorded_at.isoformat(),
+                cash_flow.type.value,
+                cash_flow.title,
+                cash_flow.amount,
+                cash_flow.currency,
+            ]
+            for cash_flow in cash_flows
+        )
+        # 読み込んだ ORM オブジェクトを手放して、セッションが膨らみ続けないようにする
+        session.expunge_all()
+
+
+def write_monthly_summary(
+    session: Session, start_date: date, end_date: date, output: io.TextIOBase
+) -> None:
+    months: dict[date, dict[str, int]] = {
+        month_start_date.replace(day=1): {"income": 0, "expense": 0}
+        for month_start_date, _ in _iter_months(start_date, end_date)
+    }
+    monthly_totals = get_monthly_totals_in_range(
+        session=session,
+        start_month=start_date.replace(day=1),
+        end_month=end_date,
+    )
+    for monthly_total in monthly_totals:
+        key = "income" if monthly_total.type == CashFlowType.INCOME else "expense"
+        months[monthly_total.month][key] = monthly_total.amount
+
+    json.dump(
+        [
+            {
+                "month": month.isoformat(),
+                "income": totals["income"],
+                "expense": totals["expense"],
+                "balance": totals["income"] - totals["expense"],
+            }
+            for month, totals in months.items()
+        ],
+        output,
+        ensure_ascii=False,
+    )
+
+
+_WRITERS = {
+    ReportJobKind.CASH_FLOWS_CSV: write_cash_flows_csv,
+    ReportJobKind.MONTHLY_SUMMARY: write_monthly_summary,
+}
+
+
+def run_report_job(
+    kind: ReportJobKind,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    result_path: str,
+    session_factory: Callable[[], Session] = default_session_factory,
+) -> None:
+    # プロセスプールからも呼べるよう、引数はすべて pickle できる値にする
+    # セッションはワーカー側で作る（プロセスをまたいで接続は共有できない）
+    # 書きかけのファイルが結果として読まれないよう、一時ファイルに書いてから置き換える
+    tmp_path = f"{result_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with (
+            session_factory() as session,
+            # 依頼した利用者のデータだけを読む
+            tenant_scope(session, user_id),
+            open(tmp_path, "w", encoding="utf-8", newline="") as output,
+        ):
+            _WRITERS[kind](session, start_date, end_date, output)
+        os.replace(tmp_path, result_path)
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
@@ -0,0 +1,206 @@
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.jobs.reports import RESULT_FORMATS, run_report_job
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.store.enum.report_job_kind import ReportJobKind
+from kakeibo_be.store.enum.report_job_status import ReportJobStatus
+
+# thread: 同じプロセスのスレッドで実行する（DB待ちが中心のジョブ向け）
+# process: 別プロセスで実行する（CPUを使う集計でAPIのイベントループを止めたくない場合）
+JOB_EXECUTOR = os.environ.get("JOB_EXECUTOR", "thread")
+JOB_MAX_WORKERS = int(os.environ.get("JOB_MAX_WORKERS", "2"))
+# 結果ファイルの置き場所と保持期間
+JOB_RESULT_DIR = os.environ.get(
+    "JOB_RESULT_DIR", str(Path(tempfile.gettempdir()) / "kakeibo_be_jobs")
+)
+JOB_RESULT_TTL_SECONDS = int(os.environ.get("JOB_RESULT_TTL_SECONDS", "600"))
+
+
+@dataclass
+class ReportJob:
+    id: str
+    kind: ReportJobKind
+    user_id: int
+    start_date: date
+    end_date: date
+    # 同じ内容のジョブを見分けるためのキー。結果ファイル名にも使う
+    key: str
+    result_path: Path
+    created_at: datetime
+    finished_at: datetime | None = None
+    error: str | None = None
+    # キャッシュから返したジョブは Future を持たない
+    future: Future | None = field(default=None, repr=False)
+    # 結果の有効期限（time.time() の値）
+    expires_at: float | None = None
+
+    @property
+    def status(self) -> ReportJobStatus:
+        if self.future is None or self.future.done():
+            return ReportJobStatus.FAILED if self.error is not None else ReportJobStatus.SUCCEEDED
+        return ReportJobStatus.RUNNING if self.future.running() else ReportJobStatus.PENDING
+
+
+def make_job_key(kind: ReportJobKind, user_id: int, start_date: date, end_date: date) -> str:
+    return hashlib.sha256(f"{kind.value}:{user_id}:{start_date}:{end_date}".encode()).hexdigest()
+
+
+def create_executor(executor: str, max_workers: int) -> Executor:
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+    if executor == "process":
+        # 親プロセスの DB 接続を子プロセスに持ち込まないよう、fork ではなく spawn で起動する
+        return ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    raise ValueError(f"未対応の JOB_EXECUTOR です。JOB_EXECUTOR = {executor}")
+
+
+class ReportJobRunner:
+    def __init__(
+        self,
+        executor: Executor,
+        result_dir: str,
+        ttl_seconds: int,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> None:
+        self._executor = executor
+        self._result_dir = Path(result_dir)
+        self._result_dir.mkdir(parents=True, exist_ok=True)
+        self._ttl_seconds = ttl_seconds
+        # テストなどで、ワーカーが使うセッションを差し替えたい場合に指定する（スレッド実行のみ）
+        self._session_factory = session_factory
+        self._jobs: dict[str, ReportJob] = {}
+        # 同じ内容のジョブは1つだけ実行し、実行中・結果の有効期限内はそのジョブを返す
+        self._job_ids_by_key: dict[str, str] = {}
+        self._lock = threading.Lock()
+        # 再起動前の結果は、同じ内容のジョブが来ない限りメモリ上のジョブから辿れないので、起動時に片付ける
+        self._remove_expired_result_files()
+
+    def submit(
+        self, kind: ReportJobKind, user_id: int, start_date: date, end_date: date
+    ) -> ReportJob:
+        key = make_job_key(kind, user_id, start_date, end_date)
+        with self._lock:
+            self._evict_expired()
+
+            job_id = self._job_ids_by_key.get(key)
+            if job_id is not None and self._jobs[job_id].status != ReportJobStatus.FAILED:
+                return self._jobs[job_id]
+
+            extension, _ = RESULT_FORMATS[kind]
+            job = ReportJob(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                key=key,
+                result_path=self._result_dir / f"{key}{extension}",
+                created_at=get_now(),
+            )
+            self._jobs[job.id] = job
+            self._job_ids_by_key[key] = job.id
+
+            # 再起動前に作った結果がディスクに残っていれば、それを使う
+            cached_expires_at = self._get_cached_expires_at(job.result_path)
+            if cached_expires_at is not None:
+                job.finished_at = job.created_at
+                job.expires_at = cached_expires_at
+                return job
+
+            args = [kind, user_id, start_date, end_date, str(job.result_path)]
+            if self._session_factory is not None:
+                args.append(self._session_factory)
+            job.future = self._executor.submit(run_report_job, *args)
+
+        # すでに終わっていた場合はこの場で呼ばれるので、ロックの外で登録する
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        return job
+
+    def get(self, job_id: str, user_id: int) -> ReportJob | None:
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(job_id)
+        # 他の利用者のジョブは存在しないものとして扱う
+        return job if job is not None and job.user_id == user_id else None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _on_done(self, job: ReportJob, future: Future) -> None:
+        with self._lock:
+            job.finished_at = get_now()
+            job.expires_at = time.time() + self._ttl_seconds
+            if future.cancelled():
+                job.error = "ジョブがキャンセルされました。"
+            elif future.exception() is not None:
+                job.error = "ジョブの実行に失敗しました。"
+                logger.error(
+                    f"レポートジョブが失敗しました。id = {job.id}, error = {future.exception()!r}"
+                )
+
+    def _get_cached_expires_at(self, result_path: Path) -> float | None:
+        try:
+            expires_at = result_path.stat().st_mtime + self._ttl_seconds
+        except FileNotFoundError:
+            return None
+        return expires_at if expires_at > time.time() else None
+
+    def _remove_expired_result_files(self) -> None:
+        # 保持期間を過ぎた結果ファイルと、書き込み途中で止まった一時ファイルを削除する
+        expires_before = time.time() - self._ttl_seconds
+        removed = 0
+        for path in self._result_dir.iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime <= expires_before:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                # 他のワーカーが先に削除した
+                continue
+        if removed:
+            logger.info(f"保持期間を過ぎた結果ファイルを削除しました。件数 = {removed}")
+
+    def _evict_expired(self) -> None:
+        # 呼び出し側でロックを取っている前提
+        now = time.time()
+        for job in [
+            job
+            for job in self._jobs.values()
+            if job.expires_at is not None and job.expires_at <= now
+        ]:
+            del self._jobs[job.id]
+            if self._job_ids_by_key.get(job.key) == job.id:
+                del self._job_ids_by_key[job.key]
+                job.result_path.unlink(missing_ok=True)
+
+
+def create_report_job_runner() -> ReportJobRunner:
+    return ReportJobRunner(
+        executor=create_executor(JOB_EXECUTOR, JOB_MAX_WORKERS),
+        result_dir=JOB_RESULT_DIR,
+        ttl_seconds=JOB_RESULT_TTL_SECONDS,
+    )
+
+
+report_job_runner = create_report_job_runner()
+
+
+def get_report_job_runner() -> ReportJobRunner:
+    return report_job_runner
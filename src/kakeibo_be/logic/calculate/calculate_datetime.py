@@ -3,28 +3,25 @@ from zoneinfo import ZoneInfo
 
 from dateutil.relativedelta import relativedelta
 
+# 日付の区切りに使うタイムゾーン（呼び出しのたびに ZoneInfo を作らない）
+APP_TIMEZONE = ZoneInfo("Asia/Tokyo")
+
 
 def get_now() -> datetime:
-    return datetime.now(ZoneInfo("Asia/Tokyo"))
+    return datetime.now(APP_TIMEZONE)
+
+
+def to_app_timezone(value: datetime) -> datetime:
+    # タイムゾーン付きの日時は変換する（2025-11-30T20:00:00Z は日本時間の 12/1 05:00）
+    # タイムゾーンのない日時は、日本時間の日時とみなす
+    if value.tzinfo is None:
+        return value.replace(tzinfo=APP_TIMEZONE)
+    return value.astimezone(APP_TIMEZONE)
 
 
 def get_month_start_date(target_month: datetime) -> datetime:
-    return target_month.replace(
-        day=1,
-        hour=0,
-        minute=0,
-        second=0,
-        microsecond=0,
-        tzinfo=ZoneInfo("Asia/Tokyo"),
-    )
+    return to_app_timezone(target_month).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
 def get_next_month_start_date(target_month: datetime) -> datetime:
-    return target_month.replace(
-        day=1,
-        hour=0,
-        minute=0,
-        second=0,
-        microsecond=0,
-        tzinfo=ZoneInfo("Asia/Tokyo"),
-    ) + relativedelta(months=1)
+    return get_month_start_date(target_month) + relativedelta(months=1)
@@ -0,0 +1,6 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+
+def convert_to_base_amount(amount: int, rate: Decimal) -> int:
+    # 基準通貨の最小単位に四捨五入する（負の値は 0 から遠い方へ。SQL の ROUND と同じ）
+    return int((amount * rate).quantize(Decimal(1), rounding=ROUND_HALF_UP))
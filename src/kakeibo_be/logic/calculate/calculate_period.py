@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from kakeibo_be.store.enum.period_kind import PeriodKind
+
+# 毎月の区切りに指定できる最後の日（29日以降はない月があるため）
+MAX_MONTHLY_START_DAY = 28
+
+
+@dataclass(frozen=True)
+class PeriodDefinition:
+    # 収支をまとめる期間の区切り方
+    kind: PeriodKind
+    # MONTHLY なら区切りの日（1〜28）、WEEKLY なら区切りの曜日（0 = 月曜日〜6 = 日曜日）
+    start_day: int
+
+    def __post_init__(self) -> None:
+        if self.kind == PeriodKind.MONTHLY and not 1 <= self.start_day <= MAX_MONTHLY_START_DAY:
+            raise ValueError(f"start_day must be 1-{MAX_MONTHLY_START_DAY}: {self.start_day}")
+        if self.kind == PeriodKind.WEEKLY and not 0 <= self.start_day <= 6:
+            raise ValueError(f"start_day must be 0-6: {self.start_day}")
+
+
+# 設定していない利用者の区切り方（暦の月）
+CALENDAR_MONTH = PeriodDefinition(kind=PeriodKind.MONTHLY, start_day=1)
+
+
+def get_period_start_dates(
+    definition: PeriodDefinition, start_date: date, end_date: date
+) -> np.ndarray:
+    # start_date を含む期間から、end_date より後に始まる最初の期間までの開始日（datetime64[D] の昇順）
+    # 最後の要素は、その前の期間の終わり（を含まない日）として使う
+    if definition.kind == PeriodKind.MONTHLY:
+        offset = np.timedelta64(definition.start_day - 1, "D")
+        first_month = np.datetime64(start_date, "M")
+        if np.datetime64(start_date, "D") < first_month.astype("datetime64[D]") + offset:
+            first_month -= 1
+        months = np.arange(first_month, np.datetime64(end_date, "M") + 2)
+        starts = months.astype("datetime64[D]") + offset
+    else:
+        # 1970-01-01 は木曜日（weekday() == 3）
+        first = np.datetime64(start_date, "D")
+        first -= (first.astype(np.int64) + 3 - definition.start_day) % 7
+        starts = np.arange(first, np.datetime64(end_date, "D") + 8, 7)
+    # end_date より後に始まる最初の期間までで切る
+    return starts[: np.searchsorted(starts, np.datetime64(end_date, "D"), side="right") + 1]
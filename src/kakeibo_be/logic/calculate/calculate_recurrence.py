@@ -0,0 +1,39 @@
+import calendar
+
+from datetime import date, timedelta
+
+from kakeibo_be.store.enum.recurrence_frequency import RecurrenceFrequency
+
+
+def _clamp_day(year: int, month: int, day: int) -> date:
+    # 31日起点の毎月の予定などは、その月の末日に寄せる
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def get_occurrence_dates(
+    frequency: RecurrenceFrequency,
+    start_date: date,
+    end_date: date | None,
+    month_start_date: date,
+) -> list[date]:
+    # month_start_date の月の中で、繰り返しのルールに当てはまる日付を返す
+    year, month = month_start_date.year, month_start_date.month
+    month_end_date = _clamp_day(year, month, 31)
+
+    if frequency == RecurrenceFrequency.MONTHLY:
+        candidates = [_clamp_day(year, month, start_date.day)]
+    elif frequency == RecurrenceFrequency.YEARLY:
+        candidates = [_clamp_day(year, month, start_date.day)] if month == start_date.month else []
+    else:
+        # 開始日から7日おき。月初以降で最初の日付から月末まで並べる
+        weeks = max(0, -(-(month_start_date - start_date).days // 7))
+        first = start_date + timedelta(weeks=weeks)
+        candidates = [
+            first + timedelta(weeks=i) for i in range((month_end_date - first).days // 7 + 1)
+        ]
+
+    return [
+        candidate
+        for candidate in candidates
+        if start_date <= candidate <= month_end_date and (end_date is None or candidate <= end_date)
+    ]
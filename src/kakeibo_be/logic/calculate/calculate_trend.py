@@ -0,0 +1,123 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+# 1970-01-01 は木曜日（月曜日=0 としたときの 3）
+_EPOCH_WEEKDAY = 3
+
+
+@dataclass
+class DailySeries:
+    # start_date から1日ずつ並べた日付と、その日の収入・支出の合計
+    days: np.ndarray
+    income: np.ndarray
+    expense: np.ndarray
+
+
+@dataclass
+class MonthlyTrend:
+    months: np.ndarray
+    income: np.ndarray
+    expense: np.ndarray
+    # 前月比（前月の支出が0の月と最初の月は NaN）
+    expense_change_rate: np.ndarray
+    expense_moving_average: np.ndarray
+
+
+@dataclass
+class Projection:
+    month: date
+    elapsed_days: int
+    days_in_month: int
+    expense_to_date: int
+    projected_expense: int
+
+
+def build_daily_series(
+    start_date: date,
+    end_date: date,
+    recorded_ats: Sequence[date],
+    types: Sequence[CashFlowType],
+    amounts: Sequence[int],
+) -> DailySeries:
+    # 集計クエリの結果（日付・種別・金額）を、[start_date, end_date) の1日1要素の配列に並べ直す
+    # 記録のない日は0になる。同じ日付・種別の行が複数あっても加算する
+    days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D"))
+    income = np.zeros(len(days), dtype=np.int64)
+    expense = np.zeros(len(days), dtype=np.int64)
+
+    offsets = (np.array(recorded_ats, dtype="datetime64[D]") - days[0]).astype(np.int64)
+    amount_array = np.array(amounts, dtype=np.int64)
+    is_income = np.array(
+        [cash_flow_type == CashFlowType.INCOME for cash_flow_type in types], dtype=bool
+    )
+    np.add.at(income, offsets[is_income], amount_array[is_income])
+    np.add.at(expense, offsets[~is_income], amount_array[~is_income])
+
+    return DailySeries(days=days, income=income, expense=expense)
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    # 累積和の差で窓ごとの合計を出す。先頭の window 未満の区間は、あるだけの日数で平均する
+    cumsum = np.concatenate(([0], np.cumsum(values, dtype=np.float64)))
+    positions = np.arange(1, len(values) + 1)
+    lower = np.maximum(positions - window, 0)
+    return (cumsum[positions] - cumsum[lower]) / np.minimum(positions, window)
+
+
+def weekdays(days: np.ndarray) -> np.ndarray:
+    # 月曜日=0 〜 日曜日=6
+    return (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+
+
+def calculate_monthly_trend(series: DailySeries, moving_average_window: int) -> MonthlyTrend:
+    month_of_day = series.days.astype("datetime64[M]")
+    months = np.arange(month_of_day[0], month_of_day[-1] + 1)
+    month_index = (month_of_day - months[0]).astype(np.int64)
+    income = np.bincount(month_index, weights=series.income, minlength=len(months)).astype(np.int64)
+    expense = np.bincount(month_index, weights=series.expense, minlength=len(months)).astype(
+        np.int64
+    )
+
+    previous = np.concatenate(([0], expense[:-1])).astype(np.float64)
+    change_rate = np.full(len(months), np.nan)
+    np.divide(expense - previous, previous, out=change_rate, where=previous != 0)
+
+    return MonthlyTrend(
+        months=months,
+        income=income,
+        expense=expense,
+        expense_change_rate=change_rate,
+        expense_moving_average=moving_average(expense, moving_average_window),
+    )
+
+
+def calculate_weekday_profile(series: DailySeries) -> np.ndarray:
+    # 曜日ごとの1日あたりの平均支出（月曜日=0 の7要素）
+    weekday = weekdays(series.days)
+    totals = np.bincount(weekday, weights=series.expense, minlength=7)
+    counts = np.bincount(weekday, minlength=7)
+    return np.divide(totals, counts, out=np.zeros(7), where=counts != 0)
+
+
+def project_month_end(series: DailySeries, today: date, weekday_profile: np.ndarray) -> Projection:
+    # 今日までの支出に、残りの日数分の曜日別の平均支出を足して月末の支出を見込む
+    today_day = np.datetime64(today, "D")
+    month = today_day.astype("datetime64[M]")
+    month_days = np.arange(month.astype("datetime64[D]"), (month + 1).astype("datetime64[D]"))
+    in_month_to_date = (series.days >= month_days[0]) & (series.days <= today_day)
+    expense_to_date = int(series.expense[in_month_to_date].sum())
+    remaining_days = month_days[month_days > today_day]
+    projected_expense = expense_to_date + float(weekday_profile[weekdays(remaining_days)].sum())
+
+    return Projection(
+        month=month.astype(date),
+        elapsed_days=len(month_days) - len(remaining_days),
+        days_in_month=len(month_days),
+        expense_to_date=expense_to_date,
+        projected_expense=round(projected_expense),
+    )
@@ -0,0 +1,24 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CategoryRuleItem:
+    category_id: int
+    keyword: str
+    priority: int
+
+
+def sort_category_rules(rules: Sequence[CategoryRuleItem]) -> list[CategoryRuleItem]:
+    # priority の大きい順。同じなら渡された順（作成順）のまま
+    return sorted(rules, key=lambda rule: -rule.priority)
+
+
+def match_category_rule(title: str, sorted_rules: Sequence[CategoryRuleItem]) -> int | None:
+    # sort_category_rules で並べたルールのうち、タイトルにキーワードを含む最初のもののカテゴリ
+    # 大文字・小文字は区別しない（英字の店名などの表記ゆれを吸収する）
+    folded_title = title.casefold()
+    for rule in sorted_rules:
+        if rule.keyword.casefold() in folded_title:
+            return rule.category_id
+    return None
@@ -0,0 +1,26 @@
+import hashlib
+import unicodedata
+
+from datetime import date
+
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+# content_hash の列の長さ（16バイトの16進数）
+CONTENT_HASH_LENGTH = 32
+
+
+def normalize_title(title: str) -> str:
+    # 明細の取り込み元による表記ゆれを吸収する
+    # 全角・半角（NFKC）、大文字・小文字、空白の有無と数の違いは同じタイトルとみなす
+    return "".join(unicodedata.normalize("NFKC", title).casefold().split())
+
+
+def calculate_content_hash(
+    recorded_at: date, amount: int, cash_flow_type: CashFlowType, currency: str, title: str
+) -> str:
+    # 同じ内容の収支（重複の候補）が同じ値になる指紋
+    # 通貨が違えば同じ金額でも別の収支なので、通貨も含める
+    key = "\x1f".join(
+        [f"{recorded_at:%Y-%m-%d}", str(amount), cash_flow_type.value, currency, normalize_title(title)]
+    )
+    return hashlib.blake2b(key.encode(), digest_size=CONTENT_HASH_LENGTH // 2).hexdigest()
@@ -0,0 +1,223 @@
+import json
+import struct
+import zlib
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import BinaryIO
+
+import numpy as np
+
+# スナップショットのファイルの形式
+# MAGIC | ヘッダーの長さ (uint32) | ヘッダー (JSON)
+# | チャンク: 行数 (uint32) | 圧縮後の長さ (uint32) | 圧縮した列のデータ ... を繰り返す
+# | 終わりの印: 行数 0 (uint32) | 全体の行数 (uint64)
+# 複数のテーブルを入れる場合は、テーブルごとにこの並び（MAGIC から終わりの印まで）を続ける
+# 列のデータは列ごとに「NULL の印 (行数バイト)」と「値」を続けたもの
+# 途中で切れたファイルは、終わりの印か全体の行数が合わないので読み込み時に気付ける
+SNAPSHOT_MAGIC = b"KKBSNAP\x01"
+SNAPSHOT_FORMAT_VERSION = 1
+# 列の値の種類
+INT = "int"
+DATE = "date"
+DATETIME = "datetime"
+STR = "str"
+COLUMN_KINDS = (INT, DATE, DATETIME, STR)
+
+_UINT32 = struct.Struct("<I")
+_UINT64 = struct.Struct("<Q")
+# 文字列の列の並べ方。区切り文字で連結したもの（速い）か、長さを並べたもの（区切り文字を含む値がある場合）
+_STR_JOINED = 0
+_STR_OFFSETS = 1
+_STR_SEPARATOR = "\x00"
+_EPOCH_DATE = date(1970, 1, 1)
+_EPOCH_DATETIME = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class SnapshotColumn:
+    name: str
+    kind: str
+
+
+@dataclass(frozen=True)
+class SnapshotHeader:
+    table: str
+    # スナップショットを取ったときの Alembic のリビジョン（マイグレーションしていなければ None）
+    schema_revision: str | None
+    columns: tuple[SnapshotColumn, ...]
+    created_at: datetime
+    compression: str = "zlib"
+    format_version: int = SNAPSHOT_FORMAT_VERSION
+
+
+def write_header(file: BinaryIO, header: SnapshotHeader) -> None:
+    payload = json.dumps(
+        {
+            "format_version": header.format_version,
+            "table": header.table,
+            "schema_revision": header.schema_revision,
+            "compression": header.compression,
+            "created_at": header.created_at.isoformat(),
+            "columns": [{"name": column.name, "kind": column.kind} for column in header.columns],
+        }
+    ).encode()
+    file.write(SNAPSHOT_MAGIC + _UINT32.pack(len(payload)) + payload)
+
+
+def read_header(file: BinaryIO) -> SnapshotHeader:
+    if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+        raise ValueError("スナップショットのファイルではありません。")
+    (length,) = _UINT32.unpack(_read_exact(file, _UINT32.size))
+    payload = json.loads(_read_exact(file, length))
+    if payload["format_version"] != SNAPSHOT_FORMAT_VERSION or payload["compression"] != "zlib":
+        raise ValueError(
+            f"対応していない形式です。format_version = {payload['format_version']}, "
+            f"compression = {payload['compression']}"
+        )
+    return SnapshotHeader(
+        table=payload["table"],
+        schema_revision=payload["schema_revision"],
+        columns=tuple(SnapshotColumn(**column) for column in payload["columns"]),
+        created_at=datetime.fromisoformat(payload["created_at"]),
+    )
+
+
+def write_chunk(
+    file: BinaryIO,
+    columns: Sequence[SnapshotColumn],
+    values: Sequence[Sequence[object]],
+    level: int = 1,
+) -> None:
+    # values は列ごとの値の並び（行ではなく列の順に渡す）
+    row_count = len(values[0]) if values else 0
+    if row_count == 0:
+        return
+    payload = zlib.compress(
+        b"".join(
+            _encode_column(column, column_values)
+            for column, column_values in zip(columns, values, strict=True)
+        ),
+        level,
+    )
+    file.write(_UINT32.pack(row_count) + _UINT32.pack(len(payload)) + payload)
+
+
+def write_end(file: BinaryIO, total_row_count: int) -> None:
+    file.write(_UINT32.pack(0) + _UINT64.pack(total_row_count))
+
+
+def read_chunks(
+    file: BinaryIO, columns: Sequence[SnapshotColumn], dates_as_text: bool = False
+) -> Iterator[list[list]]:
+    # チャンクごとに、列ごとの値のリストを返す（NULL は None）
+    # dates_as_text なら日付・日時を date / datetime ではなく
+    # "YYYY-MM-DD" / "YYYY-MM-DD HH:MM:SS.ffffff" の文字列で返す（DB にそのまま渡せる形。まとめて変換するので速い）
+    total_row_count = 0
+    while True:
+        (row_count,) = _UINT32.unpack(_read_exact(file, _UINT32.size))
+        if row_count == 0:
+            (expected,) = _UINT64.unpack(_read_exact(file, _UINT64.size))
+            if expected != total_row_count:
+                raise ValueError(f"行数が一致しません。expected = {expected}, actual = {total_row_count}")
+            return
+        (length,) = _UINT32.unpack(_read_exact(file, _UINT32.size))
+        data = memoryview(zlib.decompress(_read_exact(file, length)))
+        offset = 0
+        chunk = []
+        for column in columns:
+            column_values, offset = _decode_column(column, data, offset, row_count, dates_as_text)
+            chunk.append(column_values)
+        total_row_count += row_count
+        yield chunk
+
+
+def _read_exact(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("スナップショットのファイルが途中で切れています。")
+    return data
+
+
+def _encode_column(column: SnapshotColumn, values: Sequence[object]) -> bytes:
+    nulls = np.fromiter((value is None for value in values), dtype=np.bool_, count=len(values))
+    has_null = bool(nulls.any())
+    if column.kind == INT:
+        data = np.array([0 if value is None else value for value in values], dtype=np.int64).tobytes()
+    elif column.kind == DATE:
+        data = (
+            np.array(
+                [_EPOCH_DATE if value is None else value for value in values],
+                dtype="datetime64[D]",
+            )
+            .astype(np.int32)
+            .tobytes()
+        )
+    elif column.kind == DATETIME:
+        data = (
+            np.array(
+                [_EPOCH_DATETIME if value is None else value for value in values],
+                dtype="datetime64[us]",
+            )
+            .astype(np.int64)
+            .tobytes()
+        )
+    elif column.kind == STR:
+        texts = ["" if value is None else value for value in values] if has_null else values
+        joined = _STR_SEPARATOR.join(texts)
+        if joined.count(_STR_SEPARATOR) == len(texts) - 1:
+            blob = joined.encode()
+            data = bytes([_STR_JOINED]) + _UINT64.pack(len(blob)) + blob
+        else:
+            encoded = [text.encode() for text in texts]
+            lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+            blob = b"".join(encoded)
+            data = bytes([_STR_OFFSETS]) + lengths.tobytes() + _UINT64.pack(len(blob)) + blob
+    else:
+        raise ValueError(f"対応していない列の種類です。{column.name}: {column.kind}")
+    return nulls.tobytes() + data
+
+
+def _decode_column(
+    column: SnapshotColumn, data: memoryview, offset: int, row_count: int, dates_as_text: bool
+) -> tuple[list, int]:
+    nulls = np.frombuffer(data, dtype=np.bool_, count=row_count, offset=offset)
+    offset += row_count
+    if column.kind in (INT, DATE, DATETIME):
+        dtype = np.int32 if column.kind == DATE else np.int64
+        array = np.frombuffer(data, dtype=dtype, count=row_count, offset=offset)
+        offset += array.nbytes
+        if column.kind == DATE:
+            array = array.astype("datetime64[D]")
+        elif column.kind == DATETIME:
+            array = array.astype("datetime64[us]")
+        if dates_as_text and column.kind == DATE:
+            values = np.datetime_as_string(array).tolist()
+        elif dates_as_text and column.kind == DATETIME:
+            values = [text.replace("T", " ") for text in np.datetime_as_string(array).tolist()]
+        else:
+            # tolist() で int / date / datetime の Python の値になる
+            values = array.tolist()
+    else:
+        encoding = data[offset]
+        offset += 1
+        if encoding == _STR_JOINED:
+            (length,) = _UINT64.unpack_from(data, offset)
+            offset += _UINT64.size
+            values = bytes(data[offset : offset + length]).decode().split(_STR_SEPARATOR)
+            offset += length
+        else:
+            lengths = np.frombuffer(data, dtype=np.int64, count=row_count, offset=offset)
+            offset += lengths.nbytes
+            (length,) = _UINT64.unpack_from(data, offset)
+            offset += _UINT64.size
+            blob = bytes(data[offset : offset + length])
+            offset += length
+            ends = np.cumsum(lengths).tolist()
+            values = [blob[end - size : end].decode() for end, size in zip(ends, lengths.tolist(), strict=True)]
+
+    if nulls.any():
+        for index in np.flatnonzero(nulls).tolist():
+            values[index] = None
+    return values, offset
@@ -0,0 +1,264 @@
+from collections.abc import Collection, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+
+from kakeibo_be.core.currency import BASE_CURRENCY
+from kakeibo_be.logic.calculate.calculate_fx import convert_to_base_amount
+from kakeibo_be.logic.deduplicate.calculate_content_hash import calculate_content_hash
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import CashFlowArchive
+from kakeibo_be.models.request.v1.cash_flow import CashFlowOperation
+from kakeibo_be.repositories.monthly_total import MonthlyTotalDelta
+from kakeibo_be.store.enum.cash_flow_operation_type import CashFlowOperationType
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.duplicate_policy import DuplicatePolicy
+
+NOT_FOUND = "CashFlow not found!"
+CLOSED_PERIOD = "CashFlow in closed period!"
+DUPLICATE_TEMP_ID = "Duplicate tempId!"
+FX_RATE_NOT_FOUND = "FX rate not found!"
+DUPLICATE_CASH_FLOW = "Duplicate CashFlow!"
+CATEGORY_NOT_FOUND = "Category not found!"
+
+
+@dataclass
+class PlannedCashFlow:
+    # 既存の行なら id、このリクエストで作成する行なら None（作成後に採番された id が入る）
+    id: int | None
+    temp_id: str | None
+    # すべての操作を反映した後の値
+    title: str
+    type: CashFlowType
+    recorded_at: date
+    amount: int
+    currency: str
+    # amount を基準通貨に換算した値（月別集計に加算するため）
+    base_amount: int
+    # 既存の行の変更前の値（月別集計から取り消すため。金額は行に保存した基準通貨での換算額）
+    original: MonthlyTotalDelta | None = None
+    # 既存の行の変更前のバージョン
+    previous_sync_version: int | None = None
+    category_id: int | None = None
+    changed: bool = False
+    deleted: bool = False
+    sync_version: int = 0
+
+    @property
+    def is_new(self) -> bool:
+        return self.original is None
+
+    @property
+    def content_hash(self) -> str | None:
+        # 削除する行は指紋を消す（トゥームストーンを重複として数えない）
+        if self.deleted:
+            return None
+        return calculate_content_hash(
+            self.recorded_at, self.amount, self.type, self.currency, self.title
+        )
+
+
+@dataclass
+class OperationOutcome:
+    index: int
+    operation: CashFlowOperation
+    target: PlannedCashFlow | None
+    error: str | None
+    # 同じ内容の行が既にある（同じリクエストで先に作成した行を含む）
+    duplicate: bool = False
+
+
+@dataclass
+class CashFlowOperationPlan:
+    # 操作の対象になった行（最初に操作された順）
+    cash_flows: list[PlannedCashFlow] = field(default_factory=list)
+    outcomes: list[OperationOutcome] = field(default_factory=list)
+
+    @property
+    def inserts(self) -> list[PlannedCashFlow]:
+        # 作成して、同じリクエストで削除しなかった行
+        return [c for c in self.cash_flows if c.is_new and not c.deleted]
+
+    @property
+    def updates(self) -> list[PlannedCashFlow]:
+        return [c for c in self.cash_flows if not c.is_new and c.changed and not c.deleted]
+
+    @property
+    def deletes(self) -> list[PlannedCashFlow]:
+        return [c for c in self.cash_flows if not c.is_new and c.deleted]
+
+    def get_monthly_total_deltas(self) -> list[MonthlyTotalDelta]:
+        # 既存の行は変更前の値を取り消し、残る行は最終的な値を加算する
+        deltas = []
+        for cash_flow in self.cash_flows:
+            if cash_flow.original is not None and (cash_flow.changed or cash_flow.deleted):
+                original = cash_flow.original
+                deltas.append(original._replace(amount=-original.amount, count=-1))
+            if not cash_flow.deleted and (cash_flow.is_new or cash_flow.changed):
+                deltas.append(
+                    MonthlyTotalDelta(
+                        cash_flow.recorded_at,
+                        cash_flow.type,
+                        cash_flow.title,
+                        cash_flow.base_amount,
+                        1,
+                    )
+                )
+        return deltas
+
+
+def plan_cash_flow_operations(
+    operations: Sequence[CashFlowOperation],
+    existing: Mapping[int, CashFlow | CashFlowArchive],
+    closed_before: date,
+    fx_rates: Mapping[tuple[str, date], Decimal],
+    duplicate_policy: DuplicatePolicy = DuplicatePolicy.ALLOW,
+    known_content_hashes: Collection[str] = (),
+    known_category_ids: Collection[int] = (),
+) -> CashFlowOperationPlan:
+    # 順番に並んだ操作を、行ごとの最終的な状態にまとめる（DB には触らない）
+    # fx_rates は (通貨, 日付) → その日に使うレート。見つからない組み合わせの操作はエラーにする
+    # 既存の行の変更前の値は、行に保存した換算額（base_amount）で取り消すのでレートを使わない
+    # known_content_hashes は、作成する行の指紋のうち既に登録されているもの
+    # duplicate_policy が ALLOW 以外なら、それらや同じリクエストで先に作成した行と同じ内容の作成を
+    # 作成しない（SKIP）か、作成して duplicate を立てる（FLAG）
+    # known_category_ids は、操作で指定されたカテゴリのうち利用者のものとして存在するもの
+    # 同じ行への複数回の更新は最後の値の1回の UPDATE に、作成してから削除した行は何もしないことになる
+    # 反映できない操作はエラーとして記録し、残りの操作はそのまま続ける
+    plan = CashFlowOperationPlan()
+    by_id: dict[int, PlannedCashFlow] = {}
+    by_temp_id: dict[str, PlannedCashFlow] = {}
+    created_by_content_hash: dict[str, PlannedCashFlow] = {}
+
+    for index, operation in enumerate(operations):
+        target: PlannedCashFlow | None = None
+        error: str | None = None
+        duplicate = False
+
+        if operation.op == CashFlowOperationType.CREATE:
+            if operation.temp_id in by_temp_id:
+                error = DUPLICATE_TEMP_ID
+            elif operation.recorded_at < closed_before:
+                error = CLOSED_PERIOD
+            elif not _category_exists(operation, known_category_ids):
+                error = CATEGORY_NOT_FOUND
+            elif (
+                base_amount := _to_base_amount(
+                    fx_rates,
+                    operation.currency or BASE_CURRENCY,
+                    operation.recorded_at,
+                    operation.amount,
+                )
+            ) is None:
+                error = FX_RATE_NOT_FOUND
+            else:
+                target = PlannedCashFlow(
+                    id=None,
+                    temp_id=operation.temp_id,
+                    title=operation.title,
+                    type=operation.type,
+                    recorded_at=operation.recorded_at,
+                    amount=operation.amount,
+                    currency=operation.currency or BASE_CURRENCY,
+                    base_amount=base_amount,
+                    category_id=operation.category_id,
+                )
+                if duplicate_policy != DuplicatePolicy.ALLOW:
+                    created = created_by_content_hash.get(target.content_hash)
+                    duplicate = target.content_hash in known_content_hashes or (
+                        created is not None and not created.deleted
+                    )
+                    if not duplicate:
+                        created_by_content_hash[target.content_hash] = target
+                if duplicate and duplicate_policy == DuplicatePolicy.SKIP:
+                    target, error = None, DUPLICATE_CASH_FLOW
+                else:
+                    by_temp_id[operation.temp_id] = target
+                    plan.cash_flows.append(target)
+        else:
+            target, error = _resolve_target(
+                operation, existing, closed_before, plan, by_id, by_temp_id
+            )
+            if target is not None and operation.op == CashFlowOperationType.UPDATE:
+                currency = operation.currency or target.currency
+                base_amount = _to_base_amount(
+                    fx_rates, currency, operation.recorded_at, operation.amount
+                )
+                if operation.recorded_at < closed_before:
+                    target, error = None, CLOSED_PERIOD
+                elif base_amount is None:
+                    target, error = None, FX_RATE_NOT_FOUND
+                elif not _category_exists(operation, known_category_ids):
+                    target, error = None, CATEGORY_NOT_FOUND
+                else:
+                    target.title = operation.title
+                    target.type = operation.type
+                    target.recorded_at = operation.recorded_at
+                    target.amount = operation.amount
+                    target.currency = currency
+                    target.base_amount = base_amount
+                    # 省略した場合は変更しない（古いクライアントが分類を消さないように）
+                    if "category_id" in operation.model_fields_set:
+                        target.category_id = operation.category_id
+                    target.changed = True
+            elif target is not None:
+                target.deleted = True
+
+        plan.outcomes.append(OperationOutcome(index, operation, target, error, duplicate))
+    return plan
+
+
+def _resolve_target(
+    operation: CashFlowOperation,
+    existing: Mapping[int, CashFlow | CashFlowArchive],
+    closed_before: date,
+    plan: CashFlowOperationPlan,
+    by_id: dict[int, PlannedCashFlow],
+    by_temp_id: dict[str, PlannedCashFlow],
+) -> tuple[PlannedCashFlow | None, str | None]:
+    if operation.temp_id is not None:
+        target = by_temp_id.get(operation.temp_id)
+    else:
+        target = by_id.get(operation.id)
+        if target is None:
+            row = existing.get(operation.id)
+            if row is None:
+                return None, NOT_FOUND
+            # アーカイブ済みの行や締めた期間の行は変更できない
+            if isinstance(row, CashFlowArchive) or row.recorded_at < closed_before:
+                return None, CLOSED_PERIOD
+            target = PlannedCashFlow(
+                id=row.id,
+                temp_id=None,
+                title=row.title,
+                type=row.type,
+                recorded_at=row.recorded_at,
+                amount=row.amount,
+                currency=row.currency,
+                base_amount=row.base_amount,
+                original=MonthlyTotalDelta(
+                    row.recorded_at, row.type, row.title, row.base_amount, 1
+                ),
+                previous_sync_version=row.sync_version,
+                category_id=row.category_id,
+            )
+            by_id[row.id] = target
+            plan.cash_flows.append(target)
+
+    # 同じリクエストで削除済みの行は、もう存在しない
+    if target is None or target.deleted:
+        return None, NOT_FOUND
+    return target, None
+
+
+def _category_exists(operation: CashFlowOperation, known_category_ids: Collection[int]) -> bool:
+    return operation.category_id is None or operation.category_id in known_category_ids
+
+
+def _to_base_amount(
+    fx_rates: Mapping[tuple[str, date], Decimal], currency: str, recorded_at: date, amount: int
+) -> int | None:
+    if currency == BASE_CURRENCY:
+        return amount
+    rate = fx_rates.get((currency, recorded_at))
+    return None if rate is None else convert_to_base_amount(amount, rate)
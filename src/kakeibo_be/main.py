@@ -4,9 +4,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from kakeibo_be.api import router as api_router
 from kakeibo_be.core.connection import FE_BASE_URL
 from kakeibo_be.handlers.server_exception_handler import handler
+from kakeibo_be.middlewares.admission_control import AdmissionControlMiddleware, admission_limiter
+from kakeibo_be.middlewares.profiling import ProfilingMiddleware, is_profiling_enabled
 
 app = FastAPI()
 
+# 遅いリクエストの原因を調べるためのプロファイル（管理者のトークンか、無作為の抽出で有効にする）
+# 設定がなければ組み込まないので、普段の処理には影響しない
+# 受け付けを待っている時間は含めないよう、アドミッション制御より内側に置く
+if is_profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
+# 同時実行数を制限し、あふれたリクエストはすぐに 503 で断る
+# 後から追加したミドルウェアほど外側になるので、503 にも CORS のヘッダーが付く
+app.add_middleware(AdmissionControlMiddleware, limiter=admission_limiter)
 
 # フロンドエンドと繋げる設定
 app.add_middleware(
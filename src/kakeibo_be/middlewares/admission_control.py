@@ -0,0 +1,169 @@
+import asyncio
+import os
+
+from collections import deque
+from dataclasses import dataclass
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from kakeibo_be.core.database import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from kakeibo_be.loggers.custom_logger import logger
+from kakeibo_be.models.response.v1.error import ErrorResponse
+
+# 同時に処理するリクエスト数。DBのコネクション数を超えて受け付けても、
+# スレッドがコネクションの取得待ちで詰まるだけなので、プールの大きさに合わせる
+MAX_CONCURRENCY = int(os.environ.get("ADMISSION_MAX_CONCURRENCY", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+# 空きを待てるリクエスト数。これを超えたら待たせずにすぐ断る
+MAX_QUEUE_SIZE = int(os.environ.get("ADMISSION_MAX_QUEUE_SIZE", MAX_CONCURRENCY * 2))
+# 空きを待つ最大秒数
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "1.0"))
+# 断るときにクライアントへ伝える再試行までの秒数
+RETRY_AFTER_SECONDS = int(os.environ.get("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# 制限の対象外にするパス（前方一致）
+# ヘルスチェックとメトリクスは混雑時こそ応答できる必要がある
+# SSE の購読はDBを使わずに長時間つながるので、枠を占有させない
+EXEMPT_PATH_PREFIXES = (
+    "/api/v1/health-check",
+    "/api/v1/metrics",
+    "/api/v1/cash-flows/stream",
+)
+
+
+@dataclass
+class AdmissionMetrics:
+    max_concurrency: int
+    max_queue_size: int
+    in_flight: int
+    queue_depth: int
+    admitted_count: int
+    # 待ち行列が満杯で断った数
+    rejected_count: int
+    # 待ち時間の上限を超えて断った数
+    timed_out_count: int
+
+
+class AdmissionLimiter:
+    # イベントループのスレッドだけから使う前提なので、ロックは使わない
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        queue_timeout: float = QUEUE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        # 空きを待っているリクエスト。到着順に枠を渡す
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._admitted_count = 0
+        self._rejected_count = 0
+        self._timed_out_count = 0
+
+    async def acquire(self) -> bool:
+        # 枠を確保できたら True、断る場合は False を返す
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            self._in_flight += 1
+            self._admitted_count += 1
+            return True
+        if len(self._waiters) >= self.max_queue_size:
+            self._rejected_count += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except TimeoutError:
+            self._remove_waiter(waiter)
+            self._timed_out_count += 1
+            return False
+        except BaseException:
+            # 待っている間にクライアントが切断した場合など
+            # 枠を渡された直後だったら、次の人へ回す
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._remove_waiter(waiter)
+            raise
+
+        self._admitted_count += 1
+        return True
+
+    def release(self) -> None:
+        # 待っている人がいれば、同時実行数を減らさずにそのまま枠を渡す
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _remove_waiter(self, waiter: asyncio.Future[None]) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+    def get_metrics(self) -> AdmissionMetrics:
+        return AdmissionMetrics(
+            max_concurrency=self.max_concurrency,
+            max_queue_size=self.max_queue_size,
+            in_flight=self._in_flight,
+            queue_depth=len(self._waiters),
+            admitted_count=self._admitted_count,
+            rejected_count=self._rejected_count,
+            timed_out_count=self._timed_out_count,
+        )
+
+
+class AdmissionControlMiddleware:
+    # StreamingResponse をそのまま流せるよう、BaseHTTPMiddleware ではなく ASGI のミドルウェアで書く
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: AdmissionLimiter,
+        exempt_path_prefixes: tuple[str, ...] = EXEMPT_PATH_PREFIXES,
+        retry_after_seconds: int = RETRY_AFTER_SECONDS,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.exempt_path_prefixes = exempt_path_prefixes
+        self.retry_after_seconds = retry_after_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._is_limited(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.limiter.acquire():
+            logger.warning(f"混雑のためリクエストを断りました。path = {scope['path']}")
+            response = JSONResponse(
+                status_code=503,
+                content=ErrorResponse(
+                    detail="混み合っています。時間をおいて再度お試しください。"
+                ).model_dump(),
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+    def _is_limited(self, scope: Scope) -> bool:
+        if scope["type"] != "http":
+            return False
+        # CORS のプリフライトはDBを使わない
+        if scope["method"] == "OPTIONS":
+            return False
+        return not scope["path"].startswith(self.exempt_path_prefixes)
+
+
+admission_limiter = AdmissionLimiter()
+
+
+def get_admission_limiter() -> AdmissionLimiter:
+    return admission_limiter
@@ -0,0 +1,232 @@
+import contextvars
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from types import FrameType
+
+import anyio
+import anyio.to_thread
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from kakeibo_be.loggers.custom_logger import logger
+
+# 管理者がこのトークンをヘッダーに付けたリクエストだけをプロファイルする（空なら使わない）
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+PROFILING_TOKEN_HEADER = "x-profile-token"
+# トークンがなくても、この割合のリクエストを無作為にプロファイルする（0〜1）
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+# プロファイルを書き出すディレクトリ
+PROFILING_DIR = Path(os.environ.get("PROFILING_DIR", "profiles"))
+# スタックを採取する間隔（秒）
+PROFILING_INTERVAL_SECONDS = float(os.environ.get("PROFILING_INTERVAL_SECONDS", "0.001"))
+# 同時にプロファイルするリクエストの上限。採取用のスレッドが増えすぎないようにする
+PROFILING_MAX_CONCURRENT = int(os.environ.get("PROFILING_MAX_CONCURRENT", "1"))
+# 書き出したファイル名をレスポンスで返すヘッダー
+PROFILE_FILE_HEADER = b"x-profile-file"
+
+# 差し替える前の anyio.to_thread.run_sync（ミドルウェア自身が使う分はこちらを呼ぶ）
+_original_run_sync = anyio.to_thread.run_sync
+
+
+def is_profiling_enabled() -> bool:
+    # どちらも設定されていなければミドルウェアを組み込まない（オフのときの負荷はゼロ）
+    return bool(PROFILING_TOKEN) or PROFILING_SAMPLE_RATE > 0
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    # collapsed 形式では ; がフレームの区切りなので、名前に含めない
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(
+        ";", ":"
+    )
+
+
+class RequestProfiler:
+    # 別スレッドから一定間隔で全スレッドのスタックを覗き、このリクエストの分だけを数える
+    # 標準ライブラリだけで動き、同期のハンドラー（ワーカースレッド）も追える
+    def __init__(self, root_frame: FrameType, interval: float) -> None:
+        self.root_frame = root_frame
+        self.interval = interval
+        self.loop_thread_id = threading.get_ident()
+        # このリクエストの処理を実行中のワーカースレッドの id → 実行中の数
+        self._worker_threads: Counter[int] = Counter()
+        self._worker_threads_lock = threading.Lock()
+        self.samples: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def run_tracked(self, func: Callable[..., object], *args: object) -> object:
+        # ワーカースレッドで呼ばれ、実行している間だけそのスレッドをこのリクエストのものとして数える
+        thread_id = threading.get_ident()
+        with self._worker_threads_lock:
+            self._worker_threads[thread_id] += 1
+        try:
+            return func(*args)
+        finally:
+            with self._worker_threads_lock:
+                self._worker_threads[thread_id] -= 1
+                if not self._worker_threads[thread_id]:
+                    del self._worker_threads[thread_id]
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample_count += 1
+            with self._worker_threads_lock:
+                worker_thread_ids = set(self._worker_threads)
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != self.loop_thread_id and thread_id not in worker_thread_ids:
+                    continue
+                stack = self._request_stack(thread_id, frame)
+                if stack:
+                    self.samples[";".join(_frame_label(f) for f in stack)] += 1
+
+    def _request_stack(self, thread_id: int, frame: FrameType) -> list[FrameType] | None:
+        frames: list[FrameType] = []
+        current: FrameType | None = frame
+        while current is not None:
+            frames.append(current)
+            current = current.f_back
+        # 根元から順に並べる
+        frames.reverse()
+
+        if thread_id == self.loop_thread_id:
+            # イベントループでは、このリクエストのミドルウェアのフレームから上だけが対象
+            # 他のリクエストのコルーチンが動いているときは含まれない
+            for index, candidate in enumerate(frames):
+                if candidate is self.root_frame:
+                    return frames[index:]
+            return None
+
+        # ワーカースレッドでは、受け渡された処理（run_tracked から上）が対象
+        for index, candidate in enumerate(frames):
+            if candidate.f_code is _RUN_TRACKED_CODE:
+                return frames[index + 1 :]
+        return None
+
+    def to_collapsed(self) -> str:
+        # flamegraph.pl や speedscope で読める collapsed stacks 形式
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_RUN_TRACKED_CODE = RequestProfiler.run_tracked.__code__
+
+# プロファイル中のリクエストから、ワーカースレッドへ処理を受け渡すときに参照する
+_current_profiler: contextvars.ContextVar[RequestProfiler | None] = contextvars.ContextVar(
+    "current_profiler", default=None
+)
+
+
+async def _run_sync_tracking_thread(
+    func: Callable[..., object], *args: object, **kwargs: object
+) -> object:
+    # 受け渡す時点で、実行するワーカースレッドの id をリクエストのプロファイラーに登録させる
+    profiler = _current_profiler.get()
+    if profiler is None:
+        return await _original_run_sync(func, *args, **kwargs)
+    return await _original_run_sync(profiler.run_tracked, func, *args, **kwargs)
+
+
+def _install_thread_tracking() -> None:
+    # Starlette / FastAPI の同期の依存関係やハンドラーは、どれも anyio.to_thread.run_sync で
+    # スレッドプールに渡されるので、そこを差し替える（ミドルウェアを組み込んだときだけ）
+    anyio.to_thread.run_sync = _run_sync_tracking_thread
+
+
+class ProfilingMiddleware:
+    # ストリーミングのレスポンスもそのまま流せるよう、ASGI のミドルウェアで書く
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str = PROFILING_TOKEN,
+        sample_rate: float = PROFILING_SAMPLE_RATE,
+        output_dir: Path = PROFILING_DIR,
+        interval: float = PROFILING_INTERVAL_SECONDS,
+        max_concurrent: int = PROFILING_MAX_CONCURRENT,
+    ) -> None:
+        self.app = app
+        self.token = token
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        # イベントループのスレッドだけから使う前提なので、ロックは使わない
+        self._active = 0
+        _install_thread_tracking()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        file_name = self._file_name(scope)
+        profiler = RequestProfiler(root_frame=sys._getframe(), interval=self.interval)
+
+        async def send_with_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_FILE_HEADER, file_name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self._active += 1
+        token = _current_profiler.set(profiler)
+        started_at = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            _current_profiler.reset(token)
+            # 採取用のスレッドの終了待ちとファイルの書き出しは、イベントループを止めないよう
+            # スレッドプールで行う。リクエストが取り消されていても必ず止めて書き出す
+            with anyio.CancelScope(shield=True):
+                await _original_run_sync(profiler.stop)
+                self._active -= 1
+                await _original_run_sync(self._write, file_name, profiler)
+            logger.info(
+                f"リクエストのプロファイルを書き出しました。path = {scope['path']}, "
+                f"elapsed = {elapsed_ms:.1f} ms, samples = {profiler.sample_count}, "
+                f"file = {file_name}"
+            )
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or self._active >= self.max_concurrent:
+            return False
+        if self.token:
+            headers = dict(scope["headers"])
+            requested = headers.get(PROFILING_TOKEN_HEADER.encode(), b"")
+            # トークンの比較にかかる時間から推測されないようにする
+            if requested and hmac.compare_digest(requested, self.token.encode()):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _file_name(self, scope: Scope) -> str:
+        path = re.sub(r"[^0-9A-Za-z]+", "_", scope["path"]).strip("_")
+        timestamp = time.strftime("%Y%m%dT%H%M%S")
+        return f"{timestamp}-{scope['method']}-{path}-{uuid.uuid4().hex[:8]}.collapsed"
+
+    def _write(self, file_name: str, profiler: RequestProfiler) -> None:
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            (self.output_dir / file_name).write_text(profiler.to_collapsed(), encoding="utf-8")
+        except OSError:
+            # プロファイルを書けなくても、レスポンスには影響させない
+            logger.exception("リクエストのプロファイルの書き出しに失敗しました。")
@@ -1,9 +1,9 @@
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import make_url, pool
 
-from kakeibo_be.core.database import get_database_url
+from kakeibo_be.core.database import create_database_engine, get_database_url
 from kakeibo_be.models.db import *  # noqa: F403
 from kakeibo_be.models.db.base import Base
 
@@ -47,6 +47,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        # SQLite は ALTER TABLE でできることが少ないので、テーブルを作り直す形で変更する
+        render_as_batch=make_url(url).get_backend_name() == "sqlite",
     )
 
     with context.begin_transaction():
@@ -60,16 +62,18 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
     url = config.get_main_option("sqlalchemy.url")
 
+    # SQLite ではテーブルを作り直す間に ON DELETE SET NULL などが動かないよう、外部キーを無効にする
+    connectable = create_database_engine(url, sqlite_foreign_keys=False, poolclass=pool.NullPool)
+
     with connectable.connect() as connection:
-        context.configure(url=url, connection=connection, target_metadata=target_metadata)
+        context.configure(
+            url=url,
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
 
         with context.begin_transaction():
             context.run_migrations()
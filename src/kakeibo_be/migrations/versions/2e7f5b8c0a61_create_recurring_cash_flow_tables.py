@@ -0,0 +1,62 @@
+"""create recurring cash flow tables
+
+Revision ID: 2e7f5b8c0a61
+Revises: 9d4c2a6e1f08
+Create Date: 2026-10-19 17:48:10.533190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e7f5b8c0a61'
+down_revision: Union[str, Sequence[str], None] = '9d4c2a6e1f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recurring_cash_flows',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=30), nullable=False),
+    sa.Column('type', sa.Enum('INCOME', 'EXPENSE', name='cashflowtype'), nullable=False),
+    sa.Column('frequency', sa.Enum('MONTHLY', 'WEEKLY', 'YEARLY', name='recurrencefrequency'), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('recurring_materialized_months',
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('month')
+    )
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.add_column(sa.Column('recurring_cash_flow_id', sa.Integer(), nullable=True))
+        # 外部キーのインデックスは一意制約のインデックスで兼ねる
+        batch_op.create_unique_constraint(
+            'uq_cash_flows_recurring_occurrence', ['recurring_cash_flow_id', 'recorded_at']
+        )
+        batch_op.create_foreign_key(
+            'fk_cash_flows_recurring_cash_flow_id',
+            'recurring_cash_flows',
+            ['recurring_cash_flow_id'],
+            ['id'],
+            ondelete='SET NULL',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.drop_constraint('fk_cash_flows_recurring_cash_flow_id', type_='foreignkey')
+        batch_op.drop_constraint('uq_cash_flows_recurring_occurrence', type_='unique')
+        batch_op.drop_column('recurring_cash_flow_id')
+    op.drop_table('recurring_materialized_months')
+    op.drop_table('recurring_cash_flows')
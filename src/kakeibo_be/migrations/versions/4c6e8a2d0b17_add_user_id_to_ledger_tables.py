@@ -0,0 +1,152 @@
+"""add user_id to ledger tables
+
+Revision ID: 4c6e8a2d0b17
+Revises: 7a3d9e1b4c52
+Create Date: 2026-10-19 20:11:37.402916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c6e8a2d0b17'
+down_revision: Union[str, Sequence[str], None] = '7a3d9e1b4c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 既存のデータはすべてこの利用者のものとして引き継ぐ
+DEFAULT_USER_ID = 1
+
+
+def _add_user_id_column(table_name: str) -> None:
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.add_column(
+            sa.Column('user_id', sa.Integer(), nullable=False, server_default=str(DEFAULT_USER_ID))
+        )
+    with op.batch_alter_table(table_name) as batch_op:
+        # 利用者の入れ忘れに気付けるよう、デフォルト値は外しておく
+        batch_op.alter_column(
+            'user_id', existing_type=sa.Integer(), existing_nullable=False, server_default=None
+        )
+
+
+def _recreate_table(table_name: str, columns: list[sa.Column], primary_key: list[str], extra: dict) -> None:
+    # 主キーを変えるため、データを退避して作り直す（どちらも行数の少ない集計・目印のテーブル）
+    table = sa.table(
+        table_name,
+        *[sa.column(column.name, column.type) for column in columns if column.name != 'user_id'],
+    )
+    rows = [dict(row._mapping) for row in op.get_bind().execute(sa.select(table))]
+    op.drop_table(table_name)
+    new_table = op.create_table(table_name, *columns, sa.PrimaryKeyConstraint(*primary_key))
+    op.bulk_insert(new_table, [{**row, **extra} for row in rows])
+
+
+def _monthly_totals_columns(with_user_id: bool) -> list[sa.Column]:
+    columns = [sa.Column('user_id', sa.Integer(), nullable=False)] if with_user_id else []
+    return columns + [
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('type', sa.Enum('INCOME', 'EXPENSE', name='cashflowtype'), nullable=False),
+        sa.Column('title', sa.String(length=30), nullable=False),
+        sa.Column('amount', sa.BigInteger(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+    ]
+
+
+def _materialized_months_columns(with_user_id: bool) -> list[sa.Column]:
+    columns = [sa.Column('user_id', sa.Integer(), nullable=False)] if with_user_id else []
+    return columns + [
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _add_user_id_column('cash_flows')
+    with op.batch_alter_table('cash_flows') as batch_op:
+        # 単独の日付・バージョンのインデックスは、利用者を先頭にした複合インデックスに置き換える
+        batch_op.drop_index('ix_cash_flows_recorded_at')
+        batch_op.drop_index('ix_cash_flows_sync_version')
+        batch_op.create_index('ix_cash_flows_user_id_recorded_at', ['user_id', 'recorded_at'], unique=False)
+        batch_op.create_index('ix_cash_flows_user_id_sync_version', ['user_id', 'sync_version'], unique=False)
+
+    _add_user_id_column('cash_flows_archive')
+    with op.batch_alter_table('cash_flows_archive') as batch_op:
+        batch_op.drop_index('ix_cash_flows_archive_recorded_at')
+        batch_op.create_index(
+            'ix_cash_flows_archive_user_id_recorded_at', ['user_id', 'recorded_at'], unique=False
+        )
+
+    _add_user_id_column('budgets')
+    with op.batch_alter_table('budgets') as batch_op:
+        batch_op.drop_constraint('uq_budgets_month_title', type_='unique')
+        batch_op.create_unique_constraint('uq_budgets_user_id_month_title', ['user_id', 'month', 'title'])
+
+    _add_user_id_column('recurring_cash_flows')
+    with op.batch_alter_table('recurring_cash_flows') as batch_op:
+        batch_op.create_index('ix_recurring_cash_flows_user_id', ['user_id'], unique=False)
+
+    _recreate_table(
+        'monthly_totals',
+        _monthly_totals_columns(with_user_id=True),
+        ['user_id', 'month', 'type', 'title'],
+        {'user_id': DEFAULT_USER_ID},
+    )
+    _recreate_table(
+        'recurring_materialized_months',
+        _materialized_months_columns(with_user_id=True),
+        ['user_id', 'month'],
+        {'user_id': DEFAULT_USER_ID},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 元のテーブル定義では利用者を区別できないので、既定の利用者以外のデータは削除する
+    for table_name in (
+        'monthly_totals',
+        'recurring_materialized_months',
+        'budgets',
+        'cash_flows_archive',
+        'cash_flows',
+        'recurring_cash_flows',
+    ):
+        op.execute(sa.text(f"DELETE FROM {table_name} WHERE user_id <> {DEFAULT_USER_ID}"))
+
+    _recreate_table(
+        'recurring_materialized_months',
+        _materialized_months_columns(with_user_id=False),
+        ['month'],
+        {},
+    )
+    _recreate_table(
+        'monthly_totals',
+        _monthly_totals_columns(with_user_id=False),
+        ['month', 'type', 'title'],
+        {},
+    )
+
+    with op.batch_alter_table('recurring_cash_flows') as batch_op:
+        batch_op.drop_index('ix_recurring_cash_flows_user_id')
+        batch_op.drop_column('user_id')
+
+    with op.batch_alter_table('budgets') as batch_op:
+        batch_op.drop_constraint('uq_budgets_user_id_month_title', type_='unique')
+        batch_op.create_unique_constraint('uq_budgets_month_title', ['month', 'title'])
+        batch_op.drop_column('user_id')
+
+    with op.batch_alter_table('cash_flows_archive') as batch_op:
+        batch_op.drop_index('ix_cash_flows_archive_user_id_recorded_at')
+        batch_op.create_index('ix_cash_flows_archive_recorded_at', ['recorded_at'], unique=False)
+        batch_op.drop_column('user_id')
+
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.drop_index('ix_cash_flows_user_id_sync_version')
+        batch_op.drop_index('ix_cash_flows_user_id_recorded_at')
+        batch_op.create_index('ix_cash_flows_sync_version', ['sync_version'], unique=False)
+        batch_op.create_index('ix_cash_flows_recorded_at', ['recorded_at'], unique=False)
+        batch_op.drop_column('user_id')
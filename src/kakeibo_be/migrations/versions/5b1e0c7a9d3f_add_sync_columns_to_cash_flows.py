@@ -0,0 +1,60 @@
+"""add sync columns to cash flows
+
+Revision ID: 5b1e0c7a9d3f
+Revises: c2496d5cc9e5
+Create Date: 2026-10-19 10:12:31.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e0c7a9d3f'
+down_revision: Union[str, Sequence[str], None] = 'c2496d5cc9e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sync_sequences',
+    sa.Column('name', sa.String(length=30), nullable=False),
+    sa.Column('last_value', sa.BigInteger(), nullable=False),
+    sa.Column('purged_value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(
+            sa.Column('sync_version', sa.BigInteger(), nullable=False, server_default='0')
+        )
+
+    # 既存データには id をそのままバージョンとして振り、採番の開始位置を最大 id に合わせる
+    op.execute("UPDATE cash_flows SET sync_version = id")
+    op.execute(
+        "INSERT INTO sync_sequences (name, last_value, purged_value) "
+        "SELECT 'cash_flows', COALESCE(MAX(id), 0), 0 FROM cash_flows"
+    )
+
+    with op.batch_alter_table('cash_flows') as batch_op:
+        # 採番漏れに気付けるよう、デフォルト値は外しておく
+        batch_op.alter_column(
+            'sync_version', existing_type=sa.BigInteger(), existing_nullable=False, server_default=None
+        )
+        batch_op.create_index('ix_cash_flows_sync_version', ['sync_version'], unique=False)
+        batch_op.create_index('ix_cash_flows_deleted_at', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 論理削除済みのデータは元のテーブル定義では表現できないので物理削除する
+    op.execute("DELETE FROM cash_flows WHERE deleted_at IS NOT NULL")
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.drop_index('ix_cash_flows_deleted_at')
+        batch_op.drop_index('ix_cash_flows_sync_version')
+        batch_op.drop_column('sync_version')
+        batch_op.drop_column('deleted_at')
+    op.drop_table('sync_sequences')
@@ -0,0 +1,62 @@
+"""create cash flow archive tables
+
+Revision ID: 7a3d9e1b4c52
+Revises: 2e7f5b8c0a61
+Create Date: 2026-10-19 19:02:41.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3d9e1b4c52'
+down_revision: Union[str, Sequence[str], None] = '2e7f5b8c0a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cash_flows_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=30), nullable=False),
+    sa.Column('type', sa.Enum('INCOME', 'EXPENSE', name='cashflowtype'), nullable=False),
+    sa.Column('recorded_at', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('sync_version', sa.BigInteger(), nullable=False),
+    sa.Column('recurring_cash_flow_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cash_flows_archive_recorded_at'), 'cash_flows_archive', ['recorded_at'], unique=False)
+    op.create_table('archive_states',
+    sa.Column('name', sa.String(length=30), nullable=False),
+    sa.Column('archived_before', sa.Date(), nullable=False),
+    sa.Column('archiving_before', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # まだ何も締めていない状態から始める
+    op.execute(
+        "INSERT INTO archive_states (name, archived_before, archiving_before) "
+        "VALUES ('cash_flows', '1970-01-01', '1970-01-01')"
+    )
+    op.create_index(op.f('ix_cash_flows_recorded_at'), 'cash_flows', ['recorded_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cash_flows_recorded_at'), table_name='cash_flows')
+    # アーカイブ済みのデータは cash_flows に戻してからテーブルを削除する
+    op.execute(
+        "INSERT INTO cash_flows "
+        "(id, amount, title, type, recorded_at, created_at, updated_at, sync_version, recurring_cash_flow_id) "
+        "SELECT id, amount, title, type, recorded_at, created_at, updated_at, sync_version, recurring_cash_flow_id "
+        "FROM cash_flows_archive"
+    )
+    op.drop_table('archive_states')
+    op.drop_index(op.f('ix_cash_flows_archive_recorded_at'), table_name='cash_flows_archive')
+    op.drop_table('cash_flows_archive')
@@ -0,0 +1,78 @@
+"""create budget and monthly total tables
+
+Revision ID: 9d4c2a6e1f08
+Revises: 5b1e0c7a9d3f
+Create Date: 2026-10-19 14:03:52.107726
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4c2a6e1f08'
+down_revision: Union[str, Sequence[str], None] = '5b1e0c7a9d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('budgets',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('title', sa.String(length=30), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('month', 'title', name='uq_budgets_month_title')
+    )
+    monthly_totals = op.create_table('monthly_totals',
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('type', sa.Enum('INCOME', 'EXPENSE', name='cashflowtype'), nullable=False),
+    sa.Column('title', sa.String(length=30), nullable=False),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('month', 'type', 'title')
+    )
+
+    # 既存の cash_flows から月別集計を作成する（タイトルごとの行と、タイトルを問わない行）
+    cash_flows = sa.table('cash_flows',
+        sa.column('recorded_at', sa.Date()),
+        sa.column('type', sa.String()),
+        sa.column('title', sa.String()),
+        sa.column('amount', sa.Integer()),
+        sa.column('deleted_at', sa.DateTime()),
+    )
+    rows = op.get_bind().execute(
+        sa.select(
+            cash_flows.c.recorded_at,
+            cash_flows.c.type,
+            cash_flows.c.title,
+            sa.func.sum(cash_flows.c.amount),
+            sa.func.count(),
+        )
+        .where(cash_flows.c.deleted_at.is_(None))
+        .group_by(cash_flows.c.recorded_at, cash_flows.c.type, cash_flows.c.title)
+    )
+    merged = defaultdict(lambda: [0, 0])
+    for recorded_at, cash_flow_type, title, amount, count in rows:
+        for key_title in (title, ''):
+            key = (recorded_at.replace(day=1), cash_flow_type, key_title)
+            merged[key][0] += int(amount)
+            merged[key][1] += count
+    if merged:
+        op.bulk_insert(monthly_totals, [
+            {'month': month, 'type': cash_flow_type, 'title': title, 'amount': amount, 'count': count}
+            for (month, cash_flow_type, title), (amount, count) in merged.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_totals')
+    op.drop_table('budgets')
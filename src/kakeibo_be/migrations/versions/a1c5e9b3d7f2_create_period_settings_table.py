@@ -0,0 +1,34 @@
+"""create period settings table
+
+Revision ID: a1c5e9b3d7f2
+Revises: f8c2a4e6b0d3
+Create Date: 2026-10-21 10:14:37.582604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c5e9b3d7f2'
+down_revision: Union[str, Sequence[str], None] = 'f8c2a4e6b0d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('period_settings',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('MONTHLY', 'WEEKLY', name='periodkind'), nullable=False),
+    sa.Column('start_day', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('period_settings')
@@ -0,0 +1,33 @@
+"""add amount indexes to cash flows
+
+Revision ID: b4d8f2a6c0e9
+Revises: a1c5e9b3d7f2
+Create Date: 2026-10-21 15:02:48.917356
+
+"""
+from typing import Sequence, Union
+
+from kakeibo_be.core.online_migration import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d8f2a6c0e9'
+down_revision: Union[str, Sequence[str], None] = 'a1c5e9b3d7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 検索（GET /cash-flows/search）で金額の範囲・金額の順を扱うためのインデックス
+    # 行数が多いテーブルなので、作成中も読み書きを止めない
+    create_index_online('ix_cash_flows_user_id_amount', 'cash_flows', ['user_id', 'amount'])
+    create_index_online(
+        'ix_cash_flows_archive_user_id_amount', 'cash_flows_archive', ['user_id', 'amount']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_online('ix_cash_flows_archive_user_id_amount', 'cash_flows_archive')
+    drop_index_online('ix_cash_flows_user_id_amount', 'cash_flows')
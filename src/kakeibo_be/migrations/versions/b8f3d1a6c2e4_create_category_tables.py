@@ -0,0 +1,77 @@
+"""create category tables
+
+Revision ID: b8f3d1a6c2e4
+Revises: 4c6e8a2d0b17
+Create Date: 2026-10-19 23:02:18.615402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f3d1a6c2e4'
+down_revision: Union[str, Sequence[str], None] = '4c6e8a2d0b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=30), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'name', name='uq_categories_user_id_name')
+    )
+    op.create_table('category_rules',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('keyword', sa.String(length=30), nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_category_rules_user_id', 'category_rules', ['user_id'], unique=False)
+    op.create_index('ix_category_rules_category_id', 'category_rules', ['category_id'], unique=False)
+
+    # 既存の行は未分類（NULL）のまま追加し、分類はバッチ（backfill_cash_flow_categories）で行う
+    # 行数の多いテーブルでも、列の追加だけならデータの書き換えを伴わない
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_cash_flows_category_id', 'categories', ['category_id'], ['id'], ondelete='SET NULL'
+        )
+        # 外部キーの列を先頭にしたインデックス（MySQL の外部キーに必要。カテゴリの削除時にも使う）
+        batch_op.create_index('ix_cash_flows_category_id', ['category_id'], unique=False)
+        # カテゴリで絞り込む一覧・集計用
+        batch_op.create_index(
+            'ix_cash_flows_user_id_category_id_recorded_at',
+            ['user_id', 'category_id', 'recorded_at'],
+            unique=False,
+        )
+    with op.batch_alter_table('cash_flows_archive') as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cash_flows_archive') as batch_op:
+        batch_op.drop_column('category_id')
+    with op.batch_alter_table('cash_flows') as batch_op:
+        # MySQL では外部キーが使っているインデックスを先に削除できないので、外部キーから外す
+        batch_op.drop_constraint('fk_cash_flows_category_id', type_='foreignkey')
+        batch_op.drop_index('ix_cash_flows_user_id_category_id_recorded_at')
+        batch_op.drop_index('ix_cash_flows_category_id')
+        batch_op.drop_column('category_id')
+    op.drop_index('ix_category_rules_category_id', table_name='category_rules')
+    op.drop_index('ix_category_rules_user_id', table_name='category_rules')
+    op.drop_table('category_rules')
+    op.drop_table('categories')
@@ -0,0 +1,75 @@
+"""add base amount to cash flows
+
+Revision ID: c7e1f5a3b9d2
+Revises: b4d8f2a6c0e9
+Create Date: 2026-10-22 10:18:44.561209
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e1f5a3b9d2'
+down_revision: Union[str, Sequence[str], None] = 'b4d8f2a6c0e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BASE_CURRENCY = os.environ.get('BASE_CURRENCY', 'JPY')
+
+
+def _add_base_amount_column(table_name: str) -> None:
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.add_column(sa.Column('base_amount', sa.BigInteger(), nullable=True))
+
+    # 既存の行は、記録した日以前で最も新しいレートで換算して埋める（月別集計に加算した時と同じレート）
+    # 外貨の行はレートがある場合しか登録できないので、NULL のまま残る行はない
+    cash_flows = sa.table(table_name,
+        sa.column('amount', sa.Integer()),
+        sa.column('currency', sa.String()),
+        sa.column('recorded_at', sa.Date()),
+        sa.column('base_amount', sa.BigInteger()),
+    )
+    fx_rates = sa.table('fx_rates',
+        sa.column('currency', sa.String()),
+        sa.column('rate_date', sa.Date()),
+        sa.column('rate', sa.Numeric(precision=18, scale=8)),
+    )
+    rate = (
+        sa.select(fx_rates.c.rate)
+        .where(
+            fx_rates.c.currency == cash_flows.c.currency,
+            fx_rates.c.rate_date <= cash_flows.c.recorded_at,
+        )
+        .order_by(fx_rates.c.rate_date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    op.execute(
+        cash_flows.update().values(
+            base_amount=sa.case(
+                (cash_flows.c.currency == BASE_CURRENCY, cash_flows.c.amount),
+                else_=sa.cast(sa.func.round(cash_flows.c.amount * rate), sa.BigInteger),
+            )
+        )
+    )
+
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.alter_column('base_amount', existing_type=sa.BigInteger(), nullable=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _add_base_amount_column('cash_flows')
+    _add_base_amount_column('cash_flows_archive')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cash_flows_archive') as batch_op:
+        batch_op.drop_column('base_amount')
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.drop_column('base_amount')
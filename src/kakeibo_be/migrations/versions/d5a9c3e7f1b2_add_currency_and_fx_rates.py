@@ -0,0 +1,57 @@
+"""add currency and fx rates
+
+Revision ID: d5a9c3e7f1b2
+Revises: b8f3d1a6c2e4
+Create Date: 2026-10-20 09:41:06.283517
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9c3e7f1b2'
+down_revision: Union[str, Sequence[str], None] = 'b8f3d1a6c2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 既存のデータはすべて基準通貨で記録したものとして扱う
+BASE_CURRENCY = os.environ.get('BASE_CURRENCY', 'JPY')
+
+
+def _add_currency_column(table_name: str) -> None:
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.add_column(
+            sa.Column('currency', sa.String(length=3), nullable=False, server_default=BASE_CURRENCY)
+        )
+    with op.batch_alter_table(table_name) as batch_op:
+        # 通貨はアプリ側で必ず入れるので、デフォルト値は外しておく
+        batch_op.alter_column(
+            'currency', existing_type=sa.String(length=3), existing_nullable=False, server_default=None
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fx_rates',
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('rate_date', sa.Date(), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=18, scale=8), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('currency', 'rate_date')
+    )
+    _add_currency_column('cash_flows')
+    _add_currency_column('cash_flows_archive')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 基準通貨以外の金額は換算できないまま残るので、元に戻す前に確認すること
+    with op.batch_alter_table('cash_flows_archive') as batch_op:
+        batch_op.drop_column('currency')
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.drop_column('currency')
+    op.drop_table('fx_rates')
@@ -0,0 +1,68 @@
+"""key sync sequences by user
+
+Revision ID: d9a3f7c1e5b8
+Revises: c7e1f5a3b9d2
+Create Date: 2026-10-23 14:02:37.918342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a3f7c1e5b8'
+down_revision: Union[str, Sequence[str], None] = 'c7e1f5a3b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 利用者ごとに分ける前の、全体で1つだった値を残す行の user_id
+LEGACY_USER_ID = 0
+
+
+def _recreate_table(columns: list[sa.Column], primary_key: list[str], rows: list[dict]) -> None:
+    # 主キーを変えるため、データを退避して作り直す（採番の種類ごとに1行しかないテーブル）
+    op.drop_table('sync_sequences')
+    new_table = op.create_table('sync_sequences', *columns, sa.PrimaryKeyConstraint(*primary_key))
+    op.bulk_insert(new_table, rows)
+
+
+def _sync_sequences_columns(with_user_id: bool) -> list[sa.Column]:
+    columns = [sa.Column('name', sa.String(length=30), nullable=False)]
+    if with_user_id:
+        columns.append(sa.Column('user_id', sa.Integer(), nullable=False))
+    return columns + [
+        sa.Column('last_value', sa.BigInteger(), nullable=False),
+        sa.Column('purged_value', sa.BigInteger(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 今の値は LEGACY_USER_ID の行に残す。利用者の行は最初に採番する時にこの値から作るので、
+    # クライアントが持っているトークンより前から採番し直すことはない
+    table = sa.table('sync_sequences', *[sa.column(column.name, column.type) for column in _sync_sequences_columns(with_user_id=False)])
+    rows = [dict(row._mapping) for row in op.get_bind().execute(sa.select(table))]
+    _recreate_table(
+        _sync_sequences_columns(with_user_id=True),
+        ['name', 'user_id'],
+        [{**row, 'user_id': LEGACY_USER_ID} for row in rows],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 全体で1つの値に戻す。どの利用者のトークンよりも前に戻らないよう、最大の値を使う
+    table = sa.table('sync_sequences', *[sa.column(column.name, column.type) for column in _sync_sequences_columns(with_user_id=True)])
+    rows = [
+        dict(row._mapping)
+        for row in op.get_bind().execute(
+            sa.select(
+                table.c.name,
+                sa.func.max(table.c.last_value).label('last_value'),
+                sa.func.max(table.c.purged_value).label('purged_value'),
+            ).group_by(table.c.name)
+        )
+    ]
+    _recreate_table(_sync_sequences_columns(with_user_id=False), ['name'], rows)
@@ -0,0 +1,36 @@
+"""add content hash to cash flows
+
+Revision ID: e3b7c1d9a5f4
+Revises: d5a9c3e7f1b2
+Create Date: 2026-10-20 14:12:37.904126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c1d9a5f4'
+down_revision: Union[str, Sequence[str], None] = 'd5a9c3e7f1b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 既存の行は未計算（NULL）のまま追加し、計算はバッチ（backfill_cash_flow_content_hashes）で行う
+    # アーカイブした行は作成・更新されないので、重複の判定の対象にしない
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=32), nullable=True))
+        batch_op.create_index(
+            'ix_cash_flows_user_id_content_hash', ['user_id', 'content_hash'], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cash_flows') as batch_op:
+        batch_op.drop_index('ix_cash_flows_user_id_content_hash')
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,37 @@
+"""create backfill progress table
+
+Revision ID: f8c2a4e6b0d3
+Revises: e3b7c1d9a5f4
+Create Date: 2026-10-20 18:27:51.336409
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c2a4e6b0d3'
+down_revision: Union[str, Sequence[str], None] = 'e3b7c1d9a5f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('backfill_progress',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.BigInteger(), nullable=False),
+    sa.Column('max_id', sa.BigInteger(), nullable=False),
+    sa.Column('processed_count', sa.BigInteger(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('backfill_progress')
@@ -1,3 +1,26 @@
+from kakeibo_be.models.db.backfill_progress import BackfillProgress
+from kakeibo_be.models.db.budget import Budget
 from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState, CashFlowArchive
+from kakeibo_be.models.db.category import Category, CategoryRule
+from kakeibo_be.models.db.fx_rate import FxRate
+from kakeibo_be.models.db.monthly_total import MonthlyTotal
+from kakeibo_be.models.db.period_setting import PeriodSetting
+from kakeibo_be.models.db.recurring_cash_flow import RecurringCashFlow, RecurringMaterializedMonth
+from kakeibo_be.models.db.sync_sequence import SyncSequence
 
-__all__ = ["CashFlow"]
+__all__ = [
+    "ArchiveState",
+    "BackfillProgress",
+    "Budget",
+    "CashFlow",
+    "CashFlowArchive",
+    "Category",
+    "CategoryRule",
+    "FxRate",
+    "MonthlyTotal",
+    "PeriodSetting",
+    "RecurringCashFlow",
+    "RecurringMaterializedMonth",
+    "SyncSequence",
+]
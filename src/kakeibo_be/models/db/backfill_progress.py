@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.models.db.base import Base
+
+
+class BackfillProgress(Base):
+    # 主キーの範囲ごとに進めるバックフィル（core/online_migration.py）の進み具合
+    # バッチの書き込みと同じトランザクションで更新するので、止まっても続きから再開できる
+    __tablename__ = "backfill_progress"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # ここまでの主キーは処理済み
+    last_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # 開始時点の主キーの最大値。これより後に追加された行は新しいコードで書き込まれるので対象外
+    max_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # 処理した行の累計（process_range の戻り値の合計）
+    processed_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # NULL なら未完了
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -1,12 +1,18 @@
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
-from kakeibo_be.core.database import get_database_url
+from kakeibo_be.core.database import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    create_database_engine,
+    get_database_url,
+)
 
 database_url = get_database_url()
-engine = create_engine(database_url, echo=False)
+engine = create_database_engine(
+    database_url, echo=False, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
+)
 
 Base = declarative_base()
 
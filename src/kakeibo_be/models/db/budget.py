@@ -0,0 +1,24 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.tenant import TenantScoped
+
+
+class Budget(TenantScoped, Base):
+    __tablename__ = "budgets"
+    __table_args__ = (UniqueConstraint("user_id", "month", "title", name="uq_budgets_user_id_month_title"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # 対象月の1日
+    month: Mapped[date] = mapped_column(Date, nullable=False)
+    # 空文字はその月の支出全体の予算
+    title: Mapped[str] = mapped_column(String(30), nullable=False, default="")
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=get_now)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=get_now, onupdate=get_now
+    )
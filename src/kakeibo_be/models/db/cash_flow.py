@@ -1,18 +1,54 @@
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Enum, Integer, String
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
+from kakeibo_be.core.currency import BASE_CURRENCY
 from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.logic.deduplicate.calculate_content_hash import CONTENT_HASH_LENGTH
 from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.tenant import TenantScoped
 from kakeibo_be.store.enum.cash_flow_type import CashFlowType
 
 
-class CashFlow(Base):
+class CashFlow(TenantScoped, Base):
     __tablename__ = "cash_flows"
+    __table_args__ = (
+        # 繰り返しの収支は1つのルールから同じ日に2件以上作られない
+        UniqueConstraint(
+            "recurring_cash_flow_id", "recorded_at", name="uq_cash_flows_recurring_occurrence"
+        ),
+        # 一覧・集計は利用者と日付の範囲、差分同期は利用者とバージョンで検索する
+        # 利用者を先頭にすることで、利用者の数が増えても1人分の範囲だけを読めば済む
+        Index("ix_cash_flows_user_id_recorded_at", "user_id", "recorded_at"),
+        Index("ix_cash_flows_user_id_sync_version", "user_id", "sync_version"),
+        # カテゴリで絞り込む一覧・集計用
+        Index(
+            "ix_cash_flows_user_id_category_id_recorded_at", "user_id", "category_id", "recorded_at"
+        ),
+        # 検索で金額の範囲を絞り込む・金額で並べる場合用（同じ金額の行は主キーの順に並ぶ）
+        Index("ix_cash_flows_user_id_amount", "user_id", "amount"),
+        # 取り込み時の重複の判定と、重複のまとまりの一覧用
+        Index("ix_cash_flows_user_id_content_hash", "user_id", "content_hash"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    # amount の通貨。集計では fx_rates のレートで基準通貨に換算する
+    currency: Mapped[str] = mapped_column(String(3), nullable=False, default=BASE_CURRENCY)
+    # amount を作成・更新した時点のレートで基準通貨に換算した値（月別集計・日別の累積和に加算した値）
+    # 更新・削除ではこの値を取り消すので、後からレートが変わっても集計とずれない
+    base_amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
     title: Mapped[str] = mapped_column(String(30), nullable=False)
     type: Mapped[CashFlowType] = mapped_column(Enum(CashFlowType), nullable=False)
     recorded_at: Mapped[date] = mapped_column(Date, nullable=False)
@@ -20,3 +56,19 @@ class CashFlow(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=get_now, onupdate=get_now
     )
+    # 論理削除（トゥームストーン）の日時。NULL なら有効なデータ
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+    # 作成・更新・削除のたびに sync_sequences から利用者ごとに採番される単調増加の値（差分同期のトークン）
+    sync_version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # 繰り返しのルールから作られた場合のルールの id
+    recurring_cash_flow_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("recurring_cash_flows.id", ondelete="SET NULL"), nullable=True
+    )
+    # 分類。NULL なら未分類
+    # 外部キーの列を先頭にしたインデックスは、カテゴリの削除時に該当する行を探すのに使う
+    category_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    # (recorded_at, amount, type, currency, 正規化したタイトル) の指紋。作成・更新のたびに計算し直す
+    # NULL なら未計算（列を追加する前の行。backfill_cash_flow_content_hashes で埋める）
+    content_hash: Mapped[str | None] = mapped_column(String(CONTENT_HASH_LENGTH), nullable=True)
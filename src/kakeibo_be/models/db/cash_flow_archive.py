@@ -0,0 +1,42 @@
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Enum, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.tenant import TenantScoped
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+
+class CashFlowArchive(TenantScoped, Base):
+    # 締めた年の cash_flows の移動先。id は cash_flows の id をそのまま引き継ぐ
+    # 締めた期間のデータは変更しないので、論理削除の列や差分同期用のインデックスは持たない
+    __tablename__ = "cash_flows_archive"
+    __table_args__ = (
+        Index("ix_cash_flows_archive_user_id_recorded_at", "user_id", "recorded_at"),
+        Index("ix_cash_flows_archive_user_id_amount", "user_id", "amount"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    base_amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    title: Mapped[str] = mapped_column(String(30), nullable=False)
+    type: Mapped[CashFlowType] = mapped_column(Enum(CashFlowType), nullable=False)
+    recorded_at: Mapped[date] = mapped_column(Date, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    sync_version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    recurring_cash_flow_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    category_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
+class ArchiveState(Base):
+    __tablename__ = "archive_states"
+
+    name: Mapped[str] = mapped_column(String(30), primary_key=True)
+    # この日付より前のデータはすべてアーカイブ側にある
+    archived_before: Mapped[date] = mapped_column(Date, nullable=False)
+    # 移動中の境界。移動が終わると archived_before と同じ値になる
+    # この日付より前は締めた期間なので、作成・更新・削除を受け付けない
+    archiving_before: Mapped[date] = mapped_column(Date, nullable=False)
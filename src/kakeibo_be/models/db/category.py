@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.tenant import TenantScoped
+
+
+class Category(TenantScoped, Base):
+    # 収支の分類（食費・交通費など）。利用者ごとに自由に作る
+    __tablename__ = "categories"
+    __table_args__ = (UniqueConstraint("user_id", "name", name="uq_categories_user_id_name"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(30), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=get_now)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=get_now, onupdate=get_now
+    )
+
+
+class CategoryRule(TenantScoped, Base):
+    # タイトルにキーワードを含む収支を、そのカテゴリに分類するルール
+    # 複数のルールに当てはまる場合は priority の大きいもの、同じなら先に作ったものを使う
+    __tablename__ = "category_rules"
+    __table_args__ = (Index("ix_category_rules_user_id", "user_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    category_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    keyword: Mapped[str] = mapped_column(String(30), nullable=False)
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=get_now)
@@ -0,0 +1,23 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.base import Base
+
+
+class FxRate(Base):
+    # 通貨ごと・日付ごとの基準通貨への換算レート（利用者を問わず共通）
+    # rate は、その通貨で記録した amount の 1 を基準通貨の amount にいくつと数えるか
+    # 例: 基準通貨が JPY で、USD をセント単位で記録する場合、1ドル = 150円なら 1.5
+    # レートのない日（休日など）は、それより前で最も新しい日のレートを使う
+    __tablename__ = "fx_rates"
+
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    rate_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    rate: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=get_now, onupdate=get_now
+    )
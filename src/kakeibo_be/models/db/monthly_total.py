@@ -0,0 +1,24 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Enum, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.tenant import TenantScoped
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+# 月・種別ごとの合計（タイトルを問わない集計行）のタイトル
+ALL_TITLES = ""
+
+
+class MonthlyTotal(TenantScoped, Base):
+    # cash_flows の書き込み時に差分で更新する月別の集計
+    __tablename__ = "monthly_totals"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # 対象月の1日
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    type: Mapped[CashFlowType] = mapped_column(Enum(CashFlowType), primary_key=True)
+    title: Mapped[str] = mapped_column(String(30), primary_key=True)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.tenant import TenantScoped
+from kakeibo_be.store.enum.period_kind import PeriodKind
+
+
+class PeriodSetting(TenantScoped, Base):
+    # 利用者ごとの期間の区切り方（給料日で区切る・週で区切るなど）。行がなければ暦の月
+    __tablename__ = "period_settings"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[PeriodKind] = mapped_column(Enum(PeriodKind), nullable=False)
+    # MONTHLY なら区切りの日（1〜28）、WEEKLY なら区切りの曜日（0 = 月曜日〜6）
+    start_day: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=get_now, onupdate=get_now
+    )
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Enum, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.tenant import TenantScoped
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.recurrence_frequency import RecurrenceFrequency
+
+
+class RecurringCashFlow(TenantScoped, Base):
+    # 家賃・サブスクリプション・給料などの繰り返し発生する収支のルール
+    __tablename__ = "recurring_cash_flows"
+    __table_args__ = (Index("ix_recurring_cash_flows_user_id", "user_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    title: Mapped[str] = mapped_column(String(30), nullable=False)
+    type: Mapped[CashFlowType] = mapped_column(Enum(CashFlowType), nullable=False)
+    frequency: Mapped[RecurrenceFrequency] = mapped_column(
+        Enum(RecurrenceFrequency), nullable=False
+    )
+    # 最初の発生日。毎月・毎年の日付や毎週の曜日もこの日付を基準にする
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    # NULL なら終了日なし
+    end_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=get_now)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=get_now, onupdate=get_now
+    )
+
+
+class RecurringMaterializedMonth(TenantScoped, Base):
+    # 繰り返しの収支を cash_flows に展開済みの月
+    __tablename__ = "recurring_materialized_months"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # 対象月の1日
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=get_now)
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from kakeibo_be.models.db.base import Base
+
+
+class SyncSequence(Base):
+    __tablename__ = "sync_sequences"
+
+    name: Mapped[str] = mapped_column(String(30), primary_key=True)
+    # 利用者（台帳）ごとに採番する。行は利用者が最初に書き込む時に作る
+    # LEGACY_SYNC_USER_ID の行は利用者ごとに分ける前の全体の値で、新しく作る行の初期値になる
+    # （利用者で絞り込まない表なので、TenantScoped は付けずに user_id を明示して読み書きする）
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # 最後に採番した値
+    last_value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # この値以下のトゥームストーンは削除済み。これより古いトークンでは差分を返せない
+    purged_value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
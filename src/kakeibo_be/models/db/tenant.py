@@ -0,0 +1,68 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Integer, event
+from sqlalchemy.orm import Mapped, ORMExecuteState, Session, mapped_column, with_loader_criteria
+
+# Session.info に利用者（台帳）の id を入れるキー
+_USER_ID_KEY = "user_id"
+
+
+class TenantScoped:
+    # 利用者ごとに分かれるテーブルに付ける mixin
+    # セッションに利用者が設定されていれば、SELECT / UPDATE / DELETE に自動で user_id の条件が付き、
+    # 追加した行には user_id が自動で入る
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+def set_session_user_id(session: Session, user_id: int) -> None:
+    session.info[_USER_ID_KEY] = user_id
+
+
+def clear_session_user_id(session: Session) -> None:
+    session.info.pop(_USER_ID_KEY, None)
+
+
+def get_session_user_id(session: Session) -> int:
+    user_id = session.info.get(_USER_ID_KEY)
+    if user_id is None:
+        # 利用者を決めずに利用者ごとのデータを書き込もうとしている（呼び出し側の不具合）
+        raise RuntimeError("セッションに利用者が設定されていません。")
+    return user_id
+
+
+@contextmanager
+def tenant_scope(session: Session, user_id: int) -> Iterator[Session]:
+    # バッチなどで、利用者ごとに処理する間だけセッションを絞り込む
+    set_session_user_id(session, user_id)
+    try:
+        yield session
+    finally:
+        clear_session_user_id(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _add_tenant_criteria(orm_execute_state: ORMExecuteState) -> None:
+    user_id = orm_execute_state.session.info.get(_USER_ID_KEY)
+    if user_id is None:
+        return
+    if orm_execute_state.is_select or orm_execute_state.is_update or orm_execute_state.is_delete:
+        # 結合・サブクエリ・UNION の中の対象テーブルにも条件が付く
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            with_loader_criteria(
+                TenantScoped,
+                lambda cls: cls.user_id == user_id,
+                include_aliases=True,
+                track_closure_variables=False,
+            )
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _set_tenant_on_new_rows(session: Session, flush_context: object, instances: object) -> None:
+    user_id = session.info.get(_USER_ID_KEY)
+    if user_id is None:
+        return
+    for instance in session.new:
+        if isinstance(instance, TenantScoped) and instance.user_id is None:
+            instance.user_id = user_id
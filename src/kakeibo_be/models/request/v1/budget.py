@@ -0,0 +1,13 @@
+from datetime import date
+
+from pydantic import Field
+
+from kakeibo_be.models.request.v1.base import BaseRequest
+
+
+class CreateBudgetRequest(BaseRequest):
+    # 月の途中の日付を指定しても、その月の予算として扱う
+    month: date
+    # 省略した場合はその月の支出全体の予算
+    title: str | None = Field(default=None, min_length=1, max_length=30)
+    amount: int = Field(gt=0)
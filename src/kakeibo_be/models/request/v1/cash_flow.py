@@ -1,19 +1,84 @@
 from datetime import date
+from typing import Self
 
-from pydantic import Field
+from pydantic import Field, model_validator
 
+from kakeibo_be.core.currency import BASE_CURRENCY
 from kakeibo_be.models.request.v1.base import BaseRequest
+from kakeibo_be.store.enum.cash_flow_operation_type import CashFlowOperationType
 from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.duplicate_policy import DuplicatePolicy
+
+# まとめて取得できる id の最大数
+MAX_LOOKUP_IDS = 5000
+# まとめて反映できる操作の最大数
+MAX_SYNC_OPERATIONS = 10000
+# ISO 4217 の3文字の通貨コード
+CURRENCY_PATTERN = r"^[A-Z]{3}$"
 
 
 class CreateCashFlowRequest(BaseRequest):
-    title: str
+    # 空文字は月別集計でタイトルを問わない集計行に使うので受け付けない
+    title: str = Field(min_length=1, max_length=30)
     type: CashFlowType
     recorded_at: date
     amount: int = Field(gt=0)
+    # 省略した場合は基準通貨
+    currency: str = Field(default=BASE_CURRENCY, pattern=CURRENCY_PATTERN)
+    # 省略した場合は未分類
+    category_id: int | None = None
 
 class UpdateCashFlowRequest(BaseRequest):
-    title: str
+    title: str = Field(min_length=1, max_length=30)
     type: CashFlowType
     recorded_at: date
     amount: int 
+    # 省略した場合は変更しない
+    currency: str | None = Field(default=None, pattern=CURRENCY_PATTERN)
+    # 省略した場合は変更しない（null を指定すると未分類に戻す）
+    category_id: int | None = None
+
+
+class LookupCashFlowsRequest(BaseRequest):
+    # この並び順でレスポンスを返す
+    ids: list[int] = Field(min_length=1, max_length=MAX_LOOKUP_IDS)
+
+
+class CashFlowOperation(BaseRequest):
+    op: CashFlowOperationType
+    # create でクライアントが付けた一時的な id。同じリクエストの後の操作から参照できる
+    temp_id: str | None = Field(default=None, min_length=1, max_length=64)
+    # update / delete の対象のサーバーの id（一時的な id で指定する場合は temp_id を使う）
+    id: int | None = None
+    # create / update で使う
+    title: str | None = Field(default=None, min_length=1, max_length=30)
+    type: CashFlowType | None = None
+    recorded_at: date | None = None
+    amount: int | None = Field(default=None, gt=0)
+    # create で省略した場合は基準通貨、update で省略した場合は変更しない
+    currency: str | None = Field(default=None, pattern=CURRENCY_PATTERN)
+    # create で省略した場合は未分類、update で省略した場合は変更しない（null を指定すると未分類に戻す）
+    category_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_fields(self) -> Self:
+        if self.op != CashFlowOperationType.DELETE and None in (
+            self.title,
+            self.type,
+            self.recorded_at,
+            self.amount,
+        ):
+            raise ValueError("title, type, recordedAt and amount are required")
+        if self.op == CashFlowOperationType.CREATE:
+            if self.temp_id is None or self.id is not None:
+                raise ValueError("create requires tempId and no id")
+        elif (self.id is None) == (self.temp_id is None):
+            raise ValueError("update and delete require either id or tempId")
+        return self
+
+
+class SyncCashFlowsRequest(BaseRequest):
+    # この順に反映する
+    operations: list[CashFlowOperation] = Field(min_length=1, max_length=MAX_SYNC_OPERATIONS)
+    # create の操作と同じ内容の行が既にある場合の扱い（明細の取り込みなどで使う）
+    on_duplicate: DuplicatePolicy = DuplicatePolicy.ALLOW
@@ -0,0 +1,14 @@
+from pydantic import Field
+
+from kakeibo_be.models.request.v1.base import BaseRequest
+
+
+class CreateCategoryRequest(BaseRequest):
+    name: str = Field(min_length=1, max_length=30)
+
+
+class CreateCategoryRuleRequest(BaseRequest):
+    # タイトルにこの文字列を含む収支を分類する（大文字・小文字は区別しない）
+    keyword: str = Field(min_length=1, max_length=30)
+    # 複数のルールに当てはまる場合は大きいものを使う
+    priority: int = 0
@@ -0,0 +1,11 @@
+from pydantic import Field
+
+from kakeibo_be.logic.calculate.calculate_period import MAX_MONTHLY_START_DAY
+from kakeibo_be.models.request.v1.base import BaseRequest
+from kakeibo_be.store.enum.period_kind import PeriodKind
+
+
+class UpdatePeriodSettingRequest(BaseRequest):
+    kind: PeriodKind
+    # monthly なら区切りの日（1〜28）、weekly なら区切りの曜日（0 = 月曜日〜6）
+    start_day: int = Field(ge=0, le=MAX_MONTHLY_START_DAY)
@@ -0,0 +1,23 @@
+from datetime import date
+from typing import Self
+
+from pydantic import Field, model_validator
+
+from kakeibo_be.models.request.v1.base import BaseRequest
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.recurrence_frequency import RecurrenceFrequency
+
+
+class CreateRecurringCashFlowRequest(BaseRequest):
+    title: str = Field(min_length=1, max_length=30)
+    type: CashFlowType
+    amount: int = Field(gt=0)
+    frequency: RecurrenceFrequency
+    start_date: date
+    end_date: date | None = None
+
+    @model_validator(mode="after")
+    def check_end_date(self) -> Self:
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("end_date must be on or after start_date")
+        return self
@@ -0,0 +1,11 @@
+from datetime import date
+
+from kakeibo_be.models.request.v1.base import BaseRequest
+from kakeibo_be.store.enum.report_job_kind import ReportJobKind
+
+
+class CreateReportJobRequest(BaseRequest):
+    kind: ReportJobKind
+    # [start_date, end_date) の期間を対象にする
+    start_date: date
+    end_date: date
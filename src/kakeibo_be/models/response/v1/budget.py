@@ -0,0 +1,22 @@
+from datetime import date
+
+from kakeibo_be.models.response.v1.base import BaseResponse
+
+
+class CreateBudgetResponse(BaseResponse):
+    id: int
+    month: date
+    title: str | None
+    amount: int
+
+
+class GetBudgetResponseItem(BaseResponse):
+    id: int
+    month: date
+    title: str | None
+    amount: int
+    # 予算に対する実績（支出の合計）
+    actual_amount: int
+    # 残りの予算。超過している場合は負の値
+    remaining_amount: int
+    is_over_budget: bool
@@ -1,6 +1,8 @@
 from datetime import date
 
 from kakeibo_be.models.response.v1.base import BaseResponse
+from kakeibo_be.store.enum.cash_flow_change_action import CashFlowChangeAction
+from kakeibo_be.store.enum.cash_flow_operation_type import CashFlowOperationType
 from kakeibo_be.store.enum.cash_flow_type import CashFlowType
 
 
@@ -10,6 +12,8 @@ class CreateCashFlowResponse(BaseResponse):
     type: CashFlowType
     recorded_at: date
     amount: int
+    currency: str
+    category_id: int | None
 
 
 class GetCashFlowResponseItem(BaseResponse):
@@ -18,6 +22,45 @@ class GetCashFlowResponseItem(BaseResponse):
     type: CashFlowType
     recorded_at: date
     amount: int
+    currency: str
+    # 未分類なら None
+    category_id: int | None
+
+
+class LookupCashFlowsResponse(BaseResponse):
+    # リクエストの ids の順（重複した id は最初の1回だけ）
+    items: list[GetCashFlowResponseItem]
+    # 存在しない（削除済み・他の利用者のものを含む）id
+    missing_ids: list[int]
+
+
+class CashFlowOperationResult(BaseResponse):
+    # リクエストの operations の何番目か
+    index: int
+    op: CashFlowOperationType
+    temp_id: str | None
+    # 対象のサーバーの id（作成した後に同じリクエストで削除した場合は None）
+    id: int | None
+    applied: bool
+    # 反映しなかった理由
+    error: str | None
+    # create で、同じ内容の行が既にあった（onDuplicate が allow の場合は常に False）
+    duplicate: bool
+
+
+class SyncCashFlowsResponse(BaseResponse):
+    results: list[CashFlowOperationResult]
+    # 一時的な id → 作成したサーバーの id
+    id_map: dict[str, int]
+
+
+class DuplicateCashFlowCluster(BaseResponse):
+    # 同じ内容（日付・金額・種別・通貨・正規化したタイトル）の行。id の順
+    items: list[GetCashFlowResponseItem]
+
+
+class GetDuplicateCashFlowsResponse(BaseResponse):
+    clusters: list[DuplicateCashFlowCluster]
 
 
 class UpdateCashFlowResponse(BaseResponse):
@@ -26,3 +69,34 @@ class UpdateCashFlowResponse(BaseResponse):
     type: CashFlowType
     recorded_at: date
     amount: int
+    currency: str
+    category_id: int | None
+
+
+class GetCashFlowChangesResponse(BaseResponse):
+    # 次回の since に渡すトークン
+    token: int
+    # since 以降に作成・更新されたデータ
+    upserted: list[GetCashFlowResponseItem]
+    # since 以降に削除されたデータの id
+    deleted_ids: list[int]
+    # limit で打ち切られた場合 True。token を since にして続きを取得する
+    has_more: bool
+    # since が古すぎて差分を返せない場合 True。upserted には全件（の先頭）が入る
+    reset_required: bool
+
+
+class CashFlowChangeEventResponse(BaseResponse):
+    action: CashFlowChangeAction
+    id: int
+    # /changes の since に渡せるトークン
+    token: int
+    # 削除の場合は None
+    item: GetCashFlowResponseItem | None
+
+
+class SearchCashFlowsResponse(BaseResponse):
+    # sort の順
+    items: list[GetCashFlowResponseItem]
+    # 続きがある場合に、次のページの cursor に渡す値。最後のページなら None
+    next_cursor: str | None
@@ -0,0 +1,13 @@
+from kakeibo_be.models.response.v1.base import BaseResponse
+
+
+class CategoryResponseItem(BaseResponse):
+    id: int
+    name: str
+
+
+class CategoryRuleResponseItem(BaseResponse):
+    id: int
+    category_id: int
+    keyword: str
+    priority: int
@@ -0,0 +1,21 @@
+from kakeibo_be.models.response.v1.base import BaseResponse
+
+
+class GetAdmissionMetricsResponse(BaseResponse):
+    max_concurrency: int
+    max_queue_size: int
+    in_flight: int
+    queue_depth: int
+    admitted_count: int
+    rejected_count: int
+    timed_out_count: int
+
+
+class GetDailyTotalIndexMetricsResponse(BaseResponse):
+    enabled: bool
+    users: int
+    days: int
+    memory_bytes: int
+    max_bytes: int
+    build_count: int
+    hit_count: int
@@ -0,0 +1,17 @@
+from datetime import date
+
+from kakeibo_be.models.response.v1.base import BaseResponse
+from kakeibo_be.store.enum.period_kind import PeriodKind
+
+
+class GetPeriodSettingResponse(BaseResponse):
+    kind: PeriodKind
+    start_day: int
+
+
+class GetPeriodResponseItem(BaseResponse):
+    # 区切り方ごとの期間の通し番号
+    key: int
+    start_date: date
+    # この日を含まない
+    end_date: date
@@ -0,0 +1,15 @@
+from datetime import date
+
+from kakeibo_be.models.response.v1.base import BaseResponse
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.recurrence_frequency import RecurrenceFrequency
+
+
+class RecurringCashFlowResponseItem(BaseResponse):
+    id: int
+    title: str
+    type: CashFlowType
+    amount: int
+    frequency: RecurrenceFrequency
+    start_date: date
+    end_date: date | None
@@ -0,0 +1,106 @@
+from datetime import date, datetime
+
+from kakeibo_be.models.response.v1.base import BaseResponse
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.period_kind import PeriodKind
+from kakeibo_be.store.enum.report_job_kind import ReportJobKind
+from kakeibo_be.store.enum.report_job_status import ReportJobStatus
+
+
+class GetReportJobResponse(BaseResponse):
+    job_id: str
+    kind: ReportJobKind
+    start_date: date
+    end_date: date
+    status: ReportJobStatus
+    created_at: datetime
+    finished_at: datetime | None
+    error: str | None
+
+
+class GetRangeTotalsResponse(BaseResponse):
+    start_date: date
+    end_date: date
+    income: int
+    expense: int
+    balance: int
+
+
+class BreakdownCategoryItem(BaseResponse):
+    # 未分類の行は None
+    category_id: int | None
+    name: str | None
+    amount: int
+    count: int
+
+
+class BreakdownTitleItem(BaseResponse):
+    title: str
+    amount: int
+    count: int
+
+
+class GetBreakdownResponse(BaseResponse):
+    start_date: date
+    end_date: date
+    type: CashFlowType
+    # 金額の大きい順
+    categories: list[BreakdownCategoryItem]
+    # 金額の合計が大きいタイトルの上位
+    top_titles: list[BreakdownTitleItem]
+
+
+class TrendMonthItem(BaseResponse):
+    month: date
+    income: int
+    expense: int
+    balance: int
+    # 支出の前月比（前月の支出が0の月と最初の月は None）
+    expense_change_rate: float | None
+    # 直近数か月の支出の移動平均
+    expense_moving_average: float
+
+
+class TrendDayItem(BaseResponse):
+    date: date
+    expense: int
+    expense_moving_average_7: float
+    expense_moving_average_30: float
+
+
+class TrendWeekdayItem(BaseResponse):
+    # 月曜日=0 〜 日曜日=6
+    weekday: int
+    average_expense: float
+
+
+class TrendProjection(BaseResponse):
+    month: date
+    elapsed_days: int
+    days_in_month: int
+    expense_to_date: int
+    projected_expense: int
+
+
+class GetTrendsResponse(BaseResponse):
+    months: list[TrendMonthItem]
+    days: list[TrendDayItem]
+    weekdays: list[TrendWeekdayItem]
+    projection: TrendProjection
+
+
+class PeriodTotalItem(BaseResponse):
+    # 利用者の区切り方での期間の通し番号
+    key: int
+    start_date: date
+    # この日を含まない
+    end_date: date
+    income: int
+    expense: int
+    balance: int
+
+
+class GetPeriodTotalsResponse(BaseResponse):
+    kind: PeriodKind
+    start_day: int
+    periods: list[PeriodTotalItem]
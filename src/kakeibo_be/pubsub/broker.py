@@ -0,0 +1,130 @@
+import asyncio
+import contextlib
+import os
+import threading
+
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+
+from kakeibo_be.pubsub.cash_flow_change import CashFlowChangeEvent
+
+# 購読者ごとのバッファに溜められるイベント数
+DEFAULT_BUFFER_SIZE = int(os.environ.get("CHANGE_BROKER_BUFFER_SIZE", "100"))
+
+
+# バッファあふれを受信側に知らせるための目印
+_OVERFLOW = object()
+
+
+class SubscriptionOverflowError(Exception):
+    # 購読者の受信が追いつかず、バッファがあふれたときに発生する
+    pass
+
+
+class Subscription(ABC):
+    @abstractmethod
+    async def receive(self, timeout: float) -> CashFlowChangeEvent | None:
+        # timeout 秒以内にイベントがなければ None を返す
+        pass
+
+
+class ChangeBroker(ABC):
+    # 変更イベントの配信方式のインターフェース
+    # 複数ワーカー構成では、このクラスを継承して Redis などの外部の仕組みに差し替える
+
+    @abstractmethod
+    def publish(self, event: CashFlowChangeEvent) -> None:
+        # 同期ハンドラ（スレッドプール）から呼ばれるので、ブロックしてはいけない
+        pass
+
+    @abstractmethod
+    def subscribe(self, user_id: int) -> AbstractAsyncContextManager[Subscription]:
+        # user_id の利用者のイベントだけを受け取る
+        pass
+
+
+class InMemorySubscription(Subscription):
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int) -> None:
+        self._loop = loop
+        # あふれた目印を必ず入れられるように1件分多く確保する
+        self._queue: asyncio.Queue[CashFlowChangeEvent | object] = asyncio.Queue(
+            maxsize=buffer_size + 1
+        )
+        self._buffer_size = buffer_size
+        self._overflowed = False
+
+    def offer(self, event: CashFlowChangeEvent) -> None:
+        # 任意のスレッドから呼ばれるので、キュー操作はイベントループのスレッドに任せる
+        # イベントループが既に閉じている（切断済み）場合は RuntimeError になるので無視する
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: CashFlowChangeEvent) -> None:
+        if self._overflowed:
+            return
+        if self._queue.qsize() < self._buffer_size:
+            self._queue.put_nowait(event)
+            return
+        # 遅い購読者のために配信側を待たせない。溜まった分は捨てて再同期してもらう
+        self._overflowed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_OVERFLOW)
+
+    async def receive(self, timeout: float) -> CashFlowChangeEvent | None:
+        try:
+            event = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except TimeoutError:
+            return None
+        if event is _OVERFLOW:
+            raise SubscriptionOverflowError()
+        return event
+
+
+class InMemoryChangeBroker(ChangeBroker):
+    # 1プロセス内だけで完結する配信方式
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self._buffer_size = buffer_size
+        # 利用者ごとの購読者。他の利用者のイベントは、購読者のバッファに入れる前に振り分ける
+        self._subscriptions: dict[int, set[InMemorySubscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event: CashFlowChangeEvent) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event.user_id, ()))
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[Subscription]:
+        subscription = InMemorySubscription(asyncio.get_running_loop(), self._buffer_size)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscriptions = self._subscriptions[user_id]
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[user_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+def create_change_broker() -> ChangeBroker:
+    backend = os.environ.get("CHANGE_BROKER", "memory")
+    if backend == "memory":
+        return InMemoryChangeBroker()
+    raise ValueError(f"未対応の CHANGE_BROKER です。CHANGE_BROKER = {backend}")
+
+
+change_broker = create_change_broker()
+
+
+def get_change_broker() -> ChangeBroker:
+    return change_broker
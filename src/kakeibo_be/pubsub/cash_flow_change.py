@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from datetime import date
+
+from kakeibo_be.models.response.v1.cash_flow import GetCashFlowResponseItem
+from kakeibo_be.store.enum.cash_flow_change_action import CashFlowChangeAction
+
+
+@dataclass(frozen=True)
+class CashFlowChangeEvent:
+    action: CashFlowChangeAction
+    cash_flow_id: int
+    # 変更した利用者。購読者には自分の変更だけを届ける
+    user_id: int
+    # 差分同期のトークンと同じ値。取りこぼした場合は /changes?since= で追いつける
+    sync_version: int
+    recorded_at: date
+    # 更新で日付が変わった場合の変更前の日付（月のフィルタで両方の月に通知するため）
+    previous_recorded_at: date | None = None
+    # 削除の場合は None
+    item: GetCashFlowResponseItem | None = None
+
+    def is_in_range(self, start_date: date, end_date: date) -> bool:
+        return any(
+            recorded_at is not None and start_date <= recorded_at < end_date
+            for recorded_at in (self.recorded_at, self.previous_recorded_at)
+        )
@@ -0,0 +1,41 @@
+from datetime import date
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.budget import Budget
+from kakeibo_be.models.db.monthly_total import MonthlyTotal
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+
+def get_budget_by_id(session: Session, budget_id: int) -> Budget | None:
+    result: Result = session.execute(select(Budget).where(Budget.id == budget_id))
+    return result.scalars().first()
+
+
+def get_budget_by_month_and_title(session: Session, month: date, title: str) -> Budget | None:
+    result: Result = session.execute(
+        select(Budget).where(Budget.month == month, Budget.title == title)
+    )
+    return result.scalars().first()
+
+
+def get_budgets_with_actual_by_month(session: Session, month: date) -> list[tuple[Budget, int]]:
+    # 予算と、集計済みの月別支出を1回のクエリで結合する
+    # cash_flows は参照しないので、取引の件数に関係なく予算の件数分だけの処理で済む
+    stmt = (
+        select(Budget, func.coalesce(MonthlyTotal.amount, 0))
+        .outerjoin(
+            MonthlyTotal,
+            and_(
+                MonthlyTotal.month == Budget.month,
+                MonthlyTotal.type == CashFlowType.EXPENSE,
+                MonthlyTotal.title == Budget.title,
+            ),
+        )
+        .where(Budget.month == month)
+        .order_by(Budget.title)
+    )
+    result: Result = session.execute(stmt)
+    return [(budget, actual_amount) for budget, actual_amount in result]
@@ -1,38 +1,435 @@
-from datetime import datetime
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Row,
+    Select,
+    and_,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    union,
+    union_all,
+    update,
+)
 from sqlalchemy.engine import Result
 from sqlalchemy.orm import Session
 
 from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import CashFlowArchive
+from kakeibo_be.models.db.tenant import get_session_user_id
+from kakeibo_be.repositories.cash_flow_archive import get_archive_state
+from kakeibo_be.store.enum.cash_flow_sort_order import CashFlowSortOrder
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+# IN 句に1回で並べる id の数
+# プレースホルダーの上限（古い SQLite は 999）や、MySQL のパケットの大きさを超えないようにする
+IN_CHUNK_SIZE = 500
 
 
 def get_cash_flows_by_month(
-    session: Session, month_start_date: datetime, next_month_start_date: datetime
+    session: Session, month_start_date: date, next_month_start_date: date
+) -> list[CashFlow | CashFlowArchive]:
+    return get_cash_flows_in_range(
+        session=session, start_date=month_start_date, end_date=next_month_start_date
+    )
+
+
+def get_cash_flows_in_range(
+    session: Session, start_date: date, end_date: date
+) -> list[CashFlow | CashFlowArchive]:
+    # 締めた年のデータは cash_flows_archive に移動しているので、期間に応じて参照先を切り替える
+    # ・期間がすべて締めた期間より前 → アーカイブだけ
+    # ・期間がすべて移動中の境界以降 → cash_flows だけ（普段の表示はほぼこちら）
+    # ・境界をまたぐ（または移動中） → 両方
+    archive_state = get_archive_state(session)
+    cash_flows: list[CashFlow | CashFlowArchive] = []
+
+    if start_date < archive_state.archiving_before:
+        result: Result = session.execute(
+            select(CashFlowArchive)
+            .where(CashFlowArchive.recorded_at >= start_date, CashFlowArchive.recorded_at < end_date)
+            .order_by(CashFlowArchive.recorded_at, CashFlowArchive.id)
+        )
+        cash_flows.extend(result.scalars())
+
+    if end_date > archive_state.archived_before:
+        stmt = (
+            # CashFlow テーブル（モデル）を対象にした SELECT クエリを作成
+            select(CashFlow)
+            # recorded_at が start_date 以上（＝月初以降）を指定
+            # recorded_at が end_date 未満（＝翌月の月初より前）を指定
+            .where(CashFlow.recorded_at >= start_date, CashFlow.recorded_at < end_date)
+            # 論理削除されたデータは除外する
+            .where(CashFlow.deleted_at.is_(None))
+            .order_by(CashFlow.recorded_at, CashFlow.id)
+        )
+        # 型は Result（SQLAlchemy の「結果セット」を表すオブジェクト）。
+        # SQLAlchemy で組み立てた stmt（SQL文の設計図）を、実際にデータベースに送って実行する
+        result = session.execute(stmt)
+
+        # scalars() がなかったら → Row のリストが返ってくる
+        # result.scalars() で 1行の中の「一番左のカラム（= CashFlow オブジェクト）」だけを取り出してくれる
+        cash_flows.extend(result.scalars())
+
+    return cash_flows
+
+@dataclass(frozen=True)
+class CashFlowSearch:
+    # 検索の条件。省略した条件では絞り込まない
+    start_date: date | None = None
+    # この日を含まない
+    end_date: date | None = None
+    cash_flow_type: CashFlowType | None = None
+    # 金額は登録した通貨のまま比べる（基準通貨に換算しない）
+    min_amount: int | None = None
+    max_amount: int | None = None
+    title_contains: str | None = None
+    sort: CashFlowSortOrder = CashFlowSortOrder.RECORDED_AT_DESC
+    # 前のページの最後の行の (並べ替えの列の値, id)。この行より後ろを返す
+    after: tuple[date | int, int] | None = None
+
+    @property
+    def sort_by_amount(self) -> bool:
+        return self.sort in (CashFlowSortOrder.AMOUNT_ASC, CashFlowSortOrder.AMOUNT_DESC)
+
+    @property
+    def descending(self) -> bool:
+        return self.sort in (CashFlowSortOrder.RECORDED_AT_DESC, CashFlowSortOrder.AMOUNT_DESC)
+
+
+def build_cash_flow_search(
+    model: type[CashFlow] | type[CashFlowArchive], search: CashFlowSearch, limit: int
+) -> Select:
+    # 利用者・並べ替えの列のインデックス（(user_id, recorded_at) か (user_id, amount)）を
+    # 並べ替えの順に読み、limit 件そろった時点で打ち切れる形のクエリを組み立てる
+    # ・条件は列をそのまま比べる形だけにする（列を関数で包むとインデックスの範囲として使えない）
+    # ・並べ替えの列の範囲の条件と続きの位置は、インデックスの読み始め・読み終わりになる
+    # ・それ以外の条件（種別・もう一方の列の範囲・タイトル）は読んだ行に対して確かめる
+    #   種別は2値しかないのでインデックスを作らず、タイトルの部分一致はインデックスを使えないので、
+    #   どちらも並べ替えの列の範囲で読む行を絞った後に確かめる
+    # ・ページ送りは OFFSET を使わず、前のページの最後の行の (値, id) より後ろから読む
+    sort_column = model.amount if search.sort_by_amount else model.recorded_at
+    stmt = select(
+        model.id,
+        model.title,
+        model.type,
+        model.recorded_at,
+        model.amount,
+        model.currency,
+        model.category_id,
+    )
+    if search.start_date is not None:
+        stmt = stmt.where(model.recorded_at >= search.start_date)
+    if search.end_date is not None:
+        stmt = stmt.where(model.recorded_at < search.end_date)
+    if search.min_amount is not None:
+        stmt = stmt.where(model.amount >= search.min_amount)
+    if search.max_amount is not None:
+        stmt = stmt.where(model.amount <= search.max_amount)
+    if search.cash_flow_type is not None:
+        stmt = stmt.where(model.type == search.cash_flow_type)
+    if search.title_contains:
+        # % や _ を含む文字列もそのままの文字として探す
+        stmt = stmt.where(model.title.contains(search.title_contains, autoescape=True))
+    if model is CashFlow:
+        stmt = stmt.where(CashFlow.deleted_at.is_(None))
+
+    if search.after is not None:
+        value, after_id = search.after
+        # (列, id) > (値, id) の行値の比較はインデックスの範囲にならないデータベースがあるので、OR に展開する
+        if search.descending:
+            stmt = stmt.where(
+                or_(sort_column < value, and_(sort_column == value, model.id < after_id))
+            )
+        else:
+            stmt = stmt.where(
+                or_(sort_column > value, and_(sort_column == value, model.id > after_id))
+            )
+
+    if search.descending:
+        return stmt.order_by(sort_column.desc(), model.id.desc()).limit(limit)
+    return stmt.order_by(sort_column, model.id).limit(limit)
+
+
+def search_cash_flows(session: Session, search: CashFlowSearch, limit: int) -> list[Row]:
+    # 条件に合う行の (id, title, type, recorded_at, amount, currency, category_id) を並べ替えの順に limit 件
+    # 期間がアーカイブにかかる場合は、両方のテーブルでそれぞれ limit 件まで読んでからまとめる
+    archive_state = get_archive_state(session)
+    selects = []
+    if search.start_date is None or search.start_date < archive_state.archiving_before:
+        selects.append(build_cash_flow_search(CashFlowArchive, search, limit))
+    if search.end_date is None or search.end_date > archive_state.archived_before:
+        selects.append(build_cash_flow_search(CashFlow, search, limit))
+
+    if len(selects) == 1:
+        return list(session.execute(selects[0]))
+
+    # 移動中は同じ行が両方から返ることがあるので、UNION で1件にする
+    merged = union(*(select(branch.subquery()) for branch in selects)).subquery()
+    sort_column = merged.c.amount if search.sort_by_amount else merged.c.recorded_at
+    if search.descending:
+        order_by = (sort_column.desc(), merged.c.id.desc())
+    else:
+        order_by = (sort_column, merged.c.id)
+    result: Result = session.execute(select(merged).order_by(*order_by).limit(limit))
+    return list(result)
+
+
+def get_daily_totals_in_range(
+    session: Session, start_date: date, end_date: date
+) -> list[Row]:
+    # 日付・種別ごとの基準通貨での金額の合計 (recorded_at, type, amount) を1回のクエリで取得する
+    # 行に保存した換算額（base_amount）を足すので、作成・更新・削除で月別集計や日別の累積和に
+    # 加減した値と一致する（今のレートで換算し直さない）
+    # アーカイブとまたぐ場合は、それぞれで日付・種別ごとに集計した結果を UNION ALL でまとめる
+    archive_state = get_archive_state(session)
+    selects = []
+    if start_date < archive_state.archiving_before:
+        selects.append(
+            select(
+                CashFlowArchive.recorded_at,
+                CashFlowArchive.type,
+                func.sum(CashFlowArchive.base_amount).label("amount"),
+            )
+            .where(CashFlowArchive.recorded_at >= start_date, CashFlowArchive.recorded_at < end_date)
+            .group_by(CashFlowArchive.recorded_at, CashFlowArchive.type)
+        )
+    if end_date > archive_state.archived_before:
+        selects.append(
+            select(
+                CashFlow.recorded_at,
+                CashFlow.type,
+                func.sum(CashFlow.base_amount).label("amount"),
+            )
+            .where(CashFlow.recorded_at >= start_date, CashFlow.recorded_at < end_date)
+            .where(CashFlow.deleted_at.is_(None))
+            .group_by(CashFlow.recorded_at, CashFlow.type)
+        )
+
+    if len(selects) == 1:
+        result: Result = session.execute(selects[0])
+        return list(result)
+
+    grouped = union_all(*selects).subquery()
+    # 移動中は同じ日付の行が両方から返ることがあるので、ここで加算する
+    stmt = select(
+        grouped.c.recorded_at,
+        grouped.c.type,
+        func.sum(grouped.c.amount).label("amount"),
+    ).group_by(grouped.c.recorded_at, grouped.c.type)
+    result = session.execute(stmt)
+    return list(result)
+
+
+def _lock_cash_flows(stmt: Select, for_update: bool) -> Select:
+    if not for_update:
+        return stmt.where(CashFlow.deleted_at.is_(None))
+    # 論理削除済みかどうかはロックを取った後の値で確かめるので、条件に入れずに id だけで行をロックする
+    # セッションに読み込み済みの行も、ロックを取った後の値で上書きする
+    return stmt.with_for_update().execution_options(populate_existing=True)
+
+
+def get_cash_flow_by_id(
+    session: Session, cash_flow_id: int, for_update: bool = False
+) -> CashFlow | None:
+    # for_update なら行ロックを取って読む（更新・削除の差分を、ロックを取った後の値から作るため）
+    result: Result = session.execute(
+        _lock_cash_flows(select(CashFlow).where(CashFlow.id == cash_flow_id), for_update)
+    )
+
+    # scalars()で結果をオブジェクトとして取得し、first()で最初の1件を返す
+    # 対応するTaskが存在しない場合は None を返す
+    cash_flow = result.scalars().first()
+    # ロックを待つ間に論理削除されていたら、見つからなかったものとして扱う
+    if cash_flow is None or cash_flow.deleted_at is not None:
+        return None
+    return cash_flow
+
+
+def get_cash_flows_by_ids(
+    session: Session,
+    cash_flow_ids: Iterable[int],
+    chunk_size: int = IN_CHUNK_SIZE,
+    for_update: bool = False,
+) -> dict[int, CashFlow | CashFlowArchive]:
+    # 複数の id をまとめて取得する（1件ずつ get_cash_flow_by_id を呼ぶと id の数だけクエリが走る）
+    # 見つかったものだけを id をキーにして返すので、並び順や見つからない id は呼び出し側で扱う
+    # 重複した id は1回だけ問い合わせる
+    # for_update なら cash_flows の行はロックを取って読む。書き込み同士がデッドロックしないよう、id 順に取る
+    # （アーカイブの行は変更できないのでロックしない）
+    remaining = list(dict.fromkeys(cash_flow_ids))
+    if for_update:
+        remaining.sort()
+    cash_flows: dict[int, CashFlow | CashFlowArchive] = {}
+
+    for start in range(0, len(remaining), chunk_size):
+        chunk = remaining[start : start + chunk_size]
+        result: Result = session.execute(
+            _lock_cash_flows(
+                select(CashFlow).where(CashFlow.id.in_(chunk)).order_by(CashFlow.id), for_update
+            )
+        )
+        # ロックを待つ間に論理削除された行も含め、削除済みの行は返さない
+        cash_flows.update(
+            (cash_flow.id, cash_flow)
+            for cash_flow in result.scalars()
+            if cash_flow.deleted_at is None
+        )
+
+    # 見つからなかった id は、締めた期間としてアーカイブに移動しているかもしれない
+    remaining = [cash_flow_id for cash_flow_id in remaining if cash_flow_id not in cash_flows]
+    for start in range(0, len(remaining), chunk_size):
+        chunk = remaining[start : start + chunk_size]
+        result = session.execute(select(CashFlowArchive).where(CashFlowArchive.id.in_(chunk)))
+        cash_flows.update((cash_flow.id, cash_flow) for cash_flow in result.scalars())
+
+    return cash_flows
+
+
+def get_latest_sync_version(session: Session) -> int:
+    # 利用者のデータの最新のバージョン（削除済みの行も含む）。利用者・バージョンのインデックスだけで求まる
+    result: Result = session.execute(select(func.max(CashFlow.sync_version)))
+    return result.scalar_one() or 0
+
+
+def get_sync_versions_since(session: Session, since: int) -> list[int]:
+    # since より新しい変更があった行のバージョン（削除済みの行も含む）
+    result: Result = session.execute(
+        select(CashFlow.sync_version).where(CashFlow.sync_version > since)
+    )
+    return list(result.scalars())
+
+
+def get_cash_flows_changed_since(
+    session: Session, since: int, limit: int, include_deleted: bool = True
 ) -> list[CashFlow]:
+    # sync_version のインデックスを使って、トークンより新しい変更だけを古い順に取得する
     stmt = (
-        # CashFlow テーブル（モデル）を対象にした SELECT クエリを作成
         select(CashFlow)
-        # recorded_at が start_date 以上（＝月初以降）を指定
-        # recorded_at が end_date 未満（＝翌月の月初より前）を指定
-        .where(CashFlow.recorded_at >= month_start_date, CashFlow.recorded_at < next_month_start_date)
+        .where(CashFlow.sync_version > since)
+        .order_by(CashFlow.sync_version)
+        .limit(limit)
     )
-    # 型は Result（SQLAlchemy の「結果セット」を表すオブジェクト）。
-    # SQLAlchemy で組み立てた stmt（SQL文の設計図）を、実際にデータベースに送って実行する
+    if not include_deleted:
+        stmt = stmt.where(CashFlow.deleted_at.is_(None))
     result: Result = session.execute(stmt)
-
-    # scalars() がなかったら → Row のリストが返ってくる
-    # result.scalars() で 1行の中の「一番左のカラム（= CashFlow オブジェクト）」だけを取り出してくれる
     return list(result.scalars())
 
-def get_cash_flow_by_id(session: Session, cash_flow_id: int) -> CashFlow | None:
+
+def get_cash_flow_tombstones(
+    session: Session, deleted_before: datetime, limit: int
+) -> list[tuple[int, int, int]]:
+    # 削除から一定期間が経ったトゥームストーンの (id, user_id, sync_version) を取得する
     result: Result = session.execute(
-        select(CashFlow).where(CashFlow.id == cash_flow_id)
+        select(CashFlow.id, CashFlow.user_id, CashFlow.sync_version)
+        .where(CashFlow.deleted_at.is_not(None), CashFlow.deleted_at < deleted_before)
+        .order_by(CashFlow.id)
+        .limit(limit)
     )
+    return [(row.id, row.user_id, row.sync_version) for row in result]
 
-    # scalars()で結果をオブジェクトとして取得し、first()で最初の1件を返す
-    # 対応するTaskが存在しない場合は None を返す
-    return result.scalars().first()
+
+def delete_cash_flows_by_ids(session: Session, cash_flow_ids: list[int]) -> None:
+    # トゥームストーンの物理削除用。通常の削除 API は deleted_at を立てる論理削除を使う
+    session.execute(delete(CashFlow).where(CashFlow.id.in_(cash_flow_ids)))
+
+
+def insert_cash_flows(session: Session, rows: list[dict]) -> dict[int, int]:
+    # 複数行をまとめて INSERT し、sync_version → 採番された id の対応を返す
+    # MySQL は RETURNING を使えないので、行ごとに異なる sync_version で読み直して対応付ける
+    if not rows:
+        return {}
+    # ORM の Session.add と違って before_flush を通らないので、利用者はここで入れる
+    user_id = get_session_user_id(session)
+    # executemany なので、ドライバーが複数行の INSERT にまとめて送る
+    session.execute(insert(CashFlow), [{**row, "user_id": user_id} for row in rows])
+
+    sync_versions = [row["sync_version"] for row in rows]
+    result: Result = session.execute(
+        select(CashFlow.id, CashFlow.sync_version).where(
+            CashFlow.sync_version >= min(sync_versions),
+            CashFlow.sync_version <= max(sync_versions),
+        )
+    )
+    return {row.sync_version: row.id for row in result}
+
+
+def update_cash_flows(session: Session, rows: list[dict]) -> None:
+    # 主キー（id）ごとに異なる値で更新する。同じ列の組み合わせの行は executemany の1回の UPDATE にまとめる
+    # 論理削除も id・sync_version・deleted_at の更新としてここで行う
+    if rows:
+        session.execute(update(CashFlow), rows)
+
+
+def get_existing_content_hashes(
+    session: Session, content_hashes: Iterable[str], chunk_size: int = IN_CHUNK_SIZE
+) -> set[str]:
+    # 渡した指紋のうち、既に登録されている行があるもの
+    # 1行ずつ問い合わせず、利用者・指紋のインデックスに対する IN 句のクエリ数回で済ませる
+    # 削除した行は指紋を消しているので、行を読まずにインデックスだけで判定できる
+    remaining = list(dict.fromkeys(content_hashes))
+    existing: set[str] = set()
+    for start in range(0, len(remaining), chunk_size):
+        chunk = remaining[start : start + chunk_size]
+        result: Result = session.execute(
+            select(CashFlow.content_hash).distinct().where(CashFlow.content_hash.in_(chunk))
+        )
+        existing.update(result.scalars())
+    return existing
+
+
+def get_duplicate_cash_flows(session: Session, limit: int) -> list[CashFlow]:
+    # 同じ指紋の行が2件以上あるまとまりを、指紋の順に limit 件分返す（まとまりの中は id の順）
+    # 指紋の集計は利用者・指紋のインデックスだけで済み、行を読むのは重複している分だけ
+    duplicated = (
+        select(CashFlow.content_hash)
+        .where(CashFlow.content_hash.is_not(None))
+        .group_by(CashFlow.content_hash)
+        .having(func.count() > 1)
+        .order_by(CashFlow.content_hash)
+        .limit(limit)
+        .subquery()
+    )
+    result: Result = session.execute(
+        select(CashFlow)
+        .where(CashFlow.content_hash.in_(select(duplicated.c.content_hash)))
+        .order_by(CashFlow.content_hash, CashFlow.id)
+    )
+    return list(result.scalars())
+
+
+def get_cash_flows_without_content_hash(session: Session, after_id: int, limit: int) -> list[Row]:
+    # 指紋を計算していない有効な行の (id, recorded_at, amount, type, currency, title) を id の順に limit 件
+    result: Result = session.execute(
+        select(
+            CashFlow.id,
+            CashFlow.recorded_at,
+            CashFlow.amount,
+            CashFlow.type,
+            CashFlow.currency,
+            CashFlow.title,
+        )
+        .where(
+            CashFlow.content_hash.is_(None), CashFlow.deleted_at.is_(None), CashFlow.id > after_id
+        )
+        .order_by(CashFlow.id)
+        .limit(limit)
+    )
+    return list(result)
 
 
-    
+def set_cash_flow_content_hashes(session: Session, rows: Iterable[dict]) -> None:
+    # 主キーごとに指紋を設定する（{"id": ..., "content_hash": ...}）。executemany の1回の UPDATE にまとめる
+    # 読んだ後に更新・削除された行は、その時点で指紋が入る（消える）ので上書きしない
+    rows = list(rows)
+    if rows:
+        session.execute(
+            update(CashFlow)
+            .where(CashFlow.content_hash.is_(None), CashFlow.deleted_at.is_(None))
+            .execution_options(synchronize_session=False),
+            rows,
+        )
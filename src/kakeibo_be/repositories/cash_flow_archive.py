@@ -0,0 +1,97 @@
+from datetime import date
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState, CashFlowArchive
+
+CASH_FLOW_ARCHIVE = "cash_flows"
+
+# アーカイブ側へそのままコピーする列
+_ARCHIVE_COLUMNS = [
+    "id",
+    "amount",
+    "currency",
+    "base_amount",
+    "title",
+    "type",
+    "recorded_at",
+    "created_at",
+    "updated_at",
+    "sync_version",
+    "recurring_cash_flow_id",
+    "user_id",
+    "category_id",
+]
+
+
+def get_archive_state(session: Session, for_share: bool = False) -> ArchiveState:
+    stmt = select(ArchiveState).where(ArchiveState.name == CASH_FLOW_ARCHIVE)
+    if for_share:
+        # 書き込み側は共有ロックで読むことで、境界の変更とすれ違わないようにする
+        stmt = stmt.with_for_update(read=True)
+    result: Result = session.execute(stmt)
+    return result.scalars().one()
+
+
+def is_closed_period(session: Session, recorded_at: date) -> bool:
+    return recorded_at < get_archive_state(session, for_share=True).archiving_before
+
+
+def get_archived_cash_flow_by_id(session: Session, cash_flow_id: int) -> CashFlowArchive | None:
+    result: Result = session.execute(
+        select(CashFlowArchive).where(CashFlowArchive.id == cash_flow_id)
+    )
+    return result.scalars().first()
+
+
+def start_archiving(session: Session, archive_before: date) -> None:
+    # 移動を始める前に締めの境界を進めて、対象期間への書き込みを止める
+    session.execute(
+        update(ArchiveState)
+        .where(
+            ArchiveState.name == CASH_FLOW_ARCHIVE,
+            ArchiveState.archiving_before < archive_before,
+        )
+        .values(archiving_before=archive_before)
+    )
+
+
+def finish_archiving(session: Session, archive_before: date) -> None:
+    session.execute(
+        update(ArchiveState)
+        .where(ArchiveState.name == CASH_FLOW_ARCHIVE)
+        .values(archived_before=archive_before)
+    )
+
+
+def move_cash_flows_to_archive(session: Session, archive_before: date, limit: int) -> int:
+    # id 順に limit 件ずつ、アーカイブへのコピーと元の行の削除を同じトランザクションで行う
+    # 論理削除済みの行はトゥームストーンの削除に任せて移動しない
+    cash_flow_ids = list(
+        session.execute(
+            select(CashFlow.id)
+            .where(CashFlow.recorded_at < archive_before, CashFlow.deleted_at.is_(None))
+            .order_by(CashFlow.id)
+            .limit(limit)
+        ).scalars()
+    )
+    if not cash_flow_ids:
+        return 0
+
+    session.execute(
+        insert(CashFlowArchive).from_select(
+            _ARCHIVE_COLUMNS,
+            select(*[getattr(CashFlow, column) for column in _ARCHIVE_COLUMNS]).where(
+                CashFlow.id.in_(cash_flow_ids)
+            ),
+        )
+    )
+    session.execute(
+        delete(CashFlow)
+        .where(CashFlow.id.in_(cash_flow_ids))
+        .execution_options(synchronize_session=False)
+    )
+    return len(cash_flow_ids)
@@ -0,0 +1,162 @@
+from collections.abc import Iterable
+from datetime import date
+
+from sqlalchemy import Row, Subquery, desc, func, select, union_all, update
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from kakeibo_be.logic.categorize.match_category_rule import CategoryRuleItem
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import CashFlowArchive
+from kakeibo_be.models.db.category import Category, CategoryRule
+from kakeibo_be.repositories.cash_flow import IN_CHUNK_SIZE
+from kakeibo_be.repositories.cash_flow_archive import get_archive_state
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+
+def get_categories(session: Session) -> list[Category]:
+    result: Result = session.execute(select(Category).order_by(Category.name))
+    return list(result.scalars())
+
+
+def get_category_by_id(session: Session, category_id: int) -> Category | None:
+    result: Result = session.execute(select(Category).where(Category.id == category_id))
+    return result.scalars().first()
+
+
+def get_existing_category_ids(
+    session: Session, category_ids: Iterable[int], chunk_size: int = IN_CHUNK_SIZE
+) -> set[int]:
+    # 渡した id のうち、カテゴリがあるもの（他の利用者のカテゴリは含まない）
+    remaining = list(dict.fromkeys(category_ids))
+    existing: set[int] = set()
+    for start in range(0, len(remaining), chunk_size):
+        chunk = remaining[start : start + chunk_size]
+        result: Result = session.execute(select(Category.id).where(Category.id.in_(chunk)))
+        existing.update(result.scalars())
+    return existing
+
+
+def get_category_by_name(session: Session, name: str) -> Category | None:
+    result: Result = session.execute(select(Category).where(Category.name == name))
+    return result.scalars().first()
+
+
+def get_category_rule_items(session: Session) -> list[CategoryRuleItem]:
+    # 作成順に返す（同じ priority のルールは先に作ったものが優先）
+    result: Result = session.execute(
+        select(CategoryRule.category_id, CategoryRule.keyword, CategoryRule.priority).order_by(
+            CategoryRule.id
+        )
+    )
+    return [CategoryRuleItem(*row) for row in result]
+
+
+def get_category_rule_user_ids(session: Session) -> list[int]:
+    result: Result = session.execute(
+        select(CategoryRule.user_id).distinct().order_by(CategoryRule.user_id)
+    )
+    return list(result.scalars())
+
+
+def _select_cash_flows_in_range(
+    session: Session, start_date: date, end_date: date, cash_flow_type: CashFlowType
+) -> Subquery:
+    # 期間・種別に当てはまる (category_id, title, base_amount) を、
+    # アーカイブとまたぐ場合は UNION ALL でまとめる
+    # 集計はこの副問い合わせに対して DB の中で行い、行そのものはアプリに持ってこない
+    archive_state = get_archive_state(session)
+    selects = []
+    if start_date < archive_state.archiving_before:
+        selects.append(
+            select(
+                CashFlowArchive.category_id,
+                CashFlowArchive.title,
+                CashFlowArchive.base_amount,
+            )
+            .where(
+                CashFlowArchive.recorded_at >= start_date, CashFlowArchive.recorded_at < end_date
+            )
+            .where(CashFlowArchive.type == cash_flow_type)
+        )
+    if end_date > archive_state.archived_before:
+        selects.append(
+            select(
+                CashFlow.category_id,
+                CashFlow.title,
+                CashFlow.base_amount,
+            )
+            .where(CashFlow.recorded_at >= start_date, CashFlow.recorded_at < end_date)
+            .where(CashFlow.type == cash_flow_type)
+            .where(CashFlow.deleted_at.is_(None))
+        )
+    if len(selects) == 1:
+        return selects[0].subquery()
+    return union_all(*selects).subquery()
+
+
+def get_category_breakdown(
+    session: Session, start_date: date, end_date: date, cash_flow_type: CashFlowType
+) -> list[Row]:
+    # カテゴリごとの (category_id, name, amount, count) を基準通貨での金額の大きい順に返す
+    # （未分類は category_id が None）
+    # 金額は行に保存した換算額の合計で、月別集計・予算と同じ値になる
+    cash_flows = _select_cash_flows_in_range(session, start_date, end_date, cash_flow_type)
+    amount = func.sum(cash_flows.c.base_amount).label("amount")
+    stmt = (
+        select(cash_flows.c.category_id, Category.name, amount, func.count().label("count"))
+        .outerjoin(Category, Category.id == cash_flows.c.category_id)
+        .group_by(cash_flows.c.category_id, Category.name)
+        .order_by(desc(amount), cash_flows.c.category_id)
+    )
+    result: Result = session.execute(stmt)
+    return list(result)
+
+
+def get_top_titles(
+    session: Session, start_date: date, end_date: date, cash_flow_type: CashFlowType, limit: int
+) -> list[Row]:
+    # 基準通貨での金額の合計が大きいタイトル（支払先）の上位 limit 件の (title, amount, count)
+    # 並べ替えと件数の絞り込みも DB で行い、上位の行だけを受け取る
+    cash_flows = _select_cash_flows_in_range(session, start_date, end_date, cash_flow_type)
+    amount = func.sum(cash_flows.c.base_amount).label("amount")
+    stmt = (
+        select(cash_flows.c.title, amount, func.count().label("count"))
+        .group_by(cash_flows.c.title)
+        .order_by(desc(amount), cash_flows.c.title)
+        .limit(limit)
+    )
+    result: Result = session.execute(stmt)
+    return list(result)
+
+
+def get_uncategorized_cash_flows(
+    session: Session, model: type[CashFlow] | type[CashFlowArchive], after_id: int, limit: int
+) -> list[Row]:
+    # 未分類の行の (id, title) を id 順に limit 件。after_id より後から読むことで、
+    # ルールに当てはまらず未分類のまま残る行を何度も読み直さない
+    stmt = (
+        select(model.id, model.title)
+        .where(model.category_id.is_(None), model.id > after_id)
+        .order_by(model.id)
+        .limit(limit)
+    )
+    if model is CashFlow:
+        stmt = stmt.where(CashFlow.deleted_at.is_(None))
+    result: Result = session.execute(stmt)
+    return list(result)
+
+
+def set_uncategorized_cash_flow_categories(
+    session: Session, model: type[CashFlow] | type[CashFlowArchive], rows: Iterable[dict]
+) -> None:
+    # 主キーごとに分類を設定する（{"id": ..., "category_id": ..., ...}）。executemany の1回の UPDATE にまとめる
+    # 読んだ後に利用者が分類した行は、上書きしないよう未分類の行だけを対象にする
+    rows = list(rows)
+    if rows:
+        session.execute(
+            update(model)
+            .where(model.category_id.is_(None))
+            .execution_options(synchronize_session=False),
+            rows,
+        )
@@ -0,0 +1,40 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.fx_rate import FxRate
+
+
+def get_effective_fx_rate(session: Session, currency: str, on_date: date) -> Decimal | None:
+    # on_date 以前で最も新しいレート。主キー（通貨, 日付）のインデックスを逆順に1件読むだけ
+    result: Result = session.execute(
+        select(FxRate.rate)
+        .where(FxRate.currency == currency, FxRate.rate_date <= on_date)
+        .order_by(FxRate.rate_date.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def upsert_fx_rates(session: Session, rows: list[dict]) -> None:
+    # {"currency": ..., "rate_date": ..., "rate": ...} をまとめて登録する（同じ日付があれば上書き）
+    if rows:
+        session.execute(_build_upsert(session.get_bind().dialect.name, rows))
+
+
+def _build_upsert(dialect_name: str, rows: list[dict]) -> Insert:
+    if dialect_name == "sqlite":
+        sqlite_stmt = sqlite.insert(FxRate).values(rows)
+        return sqlite_stmt.on_conflict_do_update(
+            index_elements=list(FxRate.__table__.primary_key),
+            set_={"rate": sqlite_stmt.excluded.rate, "updated_at": sqlite_stmt.excluded.updated_at},
+        )
+
+    mysql_stmt = mysql.insert(FxRate).values(rows)
+    return mysql_stmt.on_duplicate_key_update(
+        rate=mysql_stmt.inserted.rate, updated_at=mysql_stmt.inserted.updated_at
+    )
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Date,
+    Insert,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import CashFlowArchive
+from kakeibo_be.models.db.monthly_total import ALL_TITLES, MonthlyTotal
+from kakeibo_be.models.db.tenant import get_session_user_id
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+
+class MonthlyTotalDelta(NamedTuple):
+    recorded_at: date
+    type: CashFlowType
+    title: str
+    # 加算する金額と件数（取り消す場合は負の値）
+    amount: int
+    count: int
+
+
+def add_monthly_total_deltas(session: Session, deltas: Iterable[MonthlyTotalDelta]) -> None:
+    # セッションの利用者の集計に加算する
+    user_id = get_session_user_id(session)
+    # 同じ月・種別・タイトルの差分はまとめてから、1回の upsert で反映する
+    merged: dict[tuple[date, CashFlowType, str], list[int]] = defaultdict(lambda: [0, 0])
+    for delta in deltas:
+        month = delta.recorded_at.replace(day=1)
+        # タイトルごとの行と、タイトルを問わない集計行の両方に加算する
+        for title in (delta.title, ALL_TITLES):
+            merged[(month, delta.type, title)][0] += delta.amount
+            merged[(month, delta.type, title)][1] += delta.count
+
+    rows = [
+        {
+            "user_id": user_id,
+            "month": month,
+            "type": cash_flow_type,
+            "title": title,
+            "amount": amount,
+            "count": count,
+        }
+        for (month, cash_flow_type, title), (amount, count) in merged.items()
+        if amount != 0 or count != 0
+    ]
+    if not rows:
+        return
+
+    session.execute(_build_upsert(session.get_bind().dialect.name, rows))
+
+
+def _build_upsert(dialect_name: str, rows: list[dict]) -> Insert:
+    # すでに行があれば金額と件数を足し込む。書き方がデータベースごとに違う
+    if dialect_name == "sqlite":
+        # INSERT ... ON CONFLICT (主キー) DO UPDATE
+        sqlite_stmt = sqlite.insert(MonthlyTotal).values(rows)
+        return sqlite_stmt.on_conflict_do_update(
+            index_elements=list(MonthlyTotal.__table__.primary_key),
+            set_={
+                "amount": MonthlyTotal.amount + sqlite_stmt.excluded.amount,
+                "count": MonthlyTotal.count + sqlite_stmt.excluded.count,
+            },
+        )
+
+    # INSERT ... ON DUPLICATE KEY UPDATE
+    mysql_stmt = mysql.insert(MonthlyTotal).values(rows)
+    return mysql_stmt.on_duplicate_key_update(
+        amount=MonthlyTotal.amount + mysql_stmt.inserted.amount,
+        count=MonthlyTotal.count + mysql_stmt.inserted.count,
+    )
+
+
+def rebuild_monthly_totals(connection: Connection) -> int:
+    # 全利用者の月別集計を、cash_flows（論理削除した行を除く）と cash_flows_archive から作り直す
+    # 差分での加算を通さずに行を入れた後（スナップショットの読み込みなど）に使う
+    # 加算するときと同じく、行に保存した換算額（base_amount）を合計する
+    # 全利用者が対象なので、利用者で絞り込むセッションではなく接続で実行する
+    # 月ごとにまとめるところまで DB で行い、作った行の数を返す
+    dialect_name = connection.dialect.name
+    ledger = union_all(
+        *(
+            select(
+                model.user_id,
+                _get_month_start(dialect_name, model.recorded_at).label("month"),
+                model.type,
+                model.title,
+                model.base_amount,
+            ).where(*([model.deleted_at.is_(None)] if model is CashFlow else []))
+            for model in (CashFlow, CashFlowArchive)
+        )
+    ).subquery()
+    keys = [ledger.c.user_id, ledger.c.month, ledger.c.type]
+    amount = func.sum(ledger.c.base_amount)
+    count = func.count()
+
+    connection.execute(delete(MonthlyTotal.__table__))
+    row_count = 0
+    # タイトルごとの行と、タイトルを問わない集計行
+    for stmt in (
+        select(*keys, ledger.c.title, amount, count).group_by(*keys, ledger.c.title),
+        select(*keys, literal(ALL_TITLES), amount, count).group_by(*keys),
+    ):
+        result = connection.execute(
+            insert(MonthlyTotal.__table__).from_select(
+                ["user_id", "month", "type", "title", "amount", "count"], stmt
+            )
+        )
+        row_count += result.rowcount
+    return row_count
+
+
+def _get_month_start(dialect_name: str, recorded_at: ColumnElement) -> ColumnElement:
+    # 日付をその月の1日にする式。書き方がデータベースごとに違う
+    if dialect_name == "sqlite":
+        return func.date(recorded_at, "start of month", type_=Date)
+    return func.date_format(recorded_at, "%Y-%m-01", type_=Date)
+
+
+def get_monthly_totals_in_range(
+    session: Session, start_month: date, end_month: date
+) -> list[MonthlyTotal]:
+    # タイトルを問わない集計行だけを月・種別の順に取得する
+    result: Result = session.execute(
+        select(MonthlyTotal)
+        .where(
+            MonthlyTotal.month >= start_month,
+            MonthlyTotal.month < end_month,
+            MonthlyTotal.title == ALL_TITLES,
+        )
+        .order_by(MonthlyTotal.month, MonthlyTotal.type)
+    )
+    return list(result.scalars())
@@ -0,0 +1,30 @@
+from sqlalchemy import select
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from kakeibo_be.logic.calculate.calculate_period import CALENDAR_MONTH, PeriodDefinition
+from kakeibo_be.models.db.period_setting import PeriodSetting
+
+
+def get_period_setting(session: Session) -> PeriodSetting | None:
+    # 利用者ごとに1行（主キーの検索だけ）
+    result: Result = session.execute(select(PeriodSetting))
+    return result.scalars().first()
+
+
+def get_period_definition(session: Session) -> PeriodDefinition:
+    setting = get_period_setting(session)
+    if setting is None:
+        return CALENDAR_MONTH
+    return PeriodDefinition(kind=setting.kind, start_day=setting.start_day)
+
+
+def save_period_definition(session: Session, definition: PeriodDefinition) -> PeriodSetting:
+    setting = get_period_setting(session)
+    if setting is None:
+        setting = PeriodSetting(kind=definition.kind, start_day=definition.start_day)
+        session.add(setting)
+    else:
+        setting.kind = definition.kind
+        setting.start_day = definition.start_day
+    return setting
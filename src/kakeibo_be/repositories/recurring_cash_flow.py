@@ -0,0 +1,141 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.currency import BASE_CURRENCY
+from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.logic.calculate.calculate_recurrence import get_occurrence_dates
+from kakeibo_be.logic.deduplicate.calculate_content_hash import calculate_content_hash
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.recurring_cash_flow import RecurringCashFlow, RecurringMaterializedMonth
+from kakeibo_be.models.db.tenant import get_session_user_id
+from kakeibo_be.repositories.cash_flow_archive import is_closed_period
+from kakeibo_be.repositories.monthly_total import MonthlyTotalDelta, add_monthly_total_deltas
+from kakeibo_be.repositories.sync_sequence import allocate_sync_versions
+
+
+def get_recurring_cash_flows(session: Session) -> list[RecurringCashFlow]:
+    result: Result = session.execute(select(RecurringCashFlow).order_by(RecurringCashFlow.id))
+    return list(result.scalars())
+
+
+def get_recurring_cash_flow_user_ids(session: Session) -> list[int]:
+    # バッチ用。繰り返しのルールを持つ利用者の一覧（利用者で絞り込んでいないセッションで呼ぶ）
+    result: Result = session.execute(
+        select(RecurringCashFlow.user_id).distinct().order_by(RecurringCashFlow.user_id)
+    )
+    return list(result.scalars())
+
+
+def get_recurring_cash_flow_by_id(
+    session: Session, recurring_cash_flow_id: int
+) -> RecurringCashFlow | None:
+    result: Result = session.execute(
+        select(RecurringCashFlow).where(RecurringCashFlow.id == recurring_cash_flow_id)
+    )
+    return result.scalars().first()
+
+
+def is_recurring_month_materialized(session: Session, month_start_date: date) -> bool:
+    # 主キーの検索だけなので、展開済みの月では毎回のリクエストでもほぼコストがかからない
+    key = {"user_id": get_session_user_id(session), "month": month_start_date}
+    return session.get(RecurringMaterializedMonth, key) is not None
+
+
+def reset_recurring_materialized_months(session: Session, from_month_start_date: date) -> None:
+    # ルールを追加したときに、展開済みの月も次に表示されたときに再度展開させる
+    # 既に作成済みの発生分は一意制約と存在チェックで重複しない
+    session.execute(
+        delete(RecurringMaterializedMonth).where(
+            RecurringMaterializedMonth.month >= from_month_start_date
+        )
+    )
+
+
+def materialize_recurring_cash_flows(session: Session, month_start_date: date) -> int:
+    # 先に展開済みの印を入れる
+    # 同じ月を同時に展開しようとした別のトランザクションはこの行のロックで待たされ、
+    # こちらのコミット後に IntegrityError になるので、二重に展開されることはない
+    session.add(RecurringMaterializedMonth(month=month_start_date))
+    session.flush()
+
+    # 締めてアーカイブした（している）月には作成しない
+    if is_closed_period(session, month_start_date):
+        return 0
+
+    next_month_start_date = month_start_date + relativedelta(months=1)
+    rules = list(
+        session.execute(
+            select(RecurringCashFlow).where(
+                RecurringCashFlow.start_date < next_month_start_date,
+                or_(
+                    RecurringCashFlow.end_date.is_(None),
+                    RecurringCashFlow.end_date >= month_start_date,
+                ),
+            )
+        ).scalars()
+    )
+    if not rules:
+        return 0
+
+    # 作成済みの発生分（論理削除したものも含む）は作り直さない
+    existing = {
+        (row.recurring_cash_flow_id, row.recorded_at)
+        for row in session.execute(
+            select(CashFlow.recurring_cash_flow_id, CashFlow.recorded_at).where(
+                CashFlow.recurring_cash_flow_id.is_not(None),
+                CashFlow.recorded_at >= month_start_date,
+                CashFlow.recorded_at < next_month_start_date,
+            )
+        )
+    }
+    occurrences = [
+        (rule, recorded_at)
+        for rule in rules
+        for recorded_at in get_occurrence_dates(
+            frequency=rule.frequency,
+            start_date=rule.start_date,
+            end_date=rule.end_date,
+            month_start_date=month_start_date,
+        )
+        if (rule.id, recorded_at) not in existing
+    ]
+    if not occurrences:
+        return 0
+
+    # 件数分のバージョンをまとめて採番し、1回の複数行 INSERT で登録する
+    last_version = allocate_sync_versions(session, count=len(occurrences))
+    first_version = last_version - len(occurrences) + 1
+    now = get_now()
+    rows = [
+        {
+            "title": rule.title,
+            "type": rule.type,
+            "recorded_at": recorded_at,
+            "amount": rule.amount,
+            # 繰り返しの収支は基準通貨で登録する
+            "base_amount": rule.amount,
+            "recurring_cash_flow_id": rule.id,
+            "content_hash": calculate_content_hash(
+                recorded_at, rule.amount, rule.type, BASE_CURRENCY, rule.title
+            ),
+            # ORM を通さない INSERT なので、利用者は明示的に入れる
+            "user_id": rule.user_id,
+            "sync_version": first_version + i,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i, (rule, recorded_at) in enumerate(occurrences)
+    ]
+    session.execute(insert(CashFlow).values(rows))
+    add_monthly_total_deltas(
+        session,
+        [
+            MonthlyTotalDelta(recorded_at, rule.type, rule.title, rule.amount, 1)
+            for rule, recorded_at in occurrences
+        ],
+    )
+    return len(rows)
@@ -0,0 +1,155 @@
+from sqlalchemy import Connection, Insert, bindparam, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.sync_sequence import SyncSequence
+from kakeibo_be.models.db.tenant import get_session_user_id
+
+CASH_FLOW_SEQUENCE = "cash_flows"
+# 利用者ごとに分ける前の、全体で1つだった値を残す行の user_id（マイグレーションで入れる）
+LEGACY_SYNC_USER_ID = 0
+
+
+def allocate_sync_versions(session: Session, count: int = 1, user_id: int | None = None) -> int:
+    # 利用者（省略時はセッションの利用者）の行を UPDATE で行ロックし、commit まで保持する
+    # → 利用者ごとに採番順とコミット順が一致するので、トークンより古い変更が後からコミットされることはない
+    # ロックは利用者ごとの行なので、別の利用者の書き込みは待たせない
+    if user_id is None:
+        user_id = get_session_user_id(session)
+    if _increment_last_value(session, user_id, count) == 0:
+        # 初めて書き込む利用者は行を作ってから採番する
+        _insert_missing_sequence(session, user_id)
+        _increment_last_value(session, user_id, count)
+    # 採番した範囲の最後の値を返す（count 件なら last_value - count + 1 〜 last_value）
+    return get_current_sync_version(session, user_id)
+
+
+def get_current_sync_version(session: Session, user_id: int | None = None) -> int:
+    return _get_sequence_values(session, user_id)[0]
+
+
+def get_purged_sync_version(session: Session, user_id: int | None = None) -> int:
+    return _get_sequence_values(session, user_id)[1]
+
+
+def advance_purged_sync_version(
+    session: Session, purged_value: int, user_id: int | None = None
+) -> None:
+    # 値が巻き戻らないように、今より大きいときだけ更新する
+    if user_id is None:
+        user_id = get_session_user_id(session)
+    _insert_missing_sequence(session, user_id)
+    session.execute(
+        update(SyncSequence)
+        .where(
+            SyncSequence.name == CASH_FLOW_SEQUENCE,
+            SyncSequence.user_id == user_id,
+            SyncSequence.purged_value < purged_value,
+        )
+        .values(purged_value=purged_value)
+    )
+
+
+def advance_last_sync_versions(connection: Connection, last_values: dict[int, int]) -> None:
+    # 利用者ごとの {user_id: バージョン} まで採番を進める（差分での採番を通さずに行を入れた後に使う）
+    # 全利用者が対象なので、利用者で絞り込むセッションではなく接続で実行する
+    if not last_values:
+        return
+    table = SyncSequence.__table__
+    existing_user_ids = set(
+        connection.execute(
+            select(table.c.user_id).where(
+                table.c.name == CASH_FLOW_SEQUENCE, table.c.user_id.in_(last_values)
+            )
+        ).scalars()
+    )
+    legacy_last_value, legacy_purged_value = _get_legacy_values(connection)
+    missing = [
+        {
+            "name": CASH_FLOW_SEQUENCE,
+            "user_id": user_id,
+            "last_value": max(last_value, legacy_last_value),
+            "purged_value": legacy_purged_value,
+        }
+        for user_id, last_value in last_values.items()
+        if user_id not in existing_user_ids
+    ]
+    if missing:
+        connection.execute(table.insert(), missing)
+    existing = [
+        {"target_user_id": user_id, "target_value": last_value}
+        for user_id, last_value in last_values.items()
+        if user_id in existing_user_ids
+    ]
+    if existing:
+        connection.execute(
+            table.update()
+            .where(
+                table.c.name == CASH_FLOW_SEQUENCE,
+                table.c.user_id == bindparam("target_user_id"),
+                table.c.last_value < bindparam("target_value"),
+            )
+            .values(last_value=bindparam("target_value")),
+            existing,
+        )
+
+
+def _increment_last_value(session: Session, user_id: int, count: int) -> int:
+    # 更新した行数（行がまだなければ 0）
+    result = session.execute(
+        update(SyncSequence)
+        .where(SyncSequence.name == CASH_FLOW_SEQUENCE, SyncSequence.user_id == user_id)
+        .values(last_value=SyncSequence.last_value + count)
+    )
+    return result.rowcount
+
+
+def _get_sequence_values(session: Session, user_id: int | None) -> tuple[int, int]:
+    # (last_value, purged_value)。利用者の行がまだなければ、行を作る時の初期値と同じ全体の値
+    if user_id is None:
+        user_id = get_session_user_id(session)
+    row = session.execute(
+        select(SyncSequence.last_value, SyncSequence.purged_value)
+        .where(
+            SyncSequence.name == CASH_FLOW_SEQUENCE,
+            SyncSequence.user_id.in_([user_id, LEGACY_SYNC_USER_ID]),
+        )
+        .order_by(SyncSequence.user_id == LEGACY_SYNC_USER_ID)
+        .limit(1)
+    ).first()
+    return (0, 0) if row is None else (row.last_value, row.purged_value)
+
+
+def _get_legacy_values(connection: Connection | Session) -> tuple[int, int]:
+    row = connection.execute(
+        select(SyncSequence.last_value, SyncSequence.purged_value).where(
+            SyncSequence.name == CASH_FLOW_SEQUENCE,
+            SyncSequence.user_id == LEGACY_SYNC_USER_ID,
+        )
+    ).first()
+    return (0, 0) if row is None else (row.last_value, row.purged_value)
+
+
+def _insert_missing_sequence(session: Session, user_id: int) -> None:
+    # 利用者の行を全体の値から作る。同時に作られていれば何もしない
+    last_value, purged_value = _get_legacy_values(session)
+    row = {
+        "name": CASH_FLOW_SEQUENCE,
+        "user_id": user_id,
+        "last_value": last_value,
+        "purged_value": purged_value,
+    }
+    session.execute(_build_insert_ignore(session.get_bind().dialect.name, row))
+
+
+def _build_insert_ignore(dialect_name: str, row: dict) -> Insert:
+    # すでに行があれば何もしない。書き方がデータベースごとに違う
+    if dialect_name == "sqlite":
+        # INSERT ... ON CONFLICT (主キー) DO NOTHING
+        return sqlite.insert(SyncSequence).values(row).on_conflict_do_nothing(
+            index_elements=list(SyncSequence.__table__.primary_key)
+        )
+
+    # INSERT ... ON DUPLICATE KEY UPDATE で、既存の行を同じ値のまま残す
+    mysql_stmt = mysql.insert(SyncSequence).values(row)
+    return mysql_stmt.on_duplicate_key_update(last_value=SyncSequence.last_value)
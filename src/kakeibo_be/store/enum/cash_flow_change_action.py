@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class CashFlowChangeAction(Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class CashFlowOperationType(Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
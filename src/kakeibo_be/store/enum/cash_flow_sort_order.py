@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class CashFlowSortOrder(Enum):
+    # 同じ値の行は id の順（DESC なら id の降順）
+    RECORDED_AT_ASC = "recorded_at_asc"
+    RECORDED_AT_DESC = "recorded_at_desc"
+    AMOUNT_ASC = "amount_asc"
+    AMOUNT_DESC = "amount_desc"
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class DuplicatePolicy(Enum):
+    # 重複を調べずに作成する
+    ALLOW = "allow"
+    # 同じ内容の行があれば作成しない
+    SKIP = "skip"
+    # 作成したうえで、重複していることを結果で知らせる
+    FLAG = "flag"
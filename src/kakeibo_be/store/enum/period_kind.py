@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class PeriodKind(Enum):
+    # 毎月 start_day 日から翌月の start_day 日の前日まで（給料日で区切る場合など）
+    MONTHLY = "monthly"
+    # 毎週 start_day 曜日（0 = 月曜日）から7日間
+    WEEKLY = "weekly"
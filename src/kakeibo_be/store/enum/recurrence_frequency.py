@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class RecurrenceFrequency(Enum):
+    MONTHLY = "monthly"
+    WEEKLY = "weekly"
+    YEARLY = "yearly"
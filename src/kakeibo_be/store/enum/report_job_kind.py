@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class ReportJobKind(Enum):
+    # 期間内の CashFlow を CSV で出力する
+    CASH_FLOWS_CSV = "cash_flows_csv"
+    # 期間内の月ごとの収入・支出の合計を JSON で出力する
+    MONTHLY_SUMMARY = "monthly_summary"
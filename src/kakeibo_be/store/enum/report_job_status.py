@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class ReportJobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
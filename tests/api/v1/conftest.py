@@ -5,6 +5,8 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from kakeibo_be.caches.fx_rate import FxRateCache, get_fx_rate_cache
+from kakeibo_be.indexes.daily_totals import DailyTotalIndex, get_daily_total_index
 from kakeibo_be.main import app
 from kakeibo_be.models.db.base import get_db
 
@@ -26,6 +28,13 @@ def client(db_session: Session) -> Generator[TestClient]:
     # 「通常の get_db」を「override_get_db」に差し替える
     # これにより API の処理はこの db_session を使ってDB操作を行う
     app.dependency_overrides[get_db] = override_get_db
+    # 日別の累積和のインデックスはプロセスで共有されるので、テストごとに空のものに差し替える
+    # （テストのたびに DB は巻き戻り、同じバージョンが再び採番されるため）
+    daily_total_index = DailyTotalIndex(enabled=True, max_bytes=1024 * 1024, max_pending=1000)
+    app.dependency_overrides[get_daily_total_index] = lambda: daily_total_index
+    # 為替レートのキャッシュも、巻き戻したテストのレートが残らないよう空のものに差し替える
+    fx_rate_cache = FxRateCache(max_entries=100, ttl_seconds=3600)
+    app.dependency_overrides[get_fx_rate_cache] = lambda: fx_rate_cache
 
     # FastAPI のアプリに対して HTTP リクエストを送れるテスト用クライアントを作成
     client = TestClient(app)
@@ -0,0 +1,114 @@
+from fastapi.testclient import TestClient
+
+
+def create_expense(client: TestClient, title: str, recorded_at: str, amount: int) -> int:
+    body = {"title": title, "type": "expense", "recordedAt": recorded_at, "amount": amount}
+    return client.post("/api/v1/cash-flows", json=body).json()["id"]
+
+
+def test_create_budget(client: TestClient) -> None:
+    body = {"month": "2025-12-15", "title": "食費", "amount": 30000}
+
+    response = client.post("/api/v1/budgets", json=body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["id"]
+    # 月の途中の日付でも月初に丸められる
+    assert result["month"] == "2025-12-01"
+    assert result["title"] == "食費"
+    assert result["amount"] == 30000
+
+
+def test_create_budget_duplicated(client: TestClient) -> None:
+    body = {"month": "2025-12-01", "amount": 30000}
+    client.post("/api/v1/budgets", json=body)
+
+    response = client.post("/api/v1/budgets", json=body)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Budget already exists!"
+
+
+def test_get_budgets(client: TestClient) -> None:
+    client.post("/api/v1/budgets", json={"month": "2025-12-01", "amount": 1000})
+    client.post("/api/v1/budgets", json={"month": "2025-12-01", "title": "食費", "amount": 500})
+    client.post("/api/v1/budgets", json={"month": "2025-12-01", "title": "日用品", "amount": 500})
+
+    create_expense(client, "食費", "2025-12-01", 300)
+    create_expense(client, "食費", "2025-12-20", 400)
+    create_expense(client, "交通費", "2025-12-05", 200)
+    # 別の月・収入は実績に含まれない
+    create_expense(client, "食費", "2025-11-30", 999)
+    client.post(
+        "/api/v1/cash-flows",
+        json={"title": "給料", "type": "income", "recordedAt": "2025-12-25", "amount": 9999},
+    )
+
+    response = client.get("/api/v1/budgets", params={"target_month": "2025-12-01"})
+
+    assert response.status_code == 200
+    result = {item["title"]: item for item in response.json()}
+    assert result[None]["actualAmount"] == 900
+    assert result[None]["remainingAmount"] == 100
+    assert result[None]["isOverBudget"] is False
+    assert result["食費"]["actualAmount"] == 700
+    assert result["食費"]["remainingAmount"] == -200
+    assert result["食費"]["isOverBudget"] is True
+    assert result["日用品"]["actualAmount"] == 0
+    assert result["日用品"]["isOverBudget"] is False
+
+
+def test_get_budgets_after_update_and_delete(client: TestClient) -> None:
+    client.post("/api/v1/budgets", json={"month": "2025-12-01", "title": "食費", "amount": 500})
+    first_id = create_expense(client, "食費", "2025-12-01", 300)
+    second_id = create_expense(client, "食費", "2025-12-02", 400)
+
+    # 更新で別の月へ移動したもの・削除したものは実績から外れる
+    client.put(
+        f"/api/v1/cash-flows/{first_id}",
+        json={"title": "食費", "type": "expense", "recordedAt": "2026-01-01", "amount": 300},
+    )
+    client.delete(f"/api/v1/cash-flows/{second_id}")
+    create_expense(client, "食費", "2025-12-03", 100)
+
+    result = client.get("/api/v1/budgets", params={"target_month": "2025-12-01"}).json()
+
+    assert result[0]["actualAmount"] == 100
+    assert result[0]["remainingAmount"] == 400
+
+
+def test_delete_budget(client: TestClient) -> None:
+    budget_id = client.post("/api/v1/budgets", json={"month": "2025-12-01", "amount": 1}).json()[
+        "id"
+    ]
+
+    response = client.delete(f"/api/v1/budgets/{budget_id}")
+    assert response.status_code == 204
+
+    response = client.delete(f"/api/v1/budgets/{budget_id}")
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Budget not found!"
+
+
+def test_budgets_are_scoped_by_user(client: TestClient) -> None:
+    other_user = {"X-User-Id": "2"}
+    client.post("/api/v1/budgets", json={"month": "2025-12-01", "amount": 1000})
+    # 同じ月・タイトルの予算でも、利用者が違えば作成できる
+    response = client.post(
+        "/api/v1/budgets", json={"month": "2025-12-01", "amount": 2000}, headers=other_user
+    )
+    assert response.status_code == 200
+
+    create_expense(client, "食費", "2025-12-01", 300)
+    client.post(
+        "/api/v1/cash-flows",
+        json={"title": "食費", "type": "expense", "recordedAt": "2025-12-01", "amount": 50},
+        headers=other_user,
+    )
+
+    # 実績も利用者ごとの集計から計算される
+    response = client.get(
+        "/api/v1/budgets", params={"target_month": "2025-12-01"}, headers=other_user
+    )
+    assert [(item["amount"], item["actualAmount"]) for item in response.json()] == [(2000, 50)]
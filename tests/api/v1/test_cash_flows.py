@@ -1,10 +1,28 @@
 from datetime import date
+from decimal import Decimal
 
 from fastapi.testclient import TestClient
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
+from kakeibo_be.api.v1.cash_flows import cash_flow_group_committer, get_cash_flow_group_committer
+from kakeibo_be.caches.fx_rate import get_fx_rate_cache
+from kakeibo_be.main import app
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.monthly_total import ALL_TITLES, MonthlyTotal
+from kakeibo_be.pubsub.broker import InMemoryChangeBroker, get_change_broker
+from kakeibo_be.pubsub.cash_flow_change import CashFlowChangeEvent
+from kakeibo_be.repositories.cash_flow_archive import (
+    finish_archiving,
+    move_cash_flows_to_archive,
+    start_archiving,
+)
+from kakeibo_be.repositories.sync_sequence import advance_purged_sync_version
+from kakeibo_be.store.enum.cash_flow_change_action import CashFlowChangeAction
 from tests.conftest import RollbackTracker
 from tests.factories.cash_flow import create_cash_flow
+from tests.factories.category import create_category
+from tests.factories.fx_rate import create_fx_rate
 
 
  # ----------------------------------------
@@ -282,4 +300,630 @@ def test_delete_cash_flow_error(client_with_commit_error: TestClient,
     result = response.json()
     assert rollback_tracker.called
     assert response.status_code == 500
-    assert result["detail"] == "システムエラーが発生しました。"
\ No newline at end of file
+    assert result["detail"] == "システムエラーが発生しました。"
+
+def test_delete_cash_flow_hidden_from_list(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(year=2025, month=12, day=1))
+
+    response = client.delete("/api/v1/cash-flows/1")
+    assert response.status_code == 204
+
+    # 論理削除されたデータは一覧にも更新対象にも出てこない
+    response = client.get("/api/v1/cash-flows", params={"target_month": "2025-12-01"})
+    assert response.json() == []
+    response = client.delete("/api/v1/cash-flows/1")
+    assert response.status_code == 422
+
+
+def test_get_cash_flow_changes(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, title="りんご")
+    create_cash_flow(db_session, id=2, title="ぶどう")
+
+    # since なしは全件同期
+    response = client.get("/api/v1/cash-flows/changes")
+    assert response.status_code == 200
+    result = response.json()
+    assert [item["id"] for item in result["upserted"]] == [1, 2]
+    assert result["deletedIds"] == []
+    assert result["hasMore"] is False
+    assert result["resetRequired"] is False
+    token = result["token"]
+
+    # 変更がなければ空で、トークンは変わらない
+    result = client.get("/api/v1/cash-flows/changes", params={"since": token}).json()
+    assert result["upserted"] == []
+    assert result["deletedIds"] == []
+    assert result["token"] == token
+
+    body = {"title": "もも", "type": "income", "recordedAt": "2025-12-01", "amount": 400}
+    client.put("/api/v1/cash-flows/1", json=body)
+    client.delete("/api/v1/cash-flows/2")
+
+    # 前回のトークン以降の更新と削除だけが返り、トークンは単調に増える
+    result = client.get("/api/v1/cash-flows/changes", params={"since": token}).json()
+    assert [item["id"] for item in result["upserted"]] == [1]
+    assert result["upserted"][0]["title"] == "もも"
+    assert result["deletedIds"] == [2]
+    assert result["token"] > token
+
+
+def test_get_cash_flow_changes_paging(client: TestClient, db_session: Session) -> None:
+    for i in range(1, 6):
+        create_cash_flow(db_session, id=i)
+
+    ids = []
+    token = None
+    while True:
+        params = {"limit": 2} if token is None else {"limit": 2, "since": token}
+        result = client.get("/api/v1/cash-flows/changes", params=params).json()
+        ids.extend(item["id"] for item in result["upserted"])
+        token = result["token"]
+        if not result["hasMore"]:
+            break
+
+    assert ids == [1, 2, 3, 4, 5]
+
+
+def test_get_cash_flow_changes_reset_required(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1)
+    token = client.get("/api/v1/cash-flows/changes").json()["token"]
+
+    # トークンより新しいトゥームストーンが削除済みになった状態を作る
+    advance_purged_sync_version(db_session, purged_value=token + 1, user_id=1)
+    db_session.commit()
+
+    result = client.get("/api/v1/cash-flows/changes", params={"since": token}).json()
+    assert result["resetRequired"] is True
+    assert [item["id"] for item in result["upserted"]] == [1]
+
+
+def test_get_cash_flow_changes_purged_by_other_user(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1)
+    token = client.get("/api/v1/cash-flows/changes").json()["token"]
+
+    # 別の利用者のトゥームストーンを削除しても、全件同期にはならない
+    advance_purged_sync_version(db_session, purged_value=token + 100, user_id=2)
+    db_session.commit()
+
+    result = client.get("/api/v1/cash-flows/changes", params={"since": token}).json()
+    assert result["resetRequired"] is False
+    assert result["upserted"] == []
+
+
+class RecordingBroker(InMemoryChangeBroker):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: list[CashFlowChangeEvent] = []
+
+    def publish(self, event: CashFlowChangeEvent) -> None:
+        self.events.append(event)
+        super().publish(event)
+
+
+def test_cash_flow_changes_are_published(client: TestClient, db_session: Session) -> None:
+    broker = RecordingBroker()
+    app.dependency_overrides[get_change_broker] = lambda: broker
+
+    body = {"title": "もも", "type": "expense", "recordedAt": "2025-12-01", "amount": 200}
+    cash_flow_id = client.post("/api/v1/cash-flows", json=body).json()["id"]
+    client.put(f"/api/v1/cash-flows/{cash_flow_id}", json={**body, "recordedAt": "2026-01-05"})
+    client.delete(f"/api/v1/cash-flows/{cash_flow_id}")
+
+    assert [event.action for event in broker.events] == [
+        CashFlowChangeAction.CREATED,
+        CashFlowChangeAction.UPDATED,
+        CashFlowChangeAction.DELETED,
+    ]
+    assert broker.events[0].item.title == "もも"
+    assert broker.events[1].previous_recorded_at == date(year=2025, month=12, day=1)
+    assert broker.events[2].item is None
+    # トークンは通知の順に増えていく
+    versions = [event.sync_version for event in broker.events]
+    assert versions == sorted(versions)
+
+
+def test_cash_flow_changes_are_not_published_on_error(
+    client_with_commit_error: TestClient,
+) -> None:
+    broker = RecordingBroker()
+    app.dependency_overrides[get_change_broker] = lambda: broker
+
+    body = {"title": "もも", "type": "expense", "recordedAt": "2025-12-01", "amount": 200}
+    response = client_with_commit_error.post("/api/v1/cash-flows", json=body)
+
+    assert response.status_code == 500
+    assert broker.events == []
+
+
+def test_create_cash_flow_group_commit(client: TestClient, db_session: Session) -> None:
+    app.dependency_overrides[get_cash_flow_group_committer] = lambda: cash_flow_group_committer
+    broker = RecordingBroker()
+    app.dependency_overrides[get_change_broker] = lambda: broker
+
+    body = {"title": "もも", "type": "expense", "recordedAt": "2025-12-01", "amount": 200}
+    first = client.post("/api/v1/cash-flows", json=body)
+    second = client.post(
+        "/api/v1/cash-flows", json={**body, "amount": 300}, headers={"X-User-Id": "2"}
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.json()["amount"] == 200
+    assert second.json()["id"] != first.json()["id"]
+    cash_flows = db_session.scalars(select(CashFlow).order_by(CashFlow.id)).all()
+    assert [(cash_flow.user_id, cash_flow.amount) for cash_flow in cash_flows] == [
+        (1, 200),
+        (2, 300),
+    ]
+    assert cash_flows[0].content_hash is not None
+    # 月別集計と通知も、1件ずつコミットした場合と同じ
+    monthly_total = db_session.scalars(
+        select(MonthlyTotal).where(MonthlyTotal.user_id == 2, MonthlyTotal.title == ALL_TITLES)
+    ).one()
+    assert (monthly_total.amount, monthly_total.count) == (300, 1)
+    assert [event.cash_flow_id for event in broker.events] == [
+        cash_flow.id for cash_flow in cash_flows
+    ]
+    assert [event.sync_version for event in broker.events] == [
+        cash_flow.sync_version for cash_flow in cash_flows
+    ]
+
+
+def test_cash_flow_in_closed_period(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2023, 12, 1))
+    create_cash_flow(db_session, id=2, recorded_at=date(2024, 1, 1))
+    start_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    move_cash_flows_to_archive(session=db_session, archive_before=date(2024, 1, 1), limit=100)
+    finish_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    db_session.commit()
+
+    body = {
+        "title": "もも",
+        "type": "expense",
+        "recordedAt": "2023-12-01",
+        "amount": 200,
+    }
+
+    # 締めた期間への作成、締めた期間への移動、アーカイブ済みの行の更新・削除はできない
+    response = client.post("/api/v1/cash-flows", json=body)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "CashFlow in closed period!"
+
+    response = client.put("/api/v1/cash-flows/2", json=body)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "CashFlow in closed period!"
+
+    response = client.put("/api/v1/cash-flows/1", json={**body, "recordedAt": "2024-01-02"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "CashFlow in closed period!"
+
+    response = client.delete("/api/v1/cash-flows/1")
+    assert response.status_code == 422
+    assert response.json()["detail"] == "CashFlow in closed period!"
+
+    # 一覧はアーカイブ側から読める
+    response = client.get("/api/v1/cash-flows", params={"target_month": "2023-12-01"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [1]
+
+
+def test_cash_flows_are_scoped_by_user(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, title="もも", recorded_at=date(2025, 12, 1))
+    create_cash_flow(db_session, id=2, title="みかん", recorded_at=date(2025, 12, 1), user_id=2)
+    headers = {"X-User-Id": "2"}
+
+    # 一覧・差分同期には自分のデータだけが返る
+    response = client.get("/api/v1/cash-flows", params={"target_month": "2025-12-01"}, headers=headers)
+    assert [item["id"] for item in response.json()] == [2]
+    response = client.get("/api/v1/cash-flows/changes", headers=headers)
+    assert [item["id"] for item in response.json()["upserted"]] == [2]
+
+    # 他の利用者のデータは存在しないものとして扱う
+    body = {"title": "もも", "type": "expense", "recordedAt": "2025-12-01", "amount": 400}
+    response = client.put("/api/v1/cash-flows/1", json=body, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "CashFlow not found!"
+
+    # 作成したデータはリクエストの利用者のものになる
+    response = client.post("/api/v1/cash-flows", json=body, headers=headers)
+    assert response.status_code == 200
+    response = client.get("/api/v1/cash-flows", params={"target_month": "2025-12-01"})
+    assert [item["id"] for item in response.json()] == [1]
+
+
+def test_lookup_cash_flows(client: TestClient, db_session: Session) -> None:
+    for i in range(1, 5):
+        create_cash_flow(db_session, id=i, title=f"もも_{i}", recorded_at=date(2025, 12, i))
+    create_cash_flow(db_session, id=5, user_id=2)
+
+    response = client.post("/api/v1/cash-flows/lookup", json={"ids": [3, 1, 9, 5, 3, 2]})
+
+    # リクエストの順に返し、見つからない id（他の利用者のものを含む）は missingIds で返す
+    assert response.status_code == 200
+    result = response.json()
+    assert [item["id"] for item in result["items"]] == [3, 1, 2]
+    assert result["items"][0] == {
+        "id": 3,
+        "title": "もも_3",
+        "type": "expense",
+        "recordedAt": "2025-12-03",
+        "amount": 200,
+        "currency": "JPY",
+        "categoryId": None,
+    }
+    assert result["missingIds"] == [9, 5]
+
+
+def test_lookup_cash_flows_too_many_ids(client: TestClient) -> None:
+    response = client.post("/api/v1/cash-flows/lookup", json={"ids": list(range(1, 5002))})
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/cash-flows/lookup", json={"ids": []})
+    assert response.status_code == 422
+
+
+def test_sync_cash_flows(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, title="もも", recorded_at=date(2025, 12, 1), amount=100)
+    create_cash_flow(db_session, id=2, title="みかん", recorded_at=date(2025, 12, 2), amount=300)
+    broker = RecordingBroker()
+    app.dependency_overrides[get_change_broker] = lambda: broker
+    values = {"type": "expense", "recordedAt": "2025-12-10"}
+    operations = [
+        {"op": "create", "tempId": "a", "title": "りんご", "amount": 500, **values},
+        {"op": "create", "tempId": "b", "title": "ぶどう", "amount": 700, **values},
+        # 一時的な id で、同じリクエストで作成した行を更新・削除できる
+        {"op": "update", "tempId": "a", "title": "りんご", "amount": 600, **values},
+        {"op": "delete", "tempId": "b"},
+        {"op": "update", "id": 1, "title": "もも", "amount": 150, **values},
+        {"op": "update", "id": 1, "title": "もも", "amount": 200, **values},
+        {"op": "delete", "id": 2},
+        # 反映できない操作はエラーになり、他の操作はそのまま反映される
+        {"op": "delete", "id": 2},
+        {"op": "update", "id": 99, "title": "なし", "amount": 1, **values},
+        {"op": "create", "tempId": "a", "title": "重複", "amount": 1, **values},
+    ]
+
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+
+    assert response.status_code == 200
+    result = response.json()
+    new_id = result["idMap"]["a"]
+    assert list(result["idMap"]) == ["a"]
+    assert [(r["index"], r["id"], r["applied"], r["error"]) for r in result["results"]] == [
+        (0, new_id, True, None),
+        (1, None, True, None),
+        (2, new_id, True, None),
+        (3, None, True, None),
+        (4, 1, True, None),
+        (5, 1, True, None),
+        (6, 2, True, None),
+        (7, 2, False, "CashFlow not found!"),
+        (8, 99, False, "CashFlow not found!"),
+        (9, None, False, "Duplicate tempId!"),
+    ]
+
+    rows = db_session.execute(select(CashFlow).order_by(CashFlow.id)).scalars().all()
+    assert [(row.id, row.title, row.amount, row.deleted_at is None) for row in rows] == [
+        (1, "もも", 200, True),
+        (2, "みかん", 300, False),
+        (new_id, "りんご", 600, True),
+    ]
+    assert rows[2].user_id == 1
+    # 変更した行にはそれぞれ異なるバージョンが採番される
+    assert len({row.sync_version for row in rows}) == 3
+
+    # 月別集計には変更前の値の取り消しと最終的な値だけが反映される
+    # （factory で作った行は集計に入っていないので、-100 - 300 + 200 + 600 の差分だけになる）
+    total = db_session.execute(
+        select(MonthlyTotal).where(
+            MonthlyTotal.month == date(2025, 12, 1), MonthlyTotal.title == ALL_TITLES
+        )
+    ).scalar_one()
+    assert (total.amount, total.count) == (400, 0)
+
+    assert [(event.action, event.cash_flow_id) for event in broker.events] == [
+        (CashFlowChangeAction.CREATED, new_id),
+        (CashFlowChangeAction.UPDATED, 1),
+        (CashFlowChangeAction.DELETED, 2),
+    ]
+    assert broker.events[1].previous_recorded_at == date(2025, 12, 1)
+
+
+def test_sync_cash_flows_in_closed_period(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2023, 12, 1))
+    create_cash_flow(db_session, id=2, recorded_at=date(2024, 1, 1))
+    start_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    move_cash_flows_to_archive(session=db_session, archive_before=date(2024, 1, 1), limit=100)
+    finish_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    db_session.commit()
+    values = {"title": "もも", "type": "expense", "amount": 200}
+    operations = [
+        {"op": "create", "tempId": "a", "recordedAt": "2023-12-01", **values},
+        {"op": "delete", "id": 1},
+        {"op": "update", "id": 2, "recordedAt": "2023-12-31", **values},
+        {"op": "update", "id": 2, "recordedAt": "2024-02-01", **values},
+    ]
+
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+
+    assert [r["error"] for r in response.json()["results"]] == [
+        "CashFlow in closed period!",
+        "CashFlow in closed period!",
+        "CashFlow in closed period!",
+        None,
+    ]
+
+
+def test_sync_cash_flows_invalid_operation(client: TestClient) -> None:
+    # update / delete は id か tempId のどちらか一方が必要
+    operations = [{"op": "delete", "id": 1, "tempId": "a"}]
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+    assert response.status_code == 422
+
+    operations = [{"op": "create", "tempId": "a", "title": "もも"}]
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+    assert response.status_code == 422
+
+
+def test_sync_cash_flows_error(
+    client_with_commit_error: TestClient, rollback_tracker: RollbackTracker
+) -> None:
+    operations = [
+        {
+            "op": "create",
+            "tempId": "a",
+            "title": "もも",
+            "type": "expense",
+            "recordedAt": "2025-12-01",
+            "amount": 200,
+        }
+    ]
+    response = client_with_commit_error.post(
+        "/api/v1/cash-flows/sync", json={"operations": operations}
+    )
+
+    assert response.status_code == 500
+    assert rollback_tracker.called
+
+
+def test_cash_flow_category(client: TestClient, db_session: Session) -> None:
+    category = create_category(db_session, name="食費")
+    other_user_category = create_category(db_session, name="食費", user_id=2)
+    body = {"title": "もも", "type": "expense", "recordedAt": "2025-12-01", "amount": 200}
+
+    response = client.post("/api/v1/cash-flows", json={**body, "categoryId": category.id})
+    assert response.status_code == 200
+    assert response.json()["categoryId"] == category.id
+    cash_flow_id = response.json()["id"]
+
+    # 省略した場合は分類を変えない
+    response = client.put(f"/api/v1/cash-flows/{cash_flow_id}", json={**body, "amount": 300})
+    assert response.json()["categoryId"] == category.id
+
+    # 他の利用者のカテゴリは指定できない
+    response = client.put(
+        f"/api/v1/cash-flows/{cash_flow_id}", json={**body, "categoryId": other_user_category.id}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Category not found!"
+
+    # null で未分類に戻す
+    response = client.put(f"/api/v1/cash-flows/{cash_flow_id}", json={**body, "categoryId": None})
+    assert response.json()["categoryId"] is None
+
+
+def test_sync_cash_flows_category(client: TestClient, db_session: Session) -> None:
+    category = create_category(db_session, name="食費")
+    other_category = create_category(db_session, name="日用品")
+    other_user_category = create_category(db_session, name="食費", user_id=2)
+    create_cash_flow(db_session, id=1, title="もも", recorded_at=date(2025, 12, 1))
+    create_cash_flow(db_session, id=2, title="みかん", recorded_at=date(2025, 12, 1))
+    db_session.execute(update(CashFlow).where(CashFlow.id == 2).values(category_id=category.id))
+    db_session.commit()
+    values = {"type": "expense", "recordedAt": "2025-12-10", "amount": 200}
+    other_user = {"categoryId": other_user_category.id}
+    operations = [
+        {"op": "create", "tempId": "a", "title": "りんご", "categoryId": category.id, **values},
+        {"op": "create", "tempId": "b", "title": "ぶどう", **values},
+        {"op": "update", "id": 1, "title": "もも", "categoryId": other_category.id, **values},
+        # 省略した場合は分類を変えず、null で未分類に戻す
+        {"op": "update", "id": 2, "title": "みかん", **values},
+        {"op": "update", "tempId": "a", "title": "りんご", "categoryId": None, **values},
+        # 他の利用者のカテゴリは指定できない
+        {"op": "create", "tempId": "c", "title": "なし", **other_user, **values},
+        {"op": "update", "id": 2, "title": "みかん", **other_user, **values},
+    ]
+
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [r["error"] for r in result["results"]] == [None] * 5 + ["Category not found!"] * 2
+    rows = db_session.execute(select(CashFlow).order_by(CashFlow.id)).scalars().all()
+    assert [(row.title, row.category_id) for row in rows] == [
+        ("もも", other_category.id),
+        ("みかん", category.id),
+        ("りんご", None),
+        ("ぶどう", None),
+    ]
+
+
+def test_cash_flow_currency(client: TestClient, db_session: Session) -> None:
+    create_fx_rate(db_session, currency="USD", rate_date=date(2025, 12, 1), rate=Decimal("1.5"))
+    body = {"title": "本", "type": "expense", "recordedAt": "2025-12-10", "amount": 1001}
+
+    response = client.post("/api/v1/cash-flows", json={**body, "currency": "USD"})
+    assert response.status_code == 200
+    assert response.json()["currency"] == "USD"
+    cash_flow_id = response.json()["id"]
+
+    # 省略した場合は通貨を変えない
+    response = client.put(f"/api/v1/cash-flows/{cash_flow_id}", json={**body, "amount": 2000})
+    assert response.json()["currency"] == "USD"
+
+    # 月別集計には基準通貨に換算した金額が入る（1001 × 1.5 を取り消して 2000 × 1.5 を加算）
+    total = db_session.execute(
+        select(MonthlyTotal).where(
+            MonthlyTotal.month == date(2025, 12, 1), MonthlyTotal.title == ALL_TITLES
+        )
+    ).scalar_one()
+    assert (total.amount, total.count) == (3000, 1)
+
+    # レートのない通貨・日付は登録できない
+    response = client.post("/api/v1/cash-flows", json={**body, "currency": "EUR"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "FX rate not found!"
+    response = client.post(
+        "/api/v1/cash-flows", json={**body, "recordedAt": "2025-11-30", "currency": "USD"}
+    )
+    assert response.status_code == 422
+    response = client.post("/api/v1/cash-flows", json={**body, "currency": "usd"})
+    assert response.status_code == 422
+
+    operations = [
+        {"op": "create", "tempId": "a", "currency": "USD", **body},
+        {"op": "create", "tempId": "b", "currency": "EUR", **body},
+        {"op": "update", "id": cash_flow_id, **body},
+    ]
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+    assert [r["error"] for r in response.json()["results"]] == [None, "FX rate not found!", None]
+    db_session.expire_all()
+    total = db_session.execute(
+        select(MonthlyTotal).where(
+            MonthlyTotal.month == date(2025, 12, 1), MonthlyTotal.title == ALL_TITLES
+        )
+    ).scalar_one()
+    # 1001 × 1.5 = 1501.5 → 1502 が2件
+    assert (total.amount, total.count) == (3004, 2)
+
+
+def test_cash_flow_reverses_stored_base_amount(client: TestClient, db_session: Session) -> None:
+    create_fx_rate(db_session, currency="USD", rate_date=date(2025, 12, 1), rate=Decimal("1.5"))
+    body = {"title": "本", "type": "expense", "recordedAt": "2025-12-10", "amount": 1000}
+    ids = [
+        client.post("/api/v1/cash-flows", json={**body, "currency": "USD"}).json()["id"]
+        for _ in range(3)
+    ]
+    # 登録した後でレートが変わっても、取り消すのは加算した時の換算額（1000 × 1.5）
+    create_fx_rate(db_session, currency="USD", rate_date=date(2025, 12, 5), rate=Decimal("2"))
+    app.dependency_overrides[get_fx_rate_cache]().invalidate("USD")
+
+    def get_total() -> tuple[int, int]:
+        db_session.expire_all()
+        total = db_session.execute(
+            select(MonthlyTotal).where(
+                MonthlyTotal.month == date(2025, 12, 1), MonthlyTotal.title == ALL_TITLES
+            )
+        ).scalar_one()
+        return total.amount, total.count
+
+    assert get_total() == (4500, 3)
+    client.delete(f"/api/v1/cash-flows/{ids[0]}")
+    assert get_total() == (3000, 2)
+    # 変更後の値は今のレートで換算する
+    client.put(f"/api/v1/cash-flows/{ids[1]}", json={**body, "amount": 500})
+    assert get_total() == (2500, 2)
+    operations = [
+        {"op": "update", "id": ids[2], **body},
+        {"op": "delete", "id": ids[1]},
+    ]
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+    assert [r["applied"] for r in response.json()["results"]] == [True, True]
+    assert get_total() == (2000, 1)
+    assert db_session.get(CashFlow, ids[2]).base_amount == 2000
+
+
+def test_sync_cash_flows_duplicates(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, title="Amazon", recorded_at=date(2025, 12, 1), amount=100)
+    values = {"type": "expense", "recordedAt": "2025-12-01", "amount": 100}
+    operations = [
+        # 表記ゆれは同じ内容とみなす
+        {"op": "create", "tempId": "a", "title": "ＡＭＡＺＯＮ", **values},
+        {"op": "create", "tempId": "b", "title": "もも", **values},
+        # 同じリクエストで先に作成した行とも照らし合わせる
+        {"op": "create", "tempId": "c", "title": "もも", **values},
+        {"op": "create", "tempId": "d", "title": "もも", **{**values, "amount": 101}},
+    ]
+
+    response = client.post(
+        "/api/v1/cash-flows/sync", json={"operations": operations, "onDuplicate": "skip"}
+    )
+    results = response.json()["results"]
+    assert [(r["applied"], r["error"], r["duplicate"]) for r in results] == [
+        (False, "Duplicate CashFlow!", True),
+        (True, None, False),
+        (False, "Duplicate CashFlow!", True),
+        (True, None, False),
+    ]
+
+    operations = [{"op": "create", "tempId": "e", "title": "もも", **values}]
+    response = client.post(
+        "/api/v1/cash-flows/sync", json={"operations": operations, "onDuplicate": "flag"}
+    )
+    assert [(r["applied"], r["duplicate"]) for r in response.json()["results"]] == [(True, True)]
+
+    # 省略した場合は調べない
+    response = client.post("/api/v1/cash-flows/sync", json={"operations": operations})
+    assert [(r["applied"], r["duplicate"]) for r in response.json()["results"]] == [(True, False)]
+
+
+def test_get_duplicate_cash_flow_clusters(client: TestClient, db_session: Session) -> None:
+    body = {"title": "もも", "type": "expense", "recordedAt": "2025-12-01", "amount": 100}
+    ids = [client.post("/api/v1/cash-flows", json=body).json()["id"] for _ in range(3)]
+    other_id = client.post("/api/v1/cash-flows", json={**body, "amount": 200}).json()["id"]
+    create_cash_flow(db_session, title="もも", recorded_at=date(2025, 12, 1), amount=100, user_id=2)
+
+    response = client.get("/api/v1/cash-flows/duplicates")
+    assert response.status_code == 200
+    clusters = response.json()["clusters"]
+    assert [[item["id"] for item in cluster["items"]] for cluster in clusters] == [ids]
+
+    # 削除した行は重複として数えない。更新すると指紋も変わる
+    client.delete(f"/api/v1/cash-flows/{ids[0]}")
+    client.put(f"/api/v1/cash-flows/{other_id}", json=body)
+    response = client.get("/api/v1/cash-flows/duplicates")
+    clusters = response.json()["clusters"]
+    assert [[item["id"] for item in cluster["items"]] for cluster in clusters] == [
+        [*ids[1:], other_id]
+    ]
+
+
+def test_search_cash_flows(client: TestClient, db_session: Session) -> None:
+    for i in range(1, 6):
+        create_cash_flow(db_session, id=i, title=f"ランチ{i}", recorded_at=date(2025, 1, i), amount=i * 100)
+    create_cash_flow(db_session, id=6, title="家賃", recorded_at=date(2025, 1, 25), amount=80000)
+    params = {
+        "startDate": "2025-01-01",
+        "endDate": "2025-02-01",
+        "type": "expense",
+        "minAmount": 200,
+        "title": "ランチ",
+        "sort": "amount_desc",
+        "limit": 2,
+    }
+
+    response = client.get("/api/v1/cash-flows/search", params=params)
+    assert response.status_code == 200
+    result = response.json()
+    assert [item["id"] for item in result["items"]] == [5, 4]
+    assert result["nextCursor"] == "400_4"
+
+    response = client.get("/api/v1/cash-flows/search", params={**params, "cursor": result["nextCursor"]})
+    result = response.json()
+    assert [item["id"] for item in result["items"]] == [3, 2]
+    assert result["items"][0]["recordedAt"] == "2025-01-03"
+    # 条件に合う行はこれで最後
+    assert result["nextCursor"] is None
+
+
+def test_search_cash_flows_invalid(client: TestClient) -> None:
+    response = client.get(
+        "/api/v1/cash-flows/search", params={"sort": "amount_asc", "cursor": "2025-01-01_3"}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Invalid cursor!"
+
+    response = client.get("/api/v1/cash-flows/search", params={"minAmount": 500, "maxAmount": 100})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "minAmount must not be greater than maxAmount!"
+
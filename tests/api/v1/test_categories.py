@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from tests.factories.category import create_category
+
+
+def test_create_category(client: TestClient) -> None:
+    response = client.post("/api/v1/categories", json={"name": "食費"})
+
+    assert response.status_code == 200
+    category_id = response.json()["id"]
+    response = client.get("/api/v1/categories")
+    assert response.json() == [{"id": category_id, "name": "食費"}]
+
+
+def test_create_category_duplicate(client: TestClient, db_session: Session) -> None:
+    create_category(db_session, name="食費")
+    # 他の利用者の同じ名前のカテゴリとは重複しない
+    create_category(db_session, name="日用品", user_id=2)
+
+    response = client.post("/api/v1/categories", json={"name": "食費"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Category already exists!"
+
+    response = client.post("/api/v1/categories", json={"name": "日用品"})
+    assert response.status_code == 200
+
+
+def test_create_category_rule(client: TestClient, db_session: Session) -> None:
+    category = create_category(db_session, name="食費")
+    other_user_category = create_category(db_session, name="食費", user_id=2)
+
+    body = {"keyword": "スーパー", "priority": 5}
+    response = client.post(f"/api/v1/categories/{category.id}/rules", json=body)
+
+    assert response.status_code == 200
+    assert response.json() | body == response.json()
+    assert response.json()["categoryId"] == category.id
+
+    response = client.post(f"/api/v1/categories/{other_user_category.id}/rules", json=body)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Category not found!"
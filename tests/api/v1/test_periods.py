@@ -0,0 +1,94 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from tests.factories.cash_flow import create_cash_flow
+from tests.factories.recurring_cash_flow import create_recurring_cash_flow
+
+PAYDAY = {"kind": "monthly", "startDay": 25}
+
+
+def test_period_setting(client: TestClient) -> None:
+    # 設定していなければ暦の月
+    response = client.get("/api/v1/periods/setting")
+    assert response.json() == {"kind": "monthly", "startDay": 1}
+
+    response = client.put("/api/v1/periods/setting", json=PAYDAY)
+    assert response.status_code == 200
+    assert client.get("/api/v1/periods/setting").json() == PAYDAY
+
+    # 別の利用者の設定は変わらない
+    response = client.get("/api/v1/periods/setting", headers={"X-User-Id": "2"})
+    assert response.json() == {"kind": "monthly", "startDay": 1}
+
+
+def test_period_setting_invalid(client: TestClient) -> None:
+    response = client.put("/api/v1/periods/setting", json={"kind": "weekly", "startDay": 7})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Invalid period setting!"
+
+
+def test_get_periods(client: TestClient) -> None:
+    client.put("/api/v1/periods/setting", json={"kind": "weekly", "startDay": 0})
+
+    response = client.get("/api/v1/periods", params={"targetDate": "2025-01-01", "count": 2})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [(item["startDate"], item["endDate"]) for item in result] == [
+        ("2024-12-23", "2024-12-30"),
+        ("2024-12-30", "2025-01-06"),
+    ]
+    assert result[1]["key"] == result[0]["key"] + 1
+
+
+def test_get_cash_flows_by_period(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2025, 1, 24))
+    create_cash_flow(db_session, id=2, recorded_at=date(2025, 1, 25))
+    create_cash_flow(db_session, id=3, recorded_at=date(2025, 2, 24))
+    create_cash_flow(db_session, id=4, recorded_at=date(2025, 2, 25))
+    # 毎月10日の繰り返し。期間にかかる1月・2月の両方を展開する
+    create_recurring_cash_flow(db_session, id=1, start_date=date(2024, 1, 10))
+    client.put("/api/v1/periods/setting", json=PAYDAY)
+
+    response = client.get("/api/v1/cash-flows", params={"targetDate": "2025-02-01"})
+
+    assert response.status_code == 200
+    assert [item["recordedAt"] for item in response.json()] == [
+        "2025-01-25",
+        "2025-02-10",
+        "2025-02-24",
+    ]
+
+
+def test_get_cash_flows_without_target(client: TestClient) -> None:
+    response = client.get("/api/v1/cash-flows")
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "target_month or targetDate is required!"
+
+
+def test_get_period_totals(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2025, 1, 24), amount=100)
+    create_cash_flow(db_session, id=2, recorded_at=date(2025, 1, 25), amount=200)
+    create_cash_flow(
+        db_session, id=3, recorded_at=date(2025, 2, 25), amount=3000, type=CashFlowType.INCOME
+    )
+    client.put("/api/v1/periods/setting", json=PAYDAY)
+
+    response = client.get("/api/v1/reports/periods", params={"targetDate": "2025-03-01", "count": 3})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["kind"], result["startDay"]) == ("monthly", 25)
+    assert [
+        (item["startDate"], item["income"], item["expense"], item["balance"])
+        for item in result["periods"]
+    ] == [
+        ("2024-12-25", 0, 100, -100),
+        ("2025-01-25", 0, 200, -200),
+        ("2025-02-25", 3000, 0, 3000),
+    ]
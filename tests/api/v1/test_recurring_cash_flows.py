@@ -0,0 +1,89 @@
+from fastapi.testclient import TestClient
+
+
+def test_create_recurring_cash_flow(client: TestClient) -> None:
+    body = {
+        "title": "家賃",
+        "type": "expense",
+        "amount": 80000,
+        "frequency": "monthly",
+        "startDate": "2025-10-31",
+    }
+
+    response = client.post("/api/v1/recurring-cash-flows", json=body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["id"]
+    assert result["frequency"] == "monthly"
+    assert result["endDate"] is None
+
+    response = client.get("/api/v1/recurring-cash-flows")
+    assert [item["title"] for item in response.json()] == ["家賃"]
+
+
+def test_create_recurring_cash_flow_invalid_end_date(client: TestClient) -> None:
+    body = {
+        "title": "家賃",
+        "type": "expense",
+        "amount": 80000,
+        "frequency": "monthly",
+        "startDate": "2025-10-31",
+        "endDate": "2025-10-30",
+    }
+
+    response = client.post("/api/v1/recurring-cash-flows", json=body)
+
+    assert response.status_code == 422
+
+
+def test_get_cash_flows_materializes_recurring(client: TestClient) -> None:
+    # 一度表示した月にも、後から追加したルールの分が展開される
+    client.get("/api/v1/cash-flows", params={"target_month": "2025-11-01"})
+    body = {
+        "title": "家賃",
+        "type": "expense",
+        "amount": 80000,
+        "frequency": "monthly",
+        "startDate": "2025-10-31",
+    }
+    client.post("/api/v1/recurring-cash-flows", json=body)
+    client.post("/api/v1/budgets", json={"month": "2025-11-01", "amount": 100000})
+
+    # 何度表示しても重複して作られない
+    for _ in range(2):
+        response = client.get("/api/v1/cash-flows", params={"target_month": "2025-11-01"})
+        assert response.status_code == 200
+        result = response.json()
+        assert len(result) == 1
+        assert result[0]["title"] == "家賃"
+        assert result[0]["recordedAt"] == "2025-11-30"
+
+    # 展開した分は予算の実績にも反映される
+    result = client.get("/api/v1/budgets", params={"target_month": "2025-11-01"}).json()
+    assert result[0]["actualAmount"] == 80000
+
+
+def test_delete_recurring_cash_flow(client: TestClient) -> None:
+    body = {
+        "title": "家賃",
+        "type": "expense",
+        "amount": 80000,
+        "frequency": "monthly",
+        "startDate": "2025-10-31",
+    }
+    recurring_cash_flow_id = client.post("/api/v1/recurring-cash-flows", json=body).json()["id"]
+    client.get("/api/v1/cash-flows", params={"target_month": "2025-11-01"})
+
+    response = client.delete(f"/api/v1/recurring-cash-flows/{recurring_cash_flow_id}")
+    assert response.status_code == 204
+
+    # 作成済みの収支は残り、以降の月には展開されない
+    result = client.get("/api/v1/cash-flows", params={"target_month": "2025-11-01"}).json()
+    assert len(result) == 1
+    result = client.get("/api/v1/cash-flows", params={"target_month": "2025-12-01"}).json()
+    assert result == []
+
+    response = client.delete(f"/api/v1/recurring-cash-flows/{recurring_cash_flow_id}")
+    assert response.status_code == 422
+    assert response.json()["detail"] == "RecurringCashFlow not found!"
@@ -0,0 +1,217 @@
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from fastapi.testclient import TestClient
+from freezegun import freeze_time
+from sqlalchemy import Connection
+from sqlalchemy.orm import Session, sessionmaker
+
+from kakeibo_be.caches.fx_rate import get_fx_rate_cache
+from kakeibo_be.indexes.daily_totals import DailyTotalIndex
+from kakeibo_be.jobs.runner import ReportJobRunner, get_report_job_runner
+from kakeibo_be.main import app
+from kakeibo_be.models.db.tenant import tenant_scope
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from tests.factories.cash_flow import create_cash_flow
+from tests.factories.category import create_category
+from tests.factories.fx_rate import create_fx_rate
+
+
+@pytest.fixture
+def runner(client: TestClient, db_connection: Connection, tmp_path: Path) -> Generator[ReportJobRunner]:
+    runner = ReportJobRunner(
+        executor=ThreadPoolExecutor(max_workers=1),
+        result_dir=str(tmp_path),
+        ttl_seconds=60,
+        session_factory=sessionmaker(bind=db_connection),
+    )
+    app.dependency_overrides[get_report_job_runner] = lambda: runner
+    yield runner
+    runner.shutdown()
+
+
+def test_report_job(client: TestClient, db_session: Session, runner: ReportJobRunner) -> None:
+    create_cash_flow(db_session, id=1, title="もも", recorded_at=date(2025, 1, 1), amount=200)
+    body = {"kind": "cash_flows_csv", "startDate": "2025-01-01", "endDate": "2025-02-01"}
+
+    response = client.post("/api/v1/reports/jobs", json=body)
+    assert response.status_code == 202
+    job_id = response.json()["jobId"]
+    runner.shutdown()
+
+    response = client.get(f"/api/v1/reports/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+
+    response = client.get(f"/api/v1/reports/jobs/{job_id}/result")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[1] == "1,2025-01-01,expense,もも,200,JPY"
+
+
+def test_report_job_not_found(client: TestClient, runner: ReportJobRunner) -> None:
+    response = client.get("/api/v1/reports/jobs/unknown")
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Job not found!"
+
+
+def test_report_job_invalid_period(client: TestClient, runner: ReportJobRunner) -> None:
+    body = {"kind": "monthly_summary", "startDate": "2025-02-01", "endDate": "2025-01-01"}
+
+    response = client.post("/api/v1/reports/jobs", json=body)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "startDate must be before endDate!"
+
+
+@freeze_time("2025-03-10 12:00:00+09:00")
+def test_get_trends(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2025, 2, 1), amount=1000)
+    create_cash_flow(db_session, id=2, recorded_at=date(2025, 3, 1), amount=500)
+    create_cash_flow(db_session, id=3, recorded_at=date(2025, 3, 2), type=CashFlowType.INCOME, amount=300000)
+
+    response = client.get("/api/v1/reports/trends", params={"months": 2})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [item["month"] for item in result["months"]] == ["2025-02-01", "2025-03-01"]
+    assert result["months"][1]["expense"] == 500
+    assert result["months"][1]["income"] == 300000
+    assert result["months"][1]["expenseChangeRate"] == -0.5
+    assert result["days"][-1]["date"] == "2025-03-10"
+    assert len(result["weekdays"]) == 7
+    assert result["projection"]["month"] == "2025-03-01"
+    assert result["projection"]["expenseToDate"] == 500
+    assert result["projection"]["daysInMonth"] == 31
+
+
+def test_get_range_totals(client: TestClient, db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2025, 1, 1), amount=1000)
+    create_cash_flow(db_session, id=2, recorded_at=date(2025, 1, 31), type=CashFlowType.INCOME, amount=5000)
+    create_cash_flow(db_session, id=3, recorded_at=date(2025, 2, 1), amount=300)
+    params = {"startDate": "2025-01-01", "endDate": "2025-02-01"}
+
+    response = client.get("/api/v1/reports/totals", params=params)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "startDate": "2025-01-01",
+        "endDate": "2025-02-01",
+        "income": 5000,
+        "expense": 1000,
+        "balance": 4000,
+    }
+
+    # 作成・更新・削除の後も、読み直さずに差分だけで正しい合計を返す
+    body = {"title": "もも", "type": "expense", "recordedAt": "2025-01-15", "amount": 200}
+    created_id = client.post("/api/v1/cash-flows", json=body).json()["id"]
+    client.put("/api/v1/cash-flows/1", json={**body, "recordedAt": "2025-01-02", "amount": 700})
+    client.delete("/api/v1/cash-flows/2")
+
+    response = client.get("/api/v1/reports/totals", params=params)
+    assert response.json()["income"] == 0
+    assert response.json()["expense"] == 900
+    metrics = client.get("/api/v1/metrics/daily-totals").json()
+    assert metrics["buildCount"] == 1
+    assert metrics["hitCount"] == 1
+    assert metrics["users"] == 1
+
+    client.delete(f"/api/v1/cash-flows/{created_id}")
+    response = client.get("/api/v1/reports/totals", params=params)
+    assert response.json()["expense"] == 700
+
+
+def test_get_range_totals_invalid_period(client: TestClient) -> None:
+    response = client.get("/api/v1/reports/totals", params={"startDate": "2025-02-01", "endDate": "2025-01-01"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "startDate must be before endDate!"
+
+
+def test_get_breakdown(client: TestClient, db_session: Session) -> None:
+    category = create_category(db_session, name="食費")
+    create_cash_flow(db_session, id=1, title="スーパー", recorded_at=date(2025, 1, 5), amount=3000, category_id=category.id)
+    create_cash_flow(db_session, id=2, title="パン屋", recorded_at=date(2025, 1, 6), amount=500, category_id=category.id)
+    create_cash_flow(db_session, id=3, title="電車", recorded_at=date(2025, 1, 7), amount=800)
+    create_cash_flow(db_session, id=4, title="給料", recorded_at=date(2025, 1, 25), amount=300000, type=CashFlowType.INCOME)
+
+    params = {"startDate": "2025-01-01", "endDate": "2025-02-01", "limit": 2}
+    response = client.get("/api/v1/reports/breakdown", params=params)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "startDate": "2025-01-01",
+        "endDate": "2025-02-01",
+        "type": "expense",
+        "categories": [
+            {"categoryId": category.id, "name": "食費", "amount": 3500, "count": 2},
+            {"categoryId": None, "name": None, "amount": 800, "count": 1},
+        ],
+        "topTitles": [
+            {"title": "スーパー", "amount": 3000, "count": 1},
+            {"title": "電車", "amount": 800, "count": 1},
+        ],
+    }
+
+    response = client.get("/api/v1/reports/breakdown", params={**params, "type": "income"})
+    assert response.json()["topTitles"] == [{"title": "給料", "amount": 300000, "count": 1}]
+
+
+def test_reports_convert_currency(client: TestClient, db_session: Session) -> None:
+    create_fx_rate(db_session, currency="USD", rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+    category = create_category(db_session, name="旅行")
+    create_cash_flow(db_session, id=1, title="ホテル", recorded_at=date(2025, 1, 5), amount=10000, currency="USD", base_amount=15000, category_id=category.id)
+    create_cash_flow(db_session, id=2, title="スーパー", recorded_at=date(2025, 1, 6), amount=12000)
+    params = {"startDate": "2025-01-01", "endDate": "2025-02-01"}
+
+    response = client.get("/api/v1/reports/totals", params=params)
+    assert response.json()["expense"] == 27000
+
+    # 作成した外貨の行も、換算した金額で累積和に反映される
+    body = {"title": "ホテル", "type": "expense", "recordedAt": "2025-01-07", "amount": 3000, "currency": "USD"}
+    client.post("/api/v1/cash-flows", json=body)
+    response = client.get("/api/v1/reports/totals", params=params)
+    assert response.json()["expense"] == 31500
+
+    response = client.get("/api/v1/reports/breakdown", params=params)
+    assert response.json()["categories"] == [
+        {"categoryId": None, "name": None, "amount": 16500, "count": 2},
+        {"categoryId": category.id, "name": "旅行", "amount": 15000, "count": 1},
+    ]
+    assert response.json()["topTitles"] == [
+        {"title": "ホテル", "amount": 19500, "count": 2},
+        {"title": "スーパー", "amount": 12000, "count": 1},
+    ]
+
+
+def test_reports_use_stored_base_amount(client: TestClient, db_session: Session) -> None:
+    fx_rate = create_fx_rate(db_session, currency="USD", rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+    params = {"startDate": "2025-01-01", "endDate": "2025-02-01"}
+    # 先に読み込んで、作成の差分を累積和に反映させる
+    assert client.get("/api/v1/reports/totals", params=params).json()["expense"] == 0
+    body = {"title": "本", "type": "expense", "recordedAt": "2025-01-05", "amount": 1, "currency": "USD"}
+    ids = [client.post("/api/v1/cash-flows", json=body).json()["id"] for _ in range(2)]
+
+    # 1行ずつ換算して保存した額（1 × 1.5 → 2）の合計で、読み込み直しても同じ値になる
+    assert client.get("/api/v1/reports/totals", params=params).json()["expense"] == 4
+    with tenant_scope(db_session, 1):
+        assert DailyTotalIndex(enabled=False, max_bytes=0, max_pending=0).get_range_total(
+            db_session, 1, date(2025, 1, 1), date(2025, 2, 1)
+        ) == (0, 4)
+    response = client.get("/api/v1/reports/breakdown", params=params)
+    assert response.json()["topTitles"] == [{"title": "本", "amount": 4, "count": 2}]
+
+    # 過去のレートを直しても、登録済みの行の額は変わらず、削除で差し引く額と合う
+    fx_rate.rate = Decimal("3")
+    db_session.commit()
+    app.dependency_overrides[get_fx_rate_cache]().invalidate("USD")
+    client.delete(f"/api/v1/cash-flows/{ids[0]}")
+    assert client.get("/api/v1/reports/totals", params=params).json()["expense"] == 2
+    response = client.get("/api/v1/reports/breakdown", params=params)
+    assert response.json()["topTitles"] == [{"title": "本", "amount": 2, "count": 1}]
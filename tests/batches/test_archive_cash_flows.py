@@ -0,0 +1,48 @@
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from kakeibo_be.batches.archive_cash_flows import archive_cash_flows
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import CashFlowArchive
+from kakeibo_be.repositories.cash_flow_archive import get_archive_state, move_cash_flows_to_archive
+from tests.factories.cash_flow import create_cash_flow
+
+
+def test_archive_cash_flows(db_session: Session) -> None:
+    # 2023年が3件、2024年が1件
+    for i in range(1, 4):
+        create_cash_flow(db_session, id=i, recorded_at=date(2023, i, 1))
+    create_cash_flow(db_session, id=4, recorded_at=date(2024, 1, 1))
+
+    archived_count = archive_cash_flows(
+        session=db_session, archive_before=date(2024, 1, 1), batch_size=2
+    )
+
+    assert archived_count == 3
+    assert list(db_session.execute(select(CashFlow.id)).scalars()) == [4]
+    archived_ids = db_session.execute(select(CashFlowArchive.id).order_by(CashFlowArchive.id))
+    assert list(archived_ids.scalars()) == [1, 2, 3]
+    archive_state = get_archive_state(db_session)
+    assert archive_state.archived_before == date(2024, 1, 1)
+    assert archive_state.archiving_before == date(2024, 1, 1)
+
+
+def test_archive_cash_flows_resume(db_session: Session) -> None:
+    for i in range(1, 4):
+        create_cash_flow(db_session, id=i, recorded_at=date(2023, i, 1))
+
+    # 1バッチ目だけ移動したところで止まった状態を作る
+    archive_cash_flows(session=db_session, archive_before=date(2023, 1, 2), batch_size=10)
+    move_cash_flows_to_archive(session=db_session, archive_before=date(2024, 1, 1), limit=1)
+    db_session.commit()
+
+    # 再実行すると残りだけが移動される
+    archived_count = archive_cash_flows(
+        session=db_session, archive_before=date(2024, 1, 1), batch_size=10
+    )
+
+    assert archived_count == 1
+    assert list(db_session.execute(select(CashFlow.id)).scalars()) == []
+    assert get_archive_state(db_session).archived_before == date(2024, 1, 1)
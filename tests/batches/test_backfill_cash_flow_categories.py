@@ -0,0 +1,64 @@
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from kakeibo_be.batches.backfill_cash_flow_categories import backfill_categories
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import CashFlowArchive
+from kakeibo_be.repositories.cash_flow_archive import (
+    finish_archiving,
+    move_cash_flows_to_archive,
+    start_archiving,
+)
+from tests.factories.cash_flow import create_cash_flow
+from tests.factories.category import create_category, create_category_rule
+
+
+def test_backfill_categories(db_session: Session) -> None:
+    food = create_category(db_session, name="食費")
+    transport = create_category(db_session, name="交通費")
+    other_user_food = create_category(db_session, name="食費", user_id=2)
+    create_category_rule(db_session, category_id=food.id, keyword="スーパー")
+    create_category_rule(db_session, category_id=transport.id, keyword="電車")
+    create_category_rule(db_session, category_id=other_user_food.id, keyword="スーパー", user_id=2)
+
+    create_cash_flow(db_session, id=1, title="スーパー", recorded_at=date(2023, 5, 1))
+    create_cash_flow(db_session, id=2, title="電車")
+    create_cash_flow(db_session, id=3, title="雑貨")
+    create_cash_flow(db_session, id=4, title="スーパー")
+    # 分類済みの行は変えない
+    create_cash_flow(db_session, id=5, title="電車", category_id=food.id)
+    create_cash_flow(db_session, id=6, title="スーパー", user_id=2)
+    # 論理削除済みの行は対象外
+    create_cash_flow(db_session, id=7, title="電車", deleted_at=datetime(2025, 1, 1))
+    start_archiving(db_session, date(2024, 1, 1))
+    move_cash_flows_to_archive(db_session, date(2024, 1, 1), limit=100)
+    finish_archiving(db_session, date(2024, 1, 1))
+    db_session.commit()
+    # バージョンは利用者ごとに採番する
+    max_sync_versions = dict(
+        db_session.execute(
+            select(CashFlow.user_id, func.max(CashFlow.sync_version)).group_by(CashFlow.user_id)
+        ).all()
+    )
+
+    assigned_count = backfill_categories(session=db_session, batch_size=2)
+
+    assert assigned_count == 4
+    cash_flows = db_session.execute(select(CashFlow).order_by(CashFlow.id)).scalars().all()
+    assert [(c.id, c.category_id) for c in cash_flows] == [
+        (2, transport.id),
+        (3, None),
+        (4, food.id),
+        (5, food.id),
+        (6, other_user_food.id),
+        (7, None),
+    ]
+    # 分類した行は差分同期で届くよう、新しいバージョンになっている
+    assert {c.id for c in cash_flows if c.sync_version > max_sync_versions[c.user_id]} == {2, 4, 6}
+    archived = db_session.execute(select(CashFlowArchive)).scalars().one()
+    assert archived.category_id == food.id
+
+    # 2回目は分類する行が残っていない
+    assert backfill_categories(session=db_session, batch_size=2) == 0
@@ -0,0 +1,35 @@
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from kakeibo_be.batches.backfill_cash_flow_content_hashes import backfill_content_hashes
+from kakeibo_be.logic.deduplicate.calculate_content_hash import calculate_content_hash
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from tests.factories.cash_flow import create_cash_flow
+
+
+def test_backfill_content_hashes(db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, title="スーパー", recorded_at=date(2025, 1, 1), content_hash=None)
+    create_cash_flow(db_session, id=2, title="電車", recorded_at=date(2025, 1, 2), content_hash=None)
+    create_cash_flow(
+        db_session, id=3, title="スーパー", recorded_at=date(2025, 1, 1), content_hash=None, user_id=2
+    )
+    # 計算済みの行は変えない
+    create_cash_flow(db_session, id=4, title="雑貨", recorded_at=date(2025, 1, 3), content_hash="x")
+    # 論理削除済みの行は対象外
+    create_cash_flow(
+        db_session, id=5, title="電車", deleted_at=datetime(2025, 1, 1), content_hash=None
+    )
+
+    filled_count = backfill_content_hashes(session=db_session, batch_size=2)
+
+    assert filled_count == 3
+    cash_flows = db_session.execute(select(CashFlow).order_by(CashFlow.id)).scalars().all()
+    expected = calculate_content_hash(date(2025, 1, 1), 200, CashFlowType.EXPENSE, "JPY", "スーパー")
+    assert cash_flows[0].content_hash == expected
+    # 利用者が違っても、内容が同じなら同じ指紋
+    assert cash_flows[2].content_hash == expected
+    assert cash_flows[1].content_hash is not None
+    assert [c.content_hash for c in cash_flows[3:]] == ["x", None]
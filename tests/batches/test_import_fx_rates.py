@@ -0,0 +1,28 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.batches.import_fx_rates import import_fx_rates
+from kakeibo_be.caches.fx_rate import FxRateCache
+from kakeibo_be.repositories.fx_rate import get_effective_fx_rate
+from tests.factories.fx_rate import create_fx_rate
+
+
+def test_import_fx_rates(db_session: Session) -> None:
+    create_fx_rate(db_session, rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+    cache = FxRateCache(max_entries=10, ttl_seconds=3600)
+    assert cache.get_rate(db_session, "USD", date(2025, 1, 1)) == Decimal("1.5")
+    rows = [
+        {"currency": "usd", "date": "2025-01-01", "rate": "1.55"},
+        {"currency": "USD", "date": "2025-01-02", "rate": "1.6"},
+        {"currency": "EUR", "date": "2025-01-01", "rate": "1.7"},
+    ]
+
+    imported_count = import_fx_rates(db_session, rows, batch_size=2, fx_rates=cache)
+
+    assert imported_count == 3
+    assert get_effective_fx_rate(db_session, "USD", date(2025, 1, 1)) == Decimal("1.55")
+    assert get_effective_fx_rate(db_session, "EUR", date(2025, 1, 5)) == Decimal("1.7")
+    # 登録した通貨のキャッシュは捨てられている
+    assert cache.get_rate(db_session, "USD", date(2025, 1, 1)) == Decimal("1.55")
@@ -0,0 +1,27 @@
+from datetime import date
+
+from freezegun import freeze_time
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from kakeibo_be.batches.materialize_recurring_cash_flows import materialize_months
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.tenant import tenant_scope
+from kakeibo_be.repositories.recurring_cash_flow import is_recurring_month_materialized
+from tests.factories.recurring_cash_flow import create_recurring_cash_flow
+
+
+@freeze_time("2025-10-10 12:00:00+00:00")
+def test_materialize_months(db_session: Session) -> None:
+    create_recurring_cash_flow(db_session, start_date=date(year=2025, month=1, day=25))
+    create_recurring_cash_flow(db_session, start_date=date(year=2025, month=1, day=1), user_id=2)
+
+    # 利用者ごとに展開する
+    assert materialize_months(session=db_session, months_ahead=2) == 6
+    # 2回目は展開済みの月を飛ばす
+    assert materialize_months(session=db_session, months_ahead=2) == 0
+
+    for user_id in (1, 2):
+        with tenant_scope(db_session, user_id):
+            assert is_recurring_month_materialized(db_session, date(year=2025, month=12, day=1))
+            assert db_session.execute(select(func.count()).select_from(CashFlow)).scalar_one() == 3
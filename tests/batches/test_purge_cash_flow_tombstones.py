@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from kakeibo_be.batches.purge_cash_flow_tombstones import purge_tombstones
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.repositories.sync_sequence import get_purged_sync_version
+from tests.factories.cash_flow import create_cash_flow
+
+
+def test_purge_tombstones(db_session: Session) -> None:
+    # 古いトゥームストーン3件、新しいトゥームストーン1件、有効なデータ1件
+    for i in range(1, 4):
+        create_cash_flow(
+            db_session, id=i, sync_version=i, deleted_at=datetime(year=2025, month=1, day=i)
+        )
+    create_cash_flow(db_session, id=4, sync_version=4, deleted_at=datetime(2025, 12, 1))
+    create_cash_flow(db_session, id=5, sync_version=5)
+    # 別の利用者のトゥームストーン
+    create_cash_flow(db_session, id=6, user_id=2, sync_version=2, deleted_at=datetime(2025, 1, 1))
+
+    purged_count = purge_tombstones(
+        session=db_session, deleted_before=datetime(2025, 6, 1), batch_size=2
+    )
+
+    assert purged_count == 4
+    remaining_ids = db_session.execute(select(CashFlow.id).order_by(CashFlow.id)).scalars()
+    assert list(remaining_ids) == [4, 5]
+    # 利用者ごとに、削除したトゥームストーンの最大バージョンまでが「差分を返せない範囲」になる
+    assert get_purged_sync_version(db_session, user_id=1) == 3
+    assert get_purged_sync_version(db_session, user_id=2) == 2
+    assert get_purged_sync_version(db_session, user_id=3) == 0
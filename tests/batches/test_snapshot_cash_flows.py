@@ -0,0 +1,255 @@
+from collections import defaultdict
+from collections.abc import Generator
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import Engine, insert, inspect, select
+
+from kakeibo_be.batches.snapshot_cash_flows import export_snapshot, restore_snapshot
+from kakeibo_be.core.database import create_database_engine
+from kakeibo_be.models.db.base import Base
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.models.db.cash_flow_archive import ArchiveState, CashFlowArchive
+from kakeibo_be.models.db.monthly_total import ALL_TITLES, MonthlyTotal
+from kakeibo_be.models.db.sync_sequence import SyncSequence
+from kakeibo_be.repositories.cash_flow_archive import CASH_FLOW_ARCHIVE
+from kakeibo_be.repositories.sync_sequence import CASH_FLOW_SEQUENCE, LEGACY_SYNC_USER_ID
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+ROW_COUNT = 2500
+ARCHIVE_ROW_COUNT = 300
+ROW_COUNTS = {"archive_states": 1, "cash_flows_archive": ARCHIVE_ROW_COUNT, "cash_flows": ROW_COUNT}
+SNAPSHOT_TABLE_NAMES = tuple(ROW_COUNTS)
+ARCHIVED_BEFORE = date(2025, 1, 1)
+
+
+@pytest.fixture
+def engines(tmp_path: Path) -> Generator[tuple[Engine, Engine]]:
+    # 書き出し元と読み込み先の DB（どちらもマイグレーションしていないので、リビジョンは None で揃う）
+    source = create_database_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    target = create_database_engine(f"sqlite:///{tmp_path / 'target.db'}", sqlite_foreign_keys=False)
+    for engine in (source, target):
+        Base.metadata.create_all(engine)
+    try:
+        yield source, target
+    finally:
+        source.dispose()
+        target.dispose()
+
+
+def seed(engine: Engine) -> dict[str, list[tuple]]:
+    now = datetime(2025, 1, 1, 9, 30, 15, 123456)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(CashFlow),
+            [
+                {
+                    "id": i,
+                    "user_id": i % 3 + 1,
+                    "title": f"タイトル{i % 7}",
+                    "type": CashFlowType.INCOME if i % 5 == 0 else CashFlowType.EXPENSE,
+                    "recorded_at": date(2025, 1 + i % 12, 1 + i % 28),
+                    "amount": i * 10,
+                    "currency": "JPY",
+                    "base_amount": i * 10,
+                    "sync_version": i,
+                    "created_at": now,
+                    # マイクロ秒が 0 の日時も、SQLAlchemy が保存するのと同じ形で入る
+                    "updated_at": datetime(2025, 1, 2),
+                    "deleted_at": now if i % 11 == 0 else None,
+                    "content_hash": None if i % 2 else f"{i:032x}",
+                }
+                for i in range(1, ROW_COUNT + 1)
+            ],
+        )
+        # 締めた期間の行（外貨の行は登録した時の換算額を持つ）
+        connection.execute(
+            insert(CashFlowArchive),
+            [
+                {
+                    "id": ROW_COUNT + i,
+                    "user_id": i % 3 + 1,
+                    "title": f"タイトル{i % 7}",
+                    "type": CashFlowType.EXPENSE,
+                    "recorded_at": date(2024, 1 + i % 12, 1 + i % 28),
+                    "amount": i,
+                    "currency": "USD" if i % 2 else "JPY",
+                    "base_amount": i * 150 if i % 2 else i,
+                    "sync_version": ROW_COUNT + i,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(1, ARCHIVE_ROW_COUNT + 1)
+            ],
+        )
+        connection.execute(
+            insert(ArchiveState),
+            [
+                {
+                    "name": CASH_FLOW_ARCHIVE,
+                    "archived_before": ARCHIVED_BEFORE,
+                    "archiving_before": ARCHIVED_BEFORE,
+                }
+            ],
+        )
+        connection.execute(
+            insert(SyncSequence),
+            [
+                {
+                    "name": CASH_FLOW_SEQUENCE,
+                    "user_id": user_id,
+                    "last_value": ROW_COUNT + ARCHIVE_ROW_COUNT,
+                }
+                for user_id in (1, 2, 3)
+            ],
+        )
+    return read_rows(engine)
+
+
+def read_rows(engine: Engine) -> dict[str, list[tuple]]:
+    # 型の変換をせず、DB に保存された値のまま比べる
+    with engine.connect() as connection:
+        return {
+            table_name: [
+                tuple(row)
+                for row in connection.exec_driver_sql(f"SELECT * FROM {table_name} ORDER BY 1")
+            ]
+            for table_name in SNAPSHOT_TABLE_NAMES
+        }
+
+
+def read_monthly_totals(engine: Engine) -> dict[tuple, tuple[int, int]]:
+    with engine.connect() as connection:
+        return {
+            (row.user_id, row.month, row.type, row.title): (row.amount, row.count)
+            for row in connection.execute(select(MonthlyTotal.__table__))
+        }
+
+
+def calculate_monthly_totals(rows: dict[str, list[tuple]]) -> dict[tuple, tuple[int, int]]:
+    # 論理削除していない行とアーカイブの行の、行に保存した換算額を月・タイトルごとに合計する
+    totals: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+    for table_name, model in (("cash_flows", CashFlow), ("cash_flows_archive", CashFlowArchive)):
+        names = [column.name for column in model.__table__.columns]
+        for values in rows[table_name]:
+            row = dict(zip(names, values, strict=True))
+            if row.get("deleted_at") is not None:
+                continue
+            month = date.fromisoformat(row["recorded_at"]).replace(day=1)
+            for title in (row["title"], ALL_TITLES):
+                total = totals[(row["user_id"], month, CashFlowType[row["type"]], title)]
+                total[0] += row["base_amount"]
+                total[1] += 1
+    return {key: (amount, count) for key, (amount, count) in totals.items()}
+
+
+def test_export_and_restore(engines: tuple[Engine, Engine], tmp_path: Path) -> None:
+    source, target = engines
+    expected = seed(source)
+    path = tmp_path / "cash_flows.snapshot"
+
+    with source.connect() as connection:
+        assert export_snapshot(connection, path, chunk_size=1000) == ROW_COUNTS
+    with target.begin() as connection:
+        # 全体の値の行と、読み込む行より先まで採番してある利用者の行
+        connection.execute(
+            insert(SyncSequence),
+            [
+                {"name": CASH_FLOW_SEQUENCE, "user_id": LEGACY_SYNC_USER_ID, "last_value": 10},
+                {"name": CASH_FLOW_SEQUENCE, "user_id": 1, "last_value": 10**6},
+            ],
+        )
+        # マイグレーションで入れる境界の行と、読み込む行と合わない月別集計
+        connection.execute(
+            insert(ArchiveState),
+            [
+                {
+                    "name": CASH_FLOW_ARCHIVE,
+                    "archived_before": date(1970, 1, 1),
+                    "archiving_before": date(1970, 1, 1),
+                }
+            ],
+        )
+        connection.execute(
+            insert(MonthlyTotal),
+            [
+                {
+                    "user_id": 1,
+                    "month": date(2025, 1, 1),
+                    "type": CashFlowType.EXPENSE,
+                    "title": ALL_TITLES,
+                    "amount": 1,
+                    "count": 1,
+                }
+            ],
+        )
+    with target.connect() as connection:
+        assert restore_snapshot(connection, path) == ROW_COUNTS
+
+    assert read_rows(target) == expected
+    # 月別集計は読み込んだ行（アーカイブを含む）から作り直す
+    monthly_totals = read_monthly_totals(target)
+    assert monthly_totals == calculate_monthly_totals(expected)
+    assert (2, date(2024, 2, 1), CashFlowType.EXPENSE, ALL_TITLES) in monthly_totals
+    # 後回しにしたインデックスは作り直されている
+    for model in (CashFlow, CashFlowArchive):
+        assert {
+            index["name"] for index in inspect(target).get_indexes(model.__tablename__)
+        } == {index.name for index in model.__table__.indexes}
+    # 利用者ごとに、読み込んだ行のバージョンより後から採番する（先まで採番してあれば戻さない）
+    with target.connect() as connection:
+        last_values = dict(
+            connection.execute(select(SyncSequence.user_id, SyncSequence.last_value)).all()
+        )
+    assert last_values == {
+        LEGACY_SYNC_USER_ID: 10,
+        1: 10**6,
+        2: ROW_COUNT + ARCHIVE_ROW_COUNT - 2,
+        3: ROW_COUNT + ARCHIVE_ROW_COUNT - 1,
+    }
+
+    # 空でないテーブルには、replace を指定しないと読み込まない
+    with target.connect() as connection, pytest.raises(ValueError):
+        restore_snapshot(connection, path)
+    with target.connect() as connection:
+        assert restore_snapshot(connection, path, replace=True) == ROW_COUNTS
+    assert read_rows(target) == expected
+    assert read_monthly_totals(target) == monthly_totals
+
+
+def test_restore_into_non_empty_archive(engines: tuple[Engine, Engine], tmp_path: Path) -> None:
+    source, target = engines
+    seed(source)
+    path = tmp_path / "cash_flows.snapshot"
+    with source.connect() as connection:
+        export_snapshot(connection, path)
+    with target.begin() as connection:
+        connection.execute(insert(CashFlowArchive), [read_archive_row(source)])
+
+    # cash_flows が空でも、アーカイブに行があれば読み込まない
+    with target.connect() as connection, pytest.raises(ValueError):
+        restore_snapshot(connection, path)
+    assert read_rows(target)["cash_flows"] == []
+
+
+def read_archive_row(engine: Engine) -> dict:
+    with engine.connect() as connection:
+        return dict(connection.execute(select(CashFlowArchive.__table__).limit(1)).one()._mapping)
+
+
+def test_restore_failure_keeps_indexes(engines: tuple[Engine, Engine], tmp_path: Path) -> None:
+    source, target = engines
+    seed(source)
+    path = tmp_path / "cash_flows.snapshot"
+    with source.connect() as connection:
+        export_snapshot(connection, path, chunk_size=1000)
+    # 途中で切れたファイル
+    path.write_bytes(path.read_bytes()[:-12])
+
+    with target.connect() as connection, pytest.raises(ValueError):
+        restore_snapshot(connection, path)
+
+    for model in (CashFlow, CashFlowArchive):
+        assert len(inspect(target).get_indexes(model.__tablename__)) == len(model.__table__.indexes)
@@ -0,0 +1,51 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.caches.fx_rate import FxRateCache
+from tests.factories.fx_rate import create_fx_rate
+
+
+def test_get_rate(db_session: Session) -> None:
+    cache = FxRateCache(max_entries=10, ttl_seconds=3600)
+    create_fx_rate(db_session, rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+
+    assert cache.get_rate(db_session, "JPY", date(2025, 1, 1)) == Decimal(1)
+    assert cache.get_rate(db_session, "USD", date(2025, 1, 2)) == Decimal("1.5")
+    assert cache.get_rate(db_session, "USD", date(2025, 1, 2)) == Decimal("1.5")
+    assert cache.get_rate(db_session, "EUR", date(2025, 1, 2)) is None
+
+    metrics = cache.get_metrics()
+    # 基準通貨は数えない。見つからなかったことも覚える
+    assert (metrics.hit_count, metrics.miss_count, metrics.entries) == (1, 2, 2)
+
+
+def test_invalidate(db_session: Session) -> None:
+    cache = FxRateCache(max_entries=10, ttl_seconds=3600)
+    create_fx_rate(db_session, rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+    assert cache.get_rate(db_session, "USD", date(2025, 1, 2)) == Decimal("1.5")
+
+    # 新しい日付のレートが入ると、その後の日付のレートも変わる
+    create_fx_rate(db_session, rate_date=date(2025, 1, 2), rate=Decimal("1.6"))
+    assert cache.get_rate(db_session, "USD", date(2025, 1, 2)) == Decimal("1.5")
+    cache.invalidate("USD")
+    assert cache.get_rate(db_session, "USD", date(2025, 1, 2)) == Decimal("1.6")
+
+
+def test_expire_and_evict(db_session: Session) -> None:
+    create_fx_rate(db_session, rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+    cache = FxRateCache(max_entries=2, ttl_seconds=3600)
+    for day in (1, 2, 3):
+        cache.get_rate(db_session, "USD", date(2025, 1, day))
+
+    # 最近使っていないものから捨てる
+    assert cache.get_metrics().entries == 2
+    cache.get_rate(db_session, "USD", date(2025, 1, 1))
+    assert cache.get_metrics().hit_count == 0
+
+    # 有効期限が切れたものは読み直す
+    expired = FxRateCache(max_entries=10, ttl_seconds=0)
+    expired.get_rate(db_session, "USD", date(2025, 1, 1))
+    expired.get_rate(db_session, "USD", date(2025, 1, 1))
+    assert expired.get_metrics().miss_count == 2
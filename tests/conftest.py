@@ -7,14 +7,16 @@ import pytest
 from alembic import command
 from alembic.config import Config
 from dotenv import load_dotenv
-from sqlalchemy import Connection, create_engine
+from sqlalchemy import Connection
 from sqlalchemy.orm import Session, sessionmaker
 
-from kakeibo_be.core.database import get_database_url
-
 # 環境変数はここにあることを伝える。
+# アプリのモジュールは import 時に環境変数を読むので、先に読み込んでおく
 load_dotenv(".env.test.unit")
 
+from kakeibo_be.core.database import create_database_engine, get_database_url  # noqa: E402
+from kakeibo_be.models.db.tenant import tenant_scope  # noqa: E402
+
 
 # テストの開始1回目に自動でapply_migrations()が実行される設定
 @pytest.fixture(scope="session", autouse=True)
@@ -50,7 +52,8 @@ def db_connection() -> Generator[Connection]:
     database_url = get_database_url()
     # SQLAlchemyのEngineを作成する（DB接続を管理するための入り口）
     # echo=False なので SQLログは出力しない（必要なら True にするとSQLが表示される）
-    engine = create_engine(database_url, echo=False)
+    # SQLite の場合は、アプリと同じ PRAGMA（WAL・外部キー制約など）を接続時に設定する
+    engine = create_database_engine(database_url, echo=False)
     # Engine から DB への接続（Connection）を取得する
     # この connection を正常系/異常系テストで共通利用することで、
     # 「テストデータ作成」と「API処理」で別connectionになってデータが見えない、などの問題を防ぐ
@@ -92,6 +95,14 @@ def db_session(db_connection: Connection) -> Generator[Session]:
         test_db.close()
 
 
+# API と同じく、利用者（id=1）で絞り込んだ Session
+# 利用者ごとのデータを読み書きするリポジトリの関数を直接テストするときに使う
+@pytest.fixture
+def tenant_session(db_session: Session) -> Generator[Session]:
+    with tenant_scope(db_session, 1):
+        yield db_session
+
+
 # transactionがなかった場合、rollback()をしなかった場合、transaction.rollback()をコメントアウトした場合の挙動を見てみる
 
 
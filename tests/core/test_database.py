@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import text
+
+from kakeibo_be.core.database import create_database_engine, get_database_url
+
+
+def test_sqlite_pragmas_are_applied_on_connect(tmp_path: Path) -> None:
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'kakeibo.db'}")
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            # NORMAL は 1
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert connection.execute(text("PRAGMA cache_size")).scalar() == -65536
+            assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_foreign_keys_can_be_disabled_for_migrations(tmp_path: Path) -> None:
+    engine = create_database_engine(
+        f"sqlite:///{tmp_path / 'kakeibo.db'}", sqlite_foreign_keys=False
+    )
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 0
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_pragmas_can_be_tuned_by_environment(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+    monkeypatch.setenv("SQLITE_CACHE_SIZE", "-2000")
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'kakeibo.db'}")
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 2
+            assert connection.execute(text("PRAGMA cache_size")).scalar() == -2000
+    finally:
+        engine.dispose()
+
+
+def test_get_database_url_for_sqlite(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", "/var/lib/kakeibo/kakeibo.db")
+    assert get_database_url() == "sqlite:////var/lib/kakeibo/kakeibo.db"
+
+
+def test_get_database_url_rejects_unknown_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_BACKEND", "postgresql")
+    with pytest.raises(ValueError):
+        get_database_url()
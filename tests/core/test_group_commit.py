@@ -0,0 +1,120 @@
+import threading
+
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import Column, Engine, Integer, MetaData, Table, event, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from kakeibo_be.core.database import create_database_engine
+from kakeibo_be.core.group_commit import GroupCommitter
+
+CLIENTS = 8
+
+metadata = MetaData()
+synthetic_rows = Table(
+    "synthetic_rows",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    # 同じ値は入れられない（1件だけ失敗させるため）
+    Column("amount", Integer, nullable=False, unique=True),
+)
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Generator[Engine]:
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'group_commit.db'}")
+    metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+def insert_rows(session: Session, amounts: list[int]) -> list[int]:
+    # 1行ずつ入れて、渡した順に id を返す
+    return [
+        session.execute(insert(synthetic_rows).values(amount=amount)).inserted_primary_key[0]
+        for amount in amounts
+    ]
+
+
+def submit_concurrently(
+    engine: Engine, committer: GroupCommitter, amounts: list[int]
+) -> list[object]:
+    # amounts の1件ずつを別のスレッド・セッションから同時に渡し、結果か例外を返す
+    results: list[object] = [None] * len(amounts)
+    barrier = threading.Barrier(len(amounts))
+
+    def run(position: int) -> None:
+        with Session(engine) as session:
+            barrier.wait()
+            try:
+                results[position] = committer.submit(session, amounts[position])
+            except Exception as e:
+                results[position] = e
+
+    threads = [threading.Thread(target=run, args=(position,)) for position in range(len(amounts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def count_commits(engine: Engine) -> list[int]:
+    commits = [0]
+
+    @event.listens_for(engine, "commit")
+    def on_commit(_connection: object) -> None:
+        commits[0] += 1
+
+    return commits
+
+
+def read_amounts(engine: Engine) -> list[int]:
+    with engine.connect() as connection:
+        return list(
+            connection.execute(
+                select(synthetic_rows.c.amount).order_by(synthetic_rows.c.amount)
+            ).scalars()
+        )
+
+
+def test_group_commit(engine: Engine) -> None:
+    committer = GroupCommitter(insert_rows, window_seconds=5, max_batch_size=CLIENTS)
+    commits = count_commits(engine)
+
+    results = submit_concurrently(engine, committer, list(range(CLIENTS)))
+
+    # 件数がそろった時点で待たずに、1回でコミットしている
+    assert commits[0] == 1
+    # それぞれのリクエストに、自分の行の id が返る
+    assert sorted(results) == list(range(1, CLIENTS + 1))
+    assert read_amounts(engine) == list(range(CLIENTS))
+
+
+def test_group_commit_failure_is_isolated(engine: Engine) -> None:
+    committer = GroupCommitter(insert_rows, window_seconds=5, max_batch_size=CLIENTS)
+
+    # 同じ amount の2件目だけが失敗する
+    results = submit_concurrently(engine, committer, [*range(CLIENTS - 1), 0])
+
+    assert sum(isinstance(result, IntegrityError) for result in results) == 1
+    assert len({result for result in results if isinstance(result, int)}) == CLIENTS - 1
+    assert read_amounts(engine) == list(range(CLIENTS - 1))
+
+
+def test_group_commit_single_failure(engine: Engine) -> None:
+    committer = GroupCommitter(insert_rows, window_seconds=0, max_batch_size=CLIENTS)
+
+    with Session(engine) as session:
+        assert committer.submit(session, 1) == 1
+        with pytest.raises(IntegrityError):
+            committer.submit(session, 1)
+        # 失敗した後も、次の書き込みは受け付ける
+        committer.submit(session, 2)
+    assert read_amounts(engine) == [1, 2]
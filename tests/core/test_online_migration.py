@@ -0,0 +1,147 @@
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Integer,
+    MetaData,
+    Table,
+    func,
+    insert,
+    select,
+    update,
+)
+
+from kakeibo_be.core.database import create_database_engine
+from kakeibo_be.core.online_migration import BackfillReport, reset_backfill, run_backfill
+from kakeibo_be.models.db.backfill_progress import BackfillProgress
+
+ROW_COUNT = 100_000
+
+metadata = MetaData()
+synthetic_rows = Table(
+    "synthetic_rows",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("amount", Integer, nullable=False),
+    # バックフィルで amount の2倍を入れる列
+    Column("doubled", Integer, nullable=True),
+)
+
+
+@pytest.fixture
+def connection(tmp_path: Path) -> Generator[Connection]:
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'backfill.db'}")
+    metadata.create_all(engine)
+    BackfillProgress.__table__.create(engine)
+    try:
+        with engine.connect() as connection:
+            connection.execute(
+                insert(synthetic_rows), [{"id": i, "amount": i} for i in range(1, ROW_COUNT + 1)]
+            )
+            connection.commit()
+            yield connection
+    finally:
+        engine.dispose()
+
+
+def double_amount(connection: Connection, after_id: int, to_id: int) -> int:
+    result = connection.execute(
+        update(synthetic_rows)
+        .where(synthetic_rows.c.id > after_id, synthetic_rows.c.id <= to_id)
+        .values(doubled=synthetic_rows.c.amount * 2)
+    )
+    return result.rowcount
+
+
+def count_doubled(connection: Connection) -> int:
+    return connection.execute(
+        select(func.count()).where(synthetic_rows.c.doubled == synthetic_rows.c.amount * 2)
+    ).scalar_one()
+
+
+def test_run_backfill_resumes_after_interruption(connection: Connection) -> None:
+    calls = []
+
+    def interrupted(connection: Connection, after_id: int, to_id: int) -> int:
+        count = double_amount(connection, after_id, to_id)
+        calls.append((after_id, to_id))
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return count
+
+    with pytest.raises(KeyboardInterrupt):
+        run_backfill(connection, "double_amount", synthetic_rows, interrupted, batch_size=10_000)
+
+    # 止まったバッチは取り消され、コミット済みの3バッチ分だけが残る
+    assert count_doubled(connection) == 30_000
+
+    reports: list[BackfillReport] = []
+    report = run_backfill(
+        connection,
+        "double_amount",
+        synthetic_rows,
+        double_amount,
+        batch_size=10_000,
+        on_progress=reports.append,
+    )
+
+    # 4バッチ目からやり直す
+    assert [r.last_id for r in reports] == list(range(40_000, ROW_COUNT + 1, 10_000))
+    assert report.finished
+    assert report.processed_count == ROW_COUNT
+    assert count_doubled(connection) == ROW_COUNT
+
+    # 終わったバックフィルは、もう一度呼んでも何もしない
+    report = run_backfill(connection, "double_amount", synthetic_rows, interrupted)
+    assert (report.finished, report.batch_count) == (True, 0)
+
+
+def test_run_backfill_with_sparse_ids(connection: Connection) -> None:
+    # 主キーに歯抜けがあっても、1バッチで batch_size 行ずつ進む
+    connection.execute(synthetic_rows.delete().where(synthetic_rows.c.id % 10 != 0))
+    connection.commit()
+
+    report = run_backfill(
+        connection, "sparse", synthetic_rows, double_amount, batch_size=1000, max_batches=3
+    )
+
+    assert (report.last_id, report.processed_count, report.finished) == (30_000, 3000, False)
+    assert report.progress == pytest.approx(0.3)
+
+    # 開始した後に追加された行は対象外（新しいコードで書き込まれる）
+    connection.execute(insert(synthetic_rows), [{"id": ROW_COUNT + 1, "amount": 1}])
+    connection.commit()
+    report = run_backfill(connection, "sparse", synthetic_rows, double_amount, batch_size=1000)
+    assert (report.processed_count, report.batch_count) == (10_000, 7)
+
+    # やり直すと、その時点の最大値までが対象になる
+    reset_backfill(connection, "sparse")
+    report = run_backfill(connection, "sparse", synthetic_rows, double_amount, batch_size=5000)
+    assert (report.max_id, report.processed_count) == (ROW_COUNT + 1, 10_001)
+
+
+def test_run_backfill_throttle(connection: Connection) -> None:
+    waits: list[float] = []
+
+    report = run_backfill(
+        connection,
+        "throttle",
+        synthetic_rows,
+        double_amount,
+        batch_size=25_000,
+        pause_seconds=0.5,
+        duty_cycle=0.5,
+        sleep=waits.append,
+    )
+
+    # 最後のバッチの後は休まない。バッチにかかった時間の分だけ余分に休む
+    assert report.batch_count == 4
+    assert len(waits) == 3
+    assert all(wait > 0.5 for wait in waits)
+
+    with pytest.raises(ValueError):
+        run_backfill(connection, "throttle", synthetic_rows, double_amount, duty_cycle=0)
@@ -0,0 +1,23 @@
+import pytest
+
+from fastapi import HTTPException
+
+from kakeibo_be.core import tenant
+from kakeibo_be.core.tenant import get_current_user_id
+
+
+def test_get_current_user_id_from_header(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tenant, "DEFAULT_USER_ID", "1")
+
+    assert get_current_user_id(x_user_id=2) == 2
+    # 1世帯だけで使う設定なら、ヘッダーのないリクエストはその利用者
+    assert get_current_user_id(x_user_id=None) == 1
+
+
+def test_get_current_user_id_requires_header(monkeypatch: pytest.MonkeyPatch) -> None:
+    # 既定（空）では、ヘッダーのないリクエストをどの利用者としても扱わない
+    monkeypatch.setattr(tenant, "DEFAULT_USER_ID", "")
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user_id(x_user_id=None)
+    assert exc_info.value.status_code == 401
@@ -2,7 +2,10 @@ from datetime import datetime
 
 from sqlalchemy.orm import Session
 
+from kakeibo_be.core.currency import BASE_CURRENCY
+from kakeibo_be.logic.deduplicate.calculate_content_hash import calculate_content_hash
 from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.repositories.sync_sequence import allocate_sync_versions
 from kakeibo_be.store.enum.cash_flow_type import CashFlowType
 
 
@@ -13,9 +16,27 @@ def create_cash_flow(session: Session, **override: dict) -> CashFlow:
         "type": CashFlowType.EXPENSE,
         "recorded_at": datetime(year=2025, month=10, day=1),
         "amount": 200,
+        "user_id": 1,
     }
 
     cash_flow_data.update(override)
+    # 基準通貨の行は換算額も同じ値になる（外貨の行は base_amount を指定する）
+    currency = cash_flow_data.get("currency", BASE_CURRENCY)
+    if "base_amount" not in cash_flow_data and currency == BASE_CURRENCY:
+        cash_flow_data["base_amount"] = cash_flow_data["amount"]
+    if "sync_version" not in cash_flow_data:
+        cash_flow_data["sync_version"] = allocate_sync_versions(
+            session, user_id=cash_flow_data["user_id"]
+        )
+    # API から作成した行と同じく指紋を入れておく（None を指定すると未計算の行になる）
+    if "content_hash" not in cash_flow_data and cash_flow_data.get("deleted_at") is None:
+        cash_flow_data["content_hash"] = calculate_content_hash(
+            cash_flow_data["recorded_at"],
+            cash_flow_data["amount"],
+            cash_flow_data["type"],
+            cash_flow_data.get("currency", BASE_CURRENCY),
+            cash_flow_data["title"],
+        )
 
     cash_flow = CashFlow(**cash_flow_data)
 
@@ -0,0 +1,35 @@
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.category import Category, CategoryRule
+
+
+def create_category(session: Session, **override: dict) -> Category:
+    category_data = {"name": "食費", "user_id": 1}
+    category_data.update(override)
+
+    category = Category(**category_data)
+
+    session.add(category)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+
+    return category
+
+
+def create_category_rule(session: Session, **override: dict) -> CategoryRule:
+    category_rule_data = {"keyword": "スーパー", "priority": 0, "user_id": 1}
+    category_rule_data.update(override)
+
+    category_rule = CategoryRule(**category_rule_data)
+
+    session.add(category_rule)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+
+    return category_rule
@@ -0,0 +1,23 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.fx_rate import FxRate
+
+
+def create_fx_rate(session: Session, **override: dict) -> FxRate:
+    # USD をセント単位で記録し、1ドル = 150円
+    fx_rate_data = {"currency": "USD", "rate_date": date(2025, 1, 1), "rate": Decimal("1.5")}
+    fx_rate_data.update(override)
+
+    fx_rate = FxRate(**fx_rate_data)
+
+    session.add(fx_rate)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+
+    return fx_rate
@@ -0,0 +1,31 @@
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.recurring_cash_flow import RecurringCashFlow
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.recurrence_frequency import RecurrenceFrequency
+
+
+def create_recurring_cash_flow(session: Session, **override: dict) -> RecurringCashFlow:
+    recurring_cash_flow_data = {
+        "title": "家賃",
+        "type": CashFlowType.EXPENSE,
+        "amount": 80000,
+        "frequency": RecurrenceFrequency.MONTHLY,
+        "start_date": date(year=2025, month=1, day=25),
+        "user_id": 1,
+    }
+
+    recurring_cash_flow_data.update(override)
+
+    recurring_cash_flow = RecurringCashFlow(**recurring_cash_flow_data)
+
+    session.add(recurring_cash_flow)
+    try:
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+
+    return recurring_cash_flow
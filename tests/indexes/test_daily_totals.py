@@ -0,0 +1,175 @@
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.indexes.daily_totals import DailyTotalIndex, UserDailyTotals
+from kakeibo_be.models.db.tenant import tenant_scope
+from kakeibo_be.repositories.monthly_total import MonthlyTotalDelta
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from tests.factories.cash_flow import create_cash_flow
+
+INCOME = CashFlowType.INCOME
+EXPENSE = CashFlowType.EXPENSE
+
+
+def create_index(max_bytes: int = 1024 * 1024, max_pending: int = 1000) -> DailyTotalIndex:
+    return DailyTotalIndex(enabled=True, max_bytes=max_bytes, max_pending=max_pending)
+
+
+def test_user_daily_totals_range_total() -> None:
+    totals = UserDailyTotals.from_daily_totals(
+        recorded_ats=[date(2025, 1, 1), date(2025, 1, 1), date(2025, 1, 3), date(2025, 1, 5)],
+        types=[EXPENSE, INCOME, EXPENSE, EXPENSE],
+        amounts=[100, 1000, 200, 400],
+        snapshot_version=0,
+    )
+
+    assert totals.days == 5
+    assert totals.get_range_total(date(2025, 1, 1), date(2025, 1, 6)) == (1000, 700)
+    # 終わりの日は含まない
+    assert totals.get_range_total(date(2025, 1, 1), date(2025, 1, 5)) == (1000, 300)
+    assert totals.get_range_total(date(2025, 1, 2), date(2025, 1, 4)) == (0, 200)
+    # 範囲の外の日は 0 として扱う
+    assert totals.get_range_total(date(2024, 1, 1), date(2030, 1, 1)) == (1000, 700)
+    assert totals.get_range_total(date(2030, 1, 1), date(2031, 1, 1)) == (0, 0)
+
+
+def test_user_daily_totals_range_totals() -> None:
+    totals = UserDailyTotals.from_daily_totals(
+        recorded_ats=[date(2025, 1, 1), date(2025, 1, 3), date(2025, 1, 5)],
+        types=[INCOME, EXPENSE, EXPENSE],
+        amounts=[1000, 200, 400],
+        snapshot_version=0,
+    )
+
+    # 連続する期間ごとの合計を、境界の差でまとめて求める
+    boundaries = [date(2024, 12, 1), date(2025, 1, 2), date(2025, 1, 4), date(2030, 1, 1)]
+    assert totals.get_range_totals(boundaries) == [(1000, 0), (0, 200), (0, 400)]
+    # 逆順の境界は空の期間
+    assert totals.get_range_totals([date(2025, 1, 4), date(2025, 1, 2)]) == [(0, 0)]
+
+
+def test_user_daily_totals_add_outside_range() -> None:
+    totals = UserDailyTotals.from_daily_totals(
+        recorded_ats=[date(2025, 1, 1)], types=[EXPENSE], amounts=[100], snapshot_version=0
+    )
+
+    totals.add(date(2024, 12, 31), EXPENSE, 50)
+    totals.add(date(2026, 6, 1), INCOME, 3000)
+    totals.add(date(2025, 1, 1), EXPENSE, -100)
+
+    assert totals.get_range_total(date(2024, 12, 31), date(2025, 1, 1)) == (0, 50)
+    assert totals.get_range_total(date(2025, 1, 1), date(2026, 6, 1)) == (0, 0)
+    assert totals.get_range_total(date(2026, 6, 1), date(2026, 6, 2)) == (3000, 0)
+    # 伸ばすたびに確保し直さないよう、まとめて伸ばしている
+    assert totals.days >= 366 * 2
+
+
+def test_get_range_total_reuses_index(tenant_session: Session) -> None:
+    create_cash_flow(tenant_session, id=1, recorded_at=date(2025, 1, 1), amount=100)
+    create_cash_flow(tenant_session, id=2, recorded_at=date(2025, 2, 1), type=INCOME, amount=1000)
+    # 別の利用者の行は含まない
+    create_cash_flow(tenant_session, id=3, recorded_at=date(2025, 1, 1), user_id=2)
+    index = create_index()
+
+    first = index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 3, 1))
+    second = index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1))
+
+    assert first == (1000, 100)
+    assert second == (0, 100)
+    metrics = index.get_metrics()
+    assert (metrics.build_count, metrics.hit_count, metrics.users) == (1, 1, 1)
+    assert metrics.memory_bytes > 0
+
+
+def test_apply_deltas(tenant_session: Session) -> None:
+    cash_flow = create_cash_flow(tenant_session, id=1, recorded_at=date(2025, 1, 1), amount=100)
+    index = create_index()
+    index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1))
+
+    # ハンドラーと同じく、DB を変更してコミットしてから差分を反映する
+    previous_version = cash_flow.sync_version
+    new_cash_flow = create_cash_flow(tenant_session, id=2, recorded_at=date(2025, 1, 2), amount=50)
+    index.apply_deltas(
+        1,
+        [MonthlyTotalDelta(date(2025, 1, 2), EXPENSE, "みかん", 50, 1)],
+        [new_cash_flow.sync_version],
+    )
+    cash_flow.amount = cash_flow.base_amount = 300
+    cash_flow.sync_version = previous_version + 100
+    tenant_session.commit()
+    index.apply_deltas(
+        1,
+        [
+            MonthlyTotalDelta(date(2025, 1, 1), EXPENSE, "みかん", -100, -1),
+            MonthlyTotalDelta(date(2025, 1, 1), EXPENSE, "みかん", 300, 1),
+        ],
+        [cash_flow.sync_version],
+        [previous_version],
+    )
+
+    assert index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1)) == (0, 350)
+    assert index.get_metrics().build_count == 1
+
+
+def test_apply_deltas_skips_changes_in_snapshot(tenant_session: Session) -> None:
+    cash_flow = create_cash_flow(tenant_session, id=1, recorded_at=date(2025, 1, 1), amount=100)
+    index = create_index()
+    index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1))
+
+    # 読み込む前にコミットされた変更の差分が後から届いても、二重に足さない
+    index.apply_deltas(
+        1,
+        [MonthlyTotalDelta(date(2025, 1, 1), EXPENSE, "みかん", 100, 1)],
+        [cash_flow.sync_version],
+    )
+
+    assert index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1)) == (0, 100)
+    assert index.get_metrics().build_count == 1
+
+
+def test_rebuild_after_change_by_other_process(tenant_session: Session) -> None:
+    cash_flow = create_cash_flow(tenant_session, id=1, recorded_at=date(2025, 1, 1), amount=100)
+    index = create_index()
+    index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1))
+
+    # 別のプロセスが更新した（このインデックスには差分が届いていない）
+    previous_version = cash_flow.sync_version
+    cash_flow.amount = cash_flow.base_amount = 500
+    cash_flow.sync_version = previous_version + 1
+    tenant_session.commit()
+
+    assert index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1)) == (0, 500)
+    assert index.get_metrics().build_count == 2
+
+    # その後、このプロセスで同じ行を更新しても、変更前のバージョンを知らないので作り直す
+    cash_flow.amount = cash_flow.base_amount = 700
+    cash_flow.sync_version = previous_version + 2
+    tenant_session.commit()
+    index.apply_deltas(
+        1,
+        [
+            MonthlyTotalDelta(date(2025, 1, 1), EXPENSE, "みかん", -500, -1),
+            MonthlyTotalDelta(date(2025, 1, 1), EXPENSE, "みかん", 700, 1),
+        ],
+        [previous_version + 2],
+        [previous_version + 1],
+    )
+    assert index.get_range_total(tenant_session, 1, date(2025, 1, 1), date(2025, 2, 1)) == (0, 700)
+
+
+def test_evict_least_recently_used(db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2025, 1, 1), user_id=1)
+    create_cash_flow(db_session, id=2, recorded_at=date(2025, 1, 1), user_id=2)
+    # 1人分（2日分 × 2列 × 8バイト）だけ入る大きさ
+    index = create_index(max_bytes=40)
+
+    for user_id in (1, 2):
+        with tenant_scope(db_session, user_id):
+            assert index.get_range_total(
+                db_session, user_id, date(2025, 1, 1), date(2025, 1, 2)
+            ) == (0, 200)
+
+    metrics = index.get_metrics()
+    assert metrics.users == 1
+    assert metrics.memory_bytes <= 40
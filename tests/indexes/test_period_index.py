@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from kakeibo_be.indexes.periods import PeriodIndex
+from kakeibo_be.logic.calculate.calculate_period import CALENDAR_MONTH, PeriodDefinition
+from kakeibo_be.store.enum.period_kind import PeriodKind
+
+PAYDAY = PeriodDefinition(kind=PeriodKind.MONTHLY, start_day=25)
+# 日曜日始まり
+WEEK = PeriodDefinition(kind=PeriodKind.WEEKLY, start_day=6)
+
+
+def create_index() -> PeriodIndex:
+    return PeriodIndex(start_date=date(2020, 1, 1), end_date=date(2030, 1, 1))
+
+
+def test_resolve_calendar_month() -> None:
+    calendar = create_index().get_calendar(CALENDAR_MONTH)
+
+    period = calendar.resolve(date(2025, 2, 28))
+    assert (period.start_date, period.end_date) == (date(2025, 2, 1), date(2025, 3, 1))
+    # 同じ期間の日付は同じ番号になる
+    assert calendar.get_key(date(2025, 2, 1)) == period.key
+    assert calendar.get_key(date(2025, 3, 1)) == period.key + 1
+
+
+def test_resolve_payday() -> None:
+    calendar = create_index().get_calendar(PAYDAY)
+
+    # 25日より前は前の月の25日から
+    period = calendar.resolve(date(2025, 1, 24))
+    assert (period.start_date, period.end_date) == (date(2024, 12, 25), date(2025, 1, 25))
+    period = calendar.resolve(date(2025, 1, 25))
+    assert (period.start_date, period.end_date) == (date(2025, 1, 25), date(2025, 2, 25))
+    # 範囲の最初の日は、その前から始まる期間に含まれる
+    assert calendar.resolve(date(2020, 1, 1)).start_date == date(2019, 12, 25)
+
+
+def test_resolve_week() -> None:
+    calendar = create_index().get_calendar(WEEK)
+
+    # 2025-01-01 は水曜日
+    period = calendar.resolve(date(2025, 1, 1))
+    assert (period.start_date, period.end_date) == (date(2024, 12, 29), date(2025, 1, 5))
+    assert calendar.resolve(date(2025, 1, 5)).start_date == date(2025, 1, 5)
+
+
+def test_get_periods() -> None:
+    calendar = create_index().get_calendar(PAYDAY)
+
+    periods = calendar.get_periods(date(2025, 1, 1), date(2025, 3, 1))
+    assert [period.start_date for period in periods] == [
+        date(2024, 12, 25),
+        date(2025, 1, 25),
+        date(2025, 2, 25),
+    ]
+    recent = calendar.get_recent_periods(date(2025, 2, 25), 2)
+    assert [period.start_date for period in recent] == [date(2025, 1, 25), date(2025, 2, 25)]
+    assert calendar.get_periods(date(2025, 1, 1), date(2025, 1, 1)) == []
+
+
+def test_out_of_range() -> None:
+    calendar = create_index().get_calendar(CALENDAR_MONTH)
+
+    with pytest.raises(ValueError):
+        calendar.resolve(date(2030, 1, 1))
+    with pytest.raises(ValueError):
+        calendar.get_period(len(calendar))
+
+
+def test_calendar_is_shared() -> None:
+    index = create_index()
+
+    assert index.get_calendar(PAYDAY) is index.get_calendar(PeriodDefinition(PeriodKind.MONTHLY, 25))
+
+
+def test_invalid_definition() -> None:
+    with pytest.raises(ValueError):
+        PeriodDefinition(kind=PeriodKind.MONTHLY, start_day=29)
+    with pytest.raises(ValueError):
+        PeriodDefinition(kind=PeriodKind.WEEKLY, start_day=7)
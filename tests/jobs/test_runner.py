@@ -0,0 +1,105 @@
+import json
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import Connection
+from sqlalchemy.orm import Session, sessionmaker
+
+from kakeibo_be.jobs.runner import ReportJobRunner
+from kakeibo_be.repositories.monthly_total import MonthlyTotalDelta, add_monthly_total_deltas
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from kakeibo_be.store.enum.report_job_kind import ReportJobKind
+from kakeibo_be.store.enum.report_job_status import ReportJobStatus
+from tests.factories.cash_flow import create_cash_flow
+
+
+def make_runner(db_connection: Connection, result_dir: Path, ttl_seconds: int = 60) -> ReportJobRunner:
+    return ReportJobRunner(
+        executor=ThreadPoolExecutor(max_workers=1),
+        result_dir=str(result_dir),
+        ttl_seconds=ttl_seconds,
+        session_factory=sessionmaker(bind=db_connection),
+    )
+
+
+def test_cash_flows_csv_job(db_connection: Connection, db_session: Session, tmp_path: Path) -> None:
+    create_cash_flow(db_session, id=1, title="もも", recorded_at=date(2024, 12, 31), amount=100)
+    create_cash_flow(db_session, id=2, title="みかん", recorded_at=date(2025, 1, 1), amount=200)
+    create_cash_flow(db_session, id=3, title="りんご", recorded_at=date(2025, 3, 1), amount=300)
+    # 他の利用者のデータは出力されない
+    create_cash_flow(db_session, id=4, title="ぶどう", recorded_at=date(2025, 3, 1), user_id=2)
+    runner = make_runner(db_connection, tmp_path)
+
+    job = runner.submit(ReportJobKind.CASH_FLOWS_CSV, 1, date(2025, 1, 1), date(2025, 4, 1))
+    # 同じ内容のジョブは、実行中でも完了後でも同じジョブが返る
+    assert runner.submit(ReportJobKind.CASH_FLOWS_CSV, 1, date(2025, 1, 1), date(2025, 4, 1)).id == job.id
+    runner.shutdown()
+
+    assert job.status == ReportJobStatus.SUCCEEDED
+    assert job.result_path.read_text(encoding="utf-8").splitlines() == [
+        "id,recorded_at,type,title,amount,currency",
+        "2,2025-01-01,expense,みかん,200,JPY",
+        "3,2025-03-01,expense,りんご,300,JPY",
+    ]
+
+
+def test_monthly_summary_job(db_connection: Connection, tenant_session: Session, tmp_path: Path) -> None:
+    add_monthly_total_deltas(
+        tenant_session,
+        [
+            MonthlyTotalDelta(date(2025, 1, 10), CashFlowType.INCOME, "給料", 1000, 1),
+            MonthlyTotalDelta(date(2025, 1, 20), CashFlowType.EXPENSE, "もも", 300, 1),
+        ],
+    )
+    tenant_session.commit()
+    runner = make_runner(db_connection, tmp_path)
+
+    job = runner.submit(ReportJobKind.MONTHLY_SUMMARY, 1, date(2025, 1, 1), date(2025, 3, 1))
+    runner.shutdown()
+
+    assert json.loads(job.result_path.read_text(encoding="utf-8")) == [
+        {"month": "2025-01-01", "income": 1000, "expense": 300, "balance": 700},
+        {"month": "2025-02-01", "income": 0, "expense": 0, "balance": 0},
+    ]
+
+
+def test_result_cache(db_connection: Connection, tmp_path: Path) -> None:
+    runner = make_runner(db_connection, tmp_path)
+    job = runner.submit(ReportJobKind.CASH_FLOWS_CSV, 1, date(2025, 1, 1), date(2025, 2, 1))
+    runner.shutdown()
+
+    # 再起動後も、保持期間内ならディスクの結果をそのまま使う
+    restarted_runner = make_runner(db_connection, tmp_path)
+    cached_job = restarted_runner.submit(ReportJobKind.CASH_FLOWS_CSV, 1, date(2025, 1, 1), date(2025, 2, 1))
+    assert cached_job.future is None
+    assert cached_job.status == ReportJobStatus.SUCCEEDED
+    assert cached_job.result_path == job.result_path
+
+
+def test_evict_expired_result(db_connection: Connection, tmp_path: Path) -> None:
+    runner = make_runner(db_connection, tmp_path, ttl_seconds=0)
+    job = runner.submit(ReportJobKind.CASH_FLOWS_CSV, 1, date(2025, 1, 1), date(2025, 2, 1))
+    runner.shutdown()
+
+    # 保持期間を過ぎたジョブと結果ファイルは削除される
+    assert runner.get(job.id, 1) is None
+    assert not job.result_path.exists()
+
+
+def test_remove_expired_result_files_on_start(db_connection: Connection, tmp_path: Path) -> None:
+    expired = tmp_path / f"{'0' * 64}.csv"
+    expired.write_text("old", encoding="utf-8")
+    an_hour_ago = time.time() - 3600
+    os.utime(expired, (an_hour_ago, an_hour_ago))
+    fresh = tmp_path / f"{'1' * 64}.csv"
+    fresh.write_text("new", encoding="utf-8")
+
+    # 再起動前の結果ファイルも、保持期間を過ぎていれば起動時に削除される
+    make_runner(db_connection, tmp_path, ttl_seconds=60).shutdown()
+
+    assert not expired.exists()
+    assert fresh.exists()
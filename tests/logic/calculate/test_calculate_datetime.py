@@ -3,7 +3,11 @@ from zoneinfo import ZoneInfo
 
 from freezegun import freeze_time
 
-from kakeibo_be.logic.calculate.calculate_datetime import get_now
+from kakeibo_be.logic.calculate.calculate_datetime import (
+    get_month_start_date,
+    get_next_month_start_date,
+    get_now,
+)
 
 
 @freeze_time("2025-10-01 12:00:00+00:00")
@@ -21,3 +25,18 @@ def test_get_now() -> None:
     )
     assert result == expected
     assert result.tzinfo == ZoneInfo("Asia/Tokyo")
+
+
+def test_get_month_start_date_converts_timezone() -> None:
+    # UTC の 11/30 20:00 は日本時間の 12/1 05:00 なので 12月
+    result = get_month_start_date(datetime(2025, 11, 30, 20, 0, tzinfo=ZoneInfo("UTC")))
+    assert result == datetime(2025, 12, 1, tzinfo=ZoneInfo("Asia/Tokyo"))
+    assert get_next_month_start_date(
+        datetime(2025, 11, 30, 20, 0, tzinfo=ZoneInfo("UTC"))
+    ) == datetime(2026, 1, 1, tzinfo=ZoneInfo("Asia/Tokyo"))
+
+
+def test_get_month_start_date_naive() -> None:
+    # タイムゾーンのない日時は日本時間とみなす
+    result = get_month_start_date(datetime(2025, 11, 30, 20, 0))
+    assert result == datetime(2025, 11, 1, tzinfo=ZoneInfo("Asia/Tokyo"))
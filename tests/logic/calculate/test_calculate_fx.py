@@ -0,0 +1,11 @@
+from decimal import Decimal
+
+from kakeibo_be.logic.calculate.calculate_fx import convert_to_base_amount
+
+
+def test_convert_to_base_amount() -> None:
+    assert convert_to_base_amount(1000, Decimal("1.5")) == 1500
+    # 0.5 は 0 から遠い方へ丸める（SQL の ROUND と同じ）
+    assert convert_to_base_amount(1, Decimal("1.5")) == 2
+    assert convert_to_base_amount(-1, Decimal("1.5")) == -2
+    assert convert_to_base_amount(3, Decimal("0.33333333")) == 1
@@ -0,0 +1,59 @@
+from datetime import date
+
+from kakeibo_be.logic.calculate.calculate_recurrence import get_occurrence_dates
+from kakeibo_be.store.enum.recurrence_frequency import RecurrenceFrequency
+
+
+def test_get_occurrence_dates_monthly() -> None:
+    # 31日起点でも、31日がない月は末日になる
+    result = get_occurrence_dates(
+        frequency=RecurrenceFrequency.MONTHLY,
+        start_date=date(year=2025, month=1, day=31),
+        end_date=None,
+        month_start_date=date(year=2025, month=2, day=1),
+    )
+    assert result == [date(year=2025, month=2, day=28)]
+
+
+def test_get_occurrence_dates_monthly_before_start() -> None:
+    result = get_occurrence_dates(
+        frequency=RecurrenceFrequency.MONTHLY,
+        start_date=date(year=2025, month=3, day=1),
+        end_date=None,
+        month_start_date=date(year=2025, month=2, day=1),
+    )
+    assert result == []
+
+
+def test_get_occurrence_dates_weekly() -> None:
+    result = get_occurrence_dates(
+        frequency=RecurrenceFrequency.WEEKLY,
+        start_date=date(year=2025, month=1, day=29),
+        end_date=date(year=2025, month=2, day=20),
+        month_start_date=date(year=2025, month=2, day=1),
+    )
+    assert result == [
+        date(year=2025, month=2, day=5),
+        date(year=2025, month=2, day=12),
+        date(year=2025, month=2, day=19),
+    ]
+
+
+def test_get_occurrence_dates_yearly() -> None:
+    start_date = date(year=2024, month=2, day=29)
+
+    result = get_occurrence_dates(
+        frequency=RecurrenceFrequency.YEARLY,
+        start_date=start_date,
+        end_date=None,
+        month_start_date=date(year=2025, month=2, day=1),
+    )
+    assert result == [date(year=2025, month=2, day=28)]
+
+    result = get_occurrence_dates(
+        frequency=RecurrenceFrequency.YEARLY,
+        start_date=start_date,
+        end_date=None,
+        month_start_date=date(year=2025, month=3, day=1),
+    )
+    assert result == []
@@ -0,0 +1,78 @@
+from datetime import date
+
+import numpy as np
+
+from kakeibo_be.logic.calculate.calculate_trend import (
+    build_daily_series,
+    calculate_monthly_trend,
+    calculate_weekday_profile,
+    moving_average,
+    project_month_end,
+)
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+
+def test_build_daily_series() -> None:
+    # 同じ日付・種別の行は加算し、記録のない日は0で埋める
+    series = build_daily_series(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 4),
+        recorded_ats=[date(2025, 1, 1), date(2025, 1, 1), date(2025, 1, 3)],
+        types=[CashFlowType.EXPENSE, CashFlowType.EXPENSE, CashFlowType.INCOME],
+        amounts=[100, 50, 1000],
+    )
+
+    assert series.expense.tolist() == [150, 0, 0]
+    assert series.income.tolist() == [0, 0, 1000]
+
+
+def test_moving_average() -> None:
+    # 先頭の窓に満たない区間は、あるだけの日数で平均する
+    assert moving_average(np.array([1, 2, 3, 4]), 2).tolist() == [1.0, 1.5, 2.5, 3.5]
+
+
+def test_calculate_monthly_trend() -> None:
+    series = build_daily_series(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 4, 1),
+        recorded_ats=[date(2025, 2, 10), date(2025, 3, 10), date(2025, 3, 20)],
+        types=[CashFlowType.EXPENSE, CashFlowType.EXPENSE, CashFlowType.INCOME],
+        amounts=[100, 150, 1000],
+    )
+
+    result = calculate_monthly_trend(series, moving_average_window=2)
+
+    assert result.months.astype("datetime64[D]").tolist() == [
+        date(2025, 1, 1),
+        date(2025, 2, 1),
+        date(2025, 3, 1),
+    ]
+    assert result.expense.tolist() == [0, 100, 150]
+    assert result.income.tolist() == [0, 0, 1000]
+    # 前月の支出が0の月は前月比を出さない
+    assert np.isnan(result.expense_change_rate[:2]).all()
+    assert result.expense_change_rate[2] == 0.5
+    assert result.expense_moving_average.tolist() == [0.0, 50.0, 125.0]
+
+
+def test_project_month_end() -> None:
+    # 2025-02-03 は月曜日。月曜日だけ 700 円の支出がある
+    series = build_daily_series(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 2, 11),
+        recorded_ats=[date(2025, 1, 6), date(2025, 2, 3), date(2025, 2, 10)],
+        types=[CashFlowType.EXPENSE] * 3,
+        amounts=[700, 700, 700],
+    )
+    weekday_profile = calculate_weekday_profile(series)
+
+    result = project_month_end(series, today=date(2025, 2, 10), weekday_profile=weekday_profile)
+
+    # 6週のうち3回の月曜日に支出があったので、月曜日の平均は 350 円
+    assert weekday_profile[0] == 350
+    assert result.month == date(2025, 2, 1)
+    assert result.elapsed_days == 10
+    assert result.days_in_month == 28
+    assert result.expense_to_date == 1400
+    # 残りの月曜日（2/17, 2/24）の分を見込む
+    assert result.projected_expense == 2100
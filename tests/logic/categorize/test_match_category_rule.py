@@ -0,0 +1,24 @@
+from kakeibo_be.logic.categorize.match_category_rule import (
+    CategoryRuleItem,
+    match_category_rule,
+    sort_category_rules,
+)
+
+
+def test_match_category_rule() -> None:
+    rules = sort_category_rules(
+        [
+            CategoryRuleItem(category_id=1, keyword="スーパー", priority=0),
+            CategoryRuleItem(category_id=2, keyword="amazon", priority=0),
+            # 優先度が高いルールが先に当てはまる
+            CategoryRuleItem(category_id=3, keyword="スーパー銭湯", priority=10),
+            # 同じ優先度なら先に作ったルール
+            CategoryRuleItem(category_id=4, keyword="スーパー", priority=0),
+        ]
+    )
+
+    assert match_category_rule("近所のスーパー", rules) == 1
+    assert match_category_rule("スーパー銭湯", rules) == 3
+    # 大文字・小文字は区別しない
+    assert match_category_rule("Amazon.co.jp", rules) == 2
+    assert match_category_rule("電車", rules) is None
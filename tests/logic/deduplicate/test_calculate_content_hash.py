@@ -0,0 +1,38 @@
+from datetime import date
+
+from kakeibo_be.logic.deduplicate.calculate_content_hash import (
+    CONTENT_HASH_LENGTH,
+    calculate_content_hash,
+    normalize_title,
+)
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+
+
+def test_normalize_title() -> None:
+    assert normalize_title("ＡＭＡＺＯＮ　ｺｰﾋｰ") == "amazonコーヒー"
+    assert normalize_title(" Amazon  コーヒー ") == "amazonコーヒー"
+
+
+def test_calculate_content_hash() -> None:
+    content_hash = calculate_content_hash(
+        date(2025, 1, 1), 1000, CashFlowType.EXPENSE, "JPY", "Amazon コーヒー"
+    )
+
+    assert len(content_hash) == CONTENT_HASH_LENGTH
+    # 表記ゆれは同じ指紋になる
+    assert content_hash == calculate_content_hash(
+        date(2025, 1, 1), 1000, CashFlowType.EXPENSE, "JPY", "ＡＭＡＺＯＮｺｰﾋｰ"
+    )
+    # 日付・金額・種別・通貨のどれかが違えば別の指紋になる
+    assert content_hash != calculate_content_hash(
+        date(2025, 1, 2), 1000, CashFlowType.EXPENSE, "JPY", "Amazon コーヒー"
+    )
+    assert content_hash != calculate_content_hash(
+        date(2025, 1, 1), 1001, CashFlowType.EXPENSE, "JPY", "Amazon コーヒー"
+    )
+    assert content_hash != calculate_content_hash(
+        date(2025, 1, 1), 1000, CashFlowType.INCOME, "JPY", "Amazon コーヒー"
+    )
+    assert content_hash != calculate_content_hash(
+        date(2025, 1, 1), 1000, CashFlowType.EXPENSE, "USD", "Amazon コーヒー"
+    )
@@ -0,0 +1,83 @@
+import io
+
+from datetime import date, datetime
+
+import pytest
+
+from kakeibo_be.logic.snapshot.encode_columnar_snapshot import (
+    DATE,
+    DATETIME,
+    INT,
+    STR,
+    SnapshotColumn,
+    SnapshotHeader,
+    read_chunks,
+    read_header,
+    write_chunk,
+    write_end,
+    write_header,
+)
+
+COLUMNS = (
+    SnapshotColumn(name="id", kind=INT),
+    SnapshotColumn(name="title", kind=STR),
+    SnapshotColumn(name="recorded_at", kind=DATE),
+    SnapshotColumn(name="deleted_at", kind=DATETIME),
+)
+HEADER = SnapshotHeader(
+    table="cash_flows",
+    schema_revision="abc123",
+    columns=COLUMNS,
+    created_at=datetime(2025, 1, 1, 12, 0),
+)
+
+
+def write_snapshot(chunks: list[list[list]]) -> io.BytesIO:
+    file = io.BytesIO()
+    write_header(file, HEADER)
+    for chunk in chunks:
+        write_chunk(file, COLUMNS, chunk)
+    write_end(file, sum(len(chunk[0]) for chunk in chunks))
+    file.seek(0)
+    return file
+
+
+def test_round_trip() -> None:
+    chunks = [
+        [
+            [1, 2, 3],
+            ["スーパー", "", None],
+            [date(2025, 1, 1), date(1969, 12, 31), date(2025, 12, 31)],
+            [None, datetime(2025, 1, 2, 3, 4, 5, 678901), None],
+        ],
+        # 区切り文字を含む文字列も、そのまま戻る
+        [[2**40], ["a\x00b"], [date(2025, 2, 1)], [datetime(2025, 2, 1)]],
+    ]
+    file = write_snapshot(chunks)
+
+    assert read_header(file) == HEADER
+    assert list(read_chunks(file, COLUMNS)) == chunks
+
+
+def test_dates_as_text() -> None:
+    file = write_snapshot(
+        [[[1, 2], ["a", "b"], [date(2025, 1, 1), None], [datetime(2025, 1, 2, 3, 4, 5), None]]]
+    )
+    read_header(file)
+
+    assert list(read_chunks(file, COLUMNS, dates_as_text=True)) == [
+        [[1, 2], ["a", "b"], ["2025-01-01", None], ["2025-01-02 03:04:05.000000", None]]
+    ]
+
+
+def test_truncated_file() -> None:
+    data = write_snapshot([[[1], ["a"], [date(2025, 1, 1)], [None]]]).getvalue()
+
+    # 終わりの印がない
+    file = io.BytesIO(data[:-12])
+    read_header(file)
+    with pytest.raises(ValueError):
+        list(read_chunks(file, COLUMNS))
+
+    with pytest.raises(ValueError):
+        read_header(io.BytesIO(b"not a snapshot"))
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from kakeibo_be.main import app
+from kakeibo_be.middlewares.admission_control import AdmissionLimiter, get_admission_limiter
+
+
+def test_acquire_in_arrival_order() -> None:
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue_size=2, queue_timeout=1)
+
+    async def run() -> list[str]:
+        order: list[str] = []
+
+        async def request(name: str) -> None:
+            assert await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        await asyncio.gather(request("a"), request("b"), request("c"))
+        return order
+
+    assert asyncio.run(run()) == ["a", "b", "c"]
+    metrics = limiter.get_metrics()
+    assert metrics.in_flight == 0
+    assert metrics.queue_depth == 0
+    assert metrics.admitted_count == 3
+
+
+def test_reject_when_queue_is_full() -> None:
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue_size=0, queue_timeout=1)
+
+    async def run() -> bool:
+        assert await limiter.acquire()
+        # 待ち行列がないので、空きを待たずにすぐ断る
+        return await limiter.acquire()
+
+    assert asyncio.run(run()) is False
+    assert limiter.get_metrics().rejected_count == 1
+
+
+def test_reject_after_queue_timeout() -> None:
+    limiter = AdmissionLimiter(max_concurrency=1, max_queue_size=1, queue_timeout=0.01)
+
+    async def run() -> bool:
+        assert await limiter.acquire()
+        return await limiter.acquire()
+
+    assert asyncio.run(run()) is False
+    metrics = limiter.get_metrics()
+    assert metrics.timed_out_count == 1
+    # 諦めたリクエストは待ち行列に残らない
+    assert metrics.queue_depth == 0
+    assert metrics.in_flight == 1
+
+
+def test_shed_with_503(monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = get_admission_limiter()
+    monkeypatch.setattr(limiter, "max_concurrency", 0)
+    monkeypatch.setattr(limiter, "max_queue_size", 0)
+    rejected_count = limiter.get_metrics().rejected_count
+
+    client = TestClient(app)
+
+    response = client.get("/api/v1/cash-flows", params={"target_month": "2025-12-01"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    # ヘルスチェックとメトリクスは制限の対象外
+    assert client.get("/api/v1/health-check").status_code == 200
+    response = client.get("/api/v1/metrics/admission")
+    assert response.status_code == 200
+    assert response.json()["rejectedCount"] == rejected_count + 1
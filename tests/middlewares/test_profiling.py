@@ -0,0 +1,113 @@
+import threading
+import time
+
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from kakeibo_be.middlewares.profiling import ProfilingMiddleware
+
+
+def sleep_in_worker_thread() -> None:
+    time.sleep(0.05)
+
+
+def sleep_in_other_thread() -> None:
+    time.sleep(0.1)
+
+
+def busy_in_event_loop() -> None:
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+def create_client(output_dir: Path, token: str = "secret", sample_rate: float = 0) -> TestClient:
+    app = FastAPI()
+
+    # 同期のハンドラーはスレッドプールで動く
+    @app.get("/sync")
+    def sync_endpoint() -> dict[str, str]:
+        sleep_in_worker_thread()
+        return {"status": "ok"}
+
+    @app.get("/async")
+    async def async_endpoint() -> dict[str, str]:
+        busy_in_event_loop()
+        return {"status": "ok"}
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=token,
+        sample_rate=sample_rate,
+        output_dir=output_dir,
+        interval=0.001,
+    )
+    return TestClient(app)
+
+
+def test_profile_sync_endpoint_with_token(tmp_path: Path) -> None:
+    client = create_client(tmp_path)
+
+    response = client.get("/sync", headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200
+    profile_path = tmp_path / response.headers["X-Profile-File"]
+    collapsed = profile_path.read_text(encoding="utf-8")
+    # ワーカースレッドで動いたハンドラーの中まで記録されている
+    assert "sync_endpoint" in collapsed
+    assert "sleep_in_worker_thread" in collapsed
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack
+        assert int(count) > 0
+
+
+def test_profile_ignores_threads_of_other_work(tmp_path: Path) -> None:
+    client = create_client(tmp_path)
+    other = threading.Thread(target=sleep_in_other_thread)
+    other.start()
+
+    response = client.get("/sync", headers={"X-Profile-Token": "secret"})
+    other.join()
+
+    collapsed = (tmp_path / response.headers["X-Profile-File"]).read_text(encoding="utf-8")
+    # このリクエストから受け渡されたワーカースレッドの処理だけが記録される
+    assert "sleep_in_worker_thread" in collapsed
+    assert "sleep_in_other_thread" not in collapsed
+    # スタックは受け渡された処理から始まり、スレッドプールの内部は含まない
+    for line in collapsed.splitlines():
+        if "sleep_in_worker_thread" in line:
+            assert line.startswith("create_client.<locals>.sync_endpoint")
+
+
+def test_profile_async_endpoint_with_token(tmp_path: Path) -> None:
+    client = create_client(tmp_path)
+
+    response = client.get("/async", headers={"X-Profile-Token": "secret"})
+
+    collapsed = (tmp_path / response.headers["X-Profile-File"]).read_text(encoding="utf-8")
+    # イベントループでの処理は、ミドルウェアから下の呼び出しとして記録されている
+    assert "ProfilingMiddleware.__call__" in collapsed
+    assert "busy_in_event_loop" in collapsed
+
+
+def test_not_profiled_without_token(tmp_path: Path) -> None:
+    client = create_client(tmp_path)
+
+    response = client.get("/sync")
+    wrong_token_response = client.get("/sync", headers={"X-Profile-Token": "wrong"})
+
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+    assert "X-Profile-File" not in wrong_token_response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled_by_sampling_rate(tmp_path: Path) -> None:
+    client = create_client(tmp_path, token="", sample_rate=1)
+
+    response = client.get("/sync")
+
+    assert (tmp_path / response.headers["X-Profile-File"]).exists()
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+from datetime import date
+
+import pytest
+
+from kakeibo_be.pubsub.broker import InMemoryChangeBroker, SubscriptionOverflowError
+from kakeibo_be.pubsub.cash_flow_change import CashFlowChangeEvent
+from kakeibo_be.store.enum.cash_flow_change_action import CashFlowChangeAction
+
+
+def make_event(sync_version: int, user_id: int = 1) -> CashFlowChangeEvent:
+    return CashFlowChangeEvent(
+        action=CashFlowChangeAction.DELETED,
+        cash_flow_id=sync_version,
+        user_id=user_id,
+        sync_version=sync_version,
+        recorded_at=date(year=2025, month=12, day=1),
+    )
+
+
+def test_publish_from_other_thread() -> None:
+    broker = InMemoryChangeBroker(buffer_size=10)
+
+    async def run() -> list[int]:
+        async with broker.subscribe(1) as subscription:
+            # 同期ハンドラと同じく、イベントループ以外のスレッドから配信する
+            thread = threading.Thread(target=lambda: [broker.publish(make_event(i)) for i in (1, 2)])
+            thread.start()
+            thread.join()
+            first = await subscription.receive(timeout=1)
+            second = await subscription.receive(timeout=1)
+            assert await subscription.receive(timeout=0.01) is None
+            return [first.sync_version, second.sync_version]
+
+    assert asyncio.run(run()) == [1, 2]
+    # 購読を抜けたら登録も解除される
+    assert broker.subscriber_count == 0
+
+
+def test_slow_subscriber_overflow() -> None:
+    broker = InMemoryChangeBroker(buffer_size=2)
+
+    async def run() -> None:
+        async with broker.subscribe(1) as slow, broker.subscribe(1) as fast:
+            broker.publish(make_event(1))
+            assert (await fast.receive(timeout=1)).sync_version == 1
+            broker.publish(make_event(2))
+            broker.publish(make_event(3))
+            assert (await fast.receive(timeout=1)).sync_version == 2
+            assert (await fast.receive(timeout=1)).sync_version == 3
+
+            # 遅い購読者のバッファだけがあふれ、配信側や他の購読者には影響しない
+            with pytest.raises(SubscriptionOverflowError):
+                await slow.receive(timeout=1)
+
+    asyncio.run(run())
+
+
+def test_events_are_delivered_per_user() -> None:
+    broker = InMemoryChangeBroker(buffer_size=2)
+
+    async def run() -> None:
+        async with broker.subscribe(1) as subscription, broker.subscribe(2) as other:
+            # 他の利用者のイベントは、いくら多くてもバッファに入らない
+            for sync_version in range(1, 6):
+                broker.publish(make_event(sync_version, user_id=2))
+            broker.publish(make_event(6))
+
+            assert (await subscription.receive(timeout=1)).sync_version == 6
+            assert await subscription.receive(timeout=0.01) is None
+            with pytest.raises(SubscriptionOverflowError):
+                await other.receive(timeout=1)
+
+    asyncio.run(run())
+    assert broker.subscriber_count == 0
+
+
+def test_is_in_range() -> None:
+    event = CashFlowChangeEvent(
+        action=CashFlowChangeAction.UPDATED,
+        cash_flow_id=1,
+        user_id=1,
+        sync_version=1,
+        recorded_at=date(year=2025, month=12, day=1),
+        previous_recorded_at=date(year=2025, month=11, day=30),
+    )
+
+    assert event.is_in_range(date(2025, 12, 1), date(2026, 1, 1))
+    assert event.is_in_range(date(2025, 11, 1), date(2025, 12, 1))
+    assert not event.is_in_range(date(2025, 10, 1), date(2025, 11, 1))
@@ -1,8 +1,23 @@
-from datetime import date
+from datetime import date, datetime
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from kakeibo_be.repositories.cash_flow import get_cash_flow_by_id
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.repositories.cash_flow import (
+    CashFlowSearch,
+    get_cash_flow_by_id,
+    get_cash_flows_by_ids,
+    get_cash_flows_changed_since,
+    get_existing_content_hashes,
+    search_cash_flows,
+)
+from kakeibo_be.repositories.cash_flow_archive import (
+    finish_archiving,
+    move_cash_flows_to_archive,
+    start_archiving,
+)
+from kakeibo_be.store.enum.cash_flow_sort_order import CashFlowSortOrder
 from kakeibo_be.store.enum.cash_flow_type import CashFlowType
 from tests.factories.cash_flow import create_cash_flow
 
@@ -36,3 +51,201 @@ def test_get_cash_flow_by_id_without_data(db_session: Session) -> None:
     result = get_cash_flow_by_id(session=db_session, cash_flow_id=2)
 
     assert not result
+
+
+def test_get_cash_flow_by_id_deleted(db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, deleted_at=datetime(year=2025, month=10, day=2))
+
+    result = get_cash_flow_by_id(session=db_session, cash_flow_id=1)
+
+    assert not result
+
+
+def test_get_cash_flow_by_id_for_update(db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, amount=100)
+    create_cash_flow(db_session, id=2, amount=200)
+    # 先に読み込んだ行を、別のリクエストが変更・削除したものとする
+    assert get_cash_flow_by_id(session=db_session, cash_flow_id=1)
+    assert get_cash_flow_by_id(session=db_session, cash_flow_id=2)
+    db_session.execute(
+        update(CashFlow)
+        .where(CashFlow.id == 1)
+        .values(amount=150)
+        .execution_options(synchronize_session=False)
+    )
+    db_session.execute(
+        update(CashFlow)
+        .where(CashFlow.id == 2)
+        .values(deleted_at=datetime(2025, 10, 2))
+        .execution_options(synchronize_session=False)
+    )
+
+    # ロックを取って読むと、セッションに読み込み済みの値ではなくロックを取った後の値になる
+    result = get_cash_flow_by_id(session=db_session, cash_flow_id=1, for_update=True)
+    assert result
+    assert result.amount == 150
+    assert not get_cash_flow_by_id(session=db_session, cash_flow_id=2, for_update=True)
+
+
+def test_get_cash_flows_changed_since(db_session: Session) -> None:
+    for i in range(1, 5):
+        create_cash_flow(db_session, id=i, sync_version=i * 10)
+    create_cash_flow(db_session, id=5, sync_version=50, deleted_at=datetime(2025, 10, 2))
+
+    result = get_cash_flows_changed_since(session=db_session, since=20, limit=10)
+    assert [cash_flow.id for cash_flow in result] == [3, 4, 5]
+
+    result = get_cash_flows_changed_since(
+        session=db_session, since=20, limit=10, include_deleted=False
+    )
+    assert [cash_flow.id for cash_flow in result] == [3, 4]
+
+    result = get_cash_flows_changed_since(session=db_session, since=0, limit=2)
+    assert [cash_flow.id for cash_flow in result] == [1, 2]
+
+
+def test_get_cash_flows_by_ids(db_session: Session) -> None:
+    for i in range(1, 8):
+        create_cash_flow(db_session, id=i, title=f"もも_{i}")
+    create_cash_flow(db_session, id=8, deleted_at=datetime(2025, 10, 2))
+
+    # chunk_size より多い id は、複数回の IN 句に分けて取得する
+    result = get_cash_flows_by_ids(
+        session=db_session, cash_flow_ids=[7, 1, 8, 3, 99, 1, 5, 2], chunk_size=3
+    )
+
+    # 削除済み・存在しない id は含まれない
+    assert sorted(result) == [1, 2, 3, 5, 7]
+    assert result[7].title == "もも_7"
+
+
+def test_get_cash_flows_by_ids_for_update(db_session: Session) -> None:
+    for i in range(1, 4):
+        create_cash_flow(db_session, id=i, amount=100 * i)
+    assert sorted(get_cash_flows_by_ids(session=db_session, cash_flow_ids=[1, 2, 3])) == [1, 2, 3]
+    db_session.execute(
+        update(CashFlow)
+        .where(CashFlow.id == 1)
+        .values(amount=150)
+        .execution_options(synchronize_session=False)
+    )
+    db_session.execute(
+        update(CashFlow)
+        .where(CashFlow.id == 3)
+        .values(deleted_at=datetime(2025, 10, 2))
+        .execution_options(synchronize_session=False)
+    )
+
+    result = get_cash_flows_by_ids(
+        session=db_session, cash_flow_ids=[3, 2, 1], chunk_size=2, for_update=True
+    )
+
+    # ロックを取った後の値で読み直し、その間に削除された行は含まれない
+    assert sorted(result) == [1, 2]
+    assert result[1].amount == 150
+
+
+def test_get_cash_flows_by_ids_from_archive(db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2023, 12, 1))
+    create_cash_flow(db_session, id=2, recorded_at=date(2024, 1, 1))
+    start_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    move_cash_flows_to_archive(session=db_session, archive_before=date(2024, 1, 1), limit=100)
+    finish_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    db_session.commit()
+
+    result = get_cash_flows_by_ids(session=db_session, cash_flow_ids=[1, 2])
+
+    # 締めた期間に移動した行はアーカイブから取得する
+    assert sorted(result) == [1, 2]
+    assert result[1].recorded_at == date(2023, 12, 1)
+
+
+def test_get_existing_content_hashes(tenant_session: Session) -> None:
+    for i in range(1, 5):
+        create_cash_flow(tenant_session, id=i, content_hash=f"hash_{i}")
+    # 同じ指紋の行が複数あっても1つにまとめる
+    create_cash_flow(tenant_session, id=5, content_hash="hash_1")
+    # 他の利用者の行・未計算の行は対象外
+    create_cash_flow(tenant_session, id=6, content_hash="hash_6", user_id=2)
+    create_cash_flow(tenant_session, id=7, content_hash=None)
+
+    result = get_existing_content_hashes(
+        session=tenant_session,
+        content_hashes=["hash_1", "hash_3", "hash_6", "hash_9", "hash_4", "hash_1"],
+        chunk_size=2,
+    )
+
+    assert result == {"hash_1", "hash_3", "hash_4"}
+
+
+def test_search_cash_flows(tenant_session: Session) -> None:
+    create_cash_flow(tenant_session, id=1, title="コンビニ", recorded_at=date(2025, 1, 1), amount=300)
+    create_cash_flow(tenant_session, id=2, title="スーパー", recorded_at=date(2025, 1, 2), amount=3000)
+    create_cash_flow(
+        tenant_session,
+        id=3,
+        title="給与",
+        recorded_at=date(2025, 1, 3),
+        amount=200000,
+        type=CashFlowType.INCOME,
+    )
+    create_cash_flow(tenant_session, id=4, title="コンビニ", recorded_at=date(2025, 1, 3), amount=500)
+    create_cash_flow(tenant_session, id=5, title="100%果汁", recorded_at=date(2025, 2, 1), amount=150)
+    # 削除した行・他の利用者の行は対象外
+    create_cash_flow(tenant_session, id=6, title="コンビニ", deleted_at=datetime(2025, 1, 4))
+    create_cash_flow(tenant_session, id=7, title="コンビニ", user_id=2)
+
+    def ids(**conditions: object) -> list[int]:
+        rows = search_cash_flows(tenant_session, CashFlowSearch(**conditions), limit=100)
+        return [row.id for row in rows]
+
+    # 省略すると日付の新しい順（同じ日は id の大きい順）
+    assert ids() == [5, 4, 3, 2, 1]
+    assert ids(start_date=date(2025, 1, 2), end_date=date(2025, 2, 1)) == [4, 3, 2]
+    assert ids(cash_flow_type=CashFlowType.INCOME) == [3]
+    assert ids(min_amount=300, max_amount=3000, sort=CashFlowSortOrder.AMOUNT_ASC) == [1, 4, 2]
+    assert ids(title_contains="コンビニ", sort=CashFlowSortOrder.RECORDED_AT_ASC) == [1, 4]
+    # % はワイルドカードではなく文字として探す
+    assert ids(title_contains="%") == [5]
+    assert ids(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 2, 1),
+        cash_flow_type=CashFlowType.EXPENSE,
+        min_amount=400,
+        sort=CashFlowSortOrder.AMOUNT_DESC,
+    ) == [2, 4]
+
+
+def test_search_cash_flows_pagination(tenant_session: Session) -> None:
+    for i in range(1, 8):
+        create_cash_flow(tenant_session, id=i, recorded_at=date(2025, 1, 1 + i // 3), amount=100)
+
+    search = CashFlowSearch(sort=CashFlowSortOrder.AMOUNT_DESC)
+    pages = []
+    while True:
+        rows = search_cash_flows(tenant_session, search, limit=3)
+        if not rows:
+            break
+        pages.append([row.id for row in rows])
+        search = CashFlowSearch(sort=search.sort, after=(rows[-1].amount, rows[-1].id))
+
+    # 同じ金額の行も id で続きから読む
+    assert pages == [[7, 6, 5], [4, 3, 2], [1]]
+
+
+def test_search_cash_flows_with_archive(db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, recorded_at=date(2023, 12, 1), amount=100)
+    create_cash_flow(db_session, id=2, recorded_at=date(2024, 1, 1), amount=50)
+    create_cash_flow(db_session, id=3, recorded_at=date(2023, 11, 1), amount=300)
+    start_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    move_cash_flows_to_archive(session=db_session, archive_before=date(2024, 1, 1), limit=100)
+    finish_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    db_session.commit()
+
+    rows = search_cash_flows(
+        db_session, CashFlowSearch(sort=CashFlowSortOrder.AMOUNT_ASC), limit=2
+    )
+    assert [row.id for row in rows] == [2, 1]
+    # 期間がアーカイブより後なら cash_flows だけを読む
+    rows = search_cash_flows(db_session, CashFlowSearch(start_date=date(2024, 1, 1)), limit=10)
+    assert [row.id for row in rows] == [2]
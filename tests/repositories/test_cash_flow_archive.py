@@ -0,0 +1,49 @@
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.repositories.cash_flow import get_cash_flows_in_range
+from kakeibo_be.repositories.cash_flow_archive import (
+    finish_archiving,
+    is_closed_period,
+    move_cash_flows_to_archive,
+    start_archiving,
+)
+from tests.factories.cash_flow import create_cash_flow
+
+
+def _archive(session: Session, archive_before: date) -> None:
+    start_archiving(session=session, archive_before=archive_before)
+    move_cash_flows_to_archive(session=session, archive_before=archive_before, limit=100)
+    finish_archiving(session=session, archive_before=archive_before)
+    session.commit()
+
+
+def test_get_cash_flows_in_range_across_archive(db_session: Session) -> None:
+    create_cash_flow(db_session, id=1, title="もも_1", recorded_at=date(2023, 12, 31))
+    create_cash_flow(db_session, id=2, title="もも_2", recorded_at=date(2024, 1, 1))
+    create_cash_flow(db_session, id=3, title="もも_3", recorded_at=date(2023, 12, 1))
+    _archive(db_session, date(2024, 1, 1))
+
+    # アーカイブ側と cash_flows の両方にまたがる範囲は、日付順にまとめて返す
+    result = get_cash_flows_in_range(
+        session=db_session, start_date=date(2023, 12, 1), end_date=date(2024, 2, 1)
+    )
+    assert [cash_flow.id for cash_flow in result] == [3, 1, 2]
+
+    # アーカイブ側だけの範囲
+    result = get_cash_flows_in_range(
+        session=db_session, start_date=date(2023, 12, 1), end_date=date(2024, 1, 1)
+    )
+    assert [cash_flow.id for cash_flow in result] == [3, 1]
+
+
+def test_is_closed_period(db_session: Session) -> None:
+    assert not is_closed_period(db_session, date(2023, 12, 31))
+
+    # 移動中でも、境界を進めた時点で締めた期間として扱う
+    start_archiving(session=db_session, archive_before=date(2024, 1, 1))
+    db_session.commit()
+
+    assert is_closed_period(db_session, date(2023, 12, 31))
+    assert not is_closed_period(db_session, date(2024, 1, 1))
@@ -0,0 +1,72 @@
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.repositories.cash_flow_archive import (
+    finish_archiving,
+    move_cash_flows_to_archive,
+    start_archiving,
+)
+from kakeibo_be.repositories.category import get_category_breakdown, get_top_titles
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from tests.factories.cash_flow import create_cash_flow
+from tests.factories.category import create_category
+
+EXPENSE = CashFlowType.EXPENSE
+
+
+def test_get_category_breakdown(tenant_session: Session) -> None:
+    food = create_category(tenant_session, name="食費")
+    transport = create_category(tenant_session, name="交通費")
+    rows = [
+        ("スーパー", 3000, food.id, date(2025, 1, 5)),
+        ("スーパー", 2000, food.id, date(2025, 1, 20)),
+        ("電車", 500, transport.id, date(2025, 1, 10)),
+        ("雑貨", 800, None, date(2025, 1, 15)),
+        # 期間の外
+        ("電車", 9999, transport.id, date(2025, 2, 1)),
+    ]
+    for i, (title, amount, category_id, recorded_at) in enumerate(rows, start=1):
+        create_cash_flow(
+            tenant_session,
+            id=i,
+            title=title,
+            amount=amount,
+            category_id=category_id,
+            recorded_at=recorded_at,
+        )
+    # 収入と、他の利用者の行は含まない
+    create_cash_flow(tenant_session, id=6, type=CashFlowType.INCOME, recorded_at=date(2025, 1, 5))
+    create_cash_flow(tenant_session, id=7, user_id=2, amount=100000, recorded_at=date(2025, 1, 5))
+
+    breakdown = get_category_breakdown(tenant_session, date(2025, 1, 1), date(2025, 2, 1), EXPENSE)
+
+    assert [tuple(row) for row in breakdown] == [
+        (food.id, "食費", 5000, 2),
+        (None, None, 800, 1),
+        (transport.id, "交通費", 500, 1),
+    ]
+
+
+def test_get_top_titles_includes_archive(tenant_session: Session) -> None:
+    create_cash_flow(
+        tenant_session, id=1, title="家賃", amount=80000, recorded_at=date(2023, 12, 25)
+    )
+    create_cash_flow(
+        tenant_session, id=2, title="家賃", amount=80000, recorded_at=date(2024, 1, 25)
+    )
+    create_cash_flow(
+        tenant_session, id=3, title="スーパー", amount=3000, recorded_at=date(2024, 1, 5)
+    )
+    create_cash_flow(tenant_session, id=4, title="電車", amount=500, recorded_at=date(2024, 1, 6))
+    # 2023 年の行をアーカイブに移す
+    start_archiving(tenant_session, date(2024, 1, 1))
+    move_cash_flows_to_archive(tenant_session, date(2024, 1, 1), limit=100)
+    finish_archiving(tenant_session, date(2024, 1, 1))
+    tenant_session.commit()
+
+    top_titles = get_top_titles(
+        tenant_session, date(2023, 12, 1), date(2024, 2, 1), EXPENSE, limit=2
+    )
+
+    assert [tuple(row) for row in top_titles] == [("家賃", 160000, 2), ("スーパー", 3000, 1)]
@@ -0,0 +1,54 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from kakeibo_be.repositories.cash_flow import get_daily_totals_in_range
+from kakeibo_be.repositories.fx_rate import get_effective_fx_rate, upsert_fx_rates
+from kakeibo_be.store.enum.cash_flow_type import CashFlowType
+from tests.factories.cash_flow import create_cash_flow
+from tests.factories.fx_rate import create_fx_rate
+
+
+def test_get_effective_fx_rate(db_session: Session) -> None:
+    create_fx_rate(db_session, rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+    create_fx_rate(db_session, rate_date=date(2025, 1, 3), rate=Decimal("1.6"))
+    create_fx_rate(db_session, currency="EUR", rate_date=date(2025, 1, 2), rate=Decimal("1.7"))
+
+    assert get_effective_fx_rate(db_session, "USD", date(2025, 1, 1)) == Decimal("1.5")
+    # レートのない日は、それより前で最も新しい日のレート
+    assert get_effective_fx_rate(db_session, "USD", date(2025, 1, 2)) == Decimal("1.5")
+    assert get_effective_fx_rate(db_session, "USD", date(2025, 2, 1)) == Decimal("1.6")
+    assert get_effective_fx_rate(db_session, "USD", date(2024, 12, 31)) is None
+
+
+def test_upsert_fx_rates(db_session: Session) -> None:
+    create_fx_rate(db_session, rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+
+    upsert_fx_rates(
+        db_session,
+        [
+            {"currency": "USD", "rate_date": date(2025, 1, 1), "rate": Decimal("1.4")},
+            {"currency": "USD", "rate_date": date(2025, 1, 2), "rate": Decimal("1.45")},
+        ],
+    )
+
+    assert get_effective_fx_rate(db_session, "USD", date(2025, 1, 1)) == Decimal("1.4")
+    assert get_effective_fx_rate(db_session, "USD", date(2025, 1, 2)) == Decimal("1.45")
+
+
+def test_get_daily_totals_in_range_sums_base_amount(tenant_session: Session) -> None:
+    create_fx_rate(tenant_session, rate_date=date(2025, 1, 1), rate=Decimal("1.5"))
+    create_fx_rate(tenant_session, rate_date=date(2025, 1, 2), rate=Decimal("2"))
+    create_cash_flow(tenant_session, id=1, recorded_at=date(2025, 1, 1), amount=1000)
+    create_cash_flow(tenant_session, id=2, recorded_at=date(2025, 1, 1), amount=100, currency="USD", base_amount=150)
+    create_cash_flow(tenant_session, id=3, recorded_at=date(2025, 1, 1), amount=101, currency="USD", base_amount=152)
+    create_cash_flow(tenant_session, id=4, recorded_at=date(2025, 1, 5), amount=10, currency="USD", base_amount=20)
+
+    rows = get_daily_totals_in_range(tenant_session, date(2025, 1, 1), date(2025, 2, 1))
+
+    # 今のレートで換算し直さず、行に保存した換算額を合計する
+    assert sorted((row.recorded_at, row.type, row.amount) for row in rows) == [
+        (date(2025, 1, 1), CashFlowType.EXPENSE, 1302),
+        (date(2025, 1, 5), CashFlowType.EXPENSE, 20),
+    ]
@@ -0,0 +1,74 @@
+from datetime import date, datetime
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.cash_flow import CashFlow
+from kakeibo_be.repositories.recurring_cash_flow import (
+    is_recurring_month_materialized,
+    materialize_recurring_cash_flows,
+    reset_recurring_materialized_months,
+)
+from kakeibo_be.store.enum.recurrence_frequency import RecurrenceFrequency
+from tests.factories.recurring_cash_flow import create_recurring_cash_flow
+
+
+def get_recurring_cash_flows_in_db(session: Session) -> list[CashFlow]:
+    result = session.execute(select(CashFlow).order_by(CashFlow.recorded_at, CashFlow.title))
+    return list(result.scalars())
+
+
+def test_materialize_recurring_cash_flows(tenant_session: Session) -> None:
+    rent = create_recurring_cash_flow(tenant_session, title="家賃")
+    create_recurring_cash_flow(
+        tenant_session,
+        title="ジム",
+        amount=1000,
+        frequency=RecurrenceFrequency.WEEKLY,
+        start_date=date(year=2025, month=1, day=29),
+    )
+    # 終了済みのルールは展開されない
+    create_recurring_cash_flow(tenant_session, title="旧サブスク", end_date=date(2025, 1, 31))
+
+    month = date(year=2025, month=2, day=1)
+    created_count = materialize_recurring_cash_flows(tenant_session, month)
+    tenant_session.commit()
+
+    assert created_count == 5
+    assert is_recurring_month_materialized(tenant_session, month)
+    cash_flows = get_recurring_cash_flows_in_db(tenant_session)
+    assert [(cash_flow.title, cash_flow.recorded_at.day) for cash_flow in cash_flows] == [
+        ("ジム", 5),
+        ("ジム", 12),
+        ("ジム", 19),
+        ("家賃", 25),
+        ("ジム", 26),
+    ]
+    assert cash_flows[3].recurring_cash_flow_id == rent.id
+    assert cash_flows[3].amount == 80000
+    # 差分同期のバージョンは1件ずつ別の値が振られる
+    assert len({cash_flow.sync_version for cash_flow in cash_flows}) == 5
+
+
+def test_materialize_recurring_cash_flows_twice(tenant_session: Session) -> None:
+    create_recurring_cash_flow(tenant_session)
+    month = date(year=2025, month=2, day=1)
+    materialize_recurring_cash_flows(tenant_session, month)
+    tenant_session.commit()
+
+    # ルールの追加などで印を消しても、作成済みの分（論理削除したものも含む）は作り直さない
+    cash_flow = get_recurring_cash_flows_in_db(tenant_session)[0]
+    cash_flow.deleted_at = datetime(year=2025, month=2, day=26)
+    reset_recurring_materialized_months(tenant_session, month)
+    tenant_session.commit()
+
+    assert materialize_recurring_cash_flows(tenant_session, month) == 0
+    tenant_session.commit()
+    assert len(get_recurring_cash_flows_in_db(tenant_session)) == 1
+
+    # 展開済みの月をもう一度展開しようとすると、展開済みの印の重複で失敗する
+    with pytest.raises(IntegrityError):
+        materialize_recurring_cash_flows(tenant_session, month)
@@ -0,0 +1,39 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from kakeibo_be.models.db.sync_sequence import SyncSequence
+from kakeibo_be.repositories.sync_sequence import (
+    LEGACY_SYNC_USER_ID,
+    advance_purged_sync_version,
+    allocate_sync_versions,
+    get_current_sync_version,
+    get_purged_sync_version,
+)
+
+
+def test_allocate_sync_versions_per_user(db_session: Session) -> None:
+    # 利用者ごとに分ける前の全体の値
+    db_session.execute(
+        update(SyncSequence)
+        .where(SyncSequence.user_id == LEGACY_SYNC_USER_ID)
+        .values(last_value=100, purged_value=50)
+    )
+
+    # まだ書き込んでいない利用者は全体の値を引き継ぎ、最初の採番で行を作る
+    assert get_current_sync_version(db_session, user_id=1) == 100
+    assert get_purged_sync_version(db_session, user_id=1) == 50
+    assert allocate_sync_versions(db_session, count=3, user_id=1) == 103
+    assert allocate_sync_versions(db_session, user_id=1) == 104
+    # 別の利用者の採番は独立している
+    assert allocate_sync_versions(db_session, user_id=2) == 101
+    assert get_current_sync_version(db_session, user_id=1) == 104
+
+    advance_purged_sync_version(db_session, purged_value=102, user_id=1)
+    # 巻き戻さない
+    advance_purged_sync_version(db_session, purged_value=60, user_id=1)
+    assert get_purged_sync_version(db_session, user_id=1) == 102
+    assert get_purged_sync_version(db_session, user_id=2) == 50
+    # 行のない利用者の削除済みの範囲を進めると、全体の値から行を作る
+    advance_purged_sync_version(db_session, purged_value=70, user_id=3)
+    assert get_current_sync_version(db_session, user_id=3) == 100
+    assert get_purged_sync_version(db_session, user_id=3) == 70